@@ -8,15 +8,171 @@ Author: Mathias Roesler
 Date: 11/24
 """
 
+import sys
+
+import math
 import numpy as np
 
-from scipy.integrate import ode
-from conversion.constants import SOLVER, METHOD, ATOL, RTOL, MAX_STEP
+from conversion import solver
 
 # Size of variable np.arrays:
 sizeAlgebraic = 59
 sizeStates = 9
 sizeConstants = 73
+gateStates = [2, 3, 4, 5, 6, 7, 8]
+derivedConstants = {
+    53: [23],
+    54: [22, 20],
+    58: [56, 20],
+    60: [57, 20],
+    69: [65, 64, 66, 57, 52],
+    70: [65, 64, 66, 56, 51],
+    71: [65, 64, 66, 55, 59],
+}
+stateIndices = {
+    "v": 0,
+    "cai": 1,
+    "w": 2,
+    "h": 3,
+    "f2": 4,
+    "q": 5,
+    "r1": 6,
+    "r2": 7,
+    "c": 8,
+}
+algebraicIndices = {
+    "I_stim": 0,
+    "wss": 1,
+    "Force": 2,
+    "hss": 3,
+    "qss": 4,
+    "rss": 5,
+    "vFRT": 6,
+    "wtc": 7,
+    "htc": 8,
+    "qtc": 9,
+    "r1tc": 10,
+    "r2tc": 11,
+    "enscc": 12,
+    "K1cl": 13,
+    "mss": 14,
+    "K2cl": 15,
+    "ina": 16,
+    "css": 17,
+    "fca": 18,
+    "ctc": 19,
+    "dss": 20,
+    "fss": 21,
+    "ical": 22,
+    "f2tc": 23,
+    "bss": 24,
+    "gss": 25,
+    "icat": 26,
+    "I_Ca_tot": 27,
+    "ib": 28,
+    "ikv43": 29,
+    "xass_z": 30,
+    "xass_vh": 31,
+    "xass": 32,
+    "iBKa": 33,
+    "xabss_z": 34,
+    "xabss_vh": 35,
+    "xabss": 36,
+    "iBKab": 37,
+    "I_K_tot": 38,
+    "icl": 39,
+    "insna": 40,
+    "insk": 41,
+    "insca": 42,
+    "I_NS_tot": 43,
+    "J_Ca_mem": 44,
+    "I_tot": 45,
+    "f1naca": 46,
+    "jcamem_plot": 47,
+    "f2naca": 48,
+    "fallo": 49,
+    "naca_Eup": 50,
+    "naca_Ed1": 51,
+    "naca_Ed2": 52,
+    "naca_Ed3": 53,
+    "jnaca": 54,
+    "jpmca": 55,
+    "jnaca_plot": 56,
+    "J_tot": 57,
+    "jpmca_plot": 58,
+}
+constantIndices = {
+    "I_hold": 0,
+    "I_test": 1,
+    "stim_start": 2,
+    "stim_interval": 3,
+    "stim_duration": 4,
+    "Cm": 5,
+    "conversion": 6,
+    "gna": 7,
+    "gcal": 8,
+    "gcat": 9,
+    "gkca": 10,
+    "gb": 11,
+    "gkv43": 12,
+    "gbka": 13,
+    "gbkab": 14,
+    "gcl": 15,
+    "gns": 16,
+    "tinyamount": 20,
+    "jnaca_sign": 21,
+    "cao": 22,
+    "mgo": 23,
+    "zna": 24,
+    "zk": 25,
+    "ecal": 26,
+    "kmca": 27,
+    "ecat": 28,
+    "PnsK": 29,
+    "PnsNa": 30,
+    "PnsCa": 31,
+    "PnsCs": 32,
+    "gnsCa": 33,
+    "gnsNa": 34,
+    "gnsK": 35,
+    "gnsCs": 36,
+    "PK": 37,
+    "PNa": 38,
+    "Jpmca": 39,
+    "Kmpmca": 40,
+    "npmca": 41,
+    "Kmallo": 42,
+    "nallo": 43,
+    "Kmnai": 44,
+    "Kmcai": 45,
+    "Kmnao": 46,
+    "Kmcao": 47,
+    "Fmax": 48,
+    "FKm": 49,
+    "Fn": 50,
+    "ki": 51,
+    "nai": 52,
+    "fmg": 53,
+    "gs_cao": 54,
+    "cli": 55,
+    "ko": 56,
+    "nao": 57,
+    "gs_ko": 58,
+    "clo": 59,
+    "gs_nao": 60,
+    "buff": 61,
+    "AV": 62,
+    "zca": 63,
+    "R": 64,
+    "frdy": 65,
+    "temp": 66,
+    "Jnaca": 67,
+    "ksat": 68,
+    "ena": 69,
+    "ek": 70,
+    "ecl": 71,
+    "xgamma": 72,
+}
 
 
 def create_legends():
@@ -301,9 +457,78 @@ def init_consts():
     return (states, constants)
 
 
+def compute_derived_constants(constants, derived=None):
+    """Computes the constants that depend on other constants
+
+    Generated from init_consts by conversion.codegen, do not edit.
+
+    Args:
+    constants -- list[int], list of constant values.
+    derived -- set[int], indices of the derived constants to compute,
+    default value None for all of them.
+
+    Returns:
+    constants -- list[int], list of updated constant values.
+
+    """
+    if derived is None:
+        derived = derivedConstants
+    if 53 in derived:
+        constants[53] = 0.108043 + 0.903902 / (
+            1.0 + np.power(constants[23] / 0.281007, 1.29834)
+        )
+    if 54 in derived:
+        constants[54] = (
+            1.0
+            / 0.000525
+            * 0.03
+            / (1.0 + np.power(150.0 / (constants[22] + constants[20]), 2.0))
+        )
+    if 58 in derived:
+        constants[58] = (
+            1.0
+            / 0.0123
+            * 0.03
+            / (1.0 + np.power(150.0 / (constants[56] + constants[20]), 2.0))
+        )
+    if 60 in derived:
+        constants[60] = (
+            1.0
+            / 0.0123
+            * 0.03
+            / (1.0 + np.power(150.0 / (constants[57] + constants[20]), 2.0))
+        )
+    if 69 in derived:
+        constants[69] = (
+            constants[64]
+            * constants[66]
+            / constants[65]
+            * np.log(constants[57] / constants[52])
+        )
+    if 70 in derived:
+        constants[70] = (
+            constants[64]
+            * constants[66]
+            / constants[65]
+            * np.log(constants[56] / constants[51])
+        )
+    if 71 in derived:
+        constants[71] = (
+            constants[64]
+            * constants[66]
+            / constants[65]
+            * np.log(constants[55] / constants[59])
+        )
+    return constants
+
+
 def compute_rates(voi, states, constants):
     """Computes rates of the system
 
+    The states and constants can also be arrays of shape (sizeStates,
+    nb_batch) and (sizeConstants, nb_batch) to compute the rates of a batch
+    of simulations at once.
+
     Args:
     voi -- list[flaot], list of voi.
     states -- list[float], list of states.
@@ -554,6 +779,1108 @@ def compute_rates(voi, states, constants):
     return rates
 
 
+def compute_jacobian(voi, states, constants):
+    """Computes the Jacobian of the rates with respect to the states
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- list[float], list of states.
+    constants -- list[int], list of constant values.
+
+    Returns:
+    jacobian -- np.array[float], derivative of rates[i] with respect
+    to states[j] at index [i, j].
+
+    """
+    jacobian = np.zeros((sizeStates, sizeStates) + np.shape(states[0]))
+    x0 = 0.38 * states[6] + 0.63 * states[7]
+    x1 = constants[12] * np.power(states[5], 2)
+    x2 = constants[18] * states[1]
+    x3 = 0.001353075608511928 * x2 + 2.0814226778178138
+    x4 = np.power(x3, 2.0) + 1.0
+    x5 = 6.175050326660162 * x2 - 0.38935853577206647
+    x6 = np.power(x5, 2.0) + 1.0
+    x7 = 0.749234 / x6 - 8.38384 / x4
+    x8 = 4179.239211293976 * x2 + 992.5818503999532
+    x9 = np.power(x8, 0.42291) + 1.0
+    x10 = 1.0 / constants[64]
+    x11 = 1.0 / constants[66]
+    x12 = constants[65] * x10 * x11
+    x13 = x12 * (states[0] + 37.5137 - 5011.47 / x9)
+    x14 = np.exp(x13 * x7)
+    x15 = x14 + 1.0
+    x16 = 1.0 * constants[10]
+    x17 = constants[13] * x16
+    x18 = constants[19] * states[1]
+    x19 = 0.0014599691070536947 * x18 + 0.33390953447425054
+    x20 = np.power(x19, 2.0) + 1.0
+    x21 = 2.3346212660651124 * x18 - 0.5112540418130668
+    x22 = np.power(x21, 2.0) + 1.0
+    x23 = 0.681249 / x22 - 1.40001 / x20
+    x24 = 250.55435150269975 * x18 + 100.5196497250166
+    x25 = np.power(x24, 0.668054) + 1.0
+    x26 = x12 * (states[0] + 109.275 - 8540.23 / x25)
+    x27 = np.exp(x23 * x26)
+    x28 = x27 + 1.0
+    x29 = constants[14] * x16
+    x30 = constants[7] * states[3]
+    x31 = np.exp(-0.10822358559890391 * states[0])
+    x32 = 0.020413741940116113 * x31 + 1.0
+    x33 = 1.0 / np.power(x32, 3)
+    x34 = states[0] * x12
+    x35 = np.exp(x34)
+    x36 = x35 + 1.0
+    x37 = 4.0 * constants[31]
+    x38 = x37 / x36
+    x39 = (
+        constants[22] * x38
+        + constants[29] * constants[56]
+        + constants[30] * constants[57]
+    )
+    x40 = (
+        constants[29] * constants[51] + constants[30] * constants[52] + states[1] * x38
+    )
+    x41 = 1.0 / x40
+    x42 = 1.0 / np.power(x36, 2)
+    x43 = 1.0 / constants[65]
+    x44 = constants[64] * constants[66] * x43
+    x45 = constants[16] * constants[53]
+    x46 = x45 * (
+        1
+        - x40
+        * x44
+        * (
+            -constants[22] * x12 * x35 * x37 * x41 * x42
+            + 4.0
+            * constants[31]
+            * constants[65]
+            * states[1]
+            * x10
+            * x11
+            * x35
+            * x39
+            * x42
+            / np.power(x40, 2)
+        )
+        / x39
+    )
+    x47 = constants[34] * constants[60]
+    x48 = constants[35] * constants[58]
+    x49 = -states[0]
+    x50 = -constants[69] - x49
+    x51 = -constants[70] - x49
+    x52 = 1.0 / np.power(x15, 2)
+    x53 = 1.0 / np.power(x28, 2)
+    x54 = np.exp(0.21551724137931036 * states[0])
+    x55 = 6770037.888349095 * x54 + 1.0
+    x56 = 0.02 + 0.98 / x55
+    x57 = np.exp(-0.10121457489878542 * states[0])
+    x58 = 0.004132526165039484 * x57 + 1.0
+    x59 = constants[9] / np.power(x58, 2)
+    x60 = -constants[28] - x49
+    x61 = 0.14285714285714285 * states[0]
+    x62 = np.exp(x61)
+    x63 = 227.82355062507335 * x62 + 1.0
+    x64 = 1.0 / x63
+    x65 = 0.2 * states[4] + 0.8 * x64
+    x66 = np.power(states[1] / constants[27], 4.0)
+    x67 = x66 + 1.0
+    x68 = 1.0 / x67
+    x69 = np.exp(-x61)
+    x70 = 0.0431593092614526 * x69 + 1.0
+    x71 = 1.0 / np.power(x70, 2)
+    x72 = constants[8] * x68 * x71
+    x73 = x62 / np.power(x63, 2)
+    x74 = -constants[26] - x49
+    x75 = x72 * x74
+    x76 = constants[8] * x65 * x74
+    x77 = constants[33] * constants[54]
+    x78 = (
+        0.0008365437581051586 * constants[9] * x56 * x57 * x60 / np.power(x58, 3)
+        + x46 * x77
+        - 1429878.6919358002 * x54 * x59 * x60 / np.power(x55, 2)
+        + 1.0 * x56 * x59
+        + 1.0 * x65 * x72
+        + 0.012331231217557886 * x68 * x69 * x76 / np.power(x70, 3)
+        - 26.036977214294097 * x73 * x75
+    )
+    x79 = 1.0 / states[1]
+    x80 = 4.0 * x66 * x71 * x76 * x79 / np.power(x67, 2)
+    x81 = x38 * x41 * x44 * x45
+    x82 = x77 * x81
+    x83 = 0.2 * x75
+    x84 = x1 * x51
+    x85 = np.power(constants[52], 3.0)
+    x86 = constants[22] * x85
+    x87 = x86 * np.exp(constants[72] * x34)
+    x88 = constants[72] - 1.0
+    x89 = np.exp(x34 * x88)
+    x90 = np.power(constants[57], 3.0)
+    x91 = states[1] * x90
+    x92 = x89 * x91
+    x93 = np.power(constants[46], 3.0)
+    x94 = 1.0 / constants[45]
+    x95 = constants[22] * np.power(constants[44], 3.0)
+    x96 = (
+        constants[45] * x90 * (np.power(constants[52] / constants[44], 3.0) + 1.0)
+        + constants[47] * x85
+        + states[1] * x93
+        + x86
+        + x91
+        + x95 * (states[1] * x94 + 1.0)
+    )
+    x97 = 1.0 / x96
+    x98 = np.power(constants[42] * x79, constants[43])
+    x99 = x98 + 1.0
+    x100 = 1.0 / x99
+    x101 = constants[68] * x89 + 1.0
+    x102 = 1.0 / x101
+    x103 = 1.0 * constants[21] * constants[67] * x100 * x102
+    x104 = x87 - x92
+    x105 = constants[5] * constants[61] * constants[62] * x43 / constants[63]
+    x106 = np.power(constants[40] * x79, constants[41])
+    x107 = np.power(constants[17] * constants[49] * x79, constants[50])
+    x108 = x107 + 1.0
+    x109 = np.power(states[1] / (constants[17] * constants[49]), constants[50])
+    x110 = x109 + 1.0
+    x111 = 939.38 + 3060.62 / x110
+    x112 = 1.0 / x111
+    x113 = constants[50] * x79
+    x114 = np.exp(0.125 * states[0])
+    x115 = 1242.6481670549956 * x114 + 1.0
+    x116 = 0.6666666666666666 * states[0] + 31.666666666666664
+    x117 = np.power(x116, 2.0) + 1.0
+    x118 = 0.9 + 1002.85 / x117
+    x119 = 1.0 / x118
+    x120 = np.exp(-0.29459419649432905 * states[0])
+    x121 = 0.06091656667493611 * x120 + 1.0
+    x122 = 1.0 / x121
+    x123 = np.exp(0.02203701336765231 * states[0])
+    x124 = 1.3602936750195582 * x123 + 1.0
+    x125 = 1.0 / x124
+    x126 = -90.9699 * x122 * x125 + 90.9699
+    x127 = 1.0 / x126
+    x128 = 0.06333122229259025 * states[0] + 3.844838505383154
+    x129 = np.exp(-0.03750853319130102 * states[0])
+    x130 = 0.49637710668432194 * x129 + 1.0
+    x131 = 0.002 * np.power(x128, 2.0) + 0.002
+    x132 = 0.027885368825830776 * states[0] + 1.748783500784973
+    x133 = np.exp(0.15873015873015872 * states[0])
+    x134 = 22026.465794806718 * x133 + 1.0
+    x135 = -1.0 / x134
+    x136 = 0.0002 * np.power(x132, 2.0) + 0.0002
+    x137 = 3496.264411874082 * x133 / np.power(x134, 2)
+    x138 = np.exp(0.25 * states[0])
+    x139 = 244.69193226422038 * x138 + 1.0
+    x140 = 30000.0 + 220000.0 / x139
+    x141 = 1.0 / x140
+    x142 = 0.08605851979345956 * states[0]
+    x143 = np.exp(-x142)
+    x144 = 0.11141511764427327 * x143 + 1.0
+    x145 = np.exp(x142)
+    x146 = 1.4805695580388407 * x145 + 1.0
+    x147 = -160.0 + 210.0 / x146 + 170.0 / x144
+    x148 = np.exp(2.53 * x34)
+    x149 = x148 * x79
+    x150 = np.power(x149, 2.0)
+    x151 = 0.0006 * x149 + 3.5999999999999994e-07 * x150 + 1.0
+    x152 = np.exp(-5.0 * x34)
+    x153 = 0.1 * x152
+    x154 = x151 * x153 + 1.0
+    x155 = 1.0 / x147
+    x156 = x155 / np.power(x154, 2)
+    jacobian[0, 0] = (
+        1.0
+        * constants[10]
+        * constants[13]
+        * constants[65]
+        * x10
+        * x11
+        * x14
+        * x51
+        * x52
+        * x7
+        + 1.0
+        * constants[10]
+        * constants[14]
+        * constants[65]
+        * x10
+        * x11
+        * x23
+        * x27
+        * x51
+        * x53
+        - constants[11]
+        - constants[15] * states[8]
+        - x0 * x1
+        - 0.006627745044750272 * x30 * x31 * x50 / np.power(x32, 4)
+        - x30 * x33
+        - x46 * x47
+        - x46 * x48
+        - x78
+        - x29 / x28
+        - x17 / x15
+    )
+    jacobian[0, 1] = (
+        x14
+        * x17
+        * x51
+        * x52
+        * (
+            8857482.834610788
+            * constants[18]
+            * x12
+            * x7
+            * (1.0 / np.power(x8, 0.57709))
+            / np.power(x9, 2)
+            + x13
+            * (
+                0.022687938819333283
+                * constants[18]
+                * np.power(x3, 1.0)
+                / np.power(x4, 2)
+                - 9.253115312889799
+                * constants[18]
+                * np.power(x5, 1.0)
+                / np.power(x6, 2)
+            )
+        )
+        + x27
+        * x29
+        * x51
+        * x53
+        * (
+            1429496.4640316702
+            * constants[19]
+            * x12
+            * x23
+            * (1.0 / np.power(x24, 0.33194599999999996))
+            / np.power(x25, 2)
+            + x26
+            * (
+                0.004087942699132486
+                * constants[19]
+                * np.power(x19, 1.0)
+                / np.power(x20, 2)
+                - 3.1809168057711834
+                * constants[19]
+                * np.power(x21, 1.0)
+                / np.power(x22, 2)
+            )
+        )
+        - x47 * x81
+        - x48 * x81
+        + x80
+        - x82
+    )
+    jacobian[0, 3] = -constants[7] * x33 * x50
+    jacobian[0, 4] = -x83
+    jacobian[0, 5] = -2 * constants[12] * states[5] * x0 * x51
+    jacobian[0, 6] = -0.38 * x84
+    jacobian[0, 7] = -0.63 * x84
+    jacobian[0, 8] = -constants[15] * (-constants[71] - x49)
+    jacobian[1, 0] = (
+        1.0
+        * constants[21]
+        * constants[65]
+        * constants[67]
+        * constants[68]
+        * x10
+        * x100
+        * x104
+        * x11
+        * x88
+        * x89
+        * x97
+        / np.power(x101, 2)
+        - x103 * x97 * (constants[72] * x12 * x87 - x12 * x88 * x92)
+        - x105 * x78
+    )
+    jacobian[1, 1] = (
+        -1.0
+        * constants[21]
+        * constants[43]
+        * constants[67]
+        * x102
+        * x104
+        * x79
+        * x97
+        * x98
+        / np.power(x99, 2)
+        + 1.0 * constants[21] * constants[67] * x100 * x102 * x89 * x90 * x97
+        - constants[39] * constants[41] * x106 * x79 / np.power(x106 + 1.0, 2)
+        - x103 * x104 * (-x90 - x93 - x94 * x95) / np.power(x96, 2)
+        - x105 * (-x80 + x82)
+    )
+    jacobian[1, 4] = -x105 * x83
+    jacobian[2, 1] = 1.0 * x107 * x112 * x113 / np.power(
+        x108, 2
+    ) + 3060.62 * x109 * x113 * (-states[2] + 1.0 / x108) / (
+        np.power(x110, 2) * np.power(x111, 2)
+    )
+    jacobian[2, 2] = -x112
+    jacobian[3, 0] = -155.33102088187445 * x114 * x119 / np.power(
+        x115, 2
+    ) + 1337.1333333333332 * np.power(x116, 1.0) * (-states[3] + 1.0 / x115) / (
+        np.power(x117, 2) * np.power(x118, 2)
+    )
+    jacobian[3, 3] = -x119
+    jacobian[4, 0] = -32.54622151786762 * x127 * x73 + (-states[4] + 1.0 * x64) * (
+        1.6325155335873531 * x120 * x125 / np.power(x121, 2)
+        - 2.7269873989528386 * x122 * x123 / np.power(x124, 2)
+    ) / np.power(x126, 2)
+    jacobian[4, 4] = -x127
+    jacobian[5, 0] = 0.000253324889170361 * np.power(x128, 1.0) * (
+        -states[5] + 0.978613 / x130
+    ) + 0.01822018594869074 * x129 * x131 / np.power(x130, 2)
+    jacobian[5, 5] = -x131
+    jacobian[6, 0] = (
+        1.1154147530332311e-05 * np.power(x132, 1.0) * (-states[6] - x135) - x136 * x137
+    )
+    jacobian[6, 6] = -x136
+    jacobian[7, 0] = -x137 * x141 + 13458056.27453212 * x138 * (-states[7] - x135) / (
+        np.power(x139, 2) * np.power(x140, 2)
+    )
+    jacobian[7, 7] = -x141
+    jacobian[8, 0] = 1.0 * x156 * (
+        0.5 * constants[65] * x10 * x11 * x151 * x152
+        - x153
+        * (0.0015179999999999998 * x12 * x149 + 1.8215999999999996e-06 * x12 * x150)
+    ) + (-states[8] + 1.0 / x154) * (
+        -1.6299974182036538 * x143 / np.power(x144, 2)
+        + 26.757281169376643 * x145 / np.power(x146, 2)
+    ) / np.power(
+        x147, 2
+    )
+    jacobian[8, 1] = (
+        -x153
+        * x156
+        * (-7.199999999999999e-07 * x150 * x79 - 0.0006 * x148 / np.power(states[1], 2))
+    )
+    jacobian[8, 8] = -x155
+    return jacobian
+
+
+def compute_jacobian_diagonal(voi, states, constants):
+    """Computes the derivative of each rate with respect to its state
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- list[float], list of states.
+    constants -- list[int], list of constant values.
+
+    Returns:
+    diagonal -- np.array[float], derivative of rates[i] with respect
+    to states[i] at index i.
+
+    """
+    diagonal = np.zeros((sizeStates,) + np.shape(states[0]))
+    x0 = np.exp(-0.10822358559890391 * states[0])
+    x1 = 0.020413741940116113 * x0 + 1.0
+    x2 = constants[7] * states[3]
+    x3 = -states[0]
+    x4 = np.exp(0.21551724137931036 * states[0])
+    x5 = 6770037.888349095 * x4 + 1.0
+    x6 = 0.02 + 0.98 / x5
+    x7 = np.exp(-0.10121457489878542 * states[0])
+    x8 = 0.004132526165039484 * x7 + 1.0
+    x9 = 1.0 / np.power(x8, 2)
+    x10 = -constants[28] - x3
+    x11 = 0.14285714285714285 * states[0]
+    x12 = np.exp(x11)
+    x13 = 227.82355062507335 * x12 + 1.0
+    x14 = 0.2 * states[4] + 0.8 / x13
+    x15 = np.power(states[1] / constants[27], 4.0)
+    x16 = x15 + 1.0
+    x17 = 1.0 / x16
+    x18 = np.exp(-x11)
+    x19 = 0.0431593092614526 * x18 + 1.0
+    x20 = 1.0 / np.power(x19, 2)
+    x21 = -constants[26] - x3
+    x22 = constants[8] * x14 * x21
+    x23 = constants[18] * states[1]
+    x24 = 0.749234 / (
+        np.power(6.175050326660162 * x23 - 0.38935853577206647, 2.0) + 1.0
+    ) - 8.38384 / (np.power(0.001353075608511928 * x23 + 2.0814226778178138, 2.0) + 1.0)
+    x25 = 1.0 / constants[64]
+    x26 = 1.0 / constants[66]
+    x27 = constants[65] * x25 * x26
+    x28 = np.exp(
+        x24
+        * x27
+        * (
+            states[0]
+            + 37.5137
+            - 5011.47
+            / (np.power(4179.239211293976 * x23 + 992.5818503999532, 0.42291) + 1.0)
+        )
+    )
+    x29 = x28 + 1.0
+    x30 = 1.0 * constants[10]
+    x31 = constants[19] * states[1]
+    x32 = 0.681249 / (
+        np.power(2.3346212660651124 * x31 - 0.5112540418130668, 2.0) + 1.0
+    ) - 1.40001 / (
+        np.power(0.0014599691070536947 * x31 + 0.33390953447425054, 2.0) + 1.0
+    )
+    x33 = np.exp(
+        x27
+        * x32
+        * (
+            states[0]
+            + 109.275
+            - 8540.23
+            / (np.power(250.55435150269975 * x31 + 100.5196497250166, 0.668054) + 1.0)
+        )
+    )
+    x34 = x33 + 1.0
+    x35 = -constants[70] - x3
+    x36 = states[0] * x27
+    x37 = np.exp(x36)
+    x38 = x37 + 1.0
+    x39 = 4.0 * constants[31]
+    x40 = x39 / x38
+    x41 = (
+        constants[22] * x40
+        + constants[29] * constants[56]
+        + constants[30] * constants[57]
+    )
+    x42 = (
+        constants[29] * constants[51] + constants[30] * constants[52] + states[1] * x40
+    )
+    x43 = 1.0 / x42
+    x44 = 1.0 / np.power(x38, 2)
+    x45 = 1.0 / constants[65]
+    x46 = constants[64] * constants[66] * x45
+    x47 = (
+        constants[16]
+        * constants[53]
+        * (
+            1
+            - x42
+            * x46
+            * (
+                -constants[22] * x27 * x37 * x39 * x43 * x44
+                + 4.0
+                * constants[31]
+                * constants[65]
+                * states[1]
+                * x25
+                * x26
+                * x37
+                * x41
+                * x44
+                / np.power(x42, 2)
+            )
+            / x41
+        )
+    )
+    x48 = constants[33] * constants[54]
+    x49 = 1.0 / states[1]
+    x50 = np.power(constants[40] * x49, constants[41])
+    x51 = np.power(constants[57], 3.0)
+    x52 = np.power(constants[42] * x49, constants[43])
+    x53 = x52 + 1.0
+    x54 = 1.0 / x53
+    x55 = np.exp(x36 * (constants[72] - 1.0))
+    x56 = 1.0 / (constants[68] * x55 + 1.0)
+    x57 = np.power(constants[52], 3.0)
+    x58 = constants[22] * x57
+    x59 = np.power(constants[46], 3.0)
+    x60 = states[1] * x51
+    x61 = 1.0 / constants[45]
+    x62 = constants[22] * np.power(constants[44], 3.0)
+    x63 = (
+        constants[45] * x51 * (np.power(constants[52] / constants[44], 3.0) + 1.0)
+        + constants[47] * x57
+        + states[1] * x59
+        + x58
+        + x60
+        + x62 * (states[1] * x61 + 1.0)
+    )
+    x64 = 1.0 / x63
+    x65 = -x55 * x60 + x58 * np.exp(constants[72] * x36)
+    x66 = 0.08605851979345956 * states[0]
+    diagonal[0] = (
+        1.0
+        * constants[10]
+        * constants[13]
+        * constants[65]
+        * x24
+        * x25
+        * x26
+        * x28
+        * x35
+        / np.power(x29, 2)
+        + 1.0
+        * constants[10]
+        * constants[14]
+        * constants[65]
+        * x25
+        * x26
+        * x32
+        * x33
+        * x35
+        / np.power(x34, 2)
+        - constants[11]
+        - constants[12] * np.power(states[5], 2) * (0.38 * states[6] + 0.63 * states[7])
+        - constants[13] * x30 / x29
+        - constants[14] * x30 / x34
+        - constants[15] * states[8]
+        - constants[34] * constants[60] * x47
+        - constants[35] * constants[58] * x47
+        + 26.036977214294097 * constants[8] * x12 * x17 * x20 * x21 / np.power(x13, 2)
+        - 1.0 * constants[8] * x14 * x17 * x20
+        + 1429878.6919358002 * constants[9] * x10 * x4 * x9 / np.power(x5, 2)
+        - 0.0008365437581051586 * constants[9] * x10 * x6 * x7 / np.power(x8, 3)
+        - 1.0 * constants[9] * x6 * x9
+        - 0.006627745044750272 * x0 * x2 * (-constants[69] - x3) / np.power(x1, 4)
+        - 0.012331231217557886 * x17 * x18 * x22 / np.power(x19, 3)
+        - x47 * x48
+        - 1.0 * x2 / np.power(x1, 3)
+    )
+    diagonal[1] = (
+        -1.0
+        * constants[21]
+        * constants[43]
+        * constants[67]
+        * x49
+        * x52
+        * x56
+        * x64
+        * x65
+        / np.power(x53, 2)
+        + 1.0 * constants[21] * constants[67] * x51 * x54 * x55 * x56 * x64
+        - 1.0
+        * constants[21]
+        * constants[67]
+        * x54
+        * x56
+        * x65
+        * (-x51 - x59 - x61 * x62)
+        / np.power(x63, 2)
+        - constants[39] * constants[41] * x49 * x50 / np.power(x50 + 1.0, 2)
+        - constants[5]
+        * constants[61]
+        * constants[62]
+        * x45
+        * (
+            constants[16] * constants[53] * x40 * x43 * x46 * x48
+            - 4.0 * x15 * x20 * x22 * x49 / np.power(x16, 2)
+        )
+        / constants[63]
+    )
+    diagonal[2] = -1 / (
+        939.38
+        + 3060.62
+        / (np.power(states[1] / (constants[17] * constants[49]), constants[50]) + 1.0)
+    )
+    diagonal[3] = -1 / (
+        0.9
+        + 1002.85
+        / (np.power(0.6666666666666666 * states[0] + 31.666666666666664, 2.0) + 1.0)
+    )
+    diagonal[4] = -1 / (
+        90.9699
+        - 90.9699
+        / (
+            (1.0 + 0.06091656667493611 * np.exp(-0.29459419649432905 * states[0]))
+            * (1.3602936750195582 * np.exp(0.02203701336765231 * states[0]) + 1.0)
+        )
+    )
+    diagonal[5] = (
+        -0.002 * np.power(0.06333122229259025 * states[0] + 3.844838505383154, 2.0)
+        - 0.002
+    )
+    diagonal[6] = (
+        -0.0002 * np.power(0.027885368825830776 * states[0] + 1.748783500784973, 2.0)
+        - 0.0002
+    )
+    diagonal[7] = -1 / (
+        30000.0 + 220000.0 / (244.69193226422038 * np.exp(0.25 * states[0]) + 1.0)
+    )
+    diagonal[8] = -1 / (
+        -160.0
+        + 210.0 / (1.4805695580388407 * np.exp(x66) + 1.0)
+        + 170.0 / (1.0 + 0.11141511764427327 * np.exp(-x66))
+    )
+    return diagonal
+
+
+def compute_rates_kernel(voi, states, prepared):
+    """Computes the rates of a single simulation with scalar functions
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- list[float], list of states.
+    prepared -- list[float], list of prepared values computed by
+    prepare from the constants.
+
+    Returns:
+    rates -- list[float], list of computed rates.
+
+    Raises:
+    OverflowError -- if an exponential overflows.
+    ZeroDivisionError -- if a denominator is zero.
+    ValueError -- if a power or logarithm is not defined.
+
+    """
+    states = np.asarray(states, dtype=float).tolist()
+    x0 = prepared[5] + states[0]
+    x1 = (
+        (
+            0.02
+            + 0.98
+            / (6770037.888349095 * math.exp(0.21551724137931036 * states[0]) + 1.0)
+        )
+        * (prepared[21] + states[0])
+        / (1.0 + 0.004132526165039484 * math.exp(-0.10121457489878542 * states[0])) ** 2
+    )
+    x2 = 1.0 / (math.exp(prepared[13] * states[0]) + 1.0)
+    x3 = (
+        prepared[27]
+        * math.log(
+            (prepared[25] * x2 + prepared[26])
+            / (prepared[23] * states[1] * x2 + prepared[24])
+        )
+        + states[0]
+    )
+    x4 = 0.14285714285714285 * states[0]
+    x5 = 1.0 / (227.82355062507335 * math.exp(x4) + 1.0)
+    x6 = (
+        (prepared[32] + states[0])
+        * (0.2 * states[4] + 0.8 * x5)
+        / (
+            (1.0 + 0.0431593092614526 * math.exp(-x4)) ** 2
+            * ((prepared[31] * states[1]) ** 4 + 1.0)
+        )
+    )
+    x7 = 1.0 / states[1]
+    x8 = math.exp(prepared[43] * states[0])
+    x9 = -1.0 / (22026.465794806718 * math.exp(0.15873015873015872 * states[0]) + 1.0)
+    x10 = 0.08605851979345956 * states[0]
+    x11 = x7 * math.exp(prepared[57] * states[0])
+    return [
+        prepared[14]
+        * x0
+        / (
+            math.exp(
+                prepared[13]
+                * (
+                    -8.38384
+                    / ((prepared[11] * states[1] + 2.0814226778178138) ** 2 + 1.0)
+                    + 0.749234
+                    / ((prepared[10] * states[1] - 0.38935853577206647) ** 2 + 1.0)
+                )
+                * (
+                    states[0]
+                    + 37.5137
+                    - 5011.47
+                    / (
+                        math.pow(prepared[12] * states[1] + 992.5818503999532, 0.42291)
+                        + 1.0
+                    )
+                )
+            )
+            + 1.0
+        )
+        + prepared[18]
+        * x0
+        / (
+            math.exp(
+                prepared[13]
+                * (
+                    -1.40001
+                    / ((prepared[16] * states[1] + 0.33390953447425054) ** 2 + 1.0)
+                    + 0.681249
+                    / ((prepared[15] * states[1] - 0.5112540418130668) ** 2 + 1.0)
+                )
+                * (
+                    states[0]
+                    + 109.275
+                    - 8540.23
+                    / (
+                        math.pow(prepared[17] * states[1] + 100.5196497250166, 0.668054)
+                        + 1.0
+                    )
+                )
+            )
+            + 1.0
+        )
+        + prepared[20]
+        * states[3]
+        * (prepared[19] + states[0])
+        / (1.0 + 0.020413741940116113 * math.exp(-0.10822358559890391 * states[0])) ** 3
+        + prepared[22] * x1
+        + prepared[28] * x3
+        + prepared[29] * x3
+        + prepared[30] * x3
+        + prepared[33] * x6
+        + prepared[6] * x0
+        + prepared[8] * states[8] * (prepared[7] + states[0])
+        + prepared[9] * states[5] ** 2 * x0 * (0.38 * states[6] + 0.63 * states[7])
+        - (
+            0.0
+            if (prepared[0] > voi)
+            else (
+                prepared[1]
+                if ((prepared[2] > voi % prepared[3]) or (prepared[4] - voi > 0))
+                else 0.0
+            )
+        ),
+        prepared[36] / (math.pow(prepared[34] * x7, prepared[35]) + 1.0)
+        + prepared[40] * (prepared[37] * x1 + prepared[38] * x3 + prepared[39] * x6)
+        + prepared[53]
+        * (
+            prepared[51] * math.exp(prepared[50] * states[0])
+            + prepared[52] * states[1] * x8
+        )
+        / (
+            (math.pow(prepared[41] * x7, prepared[42]) + 1.0)
+            * (prepared[44] * x8 + 1.0)
+            * (
+                prepared[45] * states[1]
+                + prepared[46] * states[1]
+                + prepared[48] * (prepared[47] * states[1] + 1.0)
+                + prepared[49]
+            )
+        ),
+        (-states[2] + 1.0 / (math.pow(prepared[56] * x7, prepared[55]) + 1.0))
+        / (939.38 + 3060.62 / (math.pow(prepared[54] * states[1], prepared[55]) + 1.0)),
+        (-states[3] + 1.0 / (1242.6481670549956 * math.exp(0.125 * states[0]) + 1.0))
+        / (
+            0.9
+            + 1002.85
+            / ((0.6666666666666666 * states[0] + 31.666666666666664) ** 2 + 1.0)
+        ),
+        (-states[4] + 1.0 * x5)
+        / (
+            90.9699
+            - 90.9699
+            / (
+                (1.0 + 0.06091656667493611 * math.exp(-0.29459419649432905 * states[0]))
+                * (1.3602936750195582 * math.exp(0.02203701336765231 * states[0]) + 1.0)
+            )
+        ),
+        (
+            -states[5]
+            + 0.978613
+            / (1.0 + 0.49637710668432194 * math.exp(-0.03750853319130102 * states[0]))
+        )
+        * (0.002 * (0.06333122229259025 * states[0] + 3.844838505383154) ** 2 + 0.002),
+        (-states[6] - x9)
+        * (
+            0.0002 * (0.027885368825830776 * states[0] + 1.748783500784973) ** 2
+            + 0.0002
+        ),
+        (-states[7] - x9)
+        / (
+            30000.0 + 220000.0 / (244.69193226422038 * math.exp(0.25 * states[0]) + 1.0)
+        ),
+        (
+            -states[8]
+            + 1.0
+            / (
+                0.1
+                * (0.0006 * x11 + 3.5999999999999994e-07 * x11**2 + 1.0)
+                * math.exp(prepared[58] * states[0])
+                + 1.0
+            )
+        )
+        / (
+            -160.0
+            + 210.0 / (1.4805695580388407 * math.exp(x10) + 1.0)
+            + 170.0 / (1.0 + 0.11141511764427327 * math.exp(-x10))
+        ),
+    ]
+
+
+def compute_rates_buffer(voi, states, prepared, rates):
+    """Computes the rates of a single simulation into a buffer
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- np.array[float], array of states.
+    prepared -- np.array[float], array of prepared values computed by
+    prepare from the constants.
+    rates -- np.array[float], array the rates are written into.
+
+    Returns:
+    rates -- np.array[float], array of computed rates.
+
+    """
+    x0 = prepared[5] + states[0]
+    x1 = (
+        (
+            0.02
+            + 0.98
+            / (6770037.888349095 * math.exp(0.21551724137931036 * states[0]) + 1.0)
+        )
+        * (prepared[21] + states[0])
+        / (1.0 + 0.004132526165039484 * math.exp(-0.10121457489878542 * states[0])) ** 2
+    )
+    x2 = 1.0 / (math.exp(prepared[13] * states[0]) + 1.0)
+    x3 = (
+        prepared[27]
+        * math.log(
+            (prepared[25] * x2 + prepared[26])
+            / (prepared[23] * states[1] * x2 + prepared[24])
+        )
+        + states[0]
+    )
+    x4 = 0.14285714285714285 * states[0]
+    x5 = 1.0 / (227.82355062507335 * math.exp(x4) + 1.0)
+    x6 = (
+        (prepared[32] + states[0])
+        * (0.2 * states[4] + 0.8 * x5)
+        / (
+            (1.0 + 0.0431593092614526 * math.exp(-x4)) ** 2
+            * ((prepared[31] * states[1]) ** 4 + 1.0)
+        )
+    )
+    x7 = 1.0 / states[1]
+    x8 = math.exp(prepared[43] * states[0])
+    x9 = -1.0 / (22026.465794806718 * math.exp(0.15873015873015872 * states[0]) + 1.0)
+    x10 = 0.08605851979345956 * states[0]
+    x11 = x7 * math.exp(prepared[57] * states[0])
+    rates[0] = (
+        prepared[14]
+        * x0
+        / (
+            math.exp(
+                prepared[13]
+                * (
+                    -8.38384
+                    / ((prepared[11] * states[1] + 2.0814226778178138) ** 2 + 1.0)
+                    + 0.749234
+                    / ((prepared[10] * states[1] - 0.38935853577206647) ** 2 + 1.0)
+                )
+                * (
+                    states[0]
+                    + 37.5137
+                    - 5011.47
+                    / (
+                        math.pow(prepared[12] * states[1] + 992.5818503999532, 0.42291)
+                        + 1.0
+                    )
+                )
+            )
+            + 1.0
+        )
+        + prepared[18]
+        * x0
+        / (
+            math.exp(
+                prepared[13]
+                * (
+                    -1.40001
+                    / ((prepared[16] * states[1] + 0.33390953447425054) ** 2 + 1.0)
+                    + 0.681249
+                    / ((prepared[15] * states[1] - 0.5112540418130668) ** 2 + 1.0)
+                )
+                * (
+                    states[0]
+                    + 109.275
+                    - 8540.23
+                    / (
+                        math.pow(prepared[17] * states[1] + 100.5196497250166, 0.668054)
+                        + 1.0
+                    )
+                )
+            )
+            + 1.0
+        )
+        + prepared[20]
+        * states[3]
+        * (prepared[19] + states[0])
+        / (1.0 + 0.020413741940116113 * math.exp(-0.10822358559890391 * states[0])) ** 3
+        + prepared[22] * x1
+        + prepared[28] * x3
+        + prepared[29] * x3
+        + prepared[30] * x3
+        + prepared[33] * x6
+        + prepared[6] * x0
+        + prepared[8] * states[8] * (prepared[7] + states[0])
+        + prepared[9] * states[5] ** 2 * x0 * (0.38 * states[6] + 0.63 * states[7])
+        - (
+            0.0
+            if (prepared[0] > voi)
+            else (
+                prepared[1]
+                if ((prepared[2] > voi % prepared[3]) or (prepared[4] - voi > 0))
+                else 0.0
+            )
+        )
+    )
+    rates[1] = (
+        prepared[36] / (math.pow(prepared[34] * x7, prepared[35]) + 1.0)
+        + prepared[40] * (prepared[37] * x1 + prepared[38] * x3 + prepared[39] * x6)
+        + prepared[53]
+        * (
+            prepared[51] * math.exp(prepared[50] * states[0])
+            + prepared[52] * states[1] * x8
+        )
+        / (
+            (math.pow(prepared[41] * x7, prepared[42]) + 1.0)
+            * (prepared[44] * x8 + 1.0)
+            * (
+                prepared[45] * states[1]
+                + prepared[46] * states[1]
+                + prepared[48] * (prepared[47] * states[1] + 1.0)
+                + prepared[49]
+            )
+        )
+    )
+    rates[2] = (
+        -states[2] + 1.0 / (math.pow(prepared[56] * x7, prepared[55]) + 1.0)
+    ) / (939.38 + 3060.62 / (math.pow(prepared[54] * states[1], prepared[55]) + 1.0))
+    rates[3] = (
+        -states[3] + 1.0 / (1242.6481670549956 * math.exp(0.125 * states[0]) + 1.0)
+    ) / (
+        0.9
+        + 1002.85 / ((0.6666666666666666 * states[0] + 31.666666666666664) ** 2 + 1.0)
+    )
+    rates[4] = (-states[4] + 1.0 * x5) / (
+        90.9699
+        - 90.9699
+        / (
+            (1.0 + 0.06091656667493611 * math.exp(-0.29459419649432905 * states[0]))
+            * (1.3602936750195582 * math.exp(0.02203701336765231 * states[0]) + 1.0)
+        )
+    )
+    rates[5] = (
+        -states[5]
+        + 0.978613
+        / (1.0 + 0.49637710668432194 * math.exp(-0.03750853319130102 * states[0]))
+    ) * (0.002 * (0.06333122229259025 * states[0] + 3.844838505383154) ** 2 + 0.002)
+    rates[6] = (-states[6] - x9) * (
+        0.0002 * (0.027885368825830776 * states[0] + 1.748783500784973) ** 2 + 0.0002
+    )
+    rates[7] = (-states[7] - x9) / (
+        30000.0 + 220000.0 / (244.69193226422038 * math.exp(0.25 * states[0]) + 1.0)
+    )
+    rates[8] = (
+        -states[8]
+        + 1.0
+        / (
+            0.1
+            * (0.0006 * x11 + 3.5999999999999994e-07 * x11**2 + 1.0)
+            * math.exp(prepared[58] * states[0])
+            + 1.0
+        )
+    ) / (
+        -160.0
+        + 210.0 / (1.4805695580388407 * math.exp(x10) + 1.0)
+        + 170.0 / (1.0 + 0.11141511764427327 * math.exp(-x10))
+    )
+    return rates
+
+
+def prepare(constants):
+    """Evaluates the constant subexpressions of the rates
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+    The prepared values need to be computed again when the constants
+    change.
+
+    Args:
+    constants -- list[int], list of constant values.
+
+    Returns:
+    prepared -- list[float], list of prepared values for
+    compute_rates_kernel.
+
+    Raises:
+    OverflowError -- if an exponential overflows.
+    ZeroDivisionError -- if a denominator is zero.
+    ValueError -- if a power or logarithm is not defined.
+
+    """
+    constants = np.asarray(constants, dtype=float).tolist()
+    x0 = constants[65] / (constants[64] * constants[66])
+    x1 = 1.0 * constants[10]
+    x2 = 1.0 * constants[9]
+    x3 = 4.0 * constants[31]
+    x4 = 1.0 / constants[65]
+    x5 = constants[16] * constants[53]
+    x6 = constants[33] * constants[54] * x5
+    x7 = 1.0 * constants[8]
+    x8 = constants[57] ** 3
+    x9 = constants[52] ** 3
+    x10 = constants[22] * x9
+    return [
+        constants[2],
+        constants[1],
+        constants[4],
+        constants[3] + constants[4],
+        constants[2] + constants[4],
+        -constants[70],
+        -constants[11],
+        -constants[71],
+        -constants[15],
+        -constants[12],
+        6.175050326660162 * constants[18],
+        0.001353075608511928 * constants[18],
+        4179.239211293976 * constants[18],
+        x0,
+        -constants[13] * x1,
+        2.3346212660651124 * constants[19],
+        0.0014599691070536947 * constants[19],
+        250.55435150269975 * constants[19],
+        -constants[14] * x1,
+        -constants[69],
+        -1.0 * constants[7],
+        -constants[28],
+        -x2,
+        x3,
+        constants[29] * constants[51] + constants[30] * constants[52],
+        constants[22] * x3,
+        constants[29] * constants[56] + constants[30] * constants[57],
+        -constants[64] * constants[66] * x4,
+        -x6,
+        -constants[34] * constants[60] * x5,
+        -constants[35] * constants[58] * x5,
+        (1.0 / constants[27]),
+        -constants[26],
+        -x7,
+        constants[40],
+        constants[41],
+        -constants[39],
+        x2,
+        x6,
+        x7,
+        -constants[5] * constants[61] * constants[62] * x4 / constants[63],
+        constants[42],
+        constants[43],
+        x0 * (constants[72] - 1.0),
+        constants[68],
+        constants[46] ** 3,
+        x8,
+        (1.0 / constants[45]),
+        constants[22] * constants[44] ** 3,
+        constants[45] * x8 * ((constants[52] / constants[44]) ** 3 + 1.0)
+        + constants[47] * x9
+        + x10,
+        constants[72] * x0,
+        x10,
+        -x8,
+        -1.0 * constants[21] * constants[67],
+        1 / (constants[17] * constants[49]),
+        constants[50],
+        constants[17] * constants[49],
+        2.53 * x0,
+        -5.0 * x0,
+    ]
+
+
 def compute_algebraic(constants, states, voi):
     """Computes algebraics of the system
 
@@ -566,7 +1893,7 @@ def compute_algebraic(constants, states, voi):
     algebraic -- np.np.array[float], list of computed algebraics.
 
     """
-    algebraic = np.array([[0.0] * len(voi)] * sizeAlgebraic)
+    algebraic = np.zeros((sizeAlgebraic, len(voi)))
     states = np.array(states)
     voi = np.array(voi)
     algebraic[1] = 1.00000 / (
@@ -815,7 +2142,15 @@ def custom_piecewise(cases):
     return np.select(cases[0::2], cases[1::2])
 
 
-def solve_model(init_states, constants, start=0, end=15000):
+def solve_model(
+    init_states,
+    constants,
+    start=0,
+    end=15000,
+    output_dt=1.0,
+    record=None,
+    **options,
+):
     """Solve model with ODE solver
 
     Args:
@@ -823,36 +2158,46 @@ def solve_model(init_states, constants, start=0, end=15000):
     constants -- list[int], list of constant values.
     start -- int, start time in ms for the simulation, default value 0.
     end -- int, end time in ms for the simulation, default value 15000.
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    record -- list, names or indices of the states to record, default value
+    None for all the states.
+    options -- dict, solver options {integrator, steady_tol, tile,
+    checkpoint, resume, max_step, atol, rtol}, see solver.solve, the
+    settings recommended for the model are used by default.
 
     Returns:
+    voi -- np.array, timesteps in ms.
+    states -- np.array, simulation data of the recorded states.
+    algebraic -- function, computes the requested algebraic variables over a
+    time window, see solver.compute_algebraic, None if only some of the states
+    are recorded.
+
+    Raises:
+    KeyError -- if an option is not valid, see solver.check_options.
+    IntegrationError -- if the integrator fails, see solver.solve.
 
     """
-    # Set timespan to solve over
-    nb_steps = end - start
-    voi = np.linspace(start, end, nb_steps)
-
-    # Construct ODE object to solve
-    r = ode(compute_rates)
-    r.set_integrator(
-        SOLVER,
-        method=METHOD,
-        atol=ATOL,
-        rtol=RTOL,
-        max_step=MAX_STEP,
-    )
-    r.set_initial_value(init_states, voi[0])
-    r.set_f_params(constants)
-
-    # Solve model
-    states = np.array([[0.0] * len(voi)] * sizeStates)
-    states[:, 0] = init_states
-    for i, t in enumerate(voi[1:]):
-        if r.successful():
-            r.integrate(t)
-            states[:, i + 1] = r.y
-        else:
-            break
-
-    # Compute algebraic variables
-    algebraic = compute_algebraic(constants, states, voi)
+    solver.check_options(options)
+    voi, states = solver.solve(
+        sys.modules[__name__],
+        init_states,
+        constants,
+        start,
+        end,
+        output_dt=output_dt,
+        record=record,
+        **options,
+    )
+
+    if record is not None:
+        # The algebraic variables depend on all the states
+        return (voi, states, None)
+
+    # Algebraic variables are only computed on request
+    algebraic = solver.lazy_algebraic(
+        sys.modules[__name__],
+        constants,
+        states,
+        voi,
+    )
     return (voi, states, algebraic)
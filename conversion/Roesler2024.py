@@ -8,15 +8,178 @@ Author: Mathias Roesler
 Date: 11/24
 """
 
+import sys
+
+import math
 import numpy as np
 
-from scipy.integrate import ode
-from conversion.constants import SOLVER, METHOD, ATOL, RTOL, MAX_STEP
+from conversion import solver
 
 # Size of variable np.arrays:
 sizeAlgebraic = 59
 sizeStates = 9
 sizeConstants = 78
+gateStates = [2, 3, 4, 5, 6, 7, 8]
+derivedConstants = {
+    25: [6, 8],
+    26: [5, 7],
+    58: [28],
+    59: [27, 23],
+    63: [61, 23],
+    65: [62, 23],
+    74: [70, 69, 71, 62, 57],
+    75: [70, 69, 71, 61, 56],
+    76: [70, 69, 71, 60, 64],
+}
+stateIndices = {
+    "v": 0,
+    "cai": 1,
+    "w": 2,
+    "h": 3,
+    "f2": 4,
+    "q": 5,
+    "r1": 6,
+    "r2": 7,
+    "c": 8,
+}
+algebraicIndices = {
+    "I_stim": 0,
+    "wss": 1,
+    "Force": 2,
+    "hss": 3,
+    "qss": 4,
+    "rss": 5,
+    "vFRT": 6,
+    "wtc": 7,
+    "htc": 8,
+    "qtc": 9,
+    "r1tc": 10,
+    "r2tc": 11,
+    "enscc": 12,
+    "K1cl": 13,
+    "mss": 14,
+    "K2cl": 15,
+    "ina": 16,
+    "css": 17,
+    "fca": 18,
+    "ctc": 19,
+    "dss": 20,
+    "fss": 21,
+    "ical": 22,
+    "f2tc": 23,
+    "bss": 24,
+    "gss": 25,
+    "icat": 26,
+    "I_Ca_tot": 27,
+    "ib": 28,
+    "ikv43": 29,
+    "xass_z": 30,
+    "xass_vh": 31,
+    "xass": 32,
+    "iBKa": 33,
+    "xabss_z": 34,
+    "xabss_vh": 35,
+    "xabss": 36,
+    "iBKab": 37,
+    "I_K_tot": 38,
+    "icl": 39,
+    "insna": 40,
+    "insk": 41,
+    "insca": 42,
+    "I_NS_tot": 43,
+    "J_Ca_mem": 44,
+    "I_tot": 45,
+    "f1naca": 46,
+    "jcamem_plot": 47,
+    "f2naca": 48,
+    "fallo": 49,
+    "naca_Eup": 50,
+    "naca_Ed1": 51,
+    "naca_Ed2": 52,
+    "naca_Ed3": 53,
+    "jnaca": 54,
+    "jpmca": 55,
+    "jnaca_plot": 56,
+    "J_tot": 57,
+    "jpmca_plot": 58,
+}
+constantIndices = {
+    "stim_start": 0,
+    "stim_interval": 1,
+    "stim_duration": 2,
+    "stim_current": 3,
+    "Cm": 4,
+    "P4": 5,
+    "E2": 6,
+    "P4_max": 7,
+    "E2_max": 8,
+    "conversion": 9,
+    "gna": 10,
+    "gcal": 11,
+    "gcat": 12,
+    "gkca": 13,
+    "gb": 14,
+    "gkv43": 15,
+    "gbka": 16,
+    "gbkab": 17,
+    "gcl": 18,
+    "gns": 19,
+    "tinyamount": 23,
+    "jnaca_sign": 24,
+    "mod_E2": 25,
+    "mod_P4": 26,
+    "cao": 27,
+    "mgo": 28,
+    "zna": 29,
+    "zk": 30,
+    "ecal": 31,
+    "kmca": 32,
+    "ecat": 33,
+    "PnsK": 34,
+    "PnsNa": 35,
+    "PnsCa": 36,
+    "PnsCs": 37,
+    "gnsCa": 38,
+    "gnsNa": 39,
+    "gnsK": 40,
+    "gnsCs": 41,
+    "PK": 42,
+    "PNa": 43,
+    "Jpmca": 44,
+    "Kmpmca": 45,
+    "npmca": 46,
+    "Kmallo": 47,
+    "nallo": 48,
+    "Kmnai": 49,
+    "Kmcai": 50,
+    "Kmnao": 51,
+    "Kmcao": 52,
+    "Fmax": 53,
+    "FKm": 54,
+    "Fn": 55,
+    "ki": 56,
+    "nai": 57,
+    "fmg": 58,
+    "gs_cao": 59,
+    "cli": 60,
+    "ko": 61,
+    "nao": 62,
+    "gs_ko": 63,
+    "clo": 64,
+    "gs_nao": 65,
+    "buff": 66,
+    "AV": 67,
+    "zca": 68,
+    "R": 69,
+    "frdy": 70,
+    "temp": 71,
+    "Jnaca": 72,
+    "ksat": 73,
+    "ena": 74,
+    "ek": 75,
+    "ecl": 76,
+    "xgamma": 77,
+}
 
 
 def create_legends():
@@ -311,9 +474,82 @@ def init_consts():
     return (states, constants)
 
 
+def compute_derived_constants(constants, derived=None):
+    """Computes the constants that depend on other constants
+
+    Generated from init_consts by conversion.codegen, do not edit.
+
+    Args:
+    constants -- list[int], list of constant values.
+    derived -- set[int], indices of the derived constants to compute,
+    default value None for all of them.
+
+    Returns:
+    constants -- list[int], list of updated constant values.
+
+    """
+    if derived is None:
+        derived = derivedConstants
+    if 25 in derived:
+        constants[25] = constants[6] / constants[8]
+    if 26 in derived:
+        constants[26] = constants[5] / constants[7]
+    if 58 in derived:
+        constants[58] = 0.108043 + 0.903902 / (
+            1.0 + np.power(constants[28] / 0.281007, 1.29834)
+        )
+    if 59 in derived:
+        constants[59] = (
+            1.0
+            / 0.000525
+            * 0.03
+            / (1.0 + np.power(150.0 / (constants[27] + constants[23]), 2.0))
+        )
+    if 63 in derived:
+        constants[63] = (
+            1.0
+            / 0.0123
+            * 0.03
+            / (1.0 + np.power(150.0 / (constants[61] + constants[23]), 2.0))
+        )
+    if 65 in derived:
+        constants[65] = (
+            1.0
+            / 0.0123
+            * 0.03
+            / (1.0 + np.power(150.0 / (constants[62] + constants[23]), 2.0))
+        )
+    if 74 in derived:
+        constants[74] = (
+            constants[69]
+            * constants[71]
+            / constants[70]
+            * np.log(constants[62] / constants[57])
+        )
+    if 75 in derived:
+        constants[75] = (
+            constants[69]
+            * constants[71]
+            / constants[70]
+            * np.log(constants[61] / constants[56])
+        )
+    if 76 in derived:
+        constants[76] = (
+            constants[69]
+            * constants[71]
+            / constants[70]
+            * np.log(constants[60] / constants[64])
+        )
+    return constants
+
+
 def compute_rates(voi, states, constants):
     """Computes rates of the system
 
+    The states and constants can also be arrays of shape (sizeStates,
+    nb_batch) and (sizeConstants, nb_batch) to compute the rates of a batch
+    of simulations at once.
+
     Args:
     voi -- list[flaot], list of voi.
     states -- list[float], list of states.
@@ -592,6 +828,1143 @@ def compute_rates(voi, states, constants):
     return rates
 
 
+def compute_jacobian(voi, states, constants):
+    """Computes the Jacobian of the rates with respect to the states
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- list[float], list of states.
+    constants -- list[int], list of constant values.
+
+    Returns:
+    jacobian -- np.array[float], derivative of rates[i] with respect
+    to states[j] at index [i, j].
+
+    """
+    jacobian = np.zeros((sizeStates, sizeStates) + np.shape(states[0]))
+    x0 = 0.38 * states[6] + 0.63 * states[7]
+    x1 = constants[15] * constants[25] * np.power(states[5], 2)
+    x2 = constants[21] * states[1]
+    x3 = 0.001353075608511928 * x2 + 2.0814226778178138
+    x4 = np.power(x3, 2.0) + 1.0
+    x5 = 6.175050326660162 * x2 - 0.38935853577206647
+    x6 = np.power(x5, 2.0) + 1.0
+    x7 = 0.749234 / x6 - 8.38384 / x4
+    x8 = 4179.239211293976 * x2 + 992.5818503999532
+    x9 = np.power(x8, 0.42291) + 1.0
+    x10 = 1.0 / constants[69]
+    x11 = 1.0 / constants[71]
+    x12 = constants[70] * x10 * x11
+    x13 = x12 * (states[0] + 37.5137 - 5011.47 / x9)
+    x14 = np.exp(x13 * x7)
+    x15 = x14 + 1.0
+    x16 = 1.0 * constants[25]
+    x17 = constants[13] * x16
+    x18 = constants[16] * x17
+    x19 = constants[22] * states[1]
+    x20 = 0.0014599691070536947 * x19 + 0.33390953447425054
+    x21 = np.power(x20, 2.0) + 1.0
+    x22 = 2.3346212660651124 * x19 - 0.5112540418130668
+    x23 = np.power(x22, 2.0) + 1.0
+    x24 = 0.681249 / x23 - 1.40001 / x21
+    x25 = 250.55435150269975 * x19 + 100.5196497250166
+    x26 = np.power(x25, 0.668054) + 1.0
+    x27 = x12 * (states[0] + 109.275 - 8540.23 / x26)
+    x28 = np.exp(x24 * x27)
+    x29 = x28 + 1.0
+    x30 = constants[17] * x17
+    x31 = states[0] * x12
+    x32 = np.exp(x31)
+    x33 = x32 + 1.0
+    x34 = 4.0 * constants[36]
+    x35 = x34 / x33
+    x36 = (
+        constants[27] * x35
+        + constants[34] * constants[61]
+        + constants[35] * constants[62]
+    )
+    x37 = (
+        constants[34] * constants[56] + constants[35] * constants[57] + states[1] * x35
+    )
+    x38 = 1.0 / x37
+    x39 = 1.0 / np.power(x33, 2)
+    x40 = 1.0 / constants[70]
+    x41 = constants[69] * constants[71] * x40
+    x42 = constants[19] * constants[58]
+    x43 = x42 * (
+        1
+        - x37
+        * x41
+        * (
+            -constants[27] * x12 * x32 * x34 * x38 * x39
+            + 4.0
+            * constants[36]
+            * constants[70]
+            * states[1]
+            * x10
+            * x11
+            * x32
+            * x36
+            * x39
+            / np.power(x37, 2)
+        )
+        / x36
+    )
+    x44 = constants[39] * constants[65]
+    x45 = constants[40] * constants[63]
+    x46 = 1.0 / constants[26]
+    x47 = constants[10] * states[3] * x46
+    x48 = np.exp(-0.10822358559890391 * states[0])
+    x49 = 0.020413741940116113 * x48 + 1.0
+    x50 = x16 / np.power(x49, 3)
+    x51 = -states[0]
+    x52 = -constants[74] - x51
+    x53 = -constants[75] - x51
+    x54 = 1.0 / np.power(x15, 2)
+    x55 = 1.0 / np.power(x29, 2)
+    x56 = np.exp(0.21551724137931036 * states[0])
+    x57 = 6770037.888349095 * x56 + 1.0
+    x58 = 0.02 + 0.98 / x57
+    x59 = np.exp(-0.10121457489878542 * states[0])
+    x60 = 0.004132526165039484 * x59 + 1.0
+    x61 = constants[12] / np.power(x60, 2)
+    x62 = -constants[33] - x51
+    x63 = 0.14285714285714285 * states[0]
+    x64 = np.exp(x63)
+    x65 = 227.82355062507335 * x64 + 1.0
+    x66 = 1.0 / x65
+    x67 = 0.2 * states[4] + 0.8 * x66
+    x68 = 1.0 / constants[25]
+    x69 = np.power(states[1] / constants[32], 4.0)
+    x70 = x69 + 1.0
+    x71 = 1.0 / x70
+    x72 = np.exp(-x63)
+    x73 = 0.0431593092614526 * x72 + 1.0
+    x74 = 1.0 / np.power(x73, 2)
+    x75 = constants[11] * constants[26] * x68 * x71 * x74
+    x76 = x64 / np.power(x65, 2)
+    x77 = -constants[31] - x51
+    x78 = x75 * x77
+    x79 = constants[11] * constants[26] * x67 * x68 * x77
+    x80 = constants[38] * constants[59]
+    x81 = (
+        0.0008365437581051586 * constants[12] * x58 * x59 * x62 / np.power(x60, 3)
+        + x43 * x80
+        - 1429878.6919358002 * x56 * x61 * x62 / np.power(x57, 2)
+        + 1.0 * x58 * x61
+        + 1.0 * x67 * x75
+        + 0.012331231217557886 * x71 * x72 * x79 / np.power(x73, 3)
+        - 26.036977214294097 * x76 * x78
+    )
+    x82 = x35 * x38 * x41 * x42
+    x83 = 1.0 / states[1]
+    x84 = 4.0 * x69 * x74 * x79 * x83 / np.power(x70, 2) - x80 * x82
+    x85 = 0.2 * x78
+    x86 = x1 * x53
+    x87 = np.power(constants[57], 3.0)
+    x88 = constants[27] * x87
+    x89 = x88 * np.exp(constants[77] * x31)
+    x90 = constants[77] - 1.0
+    x91 = np.exp(x31 * x90)
+    x92 = np.power(constants[62], 3.0)
+    x93 = states[1] * x92
+    x94 = x91 * x93
+    x95 = np.power(constants[51], 3.0)
+    x96 = 1.0 / constants[50]
+    x97 = constants[27] * np.power(constants[49], 3.0)
+    x98 = (
+        constants[50] * x92 * (np.power(constants[57] / constants[49], 3.0) + 1.0)
+        + constants[52] * x87
+        + states[1] * x95
+        + x88
+        + x93
+        + x97 * (states[1] * x96 + 1.0)
+    )
+    x99 = 1.0 / x98
+    x100 = np.power(constants[47] * x83, constants[48])
+    x101 = x100 + 1.0
+    x102 = 1.0 / x101
+    x103 = constants[73] * x91 + 1.0
+    x104 = 1.0 / x103
+    x105 = 1.0 * constants[24] * constants[72] * x102 * x104
+    x106 = x89 - x94
+    x107 = constants[4] * constants[66] * constants[67] * x40 / constants[68]
+    x108 = np.power(constants[45] * x83, constants[46])
+    x109 = np.power(constants[20] * constants[54] * x83, constants[55])
+    x110 = x109 + 1.0
+    x111 = np.power(states[1] / (constants[20] * constants[54]), constants[55])
+    x112 = x111 + 1.0
+    x113 = 939.38 + 3060.62 / x112
+    x114 = 1.0 / x113
+    x115 = constants[55] * x83
+    x116 = np.exp(0.125 * states[0])
+    x117 = 1242.6481670549956 * x116 + 1.0
+    x118 = 0.6666666666666666 * states[0] + 31.666666666666664
+    x119 = np.power(x118, 2.0) + 1.0
+    x120 = 0.9 + 1002.85 / x119
+    x121 = 1.0 / x120
+    x122 = np.exp(-0.29459419649432905 * states[0])
+    x123 = 0.06091656667493611 * x122 + 1.0
+    x124 = 1.0 / x123
+    x125 = np.exp(0.02203701336765231 * states[0])
+    x126 = 1.3602936750195582 * x125 + 1.0
+    x127 = 1.0 / x126
+    x128 = -90.9699 * x124 * x127 + 90.9699
+    x129 = 1.0 / x128
+    x130 = 0.06333122229259025 * states[0] + 3.844838505383154
+    x131 = np.exp(-0.03750853319130102 * states[0])
+    x132 = 0.49637710668432194 * x131 + 1.0
+    x133 = 0.002 * np.power(x130, 2.0) + 0.002
+    x134 = 0.027885368825830776 * states[0] + 1.748783500784973
+    x135 = np.exp(0.15873015873015872 * states[0])
+    x136 = 22026.465794806718 * x135 + 1.0
+    x137 = -1.0 / x136
+    x138 = 0.0002 * np.power(x134, 2.0) + 0.0002
+    x139 = 3496.264411874082 * x135 / np.power(x136, 2)
+    x140 = np.exp(0.25 * states[0])
+    x141 = 244.69193226422038 * x140 + 1.0
+    x142 = 30000.0 + 220000.0 / x141
+    x143 = 1.0 / x142
+    x144 = 0.08605851979345956 * states[0]
+    x145 = np.exp(-x144)
+    x146 = 0.11141511764427327 * x145 + 1.0
+    x147 = np.exp(x144)
+    x148 = 1.4805695580388407 * x147 + 1.0
+    x149 = -160.0 + 210.0 / x148 + 170.0 / x146
+    x150 = np.exp(2.53 * x31)
+    x151 = x150 * x83
+    x152 = np.power(x151, 2.0)
+    x153 = 0.0006 * x151 + 3.5999999999999994e-07 * x152 + 1.0
+    x154 = np.exp(-5.0 * x31)
+    x155 = 0.1 * x154
+    x156 = x153 * x155 + 1.0
+    x157 = 1.0 / x149
+    x158 = x157 / np.power(x156, 2)
+    jacobian[0, 0] = (
+        1.0
+        * constants[13]
+        * constants[16]
+        * constants[25]
+        * constants[70]
+        * x10
+        * x11
+        * x14
+        * x53
+        * x54
+        * x7
+        + 1.0
+        * constants[13]
+        * constants[17]
+        * constants[25]
+        * constants[70]
+        * x10
+        * x11
+        * x24
+        * x28
+        * x53
+        * x55
+        - constants[14]
+        - constants[18] * states[8]
+        - 0.006627745044750272 * constants[25] * x47 * x48 * x52 / np.power(x49, 4)
+        - x0 * x1
+        - x43 * x44
+        - x43 * x45
+        - x47 * x50
+        - x81
+        - x30 / x29
+        - x18 / x15
+    )
+    jacobian[0, 1] = (
+        x14
+        * x18
+        * x53
+        * x54
+        * (
+            8857482.834610788
+            * constants[21]
+            * x12
+            * x7
+            * (1.0 / np.power(x8, 0.57709))
+            / np.power(x9, 2)
+            + x13
+            * (
+                0.022687938819333283
+                * constants[21]
+                * np.power(x3, 1.0)
+                / np.power(x4, 2)
+                - 9.253115312889799
+                * constants[21]
+                * np.power(x5, 1.0)
+                / np.power(x6, 2)
+            )
+        )
+        + x28
+        * x30
+        * x53
+        * x55
+        * (
+            1429496.4640316702
+            * constants[22]
+            * x12
+            * x24
+            * (1.0 / np.power(x25, 0.33194599999999996))
+            / np.power(x26, 2)
+            + x27
+            * (
+                0.004087942699132486
+                * constants[22]
+                * np.power(x20, 1.0)
+                / np.power(x21, 2)
+                - 3.1809168057711834
+                * constants[22]
+                * np.power(x22, 1.0)
+                / np.power(x23, 2)
+            )
+        )
+        - x44 * x82
+        - x45 * x82
+        + x84
+    )
+    jacobian[0, 3] = -constants[10] * x46 * x50 * x52
+    jacobian[0, 4] = -x85
+    jacobian[0, 5] = -2 * constants[15] * constants[25] * states[5] * x0 * x53
+    jacobian[0, 6] = -0.38 * x86
+    jacobian[0, 7] = -0.63 * x86
+    jacobian[0, 8] = -constants[18] * (-constants[76] - x51)
+    jacobian[1, 0] = (
+        1.0
+        * constants[24]
+        * constants[70]
+        * constants[72]
+        * constants[73]
+        * x10
+        * x102
+        * x106
+        * x11
+        * x90
+        * x91
+        * x99
+        / np.power(x103, 2)
+        - x105 * x99 * (constants[77] * x12 * x89 - x12 * x90 * x94)
+        - x107 * x81
+    )
+    jacobian[1, 1] = (
+        -1.0
+        * constants[24]
+        * constants[48]
+        * constants[72]
+        * x100
+        * x104
+        * x106
+        * x83
+        * x99
+        / np.power(x101, 2)
+        + 1.0 * constants[24] * constants[72] * x102 * x104 * x91 * x92 * x99
+        - constants[44] * constants[46] * x108 * x83 / np.power(x108 + 1.0, 2)
+        - x105 * x106 * (-x92 - x95 - x96 * x97) / np.power(x98, 2)
+        + x107 * x84
+    )
+    jacobian[1, 4] = -x107 * x85
+    jacobian[2, 1] = 1.0 * x109 * x114 * x115 / np.power(
+        x110, 2
+    ) + 3060.62 * x111 * x115 * (-states[2] + 1.0 / x110) / (
+        np.power(x112, 2) * np.power(x113, 2)
+    )
+    jacobian[2, 2] = -x114
+    jacobian[3, 0] = -155.33102088187445 * x116 * x121 / np.power(
+        x117, 2
+    ) + 1337.1333333333332 * np.power(x118, 1.0) * (-states[3] + 1.0 / x117) / (
+        np.power(x119, 2) * np.power(x120, 2)
+    )
+    jacobian[3, 3] = -x121
+    jacobian[4, 0] = -32.54622151786762 * x129 * x76 + (-states[4] + 1.0 * x66) * (
+        1.6325155335873531 * x122 * x127 / np.power(x123, 2)
+        - 2.7269873989528386 * x124 * x125 / np.power(x126, 2)
+    ) / np.power(x128, 2)
+    jacobian[4, 4] = -x129
+    jacobian[5, 0] = 0.000253324889170361 * np.power(x130, 1.0) * (
+        -states[5] + 0.978613 / x132
+    ) + 0.01822018594869074 * x131 * x133 / np.power(x132, 2)
+    jacobian[5, 5] = -x133
+    jacobian[6, 0] = (
+        1.1154147530332311e-05 * np.power(x134, 1.0) * (-states[6] - x137) - x138 * x139
+    )
+    jacobian[6, 6] = -x138
+    jacobian[7, 0] = -x139 * x143 + 13458056.27453212 * x140 * (-states[7] - x137) / (
+        np.power(x141, 2) * np.power(x142, 2)
+    )
+    jacobian[7, 7] = -x143
+    jacobian[8, 0] = 1.0 * x158 * (
+        0.5 * constants[70] * x10 * x11 * x153 * x154
+        - x155
+        * (0.0015179999999999998 * x12 * x151 + 1.8215999999999996e-06 * x12 * x152)
+    ) + (-states[8] + 1.0 / x156) * (
+        -1.6299974182036538 * x145 / np.power(x146, 2)
+        + 26.757281169376643 * x147 / np.power(x148, 2)
+    ) / np.power(
+        x149, 2
+    )
+    jacobian[8, 1] = (
+        -x155
+        * x158
+        * (-7.199999999999999e-07 * x152 * x83 - 0.0006 * x150 / np.power(states[1], 2))
+    )
+    jacobian[8, 8] = -x157
+    return jacobian
+
+
+def compute_jacobian_diagonal(voi, states, constants):
+    """Computes the derivative of each rate with respect to its state
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- list[float], list of states.
+    constants -- list[int], list of constant values.
+
+    Returns:
+    diagonal -- np.array[float], derivative of rates[i] with respect
+    to states[i] at index i.
+
+    """
+    diagonal = np.zeros((sizeStates,) + np.shape(states[0]))
+    x0 = np.exp(-0.10822358559890391 * states[0])
+    x1 = 0.020413741940116113 * x0 + 1.0
+    x2 = 1.0 * constants[25]
+    x3 = constants[10] * states[3] / constants[26]
+    x4 = np.exp(0.21551724137931036 * states[0])
+    x5 = 6770037.888349095 * x4 + 1.0
+    x6 = 0.02 + 0.98 / x5
+    x7 = np.exp(-0.10121457489878542 * states[0])
+    x8 = 0.004132526165039484 * x7 + 1.0
+    x9 = 1.0 / np.power(x8, 2)
+    x10 = -states[0]
+    x11 = -constants[33] - x10
+    x12 = 0.14285714285714285 * states[0]
+    x13 = np.exp(x12)
+    x14 = 227.82355062507335 * x13 + 1.0
+    x15 = 0.2 * states[4] + 0.8 / x14
+    x16 = 1.0 / constants[25]
+    x17 = np.power(states[1] / constants[32], 4.0)
+    x18 = x17 + 1.0
+    x19 = 1.0 / x18
+    x20 = np.exp(-x12)
+    x21 = 0.0431593092614526 * x20 + 1.0
+    x22 = 1.0 / np.power(x21, 2)
+    x23 = -constants[31] - x10
+    x24 = constants[11] * constants[26] * x15 * x16 * x23
+    x25 = constants[21] * states[1]
+    x26 = 0.749234 / (
+        np.power(6.175050326660162 * x25 - 0.38935853577206647, 2.0) + 1.0
+    ) - 8.38384 / (np.power(0.001353075608511928 * x25 + 2.0814226778178138, 2.0) + 1.0)
+    x27 = 1.0 / constants[69]
+    x28 = 1.0 / constants[71]
+    x29 = constants[70] * x27 * x28
+    x30 = np.exp(
+        x26
+        * x29
+        * (
+            states[0]
+            + 37.5137
+            - 5011.47
+            / (np.power(4179.239211293976 * x25 + 992.5818503999532, 0.42291) + 1.0)
+        )
+    )
+    x31 = x30 + 1.0
+    x32 = constants[13] * x2
+    x33 = constants[22] * states[1]
+    x34 = 0.681249 / (
+        np.power(2.3346212660651124 * x33 - 0.5112540418130668, 2.0) + 1.0
+    ) - 1.40001 / (
+        np.power(0.0014599691070536947 * x33 + 0.33390953447425054, 2.0) + 1.0
+    )
+    x35 = np.exp(
+        x29
+        * x34
+        * (
+            states[0]
+            + 109.275
+            - 8540.23
+            / (np.power(250.55435150269975 * x33 + 100.5196497250166, 0.668054) + 1.0)
+        )
+    )
+    x36 = x35 + 1.0
+    x37 = -constants[75] - x10
+    x38 = states[0] * x29
+    x39 = np.exp(x38)
+    x40 = x39 + 1.0
+    x41 = 1.0 / x40
+    x42 = 4.0 * constants[36]
+    x43 = x41 * x42
+    x44 = (
+        constants[27] * x43
+        + constants[34] * constants[61]
+        + constants[35] * constants[62]
+    )
+    x45 = (
+        constants[34] * constants[56] + constants[35] * constants[57] + states[1] * x43
+    )
+    x46 = 1.0 / x45
+    x47 = 1.0 / np.power(x40, 2)
+    x48 = 1.0 / constants[70]
+    x49 = (
+        constants[19]
+        * constants[58]
+        * (
+            -constants[69]
+            * constants[71]
+            * x45
+            * x48
+            * (
+                -constants[27] * x29 * x39 * x42 * x46 * x47
+                + 4.0
+                * constants[36]
+                * constants[70]
+                * states[1]
+                * x27
+                * x28
+                * x39
+                * x44
+                * x47
+                / np.power(x45, 2)
+            )
+            / x44
+            + 1
+        )
+    )
+    x50 = 1.0 / states[1]
+    x51 = np.power(constants[45] * x50, constants[46])
+    x52 = np.power(constants[62], 3.0)
+    x53 = np.power(constants[47] * x50, constants[48])
+    x54 = x53 + 1.0
+    x55 = 1.0 / x54
+    x56 = np.exp(x38 * (constants[77] - 1.0))
+    x57 = 1.0 / (constants[73] * x56 + 1.0)
+    x58 = np.power(constants[57], 3.0)
+    x59 = constants[27] * x58
+    x60 = np.power(constants[51], 3.0)
+    x61 = states[1] * x52
+    x62 = 1.0 / constants[50]
+    x63 = constants[27] * np.power(constants[49], 3.0)
+    x64 = (
+        constants[50] * x52 * (np.power(constants[57] / constants[49], 3.0) + 1.0)
+        + constants[52] * x58
+        + states[1] * x60
+        + x59
+        + x61
+        + x63 * (states[1] * x62 + 1.0)
+    )
+    x65 = 1.0 / x64
+    x66 = -x56 * x61 + x59 * np.exp(constants[77] * x38)
+    x67 = 0.08605851979345956 * states[0]
+    diagonal[0] = (
+        26.036977214294097
+        * constants[11]
+        * constants[26]
+        * x13
+        * x16
+        * x19
+        * x22
+        * x23
+        / np.power(x14, 2)
+        - 1.0 * constants[11] * constants[26] * x15 * x16 * x19 * x22
+        + 1429878.6919358002 * constants[12] * x11 * x4 * x9 / np.power(x5, 2)
+        - 0.0008365437581051586 * constants[12] * x11 * x6 * x7 / np.power(x8, 3)
+        - 1.0 * constants[12] * x6 * x9
+        + 1.0
+        * constants[13]
+        * constants[16]
+        * constants[25]
+        * constants[70]
+        * x26
+        * x27
+        * x28
+        * x30
+        * x37
+        / np.power(x31, 2)
+        + 1.0
+        * constants[13]
+        * constants[17]
+        * constants[25]
+        * constants[70]
+        * x27
+        * x28
+        * x34
+        * x35
+        * x37
+        / np.power(x36, 2)
+        - constants[14]
+        - constants[15]
+        * constants[25]
+        * np.power(states[5], 2)
+        * (0.38 * states[6] + 0.63 * states[7])
+        - constants[16] * x32 / x31
+        - constants[17] * x32 / x36
+        - constants[18] * states[8]
+        - 0.006627745044750272
+        * constants[25]
+        * x0
+        * x3
+        * (-constants[74] - x10)
+        / np.power(x1, 4)
+        - constants[38] * constants[59] * x49
+        - constants[39] * constants[65] * x49
+        - constants[40] * constants[63] * x49
+        - 0.012331231217557886 * x19 * x20 * x24 / np.power(x21, 3)
+        - x2 * x3 / np.power(x1, 3)
+    )
+    diagonal[1] = (
+        -1.0
+        * constants[24]
+        * constants[48]
+        * constants[72]
+        * x50
+        * x53
+        * x57
+        * x65
+        * x66
+        / np.power(x54, 2)
+        + 1.0 * constants[24] * constants[72] * x52 * x55 * x56 * x57 * x65
+        - 1.0
+        * constants[24]
+        * constants[72]
+        * x55
+        * x57
+        * x66
+        * (-x52 - x60 - x62 * x63)
+        / np.power(x64, 2)
+        - constants[4]
+        * constants[66]
+        * constants[67]
+        * x48
+        * (
+            4.0
+            * constants[19]
+            * constants[36]
+            * constants[38]
+            * constants[58]
+            * constants[59]
+            * constants[69]
+            * constants[71]
+            * x41
+            * x46
+            * x48
+            - 4.0 * x17 * x22 * x24 * x50 / np.power(x18, 2)
+        )
+        / constants[68]
+        - constants[44] * constants[46] * x50 * x51 / np.power(x51 + 1.0, 2)
+    )
+    diagonal[2] = -1 / (
+        939.38
+        + 3060.62
+        / (np.power(states[1] / (constants[20] * constants[54]), constants[55]) + 1.0)
+    )
+    diagonal[3] = -1 / (
+        0.9
+        + 1002.85
+        / (np.power(0.6666666666666666 * states[0] + 31.666666666666664, 2.0) + 1.0)
+    )
+    diagonal[4] = -1 / (
+        90.9699
+        - 90.9699
+        / (
+            (1.0 + 0.06091656667493611 * np.exp(-0.29459419649432905 * states[0]))
+            * (1.3602936750195582 * np.exp(0.02203701336765231 * states[0]) + 1.0)
+        )
+    )
+    diagonal[5] = (
+        -0.002 * np.power(0.06333122229259025 * states[0] + 3.844838505383154, 2.0)
+        - 0.002
+    )
+    diagonal[6] = (
+        -0.0002 * np.power(0.027885368825830776 * states[0] + 1.748783500784973, 2.0)
+        - 0.0002
+    )
+    diagonal[7] = -1 / (
+        30000.0 + 220000.0 / (244.69193226422038 * np.exp(0.25 * states[0]) + 1.0)
+    )
+    diagonal[8] = -1 / (
+        -160.0
+        + 210.0 / (1.4805695580388407 * np.exp(x67) + 1.0)
+        + 170.0 / (1.0 + 0.11141511764427327 * np.exp(-x67))
+    )
+    return diagonal
+
+
+def compute_rates_kernel(voi, states, prepared):
+    """Computes the rates of a single simulation with scalar functions
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- list[float], list of states.
+    prepared -- list[float], list of prepared values computed by
+    prepare from the constants.
+
+    Returns:
+    rates -- list[float], list of computed rates.
+
+    Raises:
+    OverflowError -- if an exponential overflows.
+    ZeroDivisionError -- if a denominator is zero.
+    ValueError -- if a power or logarithm is not defined.
+
+    """
+    states = np.asarray(states, dtype=float).tolist()
+    x0 = prepared[5] + states[0]
+    x1 = (
+        (
+            0.02
+            + 0.98
+            / (6770037.888349095 * math.exp(0.21551724137931036 * states[0]) + 1.0)
+        )
+        * (prepared[9] + states[0])
+        / (1.0 + 0.004132526165039484 * math.exp(-0.10121457489878542 * states[0])) ** 2
+    )
+    x2 = 1.0 / (math.exp(prepared[12] * states[0]) + 1.0)
+    x3 = (
+        prepared[17]
+        * math.log(
+            (prepared[15] * x2 + prepared[16])
+            / (prepared[13] * states[1] * x2 + prepared[14])
+        )
+        + states[0]
+    )
+    x4 = 0.14285714285714285 * states[0]
+    x5 = 1.0 / (227.82355062507335 * math.exp(x4) + 1.0)
+    x6 = (
+        (prepared[32] + states[0])
+        * (0.2 * states[4] + 0.8 * x5)
+        / (
+            (1.0 + 0.0431593092614526 * math.exp(-x4)) ** 2
+            * ((prepared[31] * states[1]) ** 4 + 1.0)
+        )
+    )
+    x7 = 1.0 / states[1]
+    x8 = math.exp(prepared[43] * states[0])
+    x9 = -1.0 / (22026.465794806718 * math.exp(0.15873015873015872 * states[0]) + 1.0)
+    x10 = 0.08605851979345956 * states[0]
+    x11 = x7 * math.exp(prepared[57] * states[0])
+    return [
+        prepared[10] * x1
+        + prepared[11] * states[5] ** 2 * x0 * (0.38 * states[6] + 0.63 * states[7])
+        + prepared[18] * x3
+        + prepared[19] * x3
+        + prepared[20] * x3
+        + prepared[24]
+        * x0
+        / (
+            math.exp(
+                prepared[12]
+                * (
+                    -8.38384
+                    / ((prepared[22] * states[1] + 2.0814226778178138) ** 2 + 1.0)
+                    + 0.749234
+                    / ((prepared[21] * states[1] - 0.38935853577206647) ** 2 + 1.0)
+                )
+                * (
+                    states[0]
+                    + 37.5137
+                    - 5011.47
+                    / (
+                        math.pow(prepared[23] * states[1] + 992.5818503999532, 0.42291)
+                        + 1.0
+                    )
+                )
+            )
+            + 1.0
+        )
+        + prepared[28]
+        * x0
+        / (
+            math.exp(
+                prepared[12]
+                * (
+                    -1.40001
+                    / ((prepared[26] * states[1] + 0.33390953447425054) ** 2 + 1.0)
+                    + 0.681249
+                    / ((prepared[25] * states[1] - 0.5112540418130668) ** 2 + 1.0)
+                )
+                * (
+                    states[0]
+                    + 109.275
+                    - 8540.23
+                    / (
+                        math.pow(prepared[27] * states[1] + 100.5196497250166, 0.668054)
+                        + 1.0
+                    )
+                )
+            )
+            + 1.0
+        )
+        + prepared[30]
+        * states[3]
+        * (prepared[29] + states[0])
+        / (1.0 + 0.020413741940116113 * math.exp(-0.10822358559890391 * states[0])) ** 3
+        + prepared[33] * x6
+        + prepared[6] * x0
+        + prepared[8] * states[8] * (prepared[7] + states[0])
+        - (
+            0.0
+            if (prepared[0] > voi)
+            else (
+                prepared[1]
+                if ((prepared[2] > voi % prepared[3]) or (prepared[4] - voi > 0))
+                else 0.0
+            )
+        ),
+        prepared[36] / (math.pow(prepared[34] * x7, prepared[35]) + 1.0)
+        + prepared[40] * (prepared[37] * x1 + prepared[38] * x3 + prepared[39] * x6)
+        + prepared[53]
+        * (
+            prepared[51] * math.exp(prepared[50] * states[0])
+            + prepared[52] * states[1] * x8
+        )
+        / (
+            (math.pow(prepared[41] * x7, prepared[42]) + 1.0)
+            * (prepared[44] * x8 + 1.0)
+            * (
+                prepared[45] * states[1]
+                + prepared[46] * states[1]
+                + prepared[48] * (prepared[47] * states[1] + 1.0)
+                + prepared[49]
+            )
+        ),
+        (-states[2] + 1.0 / (math.pow(prepared[56] * x7, prepared[55]) + 1.0))
+        / (939.38 + 3060.62 / (math.pow(prepared[54] * states[1], prepared[55]) + 1.0)),
+        (-states[3] + 1.0 / (1242.6481670549956 * math.exp(0.125 * states[0]) + 1.0))
+        / (
+            0.9
+            + 1002.85
+            / ((0.6666666666666666 * states[0] + 31.666666666666664) ** 2 + 1.0)
+        ),
+        (-states[4] + 1.0 * x5)
+        / (
+            90.9699
+            - 90.9699
+            / (
+                (1.0 + 0.06091656667493611 * math.exp(-0.29459419649432905 * states[0]))
+                * (1.3602936750195582 * math.exp(0.02203701336765231 * states[0]) + 1.0)
+            )
+        ),
+        (
+            -states[5]
+            + 0.978613
+            / (1.0 + 0.49637710668432194 * math.exp(-0.03750853319130102 * states[0]))
+        )
+        * (0.002 * (0.06333122229259025 * states[0] + 3.844838505383154) ** 2 + 0.002),
+        (-states[6] - x9)
+        * (
+            0.0002 * (0.027885368825830776 * states[0] + 1.748783500784973) ** 2
+            + 0.0002
+        ),
+        (-states[7] - x9)
+        / (
+            30000.0 + 220000.0 / (244.69193226422038 * math.exp(0.25 * states[0]) + 1.0)
+        ),
+        (
+            -states[8]
+            + 1.0
+            / (
+                0.1
+                * (0.0006 * x11 + 3.5999999999999994e-07 * x11**2 + 1.0)
+                * math.exp(prepared[58] * states[0])
+                + 1.0
+            )
+        )
+        / (
+            -160.0
+            + 210.0 / (1.4805695580388407 * math.exp(x10) + 1.0)
+            + 170.0 / (1.0 + 0.11141511764427327 * math.exp(-x10))
+        ),
+    ]
+
+
+def compute_rates_buffer(voi, states, prepared, rates):
+    """Computes the rates of a single simulation into a buffer
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- np.array[float], array of states.
+    prepared -- np.array[float], array of prepared values computed by
+    prepare from the constants.
+    rates -- np.array[float], array the rates are written into.
+
+    Returns:
+    rates -- np.array[float], array of computed rates.
+
+    """
+    x0 = prepared[5] + states[0]
+    x1 = (
+        (
+            0.02
+            + 0.98
+            / (6770037.888349095 * math.exp(0.21551724137931036 * states[0]) + 1.0)
+        )
+        * (prepared[9] + states[0])
+        / (1.0 + 0.004132526165039484 * math.exp(-0.10121457489878542 * states[0])) ** 2
+    )
+    x2 = 1.0 / (math.exp(prepared[12] * states[0]) + 1.0)
+    x3 = (
+        prepared[17]
+        * math.log(
+            (prepared[15] * x2 + prepared[16])
+            / (prepared[13] * states[1] * x2 + prepared[14])
+        )
+        + states[0]
+    )
+    x4 = 0.14285714285714285 * states[0]
+    x5 = 1.0 / (227.82355062507335 * math.exp(x4) + 1.0)
+    x6 = (
+        (prepared[32] + states[0])
+        * (0.2 * states[4] + 0.8 * x5)
+        / (
+            (1.0 + 0.0431593092614526 * math.exp(-x4)) ** 2
+            * ((prepared[31] * states[1]) ** 4 + 1.0)
+        )
+    )
+    x7 = 1.0 / states[1]
+    x8 = math.exp(prepared[43] * states[0])
+    x9 = -1.0 / (22026.465794806718 * math.exp(0.15873015873015872 * states[0]) + 1.0)
+    x10 = 0.08605851979345956 * states[0]
+    x11 = x7 * math.exp(prepared[57] * states[0])
+    rates[0] = (
+        prepared[10] * x1
+        + prepared[11] * states[5] ** 2 * x0 * (0.38 * states[6] + 0.63 * states[7])
+        + prepared[18] * x3
+        + prepared[19] * x3
+        + prepared[20] * x3
+        + prepared[24]
+        * x0
+        / (
+            math.exp(
+                prepared[12]
+                * (
+                    -8.38384
+                    / ((prepared[22] * states[1] + 2.0814226778178138) ** 2 + 1.0)
+                    + 0.749234
+                    / ((prepared[21] * states[1] - 0.38935853577206647) ** 2 + 1.0)
+                )
+                * (
+                    states[0]
+                    + 37.5137
+                    - 5011.47
+                    / (
+                        math.pow(prepared[23] * states[1] + 992.5818503999532, 0.42291)
+                        + 1.0
+                    )
+                )
+            )
+            + 1.0
+        )
+        + prepared[28]
+        * x0
+        / (
+            math.exp(
+                prepared[12]
+                * (
+                    -1.40001
+                    / ((prepared[26] * states[1] + 0.33390953447425054) ** 2 + 1.0)
+                    + 0.681249
+                    / ((prepared[25] * states[1] - 0.5112540418130668) ** 2 + 1.0)
+                )
+                * (
+                    states[0]
+                    + 109.275
+                    - 8540.23
+                    / (
+                        math.pow(prepared[27] * states[1] + 100.5196497250166, 0.668054)
+                        + 1.0
+                    )
+                )
+            )
+            + 1.0
+        )
+        + prepared[30]
+        * states[3]
+        * (prepared[29] + states[0])
+        / (1.0 + 0.020413741940116113 * math.exp(-0.10822358559890391 * states[0])) ** 3
+        + prepared[33] * x6
+        + prepared[6] * x0
+        + prepared[8] * states[8] * (prepared[7] + states[0])
+        - (
+            0.0
+            if (prepared[0] > voi)
+            else (
+                prepared[1]
+                if ((prepared[2] > voi % prepared[3]) or (prepared[4] - voi > 0))
+                else 0.0
+            )
+        )
+    )
+    rates[1] = (
+        prepared[36] / (math.pow(prepared[34] * x7, prepared[35]) + 1.0)
+        + prepared[40] * (prepared[37] * x1 + prepared[38] * x3 + prepared[39] * x6)
+        + prepared[53]
+        * (
+            prepared[51] * math.exp(prepared[50] * states[0])
+            + prepared[52] * states[1] * x8
+        )
+        / (
+            (math.pow(prepared[41] * x7, prepared[42]) + 1.0)
+            * (prepared[44] * x8 + 1.0)
+            * (
+                prepared[45] * states[1]
+                + prepared[46] * states[1]
+                + prepared[48] * (prepared[47] * states[1] + 1.0)
+                + prepared[49]
+            )
+        )
+    )
+    rates[2] = (
+        -states[2] + 1.0 / (math.pow(prepared[56] * x7, prepared[55]) + 1.0)
+    ) / (939.38 + 3060.62 / (math.pow(prepared[54] * states[1], prepared[55]) + 1.0))
+    rates[3] = (
+        -states[3] + 1.0 / (1242.6481670549956 * math.exp(0.125 * states[0]) + 1.0)
+    ) / (
+        0.9
+        + 1002.85 / ((0.6666666666666666 * states[0] + 31.666666666666664) ** 2 + 1.0)
+    )
+    rates[4] = (-states[4] + 1.0 * x5) / (
+        90.9699
+        - 90.9699
+        / (
+            (1.0 + 0.06091656667493611 * math.exp(-0.29459419649432905 * states[0]))
+            * (1.3602936750195582 * math.exp(0.02203701336765231 * states[0]) + 1.0)
+        )
+    )
+    rates[5] = (
+        -states[5]
+        + 0.978613
+        / (1.0 + 0.49637710668432194 * math.exp(-0.03750853319130102 * states[0]))
+    ) * (0.002 * (0.06333122229259025 * states[0] + 3.844838505383154) ** 2 + 0.002)
+    rates[6] = (-states[6] - x9) * (
+        0.0002 * (0.027885368825830776 * states[0] + 1.748783500784973) ** 2 + 0.0002
+    )
+    rates[7] = (-states[7] - x9) / (
+        30000.0 + 220000.0 / (244.69193226422038 * math.exp(0.25 * states[0]) + 1.0)
+    )
+    rates[8] = (
+        -states[8]
+        + 1.0
+        / (
+            0.1
+            * (0.0006 * x11 + 3.5999999999999994e-07 * x11**2 + 1.0)
+            * math.exp(prepared[58] * states[0])
+            + 1.0
+        )
+    ) / (
+        -160.0
+        + 210.0 / (1.4805695580388407 * math.exp(x10) + 1.0)
+        + 170.0 / (1.0 + 0.11141511764427327 * math.exp(-x10))
+    )
+    return rates
+
+
+def prepare(constants):
+    """Evaluates the constant subexpressions of the rates
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+    The prepared values need to be computed again when the constants
+    change.
+
+    Args:
+    constants -- list[int], list of constant values.
+
+    Returns:
+    prepared -- list[float], list of prepared values for
+    compute_rates_kernel.
+
+    Raises:
+    OverflowError -- if an exponential overflows.
+    ZeroDivisionError -- if a denominator is zero.
+    ValueError -- if a power or logarithm is not defined.
+
+    """
+    constants = np.asarray(constants, dtype=float).tolist()
+    x0 = 1.0 * constants[12]
+    x1 = constants[70] / (constants[69] * constants[71])
+    x2 = 4.0 * constants[36]
+    x3 = 1.0 / constants[70]
+    x4 = constants[19] * constants[58]
+    x5 = constants[38] * constants[59] * x4
+    x6 = 1.0 * constants[25]
+    x7 = constants[13] * x6
+    x8 = 1.0 * constants[11] * constants[26] / constants[25]
+    x9 = constants[62] ** 3
+    x10 = constants[57] ** 3
+    x11 = constants[27] * x10
+    return [
+        constants[0],
+        constants[3],
+        constants[2],
+        constants[1] + constants[2],
+        constants[0] + constants[2],
+        -constants[75],
+        -constants[14],
+        -constants[76],
+        -constants[18],
+        -constants[33],
+        -x0,
+        -constants[15] * constants[25],
+        x1,
+        x2,
+        constants[34] * constants[56] + constants[35] * constants[57],
+        constants[27] * x2,
+        constants[34] * constants[61] + constants[35] * constants[62],
+        -constants[69] * constants[71] * x3,
+        -x5,
+        -constants[39] * constants[65] * x4,
+        -constants[40] * constants[63] * x4,
+        6.175050326660162 * constants[21],
+        0.001353075608511928 * constants[21],
+        4179.239211293976 * constants[21],
+        -constants[16] * x7,
+        2.3346212660651124 * constants[22],
+        0.0014599691070536947 * constants[22],
+        250.55435150269975 * constants[22],
+        -constants[17] * x7,
+        -constants[74],
+        -constants[10] * x6 / constants[26],
+        (1.0 / constants[32]),
+        -constants[31],
+        -x8,
+        constants[45],
+        constants[46],
+        -constants[44],
+        x0,
+        x5,
+        x8,
+        -constants[4] * constants[66] * constants[67] * x3 / constants[68],
+        constants[47],
+        constants[48],
+        x1 * (constants[77] - 1.0),
+        constants[73],
+        constants[51] ** 3,
+        x9,
+        (1.0 / constants[50]),
+        constants[27] * constants[49] ** 3,
+        constants[50] * x9 * ((constants[57] / constants[49]) ** 3 + 1.0)
+        + constants[52] * x10
+        + x11,
+        constants[77] * x1,
+        x11,
+        -x9,
+        -1.0 * constants[24] * constants[72],
+        1 / (constants[20] * constants[54]),
+        constants[55],
+        constants[20] * constants[54],
+        2.53 * x1,
+        -5.0 * x1,
+    ]
+
+
 def compute_algebraic(constants, states, voi):
     """Computes algebraics of the system
 
@@ -604,7 +1977,7 @@ def compute_algebraic(constants, states, voi):
     algebraic -- np.array[float], list of computed algebraics.
 
     """
-    algebraic = np.array([[0.0] * len(voi)] * sizeAlgebraic)
+    algebraic = np.zeros((sizeAlgebraic, len(voi)))
     states = np.array(states)
     voi = np.array(voi)
     algebraic[1] = 1.00000 / (
@@ -881,7 +2254,15 @@ def custom_piecewise(cases):
     return np.select(cases[0::2], cases[1::2])
 
 
-def solve_model(init_states, constants, start=0, end=15000):
+def solve_model(
+    init_states,
+    constants,
+    start=0,
+    end=15000,
+    output_dt=1.0,
+    record=None,
+    **options,
+):
     """Solve model with ODE solver
 
     Args:
@@ -889,36 +2270,46 @@ def solve_model(init_states, constants, start=0, end=15000):
     constants -- list[int], list of constant values.
     start -- int, start time in ms for the simulation, default value 0.
     end -- int, end time in ms for the simulation, default value 15000.
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    record -- list, names or indices of the states to record, default value
+    None for all the states.
+    options -- dict, solver options {integrator, steady_tol, tile,
+    checkpoint, resume, max_step, atol, rtol}, see solver.solve, the
+    settings recommended for the model are used by default.
 
     Returns:
+    voi -- np.array, timesteps in ms.
+    states -- np.array, simulation data of the recorded states.
+    algebraic -- function, computes the requested algebraic variables over a
+    time window, see solver.compute_algebraic, None if only some of the states
+    are recorded.
+
+    Raises:
+    KeyError -- if an option is not valid, see solver.check_options.
+    IntegrationError -- if the integrator fails, see solver.solve.
 
     """
-    # Set timespan to solve over
-    nb_steps = end - start
-    voi = np.linspace(start, end, nb_steps)
-
-    # Construct ODE object to solve
-    r = ode(compute_rates)
-    r.set_integrator(
-        SOLVER,
-        method=METHOD,
-        atol=ATOL,
-        rtol=RTOL,
-        max_step=MAX_STEP,
-    )
-    r.set_initial_value(init_states, voi[0])
-    r.set_f_params(constants)
-
-    # Solve model
-    states = np.array([[0.0] * len(voi)] * sizeStates)
-    states[:, 0] = init_states
-    for i, t in enumerate(voi[1:]):
-        if r.successful():
-            r.integrate(t)
-            states[:, i + 1] = r.y
-        else:
-            break
-
-    # Compute algebraic variables
-    algebraic = compute_algebraic(constants, states, voi)
+    solver.check_options(options)
+    voi, states = solver.solve(
+        sys.modules[__name__],
+        init_states,
+        constants,
+        start,
+        end,
+        output_dt=output_dt,
+        record=record,
+        **options,
+    )
+
+    if record is not None:
+        # The algebraic variables depend on all the states
+        return (voi, states, None)
+
+    # Algebraic variables are only computed on request
+    algebraic = solver.lazy_algebraic(
+        sys.modules[__name__],
+        constants,
+        states,
+        voi,
+    )
     return (voi, states, algebraic)
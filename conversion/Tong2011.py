@@ -8,15 +8,220 @@ Author: Mathias Roesler
 Date: 11/24
 """
 
+import sys
+
+import math
 import numpy as np
 
-from scipy.integrate import ode
-from conversion.constants import SOLVER, METHOD, ATOL, RTOL, MAX_STEP
+from conversion import solver
 
 # Size of variable np.arrays:
 sizeAlgebraic = 82
 sizeStates = 22
 sizeConstants = 83
+gateStates = [2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21]
+derivedConstants = {
+    54: [13],
+    55: [12, 8],
+    59: [57, 8],
+    61: [58, 8],
+    71: [66, 65, 68, 58, 53],
+    72: [66, 65, 68, 57, 11],
+    73: [66, 65, 68, 56, 60],
+    77: [66, 65, 68, 57, 11, 58, 53, 75, 70],
+    81: [74, 57],
+    82: [76, 53],
+}
+stateIndices = {
+    "v": 0,
+    "cai": 1,
+    "w": 2,
+    "m": 3,
+    "h": 4,
+    "d": 5,
+    "f1": 6,
+    "f2": 7,
+    "b": 8,
+    "g": 9,
+    "q": 10,
+    "r1": 11,
+    "r2": 12,
+    "p": 13,
+    "k1": 14,
+    "k2": 15,
+    "s": 16,
+    "x": 17,
+    "xa": 18,
+    "xab": 19,
+    "y": 20,
+    "c": 21,
+}
+algebraicIndices = {
+    "Ist": 0,
+    "wss": 1,
+    "Force": 2,
+    "mss": 3,
+    "hss": 4,
+    "dss": 5,
+    "fss": 6,
+    "bss": 7,
+    "gss": 8,
+    "qss": 9,
+    "rss": 10,
+    "pss": 11,
+    "kss": 12,
+    "sss": 13,
+    "xss": 14,
+    "xass_z": 15,
+    "xabss_z": 16,
+    "yss": 17,
+    "vFRT": 18,
+    "wtc": 19,
+    "mtc": 20,
+    "htc": 21,
+    "dtc": 22,
+    "f2tc": 23,
+    "btc": 24,
+    "gtc": 25,
+    "qtc": 26,
+    "r1tc": 27,
+    "r2tc": 28,
+    "ptc": 29,
+    "k1tc": 30,
+    "k2tc": 31,
+    "stc": 32,
+    "xtc": 33,
+    "xass_vh": 34,
+    "xabss_vh": 35,
+    "ya": 36,
+    "enscc": 37,
+    "xass": 38,
+    "xabss": 39,
+    "yb": 40,
+    "K1cl": 41,
+    "ina": 42,
+    "xatc": 43,
+    "xabtc": 44,
+    "ytc": 45,
+    "K2cl": 46,
+    "fca": 47,
+    "css": 48,
+    "ical": 49,
+    "ctc": 50,
+    "icat": 51,
+    "ib": 52,
+    "ik1": 53,
+    "ik2": 54,
+    "ika": 55,
+    "iBKa": 56,
+    "iBKab": 57,
+    "ih": 58,
+    "icl": 59,
+    "insca": 60,
+    "I_Ca_tot": 61,
+    "J_Ca_mem": 62,
+    "insna": 63,
+    "jcamem_plot": 64,
+    "insk": 65,
+    "fnak": 66,
+    "inak": 67,
+    "f1naca": 68,
+    "f2naca": 69,
+    "fallo": 70,
+    "naca_Eup": 71,
+    "naca_Ed1": 72,
+    "naca_Ed2": 73,
+    "naca_Ed3": 74,
+    "jnaca": 75,
+    "inaca": 76,
+    "jpmca": 77,
+    "jnaca_plot": 78,
+    "I_tot": 79,
+    "J_tot": 80,
+    "jpmca_plot": 81,
+}
+constantIndices = {
+    "stim_start": 0,
+    "stim_interval": 1,
+    "stim_duration": 2,
+    "stim_current": 3,
+    "conversion": 4,
+    "tinyamount": 8,
+    "inaca_sign": 9,
+    "jnaca_sign": 10,
+    "ki": 11,
+    "cao": 12,
+    "mgo": 13,
+    "zna": 14,
+    "zk": 15,
+    "gna": 16,
+    "gcal": 17,
+    "ecal": 18,
+    "kmca": 19,
+    "gcat": 20,
+    "ecat": 21,
+    "gkca": 22,
+    "gb": 23,
+    "gk1": 24,
+    "gk2": 25,
+    "gbka": 26,
+    "gbkab": 27,
+    "gka": 28,
+    "gcl": 29,
+    "gh": 30,
+    "gns": 31,
+    "PnsK": 32,
+    "PnsNa": 33,
+    "PnsCa": 34,
+    "PnsCs": 35,
+    "gnsCa": 36,
+    "gnsNa": 37,
+    "gnsK": 38,
+    "gnsCs": 39,
+    "Jpmca": 40,
+    "Kmpmca": 41,
+    "npmca": 42,
+    "Kmallo": 43,
+    "nallo": 44,
+    "Kmnai": 45,
+    "Kmcai": 46,
+    "Kmnao": 47,
+    "Kmcao": 48,
+    "Fmax": 49,
+    "FKm": 50,
+    "Fn": 51,
+    "f1tc": 52,
+    "nai": 53,
+    "fmg": 54,
+    "gs_cao": 55,
+    "cli": 56,
+    "ko": 57,
+    "nao": 58,
+    "gs_ko": 59,
+    "clo": 60,
+    "gs_nao": 61,
+    "buff": 62,
+    "AV": 63,
+    "zca": 64,
+    "R": 65,
+    "frdy": 66,
+    "Cm": 67,
+    "temp": 68,
+    "ginak": 69,
+    "PK": 70,
+    "ena": 71,
+    "ek": 72,
+    "ecl": 73,
+    "nakKmko": 74,
+    "PNa": 75,
+    "nakKmnai": 76,
+    "eh": 77,
+    "Jnaca": 78,
+    "ksat": 79,
+    "xgamma": 80,
+    "knak": 81,
+    "nnak": 82,
+}
 
 
 def create_legends():
@@ -390,9 +595,92 @@ def init_consts():
     return (states, constants)
 
 
+def compute_derived_constants(constants, derived=None):
+    """Computes the constants that depend on other constants
+
+    Generated from init_consts by conversion.codegen, do not edit.
+
+    Args:
+    constants -- list[int], list of constant values.
+    derived -- set[int], indices of the derived constants to compute,
+    default value None for all of them.
+
+    Returns:
+    constants -- list[int], list of updated constant values.
+
+    """
+    if derived is None:
+        derived = derivedConstants
+    if 54 in derived:
+        constants[54] = 0.108043 + 0.903902 / (
+            1.0 + np.power(constants[13] / 0.281007, 1.29834)
+        )
+    if 55 in derived:
+        constants[55] = (
+            1.0
+            / 0.000525
+            * 0.03
+            / (1.0 + np.power(150.0 / (constants[12] + constants[8]), 2.0))
+        )
+    if 59 in derived:
+        constants[59] = (
+            1.0
+            / 0.0123
+            * 0.03
+            / (1.0 + np.power(150.0 / (constants[57] + constants[8]), 2.0))
+        )
+    if 61 in derived:
+        constants[61] = (
+            1.0
+            / 0.0123
+            * 0.03
+            / (1.0 + np.power(150.0 / (constants[58] + constants[8]), 2.0))
+        )
+    if 71 in derived:
+        constants[71] = (
+            constants[65]
+            * constants[68]
+            / constants[66]
+            * np.log(constants[58] / constants[53])
+        )
+    if 72 in derived:
+        constants[72] = (
+            constants[65]
+            * constants[68]
+            / constants[66]
+            * np.log(constants[57] / constants[11])
+        )
+    if 73 in derived:
+        constants[73] = (
+            constants[65]
+            * constants[68]
+            / constants[66]
+            * np.log(constants[56] / constants[60])
+        )
+    if 77 in derived:
+        constants[77] = (
+            constants[65]
+            * constants[68]
+            / constants[66]
+            * np.log(
+                (constants[57] + constants[75] / constants[70] * constants[58])
+                / (constants[11] + constants[75] / constants[70] * constants[53])
+            )
+        )
+    if 81 in derived:
+        constants[81] = 1.0 / (1.0 + np.power(constants[74] / constants[57], 1.5))
+    if 82 in derived:
+        constants[82] = 1.0 / (1.0 + np.power(constants[76] / constants[53], 2.0))
+    return constants
+
+
 def compute_rates(voi, states, constants):
     """Computes rates of the system
 
+    The states and constants can also be arrays of shape (sizeStates,
+    nb_batch) and (sizeConstants, nb_batch) to compute the rates of a batch
+    of simulations at once.
+
     Args:
     voi -- list[flaot], list of voi.
     states -- list[float], list of states.
@@ -747,6 +1035,1514 @@ def compute_rates(voi, states, constants):
     return rates
 
 
+def compute_jacobian(voi, states, constants):
+    """Computes the Jacobian of the rates with respect to the states
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- list[float], list of states.
+    constants -- list[int], list of constant values.
+
+    Returns:
+    jacobian -- np.array[float], derivative of rates[i] with respect
+    to states[j] at index [i, j].
+
+    """
+    jacobian = np.zeros((sizeStates, sizeStates) + np.shape(states[0]))
+    x0 = constants[16] * np.power(states[3], 3)
+    x1 = constants[22] * constants[26]
+    x2 = constants[22] * constants[27]
+    x3 = 0.38 * states[11] + 0.63 * states[12]
+    x4 = constants[24] * np.power(states[10], 2)
+    x5 = 0.75 * states[14] + 0.25 * states[15]
+    x6 = constants[25] * np.power(states[13], 2)
+    x7 = constants[28] * states[17]
+    x8 = 1.0 / constants[65]
+    x9 = 1.0 / constants[68]
+    x10 = constants[66] * x8 * x9
+    x11 = states[0] * x10
+    x12 = np.exp(x11)
+    x13 = x12 + 1.0
+    x14 = 4.0 * constants[34]
+    x15 = x14 / x13
+    x16 = (
+        constants[12] * x15
+        + constants[32] * constants[57]
+        + constants[33] * constants[58]
+    )
+    x17 = (
+        constants[11] * constants[32] + constants[33] * constants[53] + states[1] * x15
+    )
+    x18 = 1.0 / x17
+    x19 = 1.0 / np.power(x13, 2)
+    x20 = 1.0 / constants[66]
+    x21 = constants[65] * constants[68] * x20
+    x22 = constants[31] * constants[54]
+    x23 = x22 * (
+        1
+        - x17
+        * x21
+        * (
+            -constants[12] * x10 * x12 * x14 * x18 * x19
+            + 4.0
+            * constants[34]
+            * constants[66]
+            * states[1]
+            * x12
+            * x16
+            * x19
+            * x8
+            * x9
+            / np.power(x17, 2)
+        )
+        / x16
+    )
+    x24 = constants[37] * constants[61]
+    x25 = constants[38] * constants[59]
+    x26 = 0.1 * states[0]
+    x27 = np.exp(-x10 * x26)
+    x28 = np.exp(0.020116676725005028 * constants[58]) * np.exp(-1.9 * x11)
+    x29 = np.power(constants[53], 3.0)
+    x30 = constants[12] * x29
+    x31 = x30 * np.exp(constants[80] * x11)
+    x32 = constants[80] - 1.0
+    x33 = np.exp(x11 * x32)
+    x34 = np.power(constants[58], 3.0)
+    x35 = states[1] * x34
+    x36 = x33 * x35
+    x37 = constants[80] * x10 * x31 - x10 * x32 * x36
+    x38 = np.power(constants[47], 3.0)
+    x39 = 1.0 / constants[46]
+    x40 = constants[12] * np.power(constants[45], 3.0)
+    x41 = (
+        constants[46] * x34 * (np.power(constants[53] / constants[45], 3.0) + 1.0)
+        + constants[48] * x29
+        + states[1] * x38
+        + x30
+        + x35
+        + x40 * (states[1] * x39 + 1.0)
+    )
+    x42 = 1.0 / x41
+    x43 = 1.0 / states[1]
+    x44 = np.power(constants[43] * x43, constants[44])
+    x45 = x44 + 1.0
+    x46 = 1.0 / x45
+    x47 = constants[79] * x33 + 1.0
+    x48 = 1.0 / x47
+    x49 = constants[10] * constants[78] * x46 * x48
+    x50 = 1.0 / constants[62]
+    x51 = 1.0 / constants[63]
+    x52 = 1.0 / constants[67]
+    x53 = 0.5 * constants[64] * constants[66] * constants[9] * x50 * x51 * x52
+    x54 = x49 * x53
+    x55 = 1.0 / np.power(x47, 2)
+    x56 = x31 - x36
+    x57 = constants[20] * np.power(states[8], 2)
+    x58 = 0.8 * states[6] + 0.2 * states[7]
+    x59 = np.power(states[5], 2)
+    x60 = np.power(states[1] / constants[19], 4.0)
+    x61 = x60 + 1.0
+    x62 = 1.0 / x61
+    x63 = constants[17] * x59 * x62
+    x64 = constants[36] * constants[55]
+    x65 = states[9] * x57 + x23 * x64 + 1.0 * x58 * x63
+    x66 = -states[0]
+    x67 = -constants[18] - x66
+    x68 = constants[17] * x58 * x67
+    x69 = 4.0 * x43 * x59 * x60 * x68 / np.power(x61, 2)
+    x70 = x15 * x18 * x21 * x22
+    x71 = x64 * x70
+    x72 = constants[10] * constants[78] * x42 * x56
+    x73 = constants[44] * x43 * x44 * x48 / np.power(x45, 2)
+    x74 = x56 * (-x34 - x38 - x39 * x40) / np.power(x41, 2)
+    x75 = -constants[71] - x66
+    x76 = 2.0 * states[5] * x62 * x68
+    x77 = x63 * x67
+    x78 = 0.8 * x77
+    x79 = 0.2 * x77
+    x80 = -constants[21] - x66
+    x81 = 2 * constants[20] * states[8] * states[9] * x80
+    x82 = x57 * x80
+    x83 = -constants[72] - x66
+    x84 = 2 * x83
+    x85 = x4 * x83
+    x86 = x6 * x83
+    x87 = 1.0 * x49
+    x88 = constants[62] * constants[63] * constants[67] * x20 / constants[64]
+    x89 = np.power(constants[41] * x43, constants[42])
+    x90 = np.power(constants[5] * constants[50] * x43, constants[51])
+    x91 = x90 + 1.0
+    x92 = np.power(states[1] / (constants[5] * constants[50]), constants[51])
+    x93 = x92 + 1.0
+    x94 = 939.38 + 3060.62 / x93
+    x95 = 1.0 / x94
+    x96 = constants[51] * x43
+    x97 = np.exp(-0.10822358559890391 * states[0])
+    x98 = 0.020413741940116113 * x97 + 1.0
+    x99 = np.exp(x26)
+    x100 = 44.701184493300836 * x99 + 1.0
+    x101 = 0.25 + 7.0 / x100
+    x102 = 1.0 / x101
+    x103 = 0.125 * states[0]
+    x104 = np.exp(x103)
+    x105 = 1242.6481670549956 * x104 + 1.0
+    x106 = 0.6666666666666666 * states[0] + 31.666666666666664
+    x107 = np.power(x106, 2.0) + 1.0
+    x108 = 0.9 + 1002.85 / x107
+    x109 = 1.0 / x108
+    x110 = 0.14285714285714285 * states[0]
+    x111 = np.exp(-x110)
+    x112 = 0.0431593092614526 * x111 + 1.0
+    x113 = 0.1111111111111111 * states[0] + 3.3299999999999996
+    x114 = np.power(x113, 2.0) + 1.0
+    x115 = 2.29 + 5.7 / x114
+    x116 = 1.0 / x115
+    x117 = 1.0 / constants[52]
+    x118 = np.exp(x110)
+    x119 = 227.82355062507335 * x118 + 1.0
+    x120 = 32.54622151786762 * x118 / np.power(x119, 2)
+    x121 = np.exp(-0.29459419649432905 * states[0])
+    x122 = 0.06091656667493611 * x121 + 1.0
+    x123 = 1.0 / x122
+    x124 = np.exp(0.02203701336765231 * states[0])
+    x125 = 1.3602936750195582 * x124 + 1.0
+    x126 = 1.0 / x125
+    x127 = -90.9699 * x123 * x126 + 90.9699
+    x128 = 1.0 / x127
+    x129 = np.exp(-0.10121457489878542 * states[0])
+    x130 = 0.004132526165039484 * x129 + 1.0
+    x131 = 0.038461538461538464 * states[0] + 2.5384615384615388
+    x132 = np.power(x131, 2.0) + 1.0
+    x133 = 0.45 + 3.9 / x132
+    x134 = 1.0 / x133
+    x135 = np.exp(0.21551724137931036 * states[0])
+    x136 = 6770037.888349095 * x135 + 1.0
+    x137 = np.exp(-0.12391573729863692 * states[0])
+    x138 = 0.000514409608423902 * x137 + 1.0
+    x139 = 1.0 / x138
+    x140 = np.exp(0.00492174426616793 * states[0])
+    x141 = 0.1281589858272324 * x140 + 1.0
+    x142 = 1.0 / x141
+    x143 = -150.0 * x139 * x142 + 150.0
+    x144 = 1.0 / x143
+    x145 = 0.06333122229259025 * states[0] + 3.844838505383154
+    x146 = np.exp(-0.03750853319130102 * states[0])
+    x147 = 0.49637710668432194 * x146 + 1.0
+    x148 = 0.002 * np.power(x145, 2.0) + 0.002
+    x149 = 0.027885368825830776 * states[0] + 1.748783500784973
+    x150 = np.exp(0.15873015873015872 * states[0])
+    x151 = 22026.465794806718 * x150 + 1.0
+    x152 = -1.0 / x151
+    x153 = 0.0002 * np.power(x149, 2.0) + 0.0002
+    x154 = 3496.264411874082 * x150 / np.power(x151, 2)
+    x155 = np.exp(0.25 * states[0])
+    x156 = 244.69193226422038 * x155 + 1.0
+    x157 = 30000.0 + 220000.0 / x156
+    x158 = 1.0 / x157
+    x159 = 0.034879665155214505 * states[0] + 2.2357865364492495
+    x160 = np.exp(-0.05434782608695653 * states[0])
+    x161 = 0.37780784271725576 * x160 + 1.0
+    x162 = 0.01 * np.power(x159, 2.0) + 0.01
+    x163 = np.exp(-x103)
+    x164 = 8.588511730827894e-05 * x163 + 1.0
+    x165 = 1.0 / x164
+    x166 = np.exp(0.02 * states[0])
+    x167 = 0.0018363047770289071 * x166 + 1.0
+    x168 = 1.0 / x167
+    x169 = -1000000.0 * x165 * x168 + 1000000.0
+    x170 = 1.0 / x169
+    x171 = np.exp(0.17543859649122806 * states[0])
+    x172 = 41.2354467972002 * x171 + 1.0
+    x173 = 7.234288911789508 * x171 / np.power(x172, 2)
+    x174 = -1.0 / x172
+    x175 = np.exp(-0.3732527107478118 * states[0])
+    x176 = 9.128085116822181e-05 * x175 + 1.0
+    x177 = 1.0 / x176
+    x178 = np.exp(0.03937131878169391 * states[0])
+    x179 = 0.005347167038234146 * x178 + 1.0
+    x180 = 1.0 / x179
+    x181 = -2500000.0 * x177 * x180 + 2500000.0
+    x182 = 1.0 / x181
+    x183 = 0.02857142857142857 * states[0] + 0.5863771428571428
+    x184 = np.exp(-0.1321003963011889 * states[0])
+    x185 = 0.025449224366457798 * x184 + 1.0
+    x186 = 0.058823529411764705 * np.power(x183, 2.0) + 0.058823529411764705
+    x187 = np.exp(0.16666666666666666 * states[0])
+    x188 = 107294.57126320578 * x187 + 1.0
+    x189 = 0.008333333333333333 * states[0] + 0.28480416666666664
+    x190 = np.power(x189, 2.0) + 1.0
+    x191 = 7.5 + 10.0 / x190
+    x192 = 1.0 / x191
+    x193 = 3.044677150587635 - 0.019175565727127863 * states[0]
+    x194 = constants[6] * states[1]
+    x195 = 0.001353075608511928 * x194 + 2.0814226778178138
+    x196 = np.power(x195, 2.0) + 1.0
+    x197 = 6.175050326660162 * x194 - 0.38935853577206647
+    x198 = np.power(x197, 2.0) + 1.0
+    x199 = 0.749234 / x198 - 8.38384 / x196
+    x200 = 4179.239211293976 * x194 + 992.5818503999532
+    x201 = np.power(x200, 0.42291) + 1.0
+    x202 = x10 * (states[0] + 37.5137 - 5011.47 / x201)
+    x203 = np.exp(x199 * x202)
+    x204 = x203 + 1.0
+    x205 = 0.41508588126883456 * np.power(x193, 2.0) + 0.41508588126883456
+    x206 = 1.0 * x203 * x205 / np.power(x204, 2)
+    x207 = x10 * x199
+    x208 = 0.015038679483631901 * states[0] - 2.30120369590587
+    x209 = constants[7] * states[1]
+    x210 = 0.0014599691070536947 * x209 + 0.33390953447425054
+    x211 = np.power(x210, 2.0) + 1.0
+    x212 = 2.3346212660651124 * x209 - 0.5112540418130668
+    x213 = np.power(x212, 2.0) + 1.0
+    x214 = 0.681249 / x213 - 1.40001 / x211
+    x215 = 250.55435150269975 * x209 + 100.5196497250166
+    x216 = np.power(x215, 0.668054) + 1.0
+    x217 = x10 * (states[0] + 109.275 - 8540.23 / x216)
+    x218 = np.exp(x214 * x217)
+    x219 = x218 + 1.0
+    x220 = 0.07243804735999536 * np.power(x208, 2.0) + 0.07243804735999536
+    x221 = 1.0 * x218 * x220 / np.power(x219, 2)
+    x222 = x10 * x214
+    x223 = np.exp(0.11553614548311439 * states[0])
+    x224 = 194143.7945420567 * x223 + 1.0
+    x225 = np.exp(-0.0497 * states[0])
+    x226 = np.exp(0.05211 * states[0])
+    x227 = 3.5e-06 * x225 + 0.04003 * x226
+    x228 = 0.08605851979345956 * states[0]
+    x229 = np.exp(-x228)
+    x230 = 0.11141511764427327 * x229 + 1.0
+    x231 = np.exp(x228)
+    x232 = 1.4805695580388407 * x231 + 1.0
+    x233 = -160.0 + 210.0 / x232 + 170.0 / x230
+    x234 = np.exp(2.53 * x11)
+    x235 = x234 * x43
+    x236 = np.power(x235, 2.0)
+    x237 = 0.0006 * x235 + 3.5999999999999994e-07 * x236 + 1.0
+    x238 = np.exp(-5.0 * x11)
+    x239 = 0.1 * x238
+    x240 = x237 * x239 + 1.0
+    x241 = 1.0 / x233
+    x242 = x241 / np.power(x240, 2)
+    jacobian[0, 0] = (
+        0.5
+        * constants[10]
+        * constants[64]
+        * np.power(constants[66], 2)
+        * constants[78]
+        * constants[79]
+        * constants[9]
+        * x32
+        * x33
+        * x42
+        * x46
+        * x50
+        * x51
+        * x52
+        * x55
+        * x56
+        * x8
+        * x9
+        - constants[23]
+        - constants[29] * states[21]
+        - constants[30] * states[20]
+        - 1.0
+        * constants[69]
+        * constants[81]
+        * constants[82]
+        * (0.012450000000000001 * x10 * x27 + 0.004161 * x10 * x28)
+        / np.power(0.1245 * x27 + 0.00219 * x28 + 1.0, 2)
+        - states[16] * x7
+        - states[18] * x1
+        - states[19] * x2
+        - states[4] * x0
+        - x23 * x24
+        - x23 * x25
+        - x3 * x4
+        - x37 * x42 * x54
+        - x5 * x6
+        - x65
+    )
+    jacobian[0, 1] = (
+        0.5
+        * constants[10]
+        * constants[64]
+        * constants[66]
+        * constants[78]
+        * constants[9]
+        * x33
+        * x34
+        * x42
+        * x46
+        * x48
+        * x50
+        * x51
+        * x52
+        - x24 * x70
+        - x25 * x70
+        - x53 * x72 * x73
+        - x54 * x74
+        + x69
+        - x71
+    )
+    jacobian[0, 3] = -3 * constants[16] * np.power(states[3], 2) * states[4] * x75
+    jacobian[0, 4] = -x0 * x75
+    jacobian[0, 5] = -x76
+    jacobian[0, 6] = -x78
+    jacobian[0, 7] = -x79
+    jacobian[0, 8] = -x81
+    jacobian[0, 9] = -x82
+    jacobian[0, 10] = -constants[24] * states[10] * x3 * x84
+    jacobian[0, 11] = -0.38 * x85
+    jacobian[0, 12] = -0.63 * x85
+    jacobian[0, 13] = -constants[25] * states[13] * x5 * x84
+    jacobian[0, 14] = -0.75 * x86
+    jacobian[0, 15] = -0.25 * x86
+    jacobian[0, 16] = -x7 * x83
+    jacobian[0, 17] = -constants[28] * states[16] * x83
+    jacobian[0, 18] = -x1 * x83
+    jacobian[0, 19] = -x2 * x83
+    jacobian[0, 20] = -constants[30] * (-constants[77] - x66)
+    jacobian[0, 21] = -constants[29] * (-constants[73] - x66)
+    jacobian[1, 0] = (
+        1.0
+        * constants[10]
+        * constants[66]
+        * constants[78]
+        * constants[79]
+        * x32
+        * x33
+        * x42
+        * x46
+        * x55
+        * x56
+        * x8
+        * x9
+        - x37 * x42 * x87
+        - x65 * x88
+    )
+    jacobian[1, 1] = (
+        1.0 * constants[10] * constants[78] * x33 * x34 * x42 * x46 * x48
+        - constants[40] * constants[42] * x43 * x89 / np.power(x89 + 1.0, 2)
+        - 1.0 * x72 * x73
+        - x74 * x87
+        - x88 * (-x69 + x71)
+    )
+    jacobian[1, 5] = -x76 * x88
+    jacobian[1, 6] = -x78 * x88
+    jacobian[1, 7] = -x79 * x88
+    jacobian[1, 8] = -x81 * x88
+    jacobian[1, 9] = -x82 * x88
+    jacobian[2, 1] = 1.0 * x90 * x95 * x96 / np.power(x91, 2) + 3060.62 * x92 * x96 * (
+        -states[2] + 1.0 / x91
+    ) / (np.power(x93, 2) * np.power(x94, 2))
+    jacobian[2, 2] = -x95
+    jacobian[3, 0] = 0.0022092483482500907 * x102 * x97 / np.power(
+        x98, 2
+    ) + 31.290829145310585 * x99 * (-states[3] + 1.0 / x98) / (
+        np.power(x100, 2) * np.power(x101, 2)
+    )
+    jacobian[3, 3] = -x102
+    jacobian[4, 0] = -155.33102088187445 * x104 * x109 / np.power(
+        x105, 2
+    ) + 1337.1333333333332 * np.power(x106, 1.0) * (-states[4] + 1.0 / x105) / (
+        np.power(x107, 2) * np.power(x108, 2)
+    )
+    jacobian[4, 4] = -x109
+    jacobian[5, 0] = 0.006165615608778943 * x111 * x116 / np.power(
+        x112, 2
+    ) + 1.2666666666666666 * np.power(x113, 1.0) * (-states[5] + 1.0 / x112) / (
+        np.power(x114, 2) * np.power(x115, 2)
+    )
+    jacobian[5, 5] = -x116
+    jacobian[6, 0] = -x117 * x120
+    jacobian[6, 6] = -x117
+    jacobian[7, 0] = -x120 * x128 + (-states[7] + 1.0 / x119) * (
+        1.6325155335873531 * x121 * x126 / np.power(x122, 2)
+        - 2.7269873989528386 * x123 * x124 / np.power(x125, 2)
+    ) / np.power(x127, 2)
+    jacobian[7, 7] = -x128
+    jacobian[8, 0] = 0.0004182718790525793 * x129 * x134 / np.power(
+        x130, 2
+    ) + 0.3 * np.power(x131, 1.0) * (-states[8] + 1.0 / x130) / (
+        np.power(x132, 2) * np.power(x133, 2)
+    )
+    jacobian[8, 8] = -x134
+    jacobian[9, 0] = -1429878.6919358002 * x135 * x144 / np.power(x136, 2) + (
+        0.00956151688520264 * x137 * x142 / np.power(x138, 2)
+        - 0.0946148630479617 * x139 * x140 / np.power(x141, 2)
+    ) * (-states[9] + 0.02 + 0.98 / x136) / np.power(x143, 2)
+    jacobian[9, 9] = -x144
+    jacobian[10, 0] = 0.000253324889170361 * np.power(x145, 1.0) * (
+        -states[10] + 0.978613 / x147
+    ) + 0.01822018594869074 * x146 * x148 / np.power(x147, 2)
+    jacobian[10, 10] = -x148
+    jacobian[11, 0] = (
+        1.1154147530332311e-05 * np.power(x149, 1.0) * (-states[11] - x152)
+        - x153 * x154
+    )
+    jacobian[11, 11] = -x153
+    jacobian[12, 0] = -x154 * x158 + 13458056.27453212 * x155 * (-states[12] - x152) / (
+        np.power(x156, 2) * np.power(x157, 2)
+    )
+    jacobian[12, 12] = -x158
+    jacobian[13, 0] = 0.0006975933031042901 * np.power(x159, 1.0) * (
+        -states[13] + 0.948 / x161
+    ) + 0.019465317113910786 * x160 * x162 / np.power(x161, 2)
+    jacobian[13, 13] = -x162
+    jacobian[14, 0] = -x170 * x173 + (-states[14] - x174) * (
+        10.735639663534869 * x163 * x168 / np.power(x164, 2)
+        - 36.72609554057814 * x165 * x166 / np.power(x167, 2)
+    ) / np.power(x169, 2)
+    jacobian[14, 14] = -x170
+    jacobian[15, 0] = -x173 * x182 + (-states[15] - x174) * (
+        85.17706284476589 * x175 * x180 / np.power(x176, 2)
+        - 526.3125451032066 * x177 * x178 / np.power(x179, 2)
+    ) / np.power(x181, 2)
+    jacobian[15, 15] = -x182
+    jacobian[16, 0] = 0.003361344537815126 * np.power(x183, 1.0) * (
+        -states[16] + 1.0 / x185
+    ) + 0.0033618526243669477 * x184 * x186 / np.power(x185, 2)
+    jacobian[16, 16] = -x186
+    jacobian[17, 0] = -17524.779972990276 * x187 * x192 / np.power(
+        x188, 2
+    ) + 0.16666666666666666 * np.power(x189, 1.0) * (
+        -states[17] + 0.02 + 0.98 / x188
+    ) / (
+        np.power(x190, 2) * np.power(x191, 2)
+    )
+    jacobian[17, 17] = -x192
+    jacobian[18, 0] = (
+        -0.01591901319734666 * np.power(x193, 1.0) * (-states[18] + 1.0 / x204)
+        - x206 * x207
+    )
+    jacobian[18, 1] = -x206 * (
+        8857482.834610788
+        * constants[6]
+        * (1.0 / np.power(x200, 0.57709))
+        * x207
+        / np.power(x201, 2)
+        + x202
+        * (
+            0.022687938819333283
+            * constants[6]
+            * np.power(x195, 1.0)
+            / np.power(x196, 2)
+            - 9.253115312889799 * constants[6] * np.power(x197, 1.0) / np.power(x198, 2)
+        )
+    )
+    jacobian[18, 18] = -x205
+    jacobian[19, 0] = (
+        0.0021787451533342365 * np.power(x208, 1.0) * (-states[19] + 1.0 / x219)
+        - x221 * x222
+    )
+    jacobian[19, 1] = -x221 * (
+        1429496.4640316702
+        * constants[7]
+        * (1.0 / np.power(x215, 0.33194599999999996))
+        * x222
+        / np.power(x216, 2)
+        + x217
+        * (
+            0.004087942699132486
+            * constants[7]
+            * np.power(x210, 1.0)
+            / np.power(x211, 2)
+            - 3.1809168057711834
+            * constants[7]
+            * np.power(x212, 1.0)
+            / np.power(x213, 2)
+        )
+    )
+    jacobian[19, 19] = -x220
+    jacobian[20, 0] = -22430.625690854933 * x223 * x227 / np.power(x224, 2) + (
+        -states[20] + 1.0 / x224
+    ) * (-1.7395e-07 * x225 + 0.0020859633 * x226)
+    jacobian[20, 20] = -x227
+    jacobian[21, 0] = 1.0 * x242 * (
+        0.5 * constants[66] * x237 * x238 * x8 * x9
+        - x239
+        * (0.0015179999999999998 * x10 * x235 + 1.8215999999999996e-06 * x10 * x236)
+    ) + (-states[21] + 1.0 / x240) * (
+        -1.6299974182036538 * x229 / np.power(x230, 2)
+        + 26.757281169376643 * x231 / np.power(x232, 2)
+    ) / np.power(
+        x233, 2
+    )
+    jacobian[21, 1] = (
+        -x239
+        * x242
+        * (-7.199999999999999e-07 * x236 * x43 - 0.0006 * x234 / np.power(states[1], 2))
+    )
+    jacobian[21, 21] = -x241
+    return jacobian
+
+
+def compute_jacobian_diagonal(voi, states, constants):
+    """Computes the derivative of each rate with respect to its state
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- list[float], list of states.
+    constants -- list[int], list of constant values.
+
+    Returns:
+    diagonal -- np.array[float], derivative of rates[i] with respect
+    to states[i] at index i.
+
+    """
+    diagonal = np.zeros((sizeStates,) + np.shape(states[0]))
+    x0 = np.power(states[1] / constants[19], 4.0)
+    x1 = x0 + 1.0
+    x2 = constants[17] * np.power(states[5], 2) * (0.8 * states[6] + 0.2 * states[7])
+    x3 = 0.1 * states[0]
+    x4 = 1.0 / constants[65]
+    x5 = 1.0 / constants[68]
+    x6 = constants[66] * x4 * x5
+    x7 = np.exp(-x3 * x6)
+    x8 = states[0] * x6
+    x9 = np.exp(0.020116676725005028 * constants[58]) * np.exp(-1.9 * x8)
+    x10 = constants[80] - 1.0
+    x11 = np.exp(x10 * x8)
+    x12 = constants[79] * x11 + 1.0
+    x13 = 1.0 / x12
+    x14 = np.power(constants[53], 3.0)
+    x15 = constants[12] * x14
+    x16 = x15 * np.exp(constants[80] * x8)
+    x17 = np.power(constants[58], 3.0)
+    x18 = states[1] * x17
+    x19 = x11 * x18
+    x20 = 1.0 / constants[62]
+    x21 = 1.0 / constants[63]
+    x22 = 1.0 / constants[67]
+    x23 = 1.0 / states[1]
+    x24 = np.power(constants[43] * x23, constants[44])
+    x25 = x24 + 1.0
+    x26 = 1.0 / x25
+    x27 = np.power(constants[47], 3.0)
+    x28 = 1.0 / constants[46]
+    x29 = constants[12] * np.power(constants[45], 3.0)
+    x30 = (
+        constants[46] * x17 * (np.power(constants[53] / constants[45], 3.0) + 1.0)
+        + constants[48] * x14
+        + states[1] * x27
+        + x15
+        + x18
+        + x29 * (states[1] * x28 + 1.0)
+    )
+    x31 = 1.0 / x30
+    x32 = x16 - x19
+    x33 = np.exp(x8)
+    x34 = x33 + 1.0
+    x35 = 1.0 / x34
+    x36 = 4.0 * constants[34]
+    x37 = x35 * x36
+    x38 = (
+        constants[12] * x37
+        + constants[32] * constants[57]
+        + constants[33] * constants[58]
+    )
+    x39 = (
+        constants[11] * constants[32] + constants[33] * constants[53] + states[1] * x37
+    )
+    x40 = 1.0 / x39
+    x41 = 1.0 / np.power(x34, 2)
+    x42 = 1.0 / constants[66]
+    x43 = (
+        constants[31]
+        * constants[54]
+        * (
+            -constants[65]
+            * constants[68]
+            * x39
+            * x42
+            * (
+                -constants[12] * x33 * x36 * x40 * x41 * x6
+                + 4.0
+                * constants[34]
+                * constants[66]
+                * states[1]
+                * x33
+                * x38
+                * x4
+                * x41
+                * x5
+                / np.power(x39, 2)
+            )
+            / x38
+            + 1
+        )
+    )
+    x44 = np.power(constants[41] * x23, constants[42])
+    x45 = 1.0 * constants[10] * constants[78] * x13 * x32
+    x46 = 0.08605851979345956 * states[0]
+    diagonal[0] = (
+        0.5
+        * constants[10]
+        * constants[64]
+        * np.power(constants[66], 2)
+        * constants[78]
+        * constants[79]
+        * constants[9]
+        * x10
+        * x11
+        * x20
+        * x21
+        * x22
+        * x26
+        * x31
+        * x32
+        * x4
+        * x5
+        / np.power(x12, 2)
+        - 0.5
+        * constants[10]
+        * constants[64]
+        * constants[66]
+        * constants[78]
+        * constants[9]
+        * x13
+        * x20
+        * x21
+        * x22
+        * x26
+        * x31
+        * (constants[80] * x16 * x6 - x10 * x19 * x6)
+        - constants[16] * np.power(states[3], 3) * states[4]
+        - constants[20] * np.power(states[8], 2) * states[9]
+        - constants[22] * constants[26] * states[18]
+        - constants[22] * constants[27] * states[19]
+        - constants[23]
+        - constants[24]
+        * np.power(states[10], 2)
+        * (0.38 * states[11] + 0.63 * states[12])
+        - constants[25]
+        * np.power(states[13], 2)
+        * (0.75 * states[14] + 0.25 * states[15])
+        - constants[28] * states[16] * states[17]
+        - constants[29] * states[21]
+        - constants[30] * states[20]
+        - constants[36] * constants[55] * x43
+        - constants[37] * constants[61] * x43
+        - constants[38] * constants[59] * x43
+        - 1.0
+        * constants[69]
+        * constants[81]
+        * constants[82]
+        * (0.012450000000000001 * x6 * x7 + 0.004161 * x6 * x9)
+        / np.power(0.1245 * x7 + 0.00219 * x9 + 1.0, 2)
+        - 1.0 * x2 / x1
+    )
+    diagonal[1] = (
+        1.0 * constants[10] * constants[78] * x11 * x13 * x17 * x26 * x31
+        - constants[40] * constants[42] * x23 * x44 / np.power(x44 + 1.0, 2)
+        - constants[44] * x23 * x24 * x31 * x45 / np.power(x25, 2)
+        - constants[62]
+        * constants[63]
+        * constants[67]
+        * x42
+        * (
+            4.0
+            * constants[31]
+            * constants[34]
+            * constants[36]
+            * constants[54]
+            * constants[55]
+            * constants[65]
+            * constants[68]
+            * x35
+            * x40
+            * x42
+            - 4.0 * x0 * x2 * x23 * (-constants[18] + states[0]) / np.power(x1, 2)
+        )
+        / constants[64]
+        - x26 * x45 * (-x17 - x27 - x28 * x29) / np.power(x30, 2)
+    )
+    diagonal[2] = -1 / (
+        939.38
+        + 3060.62
+        / (np.power(states[1] / (constants[5] * constants[50]), constants[51]) + 1.0)
+    )
+    diagonal[3] = -1 / (0.25 + 7.0 / (44.701184493300836 * np.exp(x3) + 1.0))
+    diagonal[4] = -1 / (
+        0.9
+        + 1002.85
+        / (np.power(0.6666666666666666 * states[0] + 31.666666666666664, 2.0) + 1.0)
+    )
+    diagonal[5] = -1 / (
+        2.29
+        + 5.7
+        / (np.power(0.1111111111111111 * states[0] + 3.3299999999999996, 2.0) + 1.0)
+    )
+    diagonal[6] = -1 / constants[52]
+    diagonal[7] = -1 / (
+        90.9699
+        - 90.9699
+        / (
+            (1.0 + 0.06091656667493611 * np.exp(-0.29459419649432905 * states[0]))
+            * (1.3602936750195582 * np.exp(0.02203701336765231 * states[0]) + 1.0)
+        )
+    )
+    diagonal[8] = -1 / (
+        0.45
+        + 3.9
+        / (np.power(0.038461538461538464 * states[0] + 2.5384615384615388, 2.0) + 1.0)
+    )
+    diagonal[9] = -1 / (
+        150.0
+        - 150.0
+        / (
+            (1.0 + 0.000514409608423902 * np.exp(-0.12391573729863692 * states[0]))
+            * (0.1281589858272324 * np.exp(0.00492174426616793 * states[0]) + 1.0)
+        )
+    )
+    diagonal[10] = (
+        -0.002 * np.power(0.06333122229259025 * states[0] + 3.844838505383154, 2.0)
+        - 0.002
+    )
+    diagonal[11] = (
+        -0.0002 * np.power(0.027885368825830776 * states[0] + 1.748783500784973, 2.0)
+        - 0.0002
+    )
+    diagonal[12] = -1 / (
+        30000.0 + 220000.0 / (244.69193226422038 * np.exp(0.25 * states[0]) + 1.0)
+    )
+    diagonal[13] = (
+        -0.01 * np.power(0.034879665155214505 * states[0] + 2.2357865364492495, 2.0)
+        - 0.01
+    )
+    diagonal[14] = -1 / (
+        1000000.0
+        - 1000000.0
+        / (
+            (1.0 + 8.588511730827894e-05 * np.exp(-0.125 * states[0]))
+            * (0.0018363047770289071 * np.exp(0.02 * states[0]) + 1.0)
+        )
+    )
+    diagonal[15] = -1 / (
+        2500000.0
+        - 2500000.0
+        / (
+            (1.0 + 9.128085116822181e-05 * np.exp(-0.3732527107478118 * states[0]))
+            * (0.005347167038234146 * np.exp(0.03937131878169391 * states[0]) + 1.0)
+        )
+    )
+    diagonal[16] = (
+        -0.058823529411764705
+        * np.power(0.02857142857142857 * states[0] + 0.5863771428571428, 2.0)
+        - 0.058823529411764705
+    )
+    diagonal[17] = -1 / (
+        7.5
+        + 10.0
+        / (np.power(0.008333333333333333 * states[0] + 0.28480416666666664, 2.0) + 1.0)
+    )
+    diagonal[18] = (
+        -0.41508588126883456
+        * np.power(3.044677150587635 - 0.019175565727127863 * states[0], 2.0)
+        - 0.41508588126883456
+    )
+    diagonal[19] = (
+        -0.07243804735999536
+        * np.power(0.015038679483631901 * states[0] - 2.30120369590587, 2.0)
+        - 0.07243804735999536
+    )
+    diagonal[20] = -0.04003 * np.exp(0.05211 * states[0]) - 3.5e-06 * np.exp(
+        -0.0497 * states[0]
+    )
+    diagonal[21] = -1 / (
+        -160.0
+        + 210.0 / (1.4805695580388407 * np.exp(x46) + 1.0)
+        + 170.0 / (1.0 + 0.11141511764427327 * np.exp(-x46))
+    )
+    return diagonal
+
+
+def compute_rates_kernel(voi, states, prepared):
+    """Computes the rates of a single simulation with scalar functions
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- list[float], list of states.
+    prepared -- list[float], list of prepared values computed by
+    prepare from the constants.
+
+    Returns:
+    rates -- list[float], list of computed rates.
+
+    Raises:
+    OverflowError -- if an exponential overflows.
+    ZeroDivisionError -- if a denominator is zero.
+    ValueError -- if a power or logarithm is not defined.
+
+    """
+    states = np.asarray(states, dtype=float).tolist()
+    x0 = prepared[5] + states[0]
+    x1 = states[8] ** 2 * states[9] * (prepared[13] + states[0])
+    x2 = (
+        states[5] ** 2
+        * (prepared[34] + states[0])
+        * (0.8 * states[6] + 0.2 * states[7])
+        / ((prepared[33] * states[1]) ** 4 + 1.0)
+    )
+    x3 = 1.0 / (math.exp(prepared[24] * states[0]) + 1.0)
+    x4 = (
+        prepared[29]
+        * math.log(
+            (prepared[27] * x3 + prepared[28])
+            / (prepared[25] * states[1] * x3 + prepared[26])
+        )
+        + states[0]
+    )
+    x5 = 1.0 / states[1]
+    x6 = math.exp(prepared[38] * states[0])
+    x7 = (
+        prepared[46] * math.exp(prepared[45] * states[0])
+        + prepared[47] * states[1] * x6
+    ) / (
+        (math.pow(prepared[36] * x5, prepared[37]) + 1.0)
+        * (prepared[39] * x6 + 1.0)
+        * (
+            prepared[40] * states[1]
+            + prepared[41] * states[1]
+            + prepared[43] * (prepared[42] * states[1] + 1.0)
+            + prepared[44]
+        )
+    )
+    x8 = 0.125 * states[0]
+    x9 = 0.14285714285714285 * states[0]
+    x10 = -1.0 / (227.82355062507335 * math.exp(x9) + 1.0)
+    x11 = -1.0 / (22026.465794806718 * math.exp(0.15873015873015872 * states[0]) + 1.0)
+    x12 = -1.0 / (41.2354467972002 * math.exp(0.17543859649122806 * states[0]) + 1.0)
+    x13 = 0.08605851979345956 * states[0]
+    x14 = x5 * math.exp(prepared[67] * states[0])
+    return [
+        prepared[10] * states[20] * (prepared[9] + states[0])
+        + prepared[12] * states[3] ** 3 * states[4] * (prepared[11] + states[0])
+        + prepared[14] * x1
+        + prepared[15] * states[18] * x0
+        + prepared[16] * states[19] * x0
+        + prepared[17] * states[10] ** 2 * x0 * (0.38 * states[11] + 0.63 * states[12])
+        + prepared[18] * states[13] ** 2 * x0 * (0.75 * states[14] + 0.25 * states[15])
+        + prepared[19] * states[16] * states[17] * x0
+        + prepared[23]
+        / (
+            prepared[22] * math.exp(prepared[21] * states[0])
+            + 0.1245 * math.exp(prepared[20] * states[0])
+            + 1.0
+        )
+        + prepared[30] * x4
+        + prepared[31] * x4
+        + prepared[32] * x4
+        + prepared[35] * x2
+        + prepared[48] * x7
+        + prepared[6] * x0
+        + prepared[8] * states[21] * (prepared[7] + states[0])
+        - (
+            0.0
+            if (prepared[0] > voi)
+            else (
+                prepared[1]
+                if ((prepared[2] > voi % prepared[3]) or (prepared[4] - voi > 0))
+                else 0.0
+            )
+        ),
+        prepared[51] / (math.pow(prepared[49] * x5, prepared[50]) + 1.0)
+        + prepared[55] * (prepared[52] * x1 + prepared[53] * x4 + prepared[54] * x2)
+        + prepared[56] * x7,
+        (-states[2] + 1.0 / (math.pow(prepared[59] * x5, prepared[58]) + 1.0))
+        / (939.38 + 3060.62 / (math.pow(prepared[57] * states[1], prepared[58]) + 1.0)),
+        (
+            -states[3]
+            + 1.0
+            / (1.0 + 0.020413741940116113 * math.exp(-0.10822358559890391 * states[0]))
+        )
+        / (0.25 + 7.0 / (44.701184493300836 * math.exp(0.1 * states[0]) + 1.0)),
+        (-states[4] + 1.0 / (1242.6481670549956 * math.exp(x8) + 1.0))
+        / (
+            0.9
+            + 1002.85
+            / ((0.6666666666666666 * states[0] + 31.666666666666664) ** 2 + 1.0)
+        ),
+        (-states[5] + 1.0 / (1.0 + 0.0431593092614526 * math.exp(-x9)))
+        / (
+            2.29
+            + 5.7 / ((0.1111111111111111 * states[0] + 3.3299999999999996) ** 2 + 1.0)
+        ),
+        prepared[60] * (-states[6] - x10),
+        (-states[7] - x10)
+        / (
+            90.9699
+            - 90.9699
+            / (
+                (1.0 + 0.06091656667493611 * math.exp(-0.29459419649432905 * states[0]))
+                * (1.3602936750195582 * math.exp(0.02203701336765231 * states[0]) + 1.0)
+            )
+        ),
+        (
+            -states[8]
+            + 1.0
+            / (1.0 + 0.004132526165039484 * math.exp(-0.10121457489878542 * states[0]))
+        )
+        / (
+            0.45
+            + 3.9 / ((0.038461538461538464 * states[0] + 2.5384615384615388) ** 2 + 1.0)
+        ),
+        (
+            -states[9]
+            + 0.02
+            + 0.98
+            / (6770037.888349095 * math.exp(0.21551724137931036 * states[0]) + 1.0)
+        )
+        / (
+            150.0
+            - 150.0
+            / (
+                (
+                    1.0
+                    + 0.000514409608423902 * math.exp(-0.12391573729863692 * states[0])
+                )
+                * (0.1281589858272324 * math.exp(0.00492174426616793 * states[0]) + 1.0)
+            )
+        ),
+        (
+            -states[10]
+            + 0.978613
+            / (1.0 + 0.49637710668432194 * math.exp(-0.03750853319130102 * states[0]))
+        )
+        * (0.002 * (0.06333122229259025 * states[0] + 3.844838505383154) ** 2 + 0.002),
+        (-states[11] - x11)
+        * (
+            0.0002 * (0.027885368825830776 * states[0] + 1.748783500784973) ** 2
+            + 0.0002
+        ),
+        (-states[12] - x11)
+        / (
+            30000.0 + 220000.0 / (244.69193226422038 * math.exp(0.25 * states[0]) + 1.0)
+        ),
+        (
+            -states[13]
+            + 0.948
+            / (1.0 + 0.37780784271725576 * math.exp(-0.05434782608695653 * states[0]))
+        )
+        * (0.01 * (0.034879665155214505 * states[0] + 2.2357865364492495) ** 2 + 0.01),
+        (-states[14] - x12)
+        / (
+            1000000.0
+            - 1000000.0
+            / (
+                (1.0 + 8.588511730827894e-05 * math.exp(-x8))
+                * (0.0018363047770289071 * math.exp(0.02 * states[0]) + 1.0)
+            )
+        ),
+        (-states[15] - x12)
+        / (
+            2500000.0
+            - 2500000.0
+            / (
+                (
+                    1.0
+                    + 9.128085116822181e-05 * math.exp(-0.3732527107478118 * states[0])
+                )
+                * (
+                    0.005347167038234146 * math.exp(0.03937131878169391 * states[0])
+                    + 1.0
+                )
+            )
+        ),
+        (
+            -states[16]
+            + 1.0
+            / (1.0 + 0.025449224366457798 * math.exp(-0.1321003963011889 * states[0]))
+        )
+        * (
+            0.058823529411764705
+            * (0.02857142857142857 * states[0] + 0.5863771428571428) ** 2
+            + 0.058823529411764705
+        ),
+        (
+            -states[17]
+            + 0.02
+            + 0.98
+            / (107294.57126320578 * math.exp(0.16666666666666666 * states[0]) + 1.0)
+        )
+        / (
+            7.5
+            + 10.0
+            / ((0.008333333333333333 * states[0] + 0.28480416666666664) ** 2 + 1.0)
+        ),
+        (
+            -states[18]
+            + 1.0
+            / (
+                math.exp(
+                    prepared[24]
+                    * (
+                        -8.38384
+                        / ((prepared[62] * states[1] + 2.0814226778178138) ** 2 + 1.0)
+                        + 0.749234
+                        / ((prepared[61] * states[1] - 0.38935853577206647) ** 2 + 1.0)
+                    )
+                    * (
+                        states[0]
+                        + 37.5137
+                        - 5011.47
+                        / (
+                            math.pow(
+                                prepared[63] * states[1] + 992.5818503999532, 0.42291
+                            )
+                            + 1.0
+                        )
+                    )
+                )
+                + 1.0
+            )
+        )
+        * (
+            0.41508588126883456
+            * (3.044677150587635 - 0.019175565727127863 * states[0]) ** 2
+            + 0.41508588126883456
+        ),
+        (
+            -states[19]
+            + 1.0
+            / (
+                math.exp(
+                    prepared[24]
+                    * (
+                        -1.40001
+                        / ((prepared[65] * states[1] + 0.33390953447425054) ** 2 + 1.0)
+                        + 0.681249
+                        / ((prepared[64] * states[1] - 0.5112540418130668) ** 2 + 1.0)
+                    )
+                    * (
+                        states[0]
+                        + 109.275
+                        - 8540.23
+                        / (
+                            math.pow(
+                                prepared[66] * states[1] + 100.5196497250166, 0.668054
+                            )
+                            + 1.0
+                        )
+                    )
+                )
+                + 1.0
+            )
+        )
+        * (
+            0.07243804735999536
+            * (0.015038679483631901 * states[0] - 2.30120369590587) ** 2
+            + 0.07243804735999536
+        ),
+        (
+            -states[20]
+            + 1.0
+            / (194143.7945420567 * math.exp(0.11553614548311439 * states[0]) + 1.0)
+        )
+        * (
+            0.04003 * math.exp(0.05211 * states[0])
+            + 3.5e-06 * math.exp(-0.0497 * states[0])
+        ),
+        (
+            -states[21]
+            + 1.0
+            / (
+                0.1
+                * (0.0006 * x14 + 3.5999999999999994e-07 * x14**2 + 1.0)
+                * math.exp(prepared[68] * states[0])
+                + 1.0
+            )
+        )
+        / (
+            -160.0
+            + 210.0 / (1.4805695580388407 * math.exp(x13) + 1.0)
+            + 170.0 / (1.0 + 0.11141511764427327 * math.exp(-x13))
+        ),
+    ]
+
+
+def compute_rates_buffer(voi, states, prepared, rates):
+    """Computes the rates of a single simulation into a buffer
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- np.array[float], array of states.
+    prepared -- np.array[float], array of prepared values computed by
+    prepare from the constants.
+    rates -- np.array[float], array the rates are written into.
+
+    Returns:
+    rates -- np.array[float], array of computed rates.
+
+    """
+    x0 = prepared[5] + states[0]
+    x1 = states[8] ** 2 * states[9] * (prepared[13] + states[0])
+    x2 = (
+        states[5] ** 2
+        * (prepared[34] + states[0])
+        * (0.8 * states[6] + 0.2 * states[7])
+        / ((prepared[33] * states[1]) ** 4 + 1.0)
+    )
+    x3 = 1.0 / (math.exp(prepared[24] * states[0]) + 1.0)
+    x4 = (
+        prepared[29]
+        * math.log(
+            (prepared[27] * x3 + prepared[28])
+            / (prepared[25] * states[1] * x3 + prepared[26])
+        )
+        + states[0]
+    )
+    x5 = 1.0 / states[1]
+    x6 = math.exp(prepared[38] * states[0])
+    x7 = (
+        prepared[46] * math.exp(prepared[45] * states[0])
+        + prepared[47] * states[1] * x6
+    ) / (
+        (math.pow(prepared[36] * x5, prepared[37]) + 1.0)
+        * (prepared[39] * x6 + 1.0)
+        * (
+            prepared[40] * states[1]
+            + prepared[41] * states[1]
+            + prepared[43] * (prepared[42] * states[1] + 1.0)
+            + prepared[44]
+        )
+    )
+    x8 = 0.125 * states[0]
+    x9 = 0.14285714285714285 * states[0]
+    x10 = -1.0 / (227.82355062507335 * math.exp(x9) + 1.0)
+    x11 = -1.0 / (22026.465794806718 * math.exp(0.15873015873015872 * states[0]) + 1.0)
+    x12 = -1.0 / (41.2354467972002 * math.exp(0.17543859649122806 * states[0]) + 1.0)
+    x13 = 0.08605851979345956 * states[0]
+    x14 = x5 * math.exp(prepared[67] * states[0])
+    rates[0] = (
+        prepared[10] * states[20] * (prepared[9] + states[0])
+        + prepared[12] * states[3] ** 3 * states[4] * (prepared[11] + states[0])
+        + prepared[14] * x1
+        + prepared[15] * states[18] * x0
+        + prepared[16] * states[19] * x0
+        + prepared[17] * states[10] ** 2 * x0 * (0.38 * states[11] + 0.63 * states[12])
+        + prepared[18] * states[13] ** 2 * x0 * (0.75 * states[14] + 0.25 * states[15])
+        + prepared[19] * states[16] * states[17] * x0
+        + prepared[23]
+        / (
+            prepared[22] * math.exp(prepared[21] * states[0])
+            + 0.1245 * math.exp(prepared[20] * states[0])
+            + 1.0
+        )
+        + prepared[30] * x4
+        + prepared[31] * x4
+        + prepared[32] * x4
+        + prepared[35] * x2
+        + prepared[48] * x7
+        + prepared[6] * x0
+        + prepared[8] * states[21] * (prepared[7] + states[0])
+        - (
+            0.0
+            if (prepared[0] > voi)
+            else (
+                prepared[1]
+                if ((prepared[2] > voi % prepared[3]) or (prepared[4] - voi > 0))
+                else 0.0
+            )
+        )
+    )
+    rates[1] = (
+        prepared[51] / (math.pow(prepared[49] * x5, prepared[50]) + 1.0)
+        + prepared[55] * (prepared[52] * x1 + prepared[53] * x4 + prepared[54] * x2)
+        + prepared[56] * x7
+    )
+    rates[2] = (
+        -states[2] + 1.0 / (math.pow(prepared[59] * x5, prepared[58]) + 1.0)
+    ) / (939.38 + 3060.62 / (math.pow(prepared[57] * states[1], prepared[58]) + 1.0))
+    rates[3] = (
+        -states[3]
+        + 1.0
+        / (1.0 + 0.020413741940116113 * math.exp(-0.10822358559890391 * states[0]))
+    ) / (0.25 + 7.0 / (44.701184493300836 * math.exp(0.1 * states[0]) + 1.0))
+    rates[4] = (-states[4] + 1.0 / (1242.6481670549956 * math.exp(x8) + 1.0)) / (
+        0.9
+        + 1002.85 / ((0.6666666666666666 * states[0] + 31.666666666666664) ** 2 + 1.0)
+    )
+    rates[5] = (-states[5] + 1.0 / (1.0 + 0.0431593092614526 * math.exp(-x9))) / (
+        2.29 + 5.7 / ((0.1111111111111111 * states[0] + 3.3299999999999996) ** 2 + 1.0)
+    )
+    rates[6] = prepared[60] * (-states[6] - x10)
+    rates[7] = (-states[7] - x10) / (
+        90.9699
+        - 90.9699
+        / (
+            (1.0 + 0.06091656667493611 * math.exp(-0.29459419649432905 * states[0]))
+            * (1.3602936750195582 * math.exp(0.02203701336765231 * states[0]) + 1.0)
+        )
+    )
+    rates[8] = (
+        -states[8]
+        + 1.0
+        / (1.0 + 0.004132526165039484 * math.exp(-0.10121457489878542 * states[0]))
+    ) / (
+        0.45
+        + 3.9 / ((0.038461538461538464 * states[0] + 2.5384615384615388) ** 2 + 1.0)
+    )
+    rates[9] = (
+        -states[9]
+        + 0.02
+        + 0.98 / (6770037.888349095 * math.exp(0.21551724137931036 * states[0]) + 1.0)
+    ) / (
+        150.0
+        - 150.0
+        / (
+            (1.0 + 0.000514409608423902 * math.exp(-0.12391573729863692 * states[0]))
+            * (0.1281589858272324 * math.exp(0.00492174426616793 * states[0]) + 1.0)
+        )
+    )
+    rates[10] = (
+        -states[10]
+        + 0.978613
+        / (1.0 + 0.49637710668432194 * math.exp(-0.03750853319130102 * states[0]))
+    ) * (0.002 * (0.06333122229259025 * states[0] + 3.844838505383154) ** 2 + 0.002)
+    rates[11] = (-states[11] - x11) * (
+        0.0002 * (0.027885368825830776 * states[0] + 1.748783500784973) ** 2 + 0.0002
+    )
+    rates[12] = (-states[12] - x11) / (
+        30000.0 + 220000.0 / (244.69193226422038 * math.exp(0.25 * states[0]) + 1.0)
+    )
+    rates[13] = (
+        -states[13]
+        + 0.948
+        / (1.0 + 0.37780784271725576 * math.exp(-0.05434782608695653 * states[0]))
+    ) * (0.01 * (0.034879665155214505 * states[0] + 2.2357865364492495) ** 2 + 0.01)
+    rates[14] = (-states[14] - x12) / (
+        1000000.0
+        - 1000000.0
+        / (
+            (1.0 + 8.588511730827894e-05 * math.exp(-x8))
+            * (0.0018363047770289071 * math.exp(0.02 * states[0]) + 1.0)
+        )
+    )
+    rates[15] = (-states[15] - x12) / (
+        2500000.0
+        - 2500000.0
+        / (
+            (1.0 + 9.128085116822181e-05 * math.exp(-0.3732527107478118 * states[0]))
+            * (0.005347167038234146 * math.exp(0.03937131878169391 * states[0]) + 1.0)
+        )
+    )
+    rates[16] = (
+        -states[16]
+        + 1.0 / (1.0 + 0.025449224366457798 * math.exp(-0.1321003963011889 * states[0]))
+    ) * (
+        0.058823529411764705
+        * (0.02857142857142857 * states[0] + 0.5863771428571428) ** 2
+        + 0.058823529411764705
+    )
+    rates[17] = (
+        -states[17]
+        + 0.02
+        + 0.98 / (107294.57126320578 * math.exp(0.16666666666666666 * states[0]) + 1.0)
+    ) / (
+        7.5
+        + 10.0 / ((0.008333333333333333 * states[0] + 0.28480416666666664) ** 2 + 1.0)
+    )
+    rates[18] = (
+        -states[18]
+        + 1.0
+        / (
+            math.exp(
+                prepared[24]
+                * (
+                    -8.38384
+                    / ((prepared[62] * states[1] + 2.0814226778178138) ** 2 + 1.0)
+                    + 0.749234
+                    / ((prepared[61] * states[1] - 0.38935853577206647) ** 2 + 1.0)
+                )
+                * (
+                    states[0]
+                    + 37.5137
+                    - 5011.47
+                    / (
+                        math.pow(prepared[63] * states[1] + 992.5818503999532, 0.42291)
+                        + 1.0
+                    )
+                )
+            )
+            + 1.0
+        )
+    ) * (
+        0.41508588126883456
+        * (3.044677150587635 - 0.019175565727127863 * states[0]) ** 2
+        + 0.41508588126883456
+    )
+    rates[19] = (
+        -states[19]
+        + 1.0
+        / (
+            math.exp(
+                prepared[24]
+                * (
+                    -1.40001
+                    / ((prepared[65] * states[1] + 0.33390953447425054) ** 2 + 1.0)
+                    + 0.681249
+                    / ((prepared[64] * states[1] - 0.5112540418130668) ** 2 + 1.0)
+                )
+                * (
+                    states[0]
+                    + 109.275
+                    - 8540.23
+                    / (
+                        math.pow(prepared[66] * states[1] + 100.5196497250166, 0.668054)
+                        + 1.0
+                    )
+                )
+            )
+            + 1.0
+        )
+    ) * (
+        0.07243804735999536 * (0.015038679483631901 * states[0] - 2.30120369590587) ** 2
+        + 0.07243804735999536
+    )
+    rates[20] = (
+        -states[20]
+        + 1.0 / (194143.7945420567 * math.exp(0.11553614548311439 * states[0]) + 1.0)
+    ) * (
+        0.04003 * math.exp(0.05211 * states[0])
+        + 3.5e-06 * math.exp(-0.0497 * states[0])
+    )
+    rates[21] = (
+        -states[21]
+        + 1.0
+        / (
+            0.1
+            * (0.0006 * x14 + 3.5999999999999994e-07 * x14**2 + 1.0)
+            * math.exp(prepared[68] * states[0])
+            + 1.0
+        )
+    ) / (
+        -160.0
+        + 210.0 / (1.4805695580388407 * math.exp(x13) + 1.0)
+        + 170.0 / (1.0 + 0.11141511764427327 * math.exp(-x13))
+    )
+    return rates
+
+
+def prepare(constants):
+    """Evaluates the constant subexpressions of the rates
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+    The prepared values need to be computed again when the constants
+    change.
+
+    Args:
+    constants -- list[int], list of constant values.
+
+    Returns:
+    prepared -- list[float], list of prepared values for
+    compute_rates_kernel.
+
+    Raises:
+    OverflowError -- if an exponential overflows.
+    ZeroDivisionError -- if a denominator is zero.
+    ValueError -- if a power or logarithm is not defined.
+
+    """
+    constants = np.asarray(constants, dtype=float).tolist()
+    x0 = constants[66] / (constants[65] * constants[68])
+    x1 = 4.0 * constants[34]
+    x2 = 1.0 / constants[66]
+    x3 = constants[31] * constants[54]
+    x4 = constants[36] * constants[55] * x3
+    x5 = 1.0 * constants[17]
+    x6 = constants[58] ** 3
+    x7 = constants[53] ** 3
+    x8 = constants[12] * x7
+    x9 = constants[10] * constants[78]
+    return [
+        constants[0],
+        constants[3],
+        constants[2],
+        constants[1] + constants[2],
+        constants[0] + constants[2],
+        -constants[72],
+        -constants[23],
+        -constants[73],
+        -constants[29],
+        -constants[77],
+        -constants[30],
+        -constants[71],
+        -constants[16],
+        -constants[21],
+        -constants[20],
+        -constants[22] * constants[26],
+        -constants[22] * constants[27],
+        -constants[24],
+        -constants[25],
+        -constants[28],
+        -0.1 * x0,
+        -1.9 * x0,
+        0.00219 * math.exp(0.020116676725005028 * constants[58]),
+        -1.0 * constants[69] * constants[81] * constants[82],
+        x0,
+        x1,
+        constants[11] * constants[32] + constants[33] * constants[53],
+        constants[12] * x1,
+        constants[32] * constants[57] + constants[33] * constants[58],
+        -constants[65] * constants[68] * x2,
+        -x4,
+        -constants[37] * constants[61] * x3,
+        -constants[38] * constants[59] * x3,
+        (1.0 / constants[19]),
+        -constants[18],
+        -x5,
+        constants[43],
+        constants[44],
+        x0 * (constants[80] - 1.0),
+        constants[79],
+        constants[47] ** 3,
+        x6,
+        (1.0 / constants[46]),
+        constants[12] * constants[45] ** 3,
+        constants[46] * x6 * ((constants[53] / constants[45]) ** 3 + 1.0)
+        + constants[48] * x7
+        + x8,
+        constants[80] * x0,
+        x8,
+        -x6,
+        -0.5
+        * constants[64]
+        * constants[66]
+        * constants[9]
+        * x9
+        / (constants[62] * constants[63] * constants[67]),
+        constants[41],
+        constants[42],
+        -constants[40],
+        constants[20],
+        x4,
+        x5,
+        -constants[62] * constants[63] * constants[67] * x2 / constants[64],
+        -1.0 * x9,
+        1 / (constants[5] * constants[50]),
+        constants[51],
+        constants[5] * constants[50],
+        (1.0 / constants[52]),
+        6.175050326660162 * constants[6],
+        0.001353075608511928 * constants[6],
+        4179.239211293976 * constants[6],
+        2.3346212660651124 * constants[7],
+        0.0014599691070536947 * constants[7],
+        250.55435150269975 * constants[7],
+        2.53 * x0,
+        -5.0 * x0,
+    ]
+
+
 def compute_algebraic(constants, states, voi):
     """Computes algebraics of the system
 
@@ -759,7 +2555,7 @@ def compute_algebraic(constants, states, voi):
     algebraic -- np.array[float], list of computed algebraics.
 
     """
-    algebraic = np.array([[0.0] * len(voi)] * sizeAlgebraic)
+    algebraic = np.zeros((sizeAlgebraic, len(voi)))
     states = np.array(states)
     voi = np.array(voi)
     algebraic[6] = 1.00000 / (1.00000 + np.exp((states[0] + 38.0000) / 7.00000))
@@ -1098,7 +2894,15 @@ def custom_piecewise(cases):
     return np.select(cases[0::2], cases[1::2])
 
 
-def solve_model(init_states, constants, start=0, end=15000):
+def solve_model(
+    init_states,
+    constants,
+    start=0,
+    end=15000,
+    output_dt=1.0,
+    record=None,
+    **options,
+):
     """Solve model with ODE solver
 
     Args:
@@ -1106,37 +2910,46 @@ def solve_model(init_states, constants, start=0, end=15000):
     constants -- list[int], list of constant values.
     start -- int, start time in ms for the simulation, default value 0.
     end -- int, end time in ms for the simulation, default value 15000.
-    nb_steps -- int, number of steps in the simulation, default value 100000.
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    record -- list, names or indices of the states to record, default value
+    None for all the states.
+    options -- dict, solver options {integrator, steady_tol, tile,
+    checkpoint, resume, max_step, atol, rtol}, see solver.solve, the
+    settings recommended for the model are used by default.
 
     Returns:
+    voi -- np.array, timesteps in ms.
+    states -- np.array, simulation data of the recorded states.
+    algebraic -- function, computes the requested algebraic variables over a
+    time window, see solver.compute_algebraic, None if only some of the states
+    are recorded.
+
+    Raises:
+    KeyError -- if an option is not valid, see solver.check_options.
+    IntegrationError -- if the integrator fails, see solver.solve.
 
     """
-    # Set timespan to solve over
-    nb_steps = end - start
-    voi = np.linspace(start, end, nb_steps)
-
-    # Construct ODE object to solve
-    r = ode(compute_rates)
-    r.set_integrator(
-        SOLVER,
-        method=METHOD,
-        atol=ATOL,
-        rtol=RTOL,
-        max_step=MAX_STEP,
-    )
-    r.set_initial_value(init_states, voi[0])
-    r.set_f_params(constants)
-
-    # Solve model
-    states = np.array([[0.0] * len(voi)] * sizeStates)
-    states[:, 0] = init_states
-    for i, t in enumerate(voi[1:]):
-        if r.successful():
-            r.integrate(t)
-            states[:, i + 1] = r.y
-        else:
-            break
-
-    # Compute algebraic variables
-    algebraic = compute_algebraic(constants, states, voi)
+    solver.check_options(options)
+    voi, states = solver.solve(
+        sys.modules[__name__],
+        init_states,
+        constants,
+        start,
+        end,
+        output_dt=output_dt,
+        record=record,
+        **options,
+    )
+
+    if record is not None:
+        # The algebraic variables depend on all the states
+        return (voi, states, None)
+
+    # Algebraic variables are only computed on request
+    algebraic = solver.lazy_algebraic(
+        sys.modules[__name__],
+        constants,
+        states,
+        voi,
+    )
     return (voi, states, algebraic)
@@ -8,16 +8,299 @@ Author: Mathias Roesler
 Date: 11/24
 """
 
+import sys
+
+import math
 import numpy as np
 
-from scipy.integrate import ode
-from conversion.constants import SOLVER, METHOD, ATOL, RTOL, MAX_STEP
+from conversion import solver
 
 
 # Size of variable np.arrays:
 sizeAlgebraic = 107
 sizeStates = 35
 sizeConstants = 89
+gateStates = [
+    2,
+    3,
+    4,
+    5,
+    6,
+    7,
+    8,
+    9,
+    10,
+    11,
+    12,
+    13,
+    14,
+    15,
+    16,
+    17,
+    18,
+    19,
+    20,
+    21,
+    22,
+    23,
+    24,
+    25,
+    26,
+    27,
+    28,
+    29,
+    30,
+    31,
+    32,
+    33,
+    34,
+]
+derivedConstants = {
+    60: [13],
+    61: [12, 8],
+    65: [63, 8],
+    67: [64, 8],
+    77: [72, 71, 74, 64, 59],
+    78: [72, 71, 74, 63, 11],
+    79: [72, 71, 74, 62, 66],
+    83: [72, 71, 74, 63, 11, 64, 59, 81, 76],
+    87: [80, 63],
+    88: [82, 59],
+}
+stateIndices = {
+    "v": 0,
+    "cai": 1,
+    "w": 2,
+    "m": 3,
+    "h": 4,
+    "d": 5,
+    "f1": 6,
+    "f2": 7,
+    "b": 8,
+    "g": 9,
+    "hn1": 10,
+    "hn2": 11,
+    "hs": 12,
+    "nq1f": 13,
+    "nq1s": 14,
+    "wq1": 15,
+    "sq1": 16,
+    "nq4": 17,
+    "sq4": 18,
+    "nq5f": 19,
+    "nq5s": 20,
+    "wq5": 21,
+    "sq5": 22,
+    "q": 23,
+    "r1": 24,
+    "r2": 25,
+    "p": 26,
+    "k1": 27,
+    "k2": 28,
+    "s": 29,
+    "x": 30,
+    "xa": 31,
+    "xab": 32,
+    "y": 33,
+    "c": 34,
+}
+algebraicIndices = {
+    "Ist": 0,
+    "wss": 1,
+    "Force": 2,
+    "mss": 3,
+    "hss": 4,
+    "dss": 5,
+    "fss": 6,
+    "bss": 7,
+    "gss": 8,
+    "hnss": 9,
+    "hsss": 10,
+    "nq1ss": 11,
+    "wq1ss": 12,
+    "sq1ss": 13,
+    "nq4ss": 14,
+    "sq4ss": 15,
+    "nq5ss": 16,
+    "wq5ss": 17,
+    "sq5ss": 18,
+    "qss": 19,
+    "rss": 20,
+    "pss": 21,
+    "kss": 22,
+    "sss": 23,
+    "xss": 24,
+    "xass_z": 25,
+    "xabss_z": 26,
+    "yss": 27,
+    "vFRT": 28,
+    "wtc": 29,
+    "mtc": 30,
+    "htc": 31,
+    "dtc": 32,
+    "f2tc": 33,
+    "btc": 34,
+    "gtc": 35,
+    "hn1tc": 36,
+    "hn2tc": 37,
+    "hstc": 38,
+    "nq1ftc": 39,
+    "nq1stc": 40,
+    "wq1tc": 41,
+    "nq4tc": 42,
+    "sq4tc": 43,
+    "nq5ftc": 44,
+    "wq5tc": 45,
+    "sq5tc": 46,
+    "qtc": 47,
+    "r1tc": 48,
+    "r2tc": 49,
+    "ptc": 50,
+    "k1tc": 51,
+    "k2tc": 52,
+    "stc": 53,
+    "xtc": 54,
+    "xass_vh": 55,
+    "xabss_vh": 56,
+    "ya": 57,
+    "enscc": 58,
+    "xass": 59,
+    "xabss": 60,
+    "yb": 61,
+    "K1cl": 62,
+    "ina": 63,
+    "xatc": 64,
+    "xabtc": 65,
+    "ytc": 66,
+    "K2cl": 67,
+    "fca": 68,
+    "css": 69,
+    "ical": 70,
+    "ctc": 71,
+    "icat": 72,
+    "ib": 73,
+    "iherg": 74,
+    "ikcnq1": 75,
+    "ikcnq4": 76,
+    "ikcnq5": 77,
+    "ik1": 78,
+    "ik2": 79,
+    "ika": 80,
+    "iBKa": 81,
+    "iBKab": 82,
+    "ih": 83,
+    "icl": 84,
+    "insca": 85,
+    "I_Ca_tot": 86,
+    "J_Ca_mem": 87,
+    "insna": 88,
+    "jcamem_plot": 89,
+    "insk": 90,
+    "fnak": 91,
+    "inak": 92,
+    "f1naca": 93,
+    "f2naca": 94,
+    "fallo": 95,
+    "naca_Eup": 96,
+    "naca_Ed1": 97,
+    "naca_Ed2": 98,
+    "naca_Ed3": 99,
+    "jnaca": 100,
+    "inaca": 101,
+    "jpmca": 102,
+    "jnaca_plot": 103,
+    "I_tot": 104,
+    "J_tot": 105,
+    "jpmca_plot": 106,
+}
+constantIndices = {
+    "stim_start": 0,
+    "stim_interval": 1,
+    "stim_duration": 2,
+    "stim_current": 3,
+    "conversion": 4,
+    "tinyamount": 8,
+    "inaca_sign": 9,
+    "jnaca_sign": 10,
+    "ki": 11,
+    "cao": 12,
+    "mgo": 13,
+    "zna": 14,
+    "zk": 15,
+    "gna": 16,
+    "gcal": 17,
+    "ecal": 18,
+    "kmca": 19,
+    "gcat": 20,
+    "ecat": 21,
+    "gkca": 22,
+    "gb": 23,
+    "gk1": 24,
+    "gk2": 25,
+    "gbka": 26,
+    "gbkab": 27,
+    "gka": 28,
+    "gkq1": 29,
+    "gkq4": 30,
+    "gkq5": 31,
+    "gherg": 32,
+    "gcl": 33,
+    "gh": 34,
+    "gns": 35,
+    "PnsK": 36,
+    "PnsNa": 37,
+    "PnsCa": 38,
+    "PnsCs": 39,
+    "gnsCa": 40,
+    "gnsNa": 41,
+    "gnsK": 42,
+    "gnsCs": 43,
+    "Jpmca": 44,
+    "Kmpmca": 45,
+    "npmca": 46,
+    "Kmallo": 47,
+    "nallo": 48,
+    "Kmnai": 49,
+    "Kmcai": 50,
+    "Kmnao": 51,
+    "Kmcao": 52,
+    "Fmax": 53,
+    "FKm": 54,
+    "Fn": 55,
+    "f1tc": 56,
+    "sq1tc": 57,
+    "nq5stc": 58,
+    "nai": 59,
+    "fmg": 60,
+    "gs_cao": 61,
+    "cli": 62,
+    "ko": 63,
+    "nao": 64,
+    "gs_ko": 65,
+    "clo": 66,
+    "gs_nao": 67,
+    "buff": 68,
+    "AV": 69,
+    "zca": 70,
+    "R": 71,
+    "frdy": 72,
+    "Cm": 73,
+    "temp": 74,
+    "ginak": 75,
+    "PK": 76,
+    "ena": 77,
+    "ek": 78,
+    "ecl": 79,
+    "nakKmko": 80,
+    "PNa": 81,
+    "nakKmnai": 82,
+    "eh": 83,
+    "Jnaca": 84,
+    "ksat": 85,
+    "xgamma": 86,
+    "knak": 87,
+    "nnak": 88,
+}
 
 
 def create_legends():
@@ -467,9 +750,92 @@ def init_consts():
     return (states, constants)
 
 
+def compute_derived_constants(constants, derived=None):
+    """Computes the constants that depend on other constants
+
+    Generated from init_consts by conversion.codegen, do not edit.
+
+    Args:
+    constants -- list[int], list of constant values.
+    derived -- set[int], indices of the derived constants to compute,
+    default value None for all of them.
+
+    Returns:
+    constants -- list[int], list of updated constant values.
+
+    """
+    if derived is None:
+        derived = derivedConstants
+    if 60 in derived:
+        constants[60] = 0.108043 + 0.903902 / (
+            1.0 + np.power(constants[13] / 0.281007, 1.29834)
+        )
+    if 61 in derived:
+        constants[61] = (
+            1.0
+            / 0.000525
+            * 0.03
+            / (1.0 + np.power(150.0 / (constants[12] + constants[8]), 2.0))
+        )
+    if 65 in derived:
+        constants[65] = (
+            1.0
+            / 0.0123
+            * 0.03
+            / (1.0 + np.power(150.0 / (constants[63] + constants[8]), 2.0))
+        )
+    if 67 in derived:
+        constants[67] = (
+            1.0
+            / 0.0123
+            * 0.03
+            / (1.0 + np.power(150.0 / (constants[64] + constants[8]), 2.0))
+        )
+    if 77 in derived:
+        constants[77] = (
+            constants[71]
+            * constants[74]
+            / constants[72]
+            * np.log(constants[64] / constants[59])
+        )
+    if 78 in derived:
+        constants[78] = (
+            constants[71]
+            * constants[74]
+            / constants[72]
+            * np.log(constants[63] / constants[11])
+        )
+    if 79 in derived:
+        constants[79] = (
+            constants[71]
+            * constants[74]
+            / constants[72]
+            * np.log(constants[62] / constants[66])
+        )
+    if 83 in derived:
+        constants[83] = (
+            constants[71]
+            * constants[74]
+            / constants[72]
+            * np.log(
+                (constants[63] + constants[81] / constants[76] * constants[64])
+                / (constants[11] + constants[81] / constants[76] * constants[59])
+            )
+        )
+    if 87 in derived:
+        constants[87] = 1.0 / (1.0 + np.power(constants[80] / constants[63], 1.5))
+    if 88 in derived:
+        constants[88] = 1.0 / (1.0 + np.power(constants[82] / constants[59], 2.0))
+    return constants
+
+
 def compute_rates(voi, states, constants):
     """Computes rates of the system
 
+    The states and constants can also be arrays of shape (sizeStates,
+    nb_batch) and (sizeConstants, nb_batch) to compute the rates of a batch
+    of simulations at once.
+
     Args:
     voi -- list[flaot], list of voi.
     states -- list[float], list of states.
@@ -920,6 +1286,1956 @@ def compute_rates(voi, states, constants):
     return rates
 
 
+def compute_jacobian(voi, states, constants):
+    """Computes the Jacobian of the rates with respect to the states
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- list[float], list of states.
+    constants -- list[int], list of constant values.
+
+    Returns:
+    jacobian -- np.array[float], derivative of rates[i] with respect
+    to states[j] at index [i, j].
+
+    """
+    jacobian = np.zeros((sizeStates, sizeStates) + np.shape(states[0]))
+    x0 = constants[16] * np.power(states[3], 3)
+    x1 = constants[22] * constants[26]
+    x2 = constants[22] * constants[27]
+    x3 = 0.38 * states[24] + 0.63 * states[25]
+    x4 = constants[24] * np.power(states[23], 2)
+    x5 = 0.75 * states[27] + 0.25 * states[28]
+    x6 = constants[25] * np.power(states[26], 2)
+    x7 = constants[28] * states[30]
+    x8 = constants[30] * states[18]
+    x9 = constants[32] * (0.8 * states[10] + 0.2 * states[11])
+    x10 = 0.3 * states[13] + 0.7 * states[14]
+    x11 = constants[29] * states[16] * x10
+    x12 = 0.2 * states[19] + 0.8 * states[20]
+    x13 = constants[31] * states[22] * x12
+    x14 = 1.0 / constants[71]
+    x15 = 1.0 / constants[74]
+    x16 = constants[72] * x14 * x15
+    x17 = states[0] * x16
+    x18 = np.exp(x17)
+    x19 = x18 + 1.0
+    x20 = 4.0 * constants[38]
+    x21 = x20 / x19
+    x22 = (
+        constants[12] * x21
+        + constants[36] * constants[63]
+        + constants[37] * constants[64]
+    )
+    x23 = (
+        constants[11] * constants[36] + constants[37] * constants[59] + states[1] * x21
+    )
+    x24 = 1.0 / x23
+    x25 = 1.0 / np.power(x19, 2)
+    x26 = 1.0 / constants[72]
+    x27 = constants[71] * constants[74] * x26
+    x28 = constants[35] * constants[60]
+    x29 = x28 * (
+        1
+        - x23
+        * x27
+        * (
+            -constants[12] * x16 * x18 * x20 * x24 * x25
+            + 4.0
+            * constants[38]
+            * constants[72]
+            * states[1]
+            * x14
+            * x15
+            * x18
+            * x22
+            * x25
+            / np.power(x23, 2)
+        )
+        / x22
+    )
+    x30 = constants[41] * constants[67]
+    x31 = constants[42] * constants[65]
+    x32 = 0.1 * states[0]
+    x33 = np.exp(-x16 * x32)
+    x34 = np.exp(0.020116676725005028 * constants[64]) * np.exp(-1.9 * x17)
+    x35 = np.power(constants[59], 3.0)
+    x36 = constants[12] * x35
+    x37 = x36 * np.exp(constants[86] * x17)
+    x38 = constants[86] - 1.0
+    x39 = np.exp(x17 * x38)
+    x40 = np.power(constants[64], 3.0)
+    x41 = states[1] * x40
+    x42 = x39 * x41
+    x43 = constants[86] * x16 * x37 - x16 * x38 * x42
+    x44 = np.power(constants[51], 3.0)
+    x45 = 1.0 / constants[50]
+    x46 = constants[12] * np.power(constants[49], 3.0)
+    x47 = (
+        constants[50] * x40 * (np.power(constants[59] / constants[49], 3.0) + 1.0)
+        + constants[52] * x35
+        + states[1] * x44
+        + x36
+        + x41
+        + x46 * (states[1] * x45 + 1.0)
+    )
+    x48 = 1.0 / x47
+    x49 = 1.0 / states[1]
+    x50 = np.power(constants[47] * x49, constants[48])
+    x51 = x50 + 1.0
+    x52 = 1.0 / x51
+    x53 = constants[85] * x39 + 1.0
+    x54 = 1.0 / x53
+    x55 = constants[10] * constants[84] * x52 * x54
+    x56 = 1.0 / constants[68]
+    x57 = 1.0 / constants[69]
+    x58 = 1.0 / constants[73]
+    x59 = 0.5 * constants[70] * constants[72] * constants[9] * x56 * x57 * x58
+    x60 = x55 * x59
+    x61 = 1.0 / np.power(x53, 2)
+    x62 = x37 - x42
+    x63 = constants[20] * np.power(states[8], 2)
+    x64 = 0.8 * states[6] + 0.2 * states[7]
+    x65 = np.power(states[5], 2)
+    x66 = np.power(states[1] / constants[19], 4.0)
+    x67 = x66 + 1.0
+    x68 = 1.0 / x67
+    x69 = constants[17] * x65 * x68
+    x70 = constants[40] * constants[61]
+    x71 = states[9] * x63 + x29 * x70 + 1.0 * x64 * x69
+    x72 = -states[0]
+    x73 = -constants[18] - x72
+    x74 = constants[17] * x64 * x73
+    x75 = 4.0 * x49 * x65 * x66 * x74 / np.power(x67, 2)
+    x76 = x21 * x24 * x27 * x28
+    x77 = x70 * x76
+    x78 = constants[10] * constants[84] * x48 * x62
+    x79 = constants[48] * x49 * x50 * x54 / np.power(x51, 2)
+    x80 = x62 * (-x40 - x44 - x45 * x46) / np.power(x47, 2)
+    x81 = -constants[77] - x72
+    x82 = 2.0 * states[5] * x68 * x74
+    x83 = x69 * x73
+    x84 = 0.8 * x83
+    x85 = 0.2 * x83
+    x86 = -constants[21] - x72
+    x87 = 2 * constants[20] * states[8] * states[9] * x86
+    x88 = x63 * x86
+    x89 = -constants[78] - x72
+    x90 = 0.8 * x89
+    x91 = constants[32] * states[12]
+    x92 = 0.2 * x89
+    x93 = constants[29] * states[15] * x89
+    x94 = states[16] * x93
+    x95 = constants[31] * states[21]
+    x96 = states[22] * x95
+    x97 = 2 * x89
+    x98 = x4 * x89
+    x99 = x6 * x89
+    x100 = 1.0 * x55
+    x101 = constants[68] * constants[69] * constants[73] * x26 / constants[70]
+    x102 = np.power(constants[45] * x49, constants[46])
+    x103 = np.power(constants[5] * constants[54] * x49, constants[55])
+    x104 = x103 + 1.0
+    x105 = np.power(states[1] / (constants[5] * constants[54]), constants[55])
+    x106 = x105 + 1.0
+    x107 = 939.38 + 3060.62 / x106
+    x108 = 1.0 / x107
+    x109 = constants[55] * x49
+    x110 = np.exp(-0.10822358559890391 * states[0])
+    x111 = 0.020413741940116113 * x110 + 1.0
+    x112 = np.exp(x32)
+    x113 = 44.701184493300836 * x112 + 1.0
+    x114 = 0.25 + 7.0 / x113
+    x115 = 1.0 / x114
+    x116 = 0.125 * states[0]
+    x117 = np.exp(x116)
+    x118 = 1242.6481670549956 * x117 + 1.0
+    x119 = 0.6666666666666666 * states[0] + 31.666666666666664
+    x120 = np.power(x119, 2.0) + 1.0
+    x121 = 0.9 + 1002.85 / x120
+    x122 = 1.0 / x121
+    x123 = 0.14285714285714285 * states[0]
+    x124 = np.exp(-x123)
+    x125 = 0.0431593092614526 * x124 + 1.0
+    x126 = 0.1111111111111111 * states[0] + 3.3299999999999996
+    x127 = np.power(x126, 2.0) + 1.0
+    x128 = 2.29 + 5.7 / x127
+    x129 = 1.0 / x128
+    x130 = 1.0 / constants[56]
+    x131 = np.exp(x123)
+    x132 = 227.82355062507335 * x131 + 1.0
+    x133 = 32.54622151786762 * x131 / np.power(x132, 2)
+    x134 = np.exp(-0.29459419649432905 * states[0])
+    x135 = 0.06091656667493611 * x134 + 1.0
+    x136 = 1.0 / x135
+    x137 = np.exp(0.02203701336765231 * states[0])
+    x138 = 1.3602936750195582 * x137 + 1.0
+    x139 = 1.0 / x138
+    x140 = -90.9699 * x136 * x139 + 90.9699
+    x141 = 1.0 / x140
+    x142 = np.exp(-0.10121457489878542 * states[0])
+    x143 = 0.004132526165039484 * x142 + 1.0
+    x144 = 0.038461538461538464 * states[0] + 2.5384615384615388
+    x145 = np.power(x144, 2.0) + 1.0
+    x146 = 0.45 + 3.9 / x145
+    x147 = 1.0 / x146
+    x148 = np.exp(0.21551724137931036 * states[0])
+    x149 = 6770037.888349095 * x148 + 1.0
+    x150 = np.exp(-0.12391573729863692 * states[0])
+    x151 = 0.000514409608423902 * x150 + 1.0
+    x152 = 1.0 / x151
+    x153 = np.exp(0.00492174426616793 * states[0])
+    x154 = 0.1281589858272324 * x153 + 1.0
+    x155 = 1.0 / x154
+    x156 = -150.0 * x152 * x155 + 150.0
+    x157 = 1.0 / x156
+    x158 = np.exp(-0.07256788725853035 * states[0])
+    x159 = 0.05159562639700062 * x158 + 1.0
+    x160 = 1.0 / x159
+    x161 = np.exp(0.06617564339269288 * states[0])
+    x162 = 3.918386601476963 * x161 + 1.0
+    x163 = 1.0 / x162
+    x164 = 1685.76 * x160 * x163 + 46.0999
+    x165 = 1.0 / x164
+    x166 = np.exp(-0.10526315789473684 * states[0])
+    x167 = 0.18559089326094946 * x166 + 1.0
+    x168 = 0.019535883501152575 * x166 / np.power(x167, 2)
+    x169 = -1.0 / x167
+    x170 = np.exp(-0.14353936495314157 * states[0])
+    x171 = 0.002467243986579835 * x170 + 1.0
+    x172 = 1.0 / x171
+    x173 = np.exp(0.04695960065555603 * states[0])
+    x174 = 2.9787131844455406 * x173 + 1.0
+    x175 = 1.0 / x174
+    x176 = 16321.6 * x172 * x175 + 475.667
+    x177 = 1.0 / x176
+    x178 = np.exp(0.041666666666666664 * states[0])
+    x179 = 7.38905609893065 * x178 + 1.0
+    x180 = 0.02258009158485147 * states[0] + 0.4677149850519794
+    x181 = np.power(x180, 2.0) + 1.0
+    x182 = -0.378843 + 19.7864 / x181
+    x183 = 1.0 / x182
+    x184 = 0.02977076510866329 * states[0] + 1.1342661506400715
+    x185 = np.exp(-0.08012820512820512 * states[0])
+    x186 = 0.17156029276961057 * x185 + 1.0
+    x187 = -1.0 / x186
+    x188 = 0.0025297242600556538 * np.power(x184, 2.0) + 0.0025297242600556538
+    x189 = 0.013746818330898282 * x185 / np.power(x186, 2)
+    x190 = np.power(10.0, -0.0357 * states[0] - 0.505155)
+    x191 = x190 + 1.0
+    x192 = np.power(10.0, 0.02827 * states[0] + 0.675653)
+    x193 = x192 + 1.0
+    x194 = 5503.0 + 5345.4 / x193 - 4590.6 / x191
+    x195 = 1.0 / x194
+    x196 = np.exp(0.03474635163307853 * states[0])
+    x197 = 1.0383833630988242 * x196 + 1.0
+    x198 = 0.02047921359819783 * states[0] + 0.9848453819373337
+    x199 = np.power(x198, 2.0) + 1.0
+    x200 = 5.44 + 29.2 / x199
+    x201 = 1.0 / x200
+    x202 = 0.018400817066726905 * x196 * x201 / np.power(x197, 2)
+    x203 = np.power(x198, 1.0)
+    x204 = 1.0 / np.power(x199, 2)
+    x205 = 1.0 / np.power(x200, 2)
+    x206 = 0.49 + 0.51 / x197
+    x207 = -x201
+    x208 = 1.0 / constants[57]
+    x209 = np.exp(0.08130081300813008 * states[0])
+    x210 = np.exp(-0.058997050147492625 * states[0])
+    x211 = 0.41175958388352135 * x210 + 1.0
+    x212 = np.exp(-0.03221649484536083 * states[0])
+    x213 = 0.5597757218525993 * x212 + 1.0
+    x214 = 10.0 + 895.9 / x213
+    x215 = 1.0 / x214
+    x216 = 0.13616557734204793 * states[0] - 5.37037037037037
+    x217 = np.power(x216, 2.0) + 1.0
+    x218 = 1077.0 + 185845.0 / x217
+    x219 = 1.0 / x218
+    x220 = np.exp(0.06644518272425248 * states[0])
+    x221 = 320.5696815217901 * x220 + 1.0
+    x222 = np.exp(0.07479431563201197 * states[0])
+    x223 = 0.005272106108022878 * x222 + 1.0
+    x224 = x219 * (
+        -8.643666230002816 * x220 / np.power(x221, 2)
+        - 0.00023430706427727706 * x222 / np.power(x223, 2)
+    )
+    x225 = 0.5942 / x223 + 0.4058 / x221
+    x226 = (
+        50611.3834422658 * np.power(x216, 1.0) / (np.power(x217, 2) * np.power(x218, 2))
+    )
+    x227 = -x219
+    x228 = 0.05643340857787811 * states[0] + 2.2708803611738153
+    x229 = np.power(x228, 2.0) + 1.0
+    x230 = 37.51 + 539.0 / x229
+    x231 = 1.0 / x230
+    x232 = np.exp(-0.07267441860465117 * states[0])
+    x233 = 0.07021102001498804 * x232 + 1.0
+    x234 = 0.0051025450592287825 * x232 / np.power(x233, 2)
+    x235 = 1.0 / constants[58]
+    x236 = 0.06333122229259025 * states[0] + 3.844838505383154
+    x237 = np.exp(-0.03750853319130102 * states[0])
+    x238 = 0.49637710668432194 * x237 + 1.0
+    x239 = 0.002 * np.power(x236, 2.0) + 0.002
+    x240 = 0.027885368825830776 * states[0] + 1.748783500784973
+    x241 = np.exp(0.15873015873015872 * states[0])
+    x242 = 22026.465794806718 * x241 + 1.0
+    x243 = -1.0 / x242
+    x244 = 0.0002 * np.power(x240, 2.0) + 0.0002
+    x245 = 3496.264411874082 * x241 / np.power(x242, 2)
+    x246 = np.exp(0.25 * states[0])
+    x247 = 244.69193226422038 * x246 + 1.0
+    x248 = 30000.0 + 220000.0 / x247
+    x249 = 1.0 / x248
+    x250 = 0.034879665155214505 * states[0] + 2.2357865364492495
+    x251 = np.exp(-0.05434782608695653 * states[0])
+    x252 = 0.37780784271725576 * x251 + 1.0
+    x253 = 0.01 * np.power(x250, 2.0) + 0.01
+    x254 = np.exp(-x116)
+    x255 = 8.588511730827894e-05 * x254 + 1.0
+    x256 = 1.0 / x255
+    x257 = np.exp(0.02 * states[0])
+    x258 = 0.0018363047770289071 * x257 + 1.0
+    x259 = 1.0 / x258
+    x260 = -1000000.0 * x256 * x259 + 1000000.0
+    x261 = 1.0 / x260
+    x262 = np.exp(0.17543859649122806 * states[0])
+    x263 = 41.2354467972002 * x262 + 1.0
+    x264 = 7.234288911789508 * x262 / np.power(x263, 2)
+    x265 = -1.0 / x263
+    x266 = np.exp(-0.3732527107478118 * states[0])
+    x267 = 9.128085116822181e-05 * x266 + 1.0
+    x268 = 1.0 / x267
+    x269 = np.exp(0.03937131878169391 * states[0])
+    x270 = 0.005347167038234146 * x269 + 1.0
+    x271 = 1.0 / x270
+    x272 = -2500000.0 * x268 * x271 + 2500000.0
+    x273 = 1.0 / x272
+    x274 = 0.02857142857142857 * states[0] + 0.5863771428571428
+    x275 = np.exp(-0.1321003963011889 * states[0])
+    x276 = 0.025449224366457798 * x275 + 1.0
+    x277 = 0.058823529411764705 * np.power(x274, 2.0) + 0.058823529411764705
+    x278 = np.exp(0.16666666666666666 * states[0])
+    x279 = 107294.57126320578 * x278 + 1.0
+    x280 = 0.008333333333333333 * states[0] + 0.28480416666666664
+    x281 = np.power(x280, 2.0) + 1.0
+    x282 = 7.5 + 10.0 / x281
+    x283 = 1.0 / x282
+    x284 = 3.044677150587635 - 0.019175565727127863 * states[0]
+    x285 = constants[6] * states[1]
+    x286 = 0.001353075608511928 * x285 + 2.0814226778178138
+    x287 = np.power(x286, 2.0) + 1.0
+    x288 = 6.175050326660162 * x285 - 0.38935853577206647
+    x289 = np.power(x288, 2.0) + 1.0
+    x290 = 0.749234 / x289 - 8.38384 / x287
+    x291 = 4179.239211293976 * x285 + 992.5818503999532
+    x292 = np.power(x291, 0.42291) + 1.0
+    x293 = x16 * (states[0] + 37.5137 - 5011.47 / x292)
+    x294 = np.exp(x290 * x293)
+    x295 = x294 + 1.0
+    x296 = 0.41508588126883456 * np.power(x284, 2.0) + 0.41508588126883456
+    x297 = 1.0 * x294 * x296 / np.power(x295, 2)
+    x298 = x16 * x290
+    x299 = 0.015038679483631901 * states[0] - 2.30120369590587
+    x300 = constants[7] * states[1]
+    x301 = 0.0014599691070536947 * x300 + 0.33390953447425054
+    x302 = np.power(x301, 2.0) + 1.0
+    x303 = 2.3346212660651124 * x300 - 0.5112540418130668
+    x304 = np.power(x303, 2.0) + 1.0
+    x305 = 0.681249 / x304 - 1.40001 / x302
+    x306 = 250.55435150269975 * x300 + 100.5196497250166
+    x307 = np.power(x306, 0.668054) + 1.0
+    x308 = x16 * (states[0] + 109.275 - 8540.23 / x307)
+    x309 = np.exp(x305 * x308)
+    x310 = x309 + 1.0
+    x311 = 0.07243804735999536 * np.power(x299, 2.0) + 0.07243804735999536
+    x312 = 1.0 * x309 * x311 / np.power(x310, 2)
+    x313 = x16 * x305
+    x314 = np.exp(0.11553614548311439 * states[0])
+    x315 = 194143.7945420567 * x314 + 1.0
+    x316 = np.exp(-0.0497 * states[0])
+    x317 = np.exp(0.05211 * states[0])
+    x318 = 3.5e-06 * x316 + 0.04003 * x317
+    x319 = 0.08605851979345956 * states[0]
+    x320 = np.exp(-x319)
+    x321 = 0.11141511764427327 * x320 + 1.0
+    x322 = np.exp(x319)
+    x323 = 1.4805695580388407 * x322 + 1.0
+    x324 = -160.0 + 210.0 / x323 + 170.0 / x321
+    x325 = np.exp(2.53 * x17)
+    x326 = x325 * x49
+    x327 = np.power(x326, 2.0)
+    x328 = 0.0006 * x326 + 3.5999999999999994e-07 * x327 + 1.0
+    x329 = np.exp(-5.0 * x17)
+    x330 = 0.1 * x329
+    x331 = x328 * x330 + 1.0
+    x332 = 1.0 / x324
+    x333 = x332 / np.power(x331, 2)
+    jacobian[0, 0] = (
+        0.5
+        * constants[10]
+        * constants[70]
+        * np.power(constants[72], 2)
+        * constants[84]
+        * constants[85]
+        * constants[9]
+        * x14
+        * x15
+        * x38
+        * x39
+        * x48
+        * x52
+        * x56
+        * x57
+        * x58
+        * x61
+        * x62
+        - constants[23]
+        - constants[33] * states[34]
+        - constants[34] * states[33]
+        - 1.0
+        * constants[75]
+        * constants[87]
+        * constants[88]
+        * (0.012450000000000001 * x16 * x33 + 0.004161 * x16 * x34)
+        / np.power(0.1245 * x33 + 0.00219 * x34 + 1.0, 2)
+        - states[12] * x9
+        - states[15] * x11
+        - states[17] * x8
+        - states[21] * x13
+        - states[29] * x7
+        - states[31] * x1
+        - states[32] * x2
+        - states[4] * x0
+        - x29 * x30
+        - x29 * x31
+        - x3 * x4
+        - x43 * x48 * x60
+        - x5 * x6
+        - x71
+    )
+    jacobian[0, 1] = (
+        0.5
+        * constants[10]
+        * constants[70]
+        * constants[72]
+        * constants[84]
+        * constants[9]
+        * x39
+        * x40
+        * x48
+        * x52
+        * x54
+        * x56
+        * x57
+        * x58
+        - x30 * x76
+        - x31 * x76
+        - x59 * x78 * x79
+        - x60 * x80
+        + x75
+        - x77
+    )
+    jacobian[0, 3] = -3 * constants[16] * np.power(states[3], 2) * states[4] * x81
+    jacobian[0, 4] = -x0 * x81
+    jacobian[0, 5] = -x82
+    jacobian[0, 6] = -x84
+    jacobian[0, 7] = -x85
+    jacobian[0, 8] = -x87
+    jacobian[0, 9] = -x88
+    jacobian[0, 10] = -x90 * x91
+    jacobian[0, 11] = -x91 * x92
+    jacobian[0, 12] = -x89 * x9
+    jacobian[0, 13] = -0.3 * x94
+    jacobian[0, 14] = -0.7 * x94
+    jacobian[0, 15] = -x11 * x89
+    jacobian[0, 16] = -x10 * x93
+    jacobian[0, 17] = -x8 * x89
+    jacobian[0, 18] = -constants[30] * states[17] * x89
+    jacobian[0, 19] = -x92 * x96
+    jacobian[0, 20] = -x90 * x96
+    jacobian[0, 21] = -x13 * x89
+    jacobian[0, 22] = -x12 * x89 * x95
+    jacobian[0, 23] = -constants[24] * states[23] * x3 * x97
+    jacobian[0, 24] = -0.38 * x98
+    jacobian[0, 25] = -0.63 * x98
+    jacobian[0, 26] = -constants[25] * states[26] * x5 * x97
+    jacobian[0, 27] = -0.75 * x99
+    jacobian[0, 28] = -0.25 * x99
+    jacobian[0, 29] = -x7 * x89
+    jacobian[0, 30] = -constants[28] * states[29] * x89
+    jacobian[0, 31] = -x1 * x89
+    jacobian[0, 32] = -x2 * x89
+    jacobian[0, 33] = -constants[34] * (-constants[83] - x72)
+    jacobian[0, 34] = -constants[33] * (-constants[79] - x72)
+    jacobian[1, 0] = (
+        1.0
+        * constants[10]
+        * constants[72]
+        * constants[84]
+        * constants[85]
+        * x14
+        * x15
+        * x38
+        * x39
+        * x48
+        * x52
+        * x61
+        * x62
+        - x100 * x43 * x48
+        - x101 * x71
+    )
+    jacobian[1, 1] = (
+        1.0 * constants[10] * constants[84] * x39 * x40 * x48 * x52 * x54
+        - constants[44] * constants[46] * x102 * x49 / np.power(x102 + 1.0, 2)
+        - x100 * x80
+        - x101 * (-x75 + x77)
+        - 1.0 * x78 * x79
+    )
+    jacobian[1, 5] = -x101 * x82
+    jacobian[1, 6] = -x101 * x84
+    jacobian[1, 7] = -x101 * x85
+    jacobian[1, 8] = -x101 * x87
+    jacobian[1, 9] = -x101 * x88
+    jacobian[2, 1] = 1.0 * x103 * x108 * x109 / np.power(
+        x104, 2
+    ) + 3060.62 * x105 * x109 * (-states[2] + 1.0 / x104) / (
+        np.power(x106, 2) * np.power(x107, 2)
+    )
+    jacobian[2, 2] = -x108
+    jacobian[3, 0] = 0.0022092483482500907 * x110 * x115 / np.power(
+        x111, 2
+    ) + 31.290829145310585 * x112 * (-states[3] + 1.0 / x111) / (
+        np.power(x113, 2) * np.power(x114, 2)
+    )
+    jacobian[3, 3] = -x115
+    jacobian[4, 0] = -155.33102088187445 * x117 * x122 / np.power(
+        x118, 2
+    ) + 1337.1333333333332 * np.power(x119, 1.0) * (-states[4] + 1.0 / x118) / (
+        np.power(x120, 2) * np.power(x121, 2)
+    )
+    jacobian[4, 4] = -x122
+    jacobian[5, 0] = 0.006165615608778943 * x124 * x129 / np.power(
+        x125, 2
+    ) + 1.2666666666666666 * np.power(x126, 1.0) * (-states[5] + 1.0 / x125) / (
+        np.power(x127, 2) * np.power(x128, 2)
+    )
+    jacobian[5, 5] = -x129
+    jacobian[6, 0] = -x130 * x133
+    jacobian[6, 6] = -x130
+    jacobian[7, 0] = -x133 * x141 + (-states[7] + 1.0 / x132) * (
+        1.6325155335873531 * x134 * x139 / np.power(x135, 2)
+        - 2.7269873989528386 * x136 * x137 / np.power(x138, 2)
+    ) / np.power(x140, 2)
+    jacobian[7, 7] = -x141
+    jacobian[8, 0] = 0.0004182718790525793 * x142 * x147 / np.power(
+        x143, 2
+    ) + 0.3 * np.power(x144, 1.0) * (-states[8] + 1.0 / x143) / (
+        np.power(x145, 2) * np.power(x146, 2)
+    )
+    jacobian[8, 8] = -x147
+    jacobian[9, 0] = -1429878.6919358002 * x148 * x157 / np.power(x149, 2) + (
+        0.00956151688520264 * x150 * x155 / np.power(x151, 2)
+        - 0.0946148630479617 * x152 * x153 / np.power(x154, 2)
+    ) * (-states[9] + 0.02 + 0.98 / x149) / np.power(x156, 2)
+    jacobian[9, 9] = -x157
+    jacobian[10, 0] = x165 * x168 + (-states[10] - x169) * (
+        -6.311798316062739 * x158 * x163 / np.power(x159, 2)
+        + 437.12052552102097 * x160 * x161 / np.power(x162, 2)
+    ) / np.power(x164, 2)
+    jacobian[10, 10] = -x165
+    jacobian[11, 0] = x168 * x177 + (-states[11] - x169) * (
+        -5.78023971811186 * x170 * x175 / np.power(x171, 2)
+        + 2283.0520505494906 * x172 * x173 / np.power(x174, 2)
+    ) / np.power(x176, 2)
+    jacobian[11, 11] = -x177
+    jacobian[12, 0] = -0.30787733745544377 * x178 * x183 / np.power(
+        x179, 2
+    ) + 0.8935574482690103 * np.power(x180, 1.0) * (-states[12] + 1.0 / x179) / (
+        np.power(x181, 2) * np.power(x182, 2)
+    )
+    jacobian[12, 12] = -x183
+    jacobian[13, 0] = (
+        0.00015062365347160784 * np.power(x184, 1.0) * (-states[13] - x187)
+        + x188 * x189
+    )
+    jacobian[13, 13] = -x188
+    jacobian[14, 0] = x189 * x195 + (-states[14] - x187) * (
+        377.35782246597535 * x190 / np.power(x191, 2)
+        + 347.9538983266748 * x192 / np.power(x193, 2)
+    ) / np.power(x194, 2)
+    jacobian[14, 14] = -x195
+    jacobian[15, 0] = -x202 + 1.1959860741347532 * x203 * x204 * x205 * (
+        -states[15] + x206
+    )
+    jacobian[15, 15] = x207
+    jacobian[16, 0] = (
+        -2.133603049007443 * x208 * x209 / np.power(39.76260227695689 * x209 + 1.0, 2)
+    )
+    jacobian[16, 16] = -x208
+    jacobian[17, 0] = 0.024292600819086806 * x210 * x215 / np.power(
+        x211, 2
+    ) - 16.15667104406391 * x212 * (-states[17] + 1.0 / x211) / (
+        np.power(x213, 2) * np.power(x214, 2)
+    )
+    jacobian[17, 17] = -x215
+    jacobian[18, 0] = x224 + x226 * (-states[18] + x225)
+    jacobian[18, 18] = x227
+    jacobian[19, 0] = (
+        60.835214446952605
+        * np.power(x228, 1.0)
+        * (-states[19] + 1.0 / x233)
+        / (np.power(x229, 2) * np.power(x230, 2))
+        + x231 * x234
+    )
+    jacobian[19, 19] = -x231
+    jacobian[20, 0] = x234 * x235
+    jacobian[20, 20] = -x235
+    jacobian[21, 0] = -x202 + 1.1959860741347532 * x203 * x204 * x205 * (
+        -states[21] + x206
+    )
+    jacobian[21, 21] = x207
+    jacobian[22, 0] = x224 + x226 * (-states[22] + x225)
+    jacobian[22, 22] = x227
+    jacobian[23, 0] = 0.000253324889170361 * np.power(x236, 1.0) * (
+        -states[23] + 0.978613 / x238
+    ) + 0.01822018594869074 * x237 * x239 / np.power(x238, 2)
+    jacobian[23, 23] = -x239
+    jacobian[24, 0] = (
+        1.1154147530332311e-05 * np.power(x240, 1.0) * (-states[24] - x243)
+        - x244 * x245
+    )
+    jacobian[24, 24] = -x244
+    jacobian[25, 0] = -x245 * x249 + 13458056.27453212 * x246 * (-states[25] - x243) / (
+        np.power(x247, 2) * np.power(x248, 2)
+    )
+    jacobian[25, 25] = -x249
+    jacobian[26, 0] = 0.0006975933031042901 * np.power(x250, 1.0) * (
+        -states[26] + 0.948 / x252
+    ) + 0.019465317113910786 * x251 * x253 / np.power(x252, 2)
+    jacobian[26, 26] = -x253
+    jacobian[27, 0] = -x261 * x264 + (-states[27] - x265) * (
+        10.735639663534869 * x254 * x259 / np.power(x255, 2)
+        - 36.72609554057814 * x256 * x257 / np.power(x258, 2)
+    ) / np.power(x260, 2)
+    jacobian[27, 27] = -x261
+    jacobian[28, 0] = -x264 * x273 + (-states[28] - x265) * (
+        85.17706284476589 * x266 * x271 / np.power(x267, 2)
+        - 526.3125451032066 * x268 * x269 / np.power(x270, 2)
+    ) / np.power(x272, 2)
+    jacobian[28, 28] = -x273
+    jacobian[29, 0] = 0.003361344537815126 * np.power(x274, 1.0) * (
+        -states[29] + 1.0 / x276
+    ) + 0.0033618526243669477 * x275 * x277 / np.power(x276, 2)
+    jacobian[29, 29] = -x277
+    jacobian[30, 0] = -17524.779972990276 * x278 * x283 / np.power(
+        x279, 2
+    ) + 0.16666666666666666 * np.power(x280, 1.0) * (
+        -states[30] + 0.02 + 0.98 / x279
+    ) / (
+        np.power(x281, 2) * np.power(x282, 2)
+    )
+    jacobian[30, 30] = -x283
+    jacobian[31, 0] = (
+        -0.01591901319734666 * np.power(x284, 1.0) * (-states[31] + 1.0 / x295)
+        - x297 * x298
+    )
+    jacobian[31, 1] = -x297 * (
+        8857482.834610788
+        * constants[6]
+        * (1.0 / np.power(x291, 0.57709))
+        * x298
+        / np.power(x292, 2)
+        + x293
+        * (
+            0.022687938819333283
+            * constants[6]
+            * np.power(x286, 1.0)
+            / np.power(x287, 2)
+            - 9.253115312889799 * constants[6] * np.power(x288, 1.0) / np.power(x289, 2)
+        )
+    )
+    jacobian[31, 31] = -x296
+    jacobian[32, 0] = (
+        0.0021787451533342365 * np.power(x299, 1.0) * (-states[32] + 1.0 / x310)
+        - x312 * x313
+    )
+    jacobian[32, 1] = -x312 * (
+        1429496.4640316702
+        * constants[7]
+        * (1.0 / np.power(x306, 0.33194599999999996))
+        * x313
+        / np.power(x307, 2)
+        + x308
+        * (
+            0.004087942699132486
+            * constants[7]
+            * np.power(x301, 1.0)
+            / np.power(x302, 2)
+            - 3.1809168057711834
+            * constants[7]
+            * np.power(x303, 1.0)
+            / np.power(x304, 2)
+        )
+    )
+    jacobian[32, 32] = -x311
+    jacobian[33, 0] = -22430.625690854933 * x314 * x318 / np.power(x315, 2) + (
+        -states[33] + 1.0 / x315
+    ) * (-1.7395e-07 * x316 + 0.0020859633 * x317)
+    jacobian[33, 33] = -x318
+    jacobian[34, 0] = 1.0 * x333 * (
+        0.5 * constants[72] * x14 * x15 * x328 * x329
+        - x330
+        * (0.0015179999999999998 * x16 * x326 + 1.8215999999999996e-06 * x16 * x327)
+    ) + (-states[34] + 1.0 / x331) * (
+        -1.6299974182036538 * x320 / np.power(x321, 2)
+        + 26.757281169376643 * x322 / np.power(x323, 2)
+    ) / np.power(
+        x324, 2
+    )
+    jacobian[34, 1] = (
+        -x330
+        * x333
+        * (-7.199999999999999e-07 * x327 * x49 - 0.0006 * x325 / np.power(states[1], 2))
+    )
+    jacobian[34, 34] = -x332
+    return jacobian
+
+
+def compute_jacobian_diagonal(voi, states, constants):
+    """Computes the derivative of each rate with respect to its state
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- list[float], list of states.
+    constants -- list[int], list of constant values.
+
+    Returns:
+    diagonal -- np.array[float], derivative of rates[i] with respect
+    to states[i] at index i.
+
+    """
+    diagonal = np.zeros((sizeStates,) + np.shape(states[0]))
+    x0 = np.power(states[1] / constants[19], 4.0)
+    x1 = x0 + 1.0
+    x2 = constants[17] * np.power(states[5], 2) * (0.8 * states[6] + 0.2 * states[7])
+    x3 = 0.1 * states[0]
+    x4 = 1.0 / constants[71]
+    x5 = 1.0 / constants[74]
+    x6 = constants[72] * x4 * x5
+    x7 = np.exp(-x3 * x6)
+    x8 = states[0] * x6
+    x9 = np.exp(0.020116676725005028 * constants[64]) * np.exp(-1.9 * x8)
+    x10 = constants[86] - 1.0
+    x11 = np.exp(x10 * x8)
+    x12 = constants[85] * x11 + 1.0
+    x13 = 1.0 / x12
+    x14 = np.power(constants[59], 3.0)
+    x15 = constants[12] * x14
+    x16 = x15 * np.exp(constants[86] * x8)
+    x17 = np.power(constants[64], 3.0)
+    x18 = states[1] * x17
+    x19 = x11 * x18
+    x20 = 1.0 / constants[68]
+    x21 = 1.0 / constants[69]
+    x22 = 1.0 / constants[73]
+    x23 = 1.0 / states[1]
+    x24 = np.power(constants[47] * x23, constants[48])
+    x25 = x24 + 1.0
+    x26 = 1.0 / x25
+    x27 = np.power(constants[51], 3.0)
+    x28 = 1.0 / constants[50]
+    x29 = constants[12] * np.power(constants[49], 3.0)
+    x30 = (
+        constants[50] * x17 * (np.power(constants[59] / constants[49], 3.0) + 1.0)
+        + constants[52] * x14
+        + states[1] * x27
+        + x15
+        + x18
+        + x29 * (states[1] * x28 + 1.0)
+    )
+    x31 = 1.0 / x30
+    x32 = x16 - x19
+    x33 = np.exp(x8)
+    x34 = x33 + 1.0
+    x35 = 1.0 / x34
+    x36 = 4.0 * constants[38]
+    x37 = x35 * x36
+    x38 = (
+        constants[12] * x37
+        + constants[36] * constants[63]
+        + constants[37] * constants[64]
+    )
+    x39 = (
+        constants[11] * constants[36] + constants[37] * constants[59] + states[1] * x37
+    )
+    x40 = 1.0 / x39
+    x41 = 1.0 / np.power(x34, 2)
+    x42 = 1.0 / constants[72]
+    x43 = (
+        constants[35]
+        * constants[60]
+        * (
+            -constants[71]
+            * constants[74]
+            * x39
+            * x42
+            * (
+                -constants[12] * x33 * x36 * x40 * x41 * x6
+                + 4.0
+                * constants[38]
+                * constants[72]
+                * states[1]
+                * x33
+                * x38
+                * x4
+                * x41
+                * x5
+                / np.power(x39, 2)
+            )
+            / x38
+            + 1
+        )
+    )
+    x44 = np.power(constants[45] * x23, constants[46])
+    x45 = 1.0 * constants[10] * constants[84] * x13 * x32
+    x46 = -1 / (
+        5.44
+        + 29.2
+        / (np.power(0.02047921359819783 * states[0] + 0.9848453819373337, 2.0) + 1.0)
+    )
+    x47 = -1 / (
+        1077.0
+        + 185845.0
+        / (np.power(0.13616557734204793 * states[0] - 5.37037037037037, 2.0) + 1.0)
+    )
+    x48 = 0.08605851979345956 * states[0]
+    diagonal[0] = (
+        0.5
+        * constants[10]
+        * constants[70]
+        * np.power(constants[72], 2)
+        * constants[84]
+        * constants[85]
+        * constants[9]
+        * x10
+        * x11
+        * x20
+        * x21
+        * x22
+        * x26
+        * x31
+        * x32
+        * x4
+        * x5
+        / np.power(x12, 2)
+        - 0.5
+        * constants[10]
+        * constants[70]
+        * constants[72]
+        * constants[84]
+        * constants[9]
+        * x13
+        * x20
+        * x21
+        * x22
+        * x26
+        * x31
+        * (constants[86] * x16 * x6 - x10 * x19 * x6)
+        - constants[16] * np.power(states[3], 3) * states[4]
+        - constants[20] * np.power(states[8], 2) * states[9]
+        - constants[22] * constants[26] * states[31]
+        - constants[22] * constants[27] * states[32]
+        - constants[23]
+        - constants[24]
+        * np.power(states[23], 2)
+        * (0.38 * states[24] + 0.63 * states[25])
+        - constants[25]
+        * np.power(states[26], 2)
+        * (0.75 * states[27] + 0.25 * states[28])
+        - constants[28] * states[29] * states[30]
+        - constants[29]
+        * states[15]
+        * states[16]
+        * (0.3 * states[13] + 0.7 * states[14])
+        - constants[30] * states[17] * states[18]
+        - constants[31]
+        * states[21]
+        * states[22]
+        * (0.2 * states[19] + 0.8 * states[20])
+        - constants[32] * states[12] * (0.8 * states[10] + 0.2 * states[11])
+        - constants[33] * states[34]
+        - constants[34] * states[33]
+        - constants[40] * constants[61] * x43
+        - constants[41] * constants[67] * x43
+        - constants[42] * constants[65] * x43
+        - 1.0
+        * constants[75]
+        * constants[87]
+        * constants[88]
+        * (0.012450000000000001 * x6 * x7 + 0.004161 * x6 * x9)
+        / np.power(0.1245 * x7 + 0.00219 * x9 + 1.0, 2)
+        - 1.0 * x2 / x1
+    )
+    diagonal[1] = (
+        1.0 * constants[10] * constants[84] * x11 * x13 * x17 * x26 * x31
+        - constants[44] * constants[46] * x23 * x44 / np.power(x44 + 1.0, 2)
+        - constants[48] * x23 * x24 * x31 * x45 / np.power(x25, 2)
+        - constants[68]
+        * constants[69]
+        * constants[73]
+        * x42
+        * (
+            4.0
+            * constants[35]
+            * constants[38]
+            * constants[40]
+            * constants[60]
+            * constants[61]
+            * constants[71]
+            * constants[74]
+            * x35
+            * x40
+            * x42
+            - 4.0 * x0 * x2 * x23 * (-constants[18] + states[0]) / np.power(x1, 2)
+        )
+        / constants[70]
+        - x26 * x45 * (-x17 - x27 - x28 * x29) / np.power(x30, 2)
+    )
+    diagonal[2] = -1 / (
+        939.38
+        + 3060.62
+        / (np.power(states[1] / (constants[5] * constants[54]), constants[55]) + 1.0)
+    )
+    diagonal[3] = -1 / (0.25 + 7.0 / (44.701184493300836 * np.exp(x3) + 1.0))
+    diagonal[4] = -1 / (
+        0.9
+        + 1002.85
+        / (np.power(0.6666666666666666 * states[0] + 31.666666666666664, 2.0) + 1.0)
+    )
+    diagonal[5] = -1 / (
+        2.29
+        + 5.7
+        / (np.power(0.1111111111111111 * states[0] + 3.3299999999999996, 2.0) + 1.0)
+    )
+    diagonal[6] = -1 / constants[56]
+    diagonal[7] = -1 / (
+        90.9699
+        - 90.9699
+        / (
+            (1.0 + 0.06091656667493611 * np.exp(-0.29459419649432905 * states[0]))
+            * (1.3602936750195582 * np.exp(0.02203701336765231 * states[0]) + 1.0)
+        )
+    )
+    diagonal[8] = -1 / (
+        0.45
+        + 3.9
+        / (np.power(0.038461538461538464 * states[0] + 2.5384615384615388, 2.0) + 1.0)
+    )
+    diagonal[9] = -1 / (
+        150.0
+        - 150.0
+        / (
+            (1.0 + 0.000514409608423902 * np.exp(-0.12391573729863692 * states[0]))
+            * (0.1281589858272324 * np.exp(0.00492174426616793 * states[0]) + 1.0)
+        )
+    )
+    diagonal[10] = -1 / (
+        46.0999
+        + 1685.76
+        / (
+            (1.0 + 0.05159562639700062 * np.exp(-0.07256788725853035 * states[0]))
+            * (3.918386601476963 * np.exp(0.06617564339269288 * states[0]) + 1.0)
+        )
+    )
+    diagonal[11] = -1 / (
+        475.667
+        + 16321.6
+        / (
+            (1.0 + 0.002467243986579835 * np.exp(-0.14353936495314157 * states[0]))
+            * (2.9787131844455406 * np.exp(0.04695960065555603 * states[0]) + 1.0)
+        )
+    )
+    diagonal[12] = -1 / (
+        -0.378843
+        + 19.7864
+        / (np.power(0.02258009158485147 * states[0] + 0.4677149850519794, 2.0) + 1.0)
+    )
+    diagonal[13] = (
+        -0.0025297242600556538
+        * np.power(0.02977076510866329 * states[0] + 1.1342661506400715, 2.0)
+        - 0.0025297242600556538
+    )
+    diagonal[14] = -1 / (
+        5503.0
+        + 5345.4 / (np.power(10.0, 0.02827 * states[0] + 0.675653) + 1.0)
+        - 4590.6 / (np.power(10.0, -0.0357 * states[0] - 0.505155) + 1.0)
+    )
+    diagonal[15] = x46
+    diagonal[16] = -1 / constants[57]
+    diagonal[17] = -1 / (
+        10.0
+        + 895.9 / (1.0 + 0.5597757218525993 * np.exp(-0.03221649484536083 * states[0]))
+    )
+    diagonal[18] = x47
+    diagonal[19] = -1 / (
+        37.51
+        + 539.0
+        / (np.power(0.05643340857787811 * states[0] + 2.2708803611738153, 2.0) + 1.0)
+    )
+    diagonal[20] = -1 / constants[58]
+    diagonal[21] = x46
+    diagonal[22] = x47
+    diagonal[23] = (
+        -0.002 * np.power(0.06333122229259025 * states[0] + 3.844838505383154, 2.0)
+        - 0.002
+    )
+    diagonal[24] = (
+        -0.0002 * np.power(0.027885368825830776 * states[0] + 1.748783500784973, 2.0)
+        - 0.0002
+    )
+    diagonal[25] = -1 / (
+        30000.0 + 220000.0 / (244.69193226422038 * np.exp(0.25 * states[0]) + 1.0)
+    )
+    diagonal[26] = (
+        -0.01 * np.power(0.034879665155214505 * states[0] + 2.2357865364492495, 2.0)
+        - 0.01
+    )
+    diagonal[27] = -1 / (
+        1000000.0
+        - 1000000.0
+        / (
+            (1.0 + 8.588511730827894e-05 * np.exp(-0.125 * states[0]))
+            * (0.0018363047770289071 * np.exp(0.02 * states[0]) + 1.0)
+        )
+    )
+    diagonal[28] = -1 / (
+        2500000.0
+        - 2500000.0
+        / (
+            (1.0 + 9.128085116822181e-05 * np.exp(-0.3732527107478118 * states[0]))
+            * (0.005347167038234146 * np.exp(0.03937131878169391 * states[0]) + 1.0)
+        )
+    )
+    diagonal[29] = (
+        -0.058823529411764705
+        * np.power(0.02857142857142857 * states[0] + 0.5863771428571428, 2.0)
+        - 0.058823529411764705
+    )
+    diagonal[30] = -1 / (
+        7.5
+        + 10.0
+        / (np.power(0.008333333333333333 * states[0] + 0.28480416666666664, 2.0) + 1.0)
+    )
+    diagonal[31] = (
+        -0.41508588126883456
+        * np.power(3.044677150587635 - 0.019175565727127863 * states[0], 2.0)
+        - 0.41508588126883456
+    )
+    diagonal[32] = (
+        -0.07243804735999536
+        * np.power(0.015038679483631901 * states[0] - 2.30120369590587, 2.0)
+        - 0.07243804735999536
+    )
+    diagonal[33] = -0.04003 * np.exp(0.05211 * states[0]) - 3.5e-06 * np.exp(
+        -0.0497 * states[0]
+    )
+    diagonal[34] = -1 / (
+        -160.0
+        + 210.0 / (1.4805695580388407 * np.exp(x48) + 1.0)
+        + 170.0 / (1.0 + 0.11141511764427327 * np.exp(-x48))
+    )
+    return diagonal
+
+
+def compute_rates_kernel(voi, states, prepared):
+    """Computes the rates of a single simulation with scalar functions
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- list[float], list of states.
+    prepared -- list[float], list of prepared values computed by
+    prepare from the constants.
+
+    Returns:
+    rates -- list[float], list of computed rates.
+
+    Raises:
+    OverflowError -- if an exponential overflows.
+    ZeroDivisionError -- if a denominator is zero.
+    ValueError -- if a power or logarithm is not defined.
+
+    """
+    states = np.asarray(states, dtype=float).tolist()
+    x0 = prepared[5] + states[0]
+    x1 = states[8] ** 2 * states[9] * (prepared[13] + states[0])
+    x2 = (
+        states[5] ** 2
+        * (prepared[38] + states[0])
+        * (0.8 * states[6] + 0.2 * states[7])
+        / ((prepared[37] * states[1]) ** 4 + 1.0)
+    )
+    x3 = 1.0 / (math.exp(prepared[28] * states[0]) + 1.0)
+    x4 = (
+        prepared[33]
+        * math.log(
+            (prepared[31] * x3 + prepared[32])
+            / (prepared[29] * states[1] * x3 + prepared[30])
+        )
+        + states[0]
+    )
+    x5 = 1.0 / states[1]
+    x6 = math.exp(prepared[42] * states[0])
+    x7 = (
+        prepared[50] * math.exp(prepared[49] * states[0])
+        + prepared[51] * states[1] * x6
+    ) / (
+        (math.pow(prepared[40] * x5, prepared[41]) + 1.0)
+        * (prepared[43] * x6 + 1.0)
+        * (
+            prepared[44] * states[1]
+            + prepared[45] * states[1]
+            + prepared[47] * (prepared[46] * states[1] + 1.0)
+            + prepared[48]
+        )
+    )
+    x8 = 0.125 * states[0]
+    x9 = 0.14285714285714285 * states[0]
+    x10 = -1.0 / (227.82355062507335 * math.exp(x9) + 1.0)
+    x11 = -1.0 / (
+        1.0 + 0.18559089326094946 * math.exp(-0.10526315789473684 * states[0])
+    )
+    x12 = -1.0 / (
+        1.0 + 0.17156029276961057 * math.exp(-0.08012820512820512 * states[0])
+    )
+    x13 = 1.0 / (
+        5.44
+        + 29.2 / ((0.02047921359819783 * states[0] + 0.9848453819373337) ** 2 + 1.0)
+    )
+    x14 = 0.49 + 0.51 / (
+        1.0383833630988242 * math.exp(0.03474635163307853 * states[0]) + 1.0
+    )
+    x15 = 1.0 / (
+        1077.0
+        + 185845.0 / ((0.13616557734204793 * states[0] - 5.37037037037037) ** 2 + 1.0)
+    )
+    x16 = 0.5942 / (
+        0.005272106108022878 * math.exp(0.07479431563201197 * states[0]) + 1.0
+    ) + 0.4058 / (320.5696815217901 * math.exp(0.06644518272425248 * states[0]) + 1.0)
+    x17 = -1.0 / (
+        1.0 + 0.07021102001498804 * math.exp(-0.07267441860465117 * states[0])
+    )
+    x18 = -1.0 / (22026.465794806718 * math.exp(0.15873015873015872 * states[0]) + 1.0)
+    x19 = -1.0 / (41.2354467972002 * math.exp(0.17543859649122806 * states[0]) + 1.0)
+    x20 = 0.08605851979345956 * states[0]
+    x21 = x5 * math.exp(prepared[73] * states[0])
+    return [
+        prepared[10] * states[33] * (prepared[9] + states[0])
+        + prepared[12] * states[3] ** 3 * states[4] * (prepared[11] + states[0])
+        + prepared[14] * x1
+        + prepared[15] * states[31] * x0
+        + prepared[16] * states[32] * x0
+        + prepared[17] * states[23] ** 2 * x0 * (0.38 * states[24] + 0.63 * states[25])
+        + prepared[18] * states[26] ** 2 * x0 * (0.75 * states[27] + 0.25 * states[28])
+        + prepared[19] * states[29] * states[30] * x0
+        + prepared[20] * states[17] * states[18] * x0
+        + prepared[21] * states[12] * x0 * (0.8 * states[10] + 0.2 * states[11])
+        + prepared[25]
+        / (
+            prepared[24] * math.exp(prepared[23] * states[0])
+            + 0.1245 * math.exp(prepared[22] * states[0])
+            + 1.0
+        )
+        + prepared[26]
+        * states[15]
+        * states[16]
+        * x0
+        * (0.3 * states[13] + 0.7 * states[14])
+        + prepared[27]
+        * states[21]
+        * states[22]
+        * x0
+        * (0.2 * states[19] + 0.8 * states[20])
+        + prepared[34] * x4
+        + prepared[35] * x4
+        + prepared[36] * x4
+        + prepared[39] * x2
+        + prepared[52] * x7
+        + prepared[6] * x0
+        + prepared[8] * states[34] * (prepared[7] + states[0])
+        - (
+            0.0
+            if (prepared[0] > voi)
+            else (
+                prepared[1]
+                if ((prepared[2] > voi % prepared[3]) or (prepared[4] - voi > 0))
+                else 0.0
+            )
+        ),
+        prepared[55] / (math.pow(prepared[53] * x5, prepared[54]) + 1.0)
+        + prepared[59] * (prepared[56] * x1 + prepared[57] * x4 + prepared[58] * x2)
+        + prepared[60] * x7,
+        (-states[2] + 1.0 / (math.pow(prepared[63] * x5, prepared[62]) + 1.0))
+        / (939.38 + 3060.62 / (math.pow(prepared[61] * states[1], prepared[62]) + 1.0)),
+        (
+            -states[3]
+            + 1.0
+            / (1.0 + 0.020413741940116113 * math.exp(-0.10822358559890391 * states[0]))
+        )
+        / (0.25 + 7.0 / (44.701184493300836 * math.exp(0.1 * states[0]) + 1.0)),
+        (-states[4] + 1.0 / (1242.6481670549956 * math.exp(x8) + 1.0))
+        / (
+            0.9
+            + 1002.85
+            / ((0.6666666666666666 * states[0] + 31.666666666666664) ** 2 + 1.0)
+        ),
+        (-states[5] + 1.0 / (1.0 + 0.0431593092614526 * math.exp(-x9)))
+        / (
+            2.29
+            + 5.7 / ((0.1111111111111111 * states[0] + 3.3299999999999996) ** 2 + 1.0)
+        ),
+        prepared[64] * (-states[6] - x10),
+        (-states[7] - x10)
+        / (
+            90.9699
+            - 90.9699
+            / (
+                (1.0 + 0.06091656667493611 * math.exp(-0.29459419649432905 * states[0]))
+                * (1.3602936750195582 * math.exp(0.02203701336765231 * states[0]) + 1.0)
+            )
+        ),
+        (
+            -states[8]
+            + 1.0
+            / (1.0 + 0.004132526165039484 * math.exp(-0.10121457489878542 * states[0]))
+        )
+        / (
+            0.45
+            + 3.9 / ((0.038461538461538464 * states[0] + 2.5384615384615388) ** 2 + 1.0)
+        ),
+        (
+            -states[9]
+            + 0.02
+            + 0.98
+            / (6770037.888349095 * math.exp(0.21551724137931036 * states[0]) + 1.0)
+        )
+        / (
+            150.0
+            - 150.0
+            / (
+                (
+                    1.0
+                    + 0.000514409608423902 * math.exp(-0.12391573729863692 * states[0])
+                )
+                * (0.1281589858272324 * math.exp(0.00492174426616793 * states[0]) + 1.0)
+            )
+        ),
+        (-states[10] - x11)
+        / (
+            46.0999
+            + 1685.76
+            / (
+                (1.0 + 0.05159562639700062 * math.exp(-0.07256788725853035 * states[0]))
+                * (3.918386601476963 * math.exp(0.06617564339269288 * states[0]) + 1.0)
+            )
+        ),
+        (-states[11] - x11)
+        / (
+            475.667
+            + 16321.6
+            / (
+                (
+                    1.0
+                    + 0.002467243986579835 * math.exp(-0.14353936495314157 * states[0])
+                )
+                * (2.9787131844455406 * math.exp(0.04695960065555603 * states[0]) + 1.0)
+            )
+        ),
+        (
+            -states[12]
+            + 1.0
+            / (7.38905609893065 * math.exp(0.041666666666666664 * states[0]) + 1.0)
+        )
+        / (
+            -0.378843
+            + 19.7864
+            / ((0.02258009158485147 * states[0] + 0.4677149850519794) ** 2 + 1.0)
+        ),
+        (-states[13] - x12)
+        * (
+            0.0025297242600556538
+            * (0.02977076510866329 * states[0] + 1.1342661506400715) ** 2
+            + 0.0025297242600556538
+        ),
+        (-states[14] - x12)
+        / (
+            5503.0
+            + 5345.4 / (math.pow(10.0, 0.02827 * states[0] + 0.675653) + 1.0)
+            - 4590.6 / (math.pow(10.0, -0.0357 * states[0] - 0.505155) + 1.0)
+        ),
+        x13 * (-states[15] + x14),
+        prepared[65]
+        * (
+            -states[16]
+            + 0.34
+            + 0.66
+            / (39.76260227695689 * math.exp(0.08130081300813008 * states[0]) + 1.0)
+        ),
+        (
+            -states[17]
+            + 1.0
+            / (1.0 + 0.41175958388352135 * math.exp(-0.058997050147492625 * states[0]))
+        )
+        / (
+            10.0
+            + 895.9
+            / (1.0 + 0.5597757218525993 * math.exp(-0.03221649484536083 * states[0]))
+        ),
+        x15 * (-states[18] + x16),
+        (-states[19] - x17)
+        / (
+            37.51
+            + 539.0
+            / ((0.05643340857787811 * states[0] + 2.2708803611738153) ** 2 + 1.0)
+        ),
+        prepared[66] * (-states[20] - x17),
+        x13 * (-states[21] + x14),
+        x15 * (-states[22] + x16),
+        (
+            -states[23]
+            + 0.978613
+            / (1.0 + 0.49637710668432194 * math.exp(-0.03750853319130102 * states[0]))
+        )
+        * (0.002 * (0.06333122229259025 * states[0] + 3.844838505383154) ** 2 + 0.002),
+        (-states[24] - x18)
+        * (
+            0.0002 * (0.027885368825830776 * states[0] + 1.748783500784973) ** 2
+            + 0.0002
+        ),
+        (-states[25] - x18)
+        / (
+            30000.0 + 220000.0 / (244.69193226422038 * math.exp(0.25 * states[0]) + 1.0)
+        ),
+        (
+            -states[26]
+            + 0.948
+            / (1.0 + 0.37780784271725576 * math.exp(-0.05434782608695653 * states[0]))
+        )
+        * (0.01 * (0.034879665155214505 * states[0] + 2.2357865364492495) ** 2 + 0.01),
+        (-states[27] - x19)
+        / (
+            1000000.0
+            - 1000000.0
+            / (
+                (1.0 + 8.588511730827894e-05 * math.exp(-x8))
+                * (0.0018363047770289071 * math.exp(0.02 * states[0]) + 1.0)
+            )
+        ),
+        (-states[28] - x19)
+        / (
+            2500000.0
+            - 2500000.0
+            / (
+                (
+                    1.0
+                    + 9.128085116822181e-05 * math.exp(-0.3732527107478118 * states[0])
+                )
+                * (
+                    0.005347167038234146 * math.exp(0.03937131878169391 * states[0])
+                    + 1.0
+                )
+            )
+        ),
+        (
+            -states[29]
+            + 1.0
+            / (1.0 + 0.025449224366457798 * math.exp(-0.1321003963011889 * states[0]))
+        )
+        * (
+            0.058823529411764705
+            * (0.02857142857142857 * states[0] + 0.5863771428571428) ** 2
+            + 0.058823529411764705
+        ),
+        (
+            -states[30]
+            + 0.02
+            + 0.98
+            / (107294.57126320578 * math.exp(0.16666666666666666 * states[0]) + 1.0)
+        )
+        / (
+            7.5
+            + 10.0
+            / ((0.008333333333333333 * states[0] + 0.28480416666666664) ** 2 + 1.0)
+        ),
+        (
+            -states[31]
+            + 1.0
+            / (
+                math.exp(
+                    prepared[28]
+                    * (
+                        -8.38384
+                        / ((prepared[68] * states[1] + 2.0814226778178138) ** 2 + 1.0)
+                        + 0.749234
+                        / ((prepared[67] * states[1] - 0.38935853577206647) ** 2 + 1.0)
+                    )
+                    * (
+                        states[0]
+                        + 37.5137
+                        - 5011.47
+                        / (
+                            math.pow(
+                                prepared[69] * states[1] + 992.5818503999532, 0.42291
+                            )
+                            + 1.0
+                        )
+                    )
+                )
+                + 1.0
+            )
+        )
+        * (
+            0.41508588126883456
+            * (3.044677150587635 - 0.019175565727127863 * states[0]) ** 2
+            + 0.41508588126883456
+        ),
+        (
+            -states[32]
+            + 1.0
+            / (
+                math.exp(
+                    prepared[28]
+                    * (
+                        -1.40001
+                        / ((prepared[71] * states[1] + 0.33390953447425054) ** 2 + 1.0)
+                        + 0.681249
+                        / ((prepared[70] * states[1] - 0.5112540418130668) ** 2 + 1.0)
+                    )
+                    * (
+                        states[0]
+                        + 109.275
+                        - 8540.23
+                        / (
+                            math.pow(
+                                prepared[72] * states[1] + 100.5196497250166, 0.668054
+                            )
+                            + 1.0
+                        )
+                    )
+                )
+                + 1.0
+            )
+        )
+        * (
+            0.07243804735999536
+            * (0.015038679483631901 * states[0] - 2.30120369590587) ** 2
+            + 0.07243804735999536
+        ),
+        (
+            -states[33]
+            + 1.0
+            / (194143.7945420567 * math.exp(0.11553614548311439 * states[0]) + 1.0)
+        )
+        * (
+            0.04003 * math.exp(0.05211 * states[0])
+            + 3.5e-06 * math.exp(-0.0497 * states[0])
+        ),
+        (
+            -states[34]
+            + 1.0
+            / (
+                0.1
+                * (0.0006 * x21 + 3.5999999999999994e-07 * x21**2 + 1.0)
+                * math.exp(prepared[74] * states[0])
+                + 1.0
+            )
+        )
+        / (
+            -160.0
+            + 210.0 / (1.4805695580388407 * math.exp(x20) + 1.0)
+            + 170.0 / (1.0 + 0.11141511764427327 * math.exp(-x20))
+        ),
+    ]
+
+
+def compute_rates_buffer(voi, states, prepared, rates):
+    """Computes the rates of a single simulation into a buffer
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+
+    Args:
+    voi -- float, time in ms.
+    states -- np.array[float], array of states.
+    prepared -- np.array[float], array of prepared values computed by
+    prepare from the constants.
+    rates -- np.array[float], array the rates are written into.
+
+    Returns:
+    rates -- np.array[float], array of computed rates.
+
+    """
+    x0 = prepared[5] + states[0]
+    x1 = states[8] ** 2 * states[9] * (prepared[13] + states[0])
+    x2 = (
+        states[5] ** 2
+        * (prepared[38] + states[0])
+        * (0.8 * states[6] + 0.2 * states[7])
+        / ((prepared[37] * states[1]) ** 4 + 1.0)
+    )
+    x3 = 1.0 / (math.exp(prepared[28] * states[0]) + 1.0)
+    x4 = (
+        prepared[33]
+        * math.log(
+            (prepared[31] * x3 + prepared[32])
+            / (prepared[29] * states[1] * x3 + prepared[30])
+        )
+        + states[0]
+    )
+    x5 = 1.0 / states[1]
+    x6 = math.exp(prepared[42] * states[0])
+    x7 = (
+        prepared[50] * math.exp(prepared[49] * states[0])
+        + prepared[51] * states[1] * x6
+    ) / (
+        (math.pow(prepared[40] * x5, prepared[41]) + 1.0)
+        * (prepared[43] * x6 + 1.0)
+        * (
+            prepared[44] * states[1]
+            + prepared[45] * states[1]
+            + prepared[47] * (prepared[46] * states[1] + 1.0)
+            + prepared[48]
+        )
+    )
+    x8 = 0.125 * states[0]
+    x9 = 0.14285714285714285 * states[0]
+    x10 = -1.0 / (227.82355062507335 * math.exp(x9) + 1.0)
+    x11 = -1.0 / (
+        1.0 + 0.18559089326094946 * math.exp(-0.10526315789473684 * states[0])
+    )
+    x12 = -1.0 / (
+        1.0 + 0.17156029276961057 * math.exp(-0.08012820512820512 * states[0])
+    )
+    x13 = 1.0 / (
+        5.44
+        + 29.2 / ((0.02047921359819783 * states[0] + 0.9848453819373337) ** 2 + 1.0)
+    )
+    x14 = 0.49 + 0.51 / (
+        1.0383833630988242 * math.exp(0.03474635163307853 * states[0]) + 1.0
+    )
+    x15 = 1.0 / (
+        1077.0
+        + 185845.0 / ((0.13616557734204793 * states[0] - 5.37037037037037) ** 2 + 1.0)
+    )
+    x16 = 0.5942 / (
+        0.005272106108022878 * math.exp(0.07479431563201197 * states[0]) + 1.0
+    ) + 0.4058 / (320.5696815217901 * math.exp(0.06644518272425248 * states[0]) + 1.0)
+    x17 = -1.0 / (
+        1.0 + 0.07021102001498804 * math.exp(-0.07267441860465117 * states[0])
+    )
+    x18 = -1.0 / (22026.465794806718 * math.exp(0.15873015873015872 * states[0]) + 1.0)
+    x19 = -1.0 / (41.2354467972002 * math.exp(0.17543859649122806 * states[0]) + 1.0)
+    x20 = 0.08605851979345956 * states[0]
+    x21 = x5 * math.exp(prepared[73] * states[0])
+    rates[0] = (
+        prepared[10] * states[33] * (prepared[9] + states[0])
+        + prepared[12] * states[3] ** 3 * states[4] * (prepared[11] + states[0])
+        + prepared[14] * x1
+        + prepared[15] * states[31] * x0
+        + prepared[16] * states[32] * x0
+        + prepared[17] * states[23] ** 2 * x0 * (0.38 * states[24] + 0.63 * states[25])
+        + prepared[18] * states[26] ** 2 * x0 * (0.75 * states[27] + 0.25 * states[28])
+        + prepared[19] * states[29] * states[30] * x0
+        + prepared[20] * states[17] * states[18] * x0
+        + prepared[21] * states[12] * x0 * (0.8 * states[10] + 0.2 * states[11])
+        + prepared[25]
+        / (
+            prepared[24] * math.exp(prepared[23] * states[0])
+            + 0.1245 * math.exp(prepared[22] * states[0])
+            + 1.0
+        )
+        + prepared[26]
+        * states[15]
+        * states[16]
+        * x0
+        * (0.3 * states[13] + 0.7 * states[14])
+        + prepared[27]
+        * states[21]
+        * states[22]
+        * x0
+        * (0.2 * states[19] + 0.8 * states[20])
+        + prepared[34] * x4
+        + prepared[35] * x4
+        + prepared[36] * x4
+        + prepared[39] * x2
+        + prepared[52] * x7
+        + prepared[6] * x0
+        + prepared[8] * states[34] * (prepared[7] + states[0])
+        - (
+            0.0
+            if (prepared[0] > voi)
+            else (
+                prepared[1]
+                if ((prepared[2] > voi % prepared[3]) or (prepared[4] - voi > 0))
+                else 0.0
+            )
+        )
+    )
+    rates[1] = (
+        prepared[55] / (math.pow(prepared[53] * x5, prepared[54]) + 1.0)
+        + prepared[59] * (prepared[56] * x1 + prepared[57] * x4 + prepared[58] * x2)
+        + prepared[60] * x7
+    )
+    rates[2] = (
+        -states[2] + 1.0 / (math.pow(prepared[63] * x5, prepared[62]) + 1.0)
+    ) / (939.38 + 3060.62 / (math.pow(prepared[61] * states[1], prepared[62]) + 1.0))
+    rates[3] = (
+        -states[3]
+        + 1.0
+        / (1.0 + 0.020413741940116113 * math.exp(-0.10822358559890391 * states[0]))
+    ) / (0.25 + 7.0 / (44.701184493300836 * math.exp(0.1 * states[0]) + 1.0))
+    rates[4] = (-states[4] + 1.0 / (1242.6481670549956 * math.exp(x8) + 1.0)) / (
+        0.9
+        + 1002.85 / ((0.6666666666666666 * states[0] + 31.666666666666664) ** 2 + 1.0)
+    )
+    rates[5] = (-states[5] + 1.0 / (1.0 + 0.0431593092614526 * math.exp(-x9))) / (
+        2.29 + 5.7 / ((0.1111111111111111 * states[0] + 3.3299999999999996) ** 2 + 1.0)
+    )
+    rates[6] = prepared[64] * (-states[6] - x10)
+    rates[7] = (-states[7] - x10) / (
+        90.9699
+        - 90.9699
+        / (
+            (1.0 + 0.06091656667493611 * math.exp(-0.29459419649432905 * states[0]))
+            * (1.3602936750195582 * math.exp(0.02203701336765231 * states[0]) + 1.0)
+        )
+    )
+    rates[8] = (
+        -states[8]
+        + 1.0
+        / (1.0 + 0.004132526165039484 * math.exp(-0.10121457489878542 * states[0]))
+    ) / (
+        0.45
+        + 3.9 / ((0.038461538461538464 * states[0] + 2.5384615384615388) ** 2 + 1.0)
+    )
+    rates[9] = (
+        -states[9]
+        + 0.02
+        + 0.98 / (6770037.888349095 * math.exp(0.21551724137931036 * states[0]) + 1.0)
+    ) / (
+        150.0
+        - 150.0
+        / (
+            (1.0 + 0.000514409608423902 * math.exp(-0.12391573729863692 * states[0]))
+            * (0.1281589858272324 * math.exp(0.00492174426616793 * states[0]) + 1.0)
+        )
+    )
+    rates[10] = (-states[10] - x11) / (
+        46.0999
+        + 1685.76
+        / (
+            (1.0 + 0.05159562639700062 * math.exp(-0.07256788725853035 * states[0]))
+            * (3.918386601476963 * math.exp(0.06617564339269288 * states[0]) + 1.0)
+        )
+    )
+    rates[11] = (-states[11] - x11) / (
+        475.667
+        + 16321.6
+        / (
+            (1.0 + 0.002467243986579835 * math.exp(-0.14353936495314157 * states[0]))
+            * (2.9787131844455406 * math.exp(0.04695960065555603 * states[0]) + 1.0)
+        )
+    )
+    rates[12] = (
+        -states[12]
+        + 1.0 / (7.38905609893065 * math.exp(0.041666666666666664 * states[0]) + 1.0)
+    ) / (
+        -0.378843
+        + 19.7864 / ((0.02258009158485147 * states[0] + 0.4677149850519794) ** 2 + 1.0)
+    )
+    rates[13] = (-states[13] - x12) * (
+        0.0025297242600556538
+        * (0.02977076510866329 * states[0] + 1.1342661506400715) ** 2
+        + 0.0025297242600556538
+    )
+    rates[14] = (-states[14] - x12) / (
+        5503.0
+        + 5345.4 / (math.pow(10.0, 0.02827 * states[0] + 0.675653) + 1.0)
+        - 4590.6 / (math.pow(10.0, -0.0357 * states[0] - 0.505155) + 1.0)
+    )
+    rates[15] = x13 * (-states[15] + x14)
+    rates[16] = prepared[65] * (
+        -states[16]
+        + 0.34
+        + 0.66 / (39.76260227695689 * math.exp(0.08130081300813008 * states[0]) + 1.0)
+    )
+    rates[17] = (
+        -states[17]
+        + 1.0
+        / (1.0 + 0.41175958388352135 * math.exp(-0.058997050147492625 * states[0]))
+    ) / (
+        10.0
+        + 895.9
+        / (1.0 + 0.5597757218525993 * math.exp(-0.03221649484536083 * states[0]))
+    )
+    rates[18] = x15 * (-states[18] + x16)
+    rates[19] = (-states[19] - x17) / (
+        37.51
+        + 539.0 / ((0.05643340857787811 * states[0] + 2.2708803611738153) ** 2 + 1.0)
+    )
+    rates[20] = prepared[66] * (-states[20] - x17)
+    rates[21] = x13 * (-states[21] + x14)
+    rates[22] = x15 * (-states[22] + x16)
+    rates[23] = (
+        -states[23]
+        + 0.978613
+        / (1.0 + 0.49637710668432194 * math.exp(-0.03750853319130102 * states[0]))
+    ) * (0.002 * (0.06333122229259025 * states[0] + 3.844838505383154) ** 2 + 0.002)
+    rates[24] = (-states[24] - x18) * (
+        0.0002 * (0.027885368825830776 * states[0] + 1.748783500784973) ** 2 + 0.0002
+    )
+    rates[25] = (-states[25] - x18) / (
+        30000.0 + 220000.0 / (244.69193226422038 * math.exp(0.25 * states[0]) + 1.0)
+    )
+    rates[26] = (
+        -states[26]
+        + 0.948
+        / (1.0 + 0.37780784271725576 * math.exp(-0.05434782608695653 * states[0]))
+    ) * (0.01 * (0.034879665155214505 * states[0] + 2.2357865364492495) ** 2 + 0.01)
+    rates[27] = (-states[27] - x19) / (
+        1000000.0
+        - 1000000.0
+        / (
+            (1.0 + 8.588511730827894e-05 * math.exp(-x8))
+            * (0.0018363047770289071 * math.exp(0.02 * states[0]) + 1.0)
+        )
+    )
+    rates[28] = (-states[28] - x19) / (
+        2500000.0
+        - 2500000.0
+        / (
+            (1.0 + 9.128085116822181e-05 * math.exp(-0.3732527107478118 * states[0]))
+            * (0.005347167038234146 * math.exp(0.03937131878169391 * states[0]) + 1.0)
+        )
+    )
+    rates[29] = (
+        -states[29]
+        + 1.0 / (1.0 + 0.025449224366457798 * math.exp(-0.1321003963011889 * states[0]))
+    ) * (
+        0.058823529411764705
+        * (0.02857142857142857 * states[0] + 0.5863771428571428) ** 2
+        + 0.058823529411764705
+    )
+    rates[30] = (
+        -states[30]
+        + 0.02
+        + 0.98 / (107294.57126320578 * math.exp(0.16666666666666666 * states[0]) + 1.0)
+    ) / (
+        7.5
+        + 10.0 / ((0.008333333333333333 * states[0] + 0.28480416666666664) ** 2 + 1.0)
+    )
+    rates[31] = (
+        -states[31]
+        + 1.0
+        / (
+            math.exp(
+                prepared[28]
+                * (
+                    -8.38384
+                    / ((prepared[68] * states[1] + 2.0814226778178138) ** 2 + 1.0)
+                    + 0.749234
+                    / ((prepared[67] * states[1] - 0.38935853577206647) ** 2 + 1.0)
+                )
+                * (
+                    states[0]
+                    + 37.5137
+                    - 5011.47
+                    / (
+                        math.pow(prepared[69] * states[1] + 992.5818503999532, 0.42291)
+                        + 1.0
+                    )
+                )
+            )
+            + 1.0
+        )
+    ) * (
+        0.41508588126883456
+        * (3.044677150587635 - 0.019175565727127863 * states[0]) ** 2
+        + 0.41508588126883456
+    )
+    rates[32] = (
+        -states[32]
+        + 1.0
+        / (
+            math.exp(
+                prepared[28]
+                * (
+                    -1.40001
+                    / ((prepared[71] * states[1] + 0.33390953447425054) ** 2 + 1.0)
+                    + 0.681249
+                    / ((prepared[70] * states[1] - 0.5112540418130668) ** 2 + 1.0)
+                )
+                * (
+                    states[0]
+                    + 109.275
+                    - 8540.23
+                    / (
+                        math.pow(prepared[72] * states[1] + 100.5196497250166, 0.668054)
+                        + 1.0
+                    )
+                )
+            )
+            + 1.0
+        )
+    ) * (
+        0.07243804735999536 * (0.015038679483631901 * states[0] - 2.30120369590587) ** 2
+        + 0.07243804735999536
+    )
+    rates[33] = (
+        -states[33]
+        + 1.0 / (194143.7945420567 * math.exp(0.11553614548311439 * states[0]) + 1.0)
+    ) * (
+        0.04003 * math.exp(0.05211 * states[0])
+        + 3.5e-06 * math.exp(-0.0497 * states[0])
+    )
+    rates[34] = (
+        -states[34]
+        + 1.0
+        / (
+            0.1
+            * (0.0006 * x21 + 3.5999999999999994e-07 * x21**2 + 1.0)
+            * math.exp(prepared[74] * states[0])
+            + 1.0
+        )
+    ) / (
+        -160.0
+        + 210.0 / (1.4805695580388407 * math.exp(x20) + 1.0)
+        + 170.0 / (1.0 + 0.11141511764427327 * math.exp(-x20))
+    )
+    return rates
+
+
+def prepare(constants):
+    """Evaluates the constant subexpressions of the rates
+
+    Generated from compute_rates by conversion.codegen, do not edit.
+    The prepared values need to be computed again when the constants
+    change.
+
+    Args:
+    constants -- list[int], list of constant values.
+
+    Returns:
+    prepared -- list[float], list of prepared values for
+    compute_rates_kernel.
+
+    Raises:
+    OverflowError -- if an exponential overflows.
+    ZeroDivisionError -- if a denominator is zero.
+    ValueError -- if a power or logarithm is not defined.
+
+    """
+    constants = np.asarray(constants, dtype=float).tolist()
+    x0 = constants[72] / (constants[71] * constants[74])
+    x1 = 4.0 * constants[38]
+    x2 = 1.0 / constants[72]
+    x3 = constants[35] * constants[60]
+    x4 = constants[40] * constants[61] * x3
+    x5 = 1.0 * constants[17]
+    x6 = constants[64] ** 3
+    x7 = constants[59] ** 3
+    x8 = constants[12] * x7
+    x9 = constants[10] * constants[84]
+    return [
+        constants[0],
+        constants[3],
+        constants[2],
+        constants[1] + constants[2],
+        constants[0] + constants[2],
+        -constants[78],
+        -constants[23],
+        -constants[79],
+        -constants[33],
+        -constants[83],
+        -constants[34],
+        -constants[77],
+        -constants[16],
+        -constants[21],
+        -constants[20],
+        -constants[22] * constants[26],
+        -constants[22] * constants[27],
+        -constants[24],
+        -constants[25],
+        -constants[28],
+        -constants[30],
+        -constants[32],
+        -0.1 * x0,
+        -1.9 * x0,
+        0.00219 * math.exp(0.020116676725005028 * constants[64]),
+        -1.0 * constants[75] * constants[87] * constants[88],
+        -constants[29],
+        -constants[31],
+        x0,
+        x1,
+        constants[11] * constants[36] + constants[37] * constants[59],
+        constants[12] * x1,
+        constants[36] * constants[63] + constants[37] * constants[64],
+        -constants[71] * constants[74] * x2,
+        -x4,
+        -constants[41] * constants[67] * x3,
+        -constants[42] * constants[65] * x3,
+        (1.0 / constants[19]),
+        -constants[18],
+        -x5,
+        constants[47],
+        constants[48],
+        x0 * (constants[86] - 1.0),
+        constants[85],
+        constants[51] ** 3,
+        x6,
+        (1.0 / constants[50]),
+        constants[12] * constants[49] ** 3,
+        constants[50] * x6 * ((constants[59] / constants[49]) ** 3 + 1.0)
+        + constants[52] * x7
+        + x8,
+        constants[86] * x0,
+        x8,
+        -x6,
+        -0.5
+        * constants[70]
+        * constants[72]
+        * constants[9]
+        * x9
+        / (constants[68] * constants[69] * constants[73]),
+        constants[45],
+        constants[46],
+        -constants[44],
+        constants[20],
+        x4,
+        x5,
+        -constants[68] * constants[69] * constants[73] * x2 / constants[70],
+        -1.0 * x9,
+        1 / (constants[5] * constants[54]),
+        constants[55],
+        constants[5] * constants[54],
+        (1.0 / constants[56]),
+        (1.0 / constants[57]),
+        (1.0 / constants[58]),
+        6.175050326660162 * constants[6],
+        0.001353075608511928 * constants[6],
+        4179.239211293976 * constants[6],
+        2.3346212660651124 * constants[7],
+        0.0014599691070536947 * constants[7],
+        250.55435150269975 * constants[7],
+        2.53 * x0,
+        -5.0 * x0,
+    ]
+
+
 def compute_algebraic(constants, states, voi):
     """Computes algebraics of the system
 
@@ -932,7 +3248,7 @@ def compute_algebraic(constants, states, voi):
     algebraic -- np.array[float], list of computed algebraics.
 
     """
-    algebraic = np.array([[0.0] * len(voi)] * sizeAlgebraic)
+    algebraic = np.zeros((sizeAlgebraic, len(voi)))
     states = np.array(states)
     voi = np.array(voi)
     algebraic[6] = 1.00000 / (1.00000 + np.exp((states[0] + 38.0000) / 7.00000))
@@ -1355,7 +3671,15 @@ def custom_piecewise(cases):
     return np.select(cases[0::2], cases[1::2])
 
 
-def solve_model(init_states, constants, start=0, end=15000):
+def solve_model(
+    init_states,
+    constants,
+    start=0,
+    end=15000,
+    output_dt=1.0,
+    record=None,
+    **options,
+):
     """Solve model with ODE solver
 
     Args:
@@ -1363,36 +3687,46 @@ def solve_model(init_states, constants, start=0, end=15000):
     constants -- list[int], list of constant values.
     start -- int, start time in ms for the simulation, default value 0.
     end -- int, end time in ms for the simulation, default value 15000.
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    record -- list, names or indices of the states to record, default value
+    None for all the states.
+    options -- dict, solver options {integrator, steady_tol, tile,
+    checkpoint, resume, max_step, atol, rtol}, see solver.solve, the
+    settings recommended for the model are used by default.
 
     Returns:
+    voi -- np.array, timesteps in ms.
+    states -- np.array, simulation data of the recorded states.
+    algebraic -- function, computes the requested algebraic variables over a
+    time window, see solver.compute_algebraic, None if only some of the states
+    are recorded.
+
+    Raises:
+    KeyError -- if an option is not valid, see solver.check_options.
+    IntegrationError -- if the integrator fails, see solver.solve.
 
     """
-    # Set timespan to solve over
-    nb_steps = end - start
-    voi = np.linspace(start, end, nb_steps)
-
-    # Construct ODE object to solve
-    r = ode(compute_rates)
-    r.set_integrator(
-        SOLVER,
-        method=METHOD,
-        atol=ATOL,
-        rtol=RTOL,
-        max_step=MAX_STEP,
-    )
-    r.set_initial_value(init_states, voi[0])
-    r.set_f_params(constants)
-
-    # Solve model
-    states = np.array([[0.0] * len(voi)] * sizeStates)
-    states[:, 0] = init_states
-    for i, t in enumerate(voi[1:]):
-        if r.successful():
-            r.integrate(t)
-            states[:, i + 1] = r.y
-        else:
-            break
-
-    # Compute algebraic variables
-    algebraic = compute_algebraic(constants, states, voi)
+    solver.check_options(options)
+    voi, states = solver.solve(
+        sys.modules[__name__],
+        init_states,
+        constants,
+        start,
+        end,
+        output_dt=output_dt,
+        record=record,
+        **options,
+    )
+
+    if record is not None:
+        # The algebraic variables depend on all the states
+        return (voi, states, None)
+
+    # Algebraic variables are only computed on request
+    algebraic = solver.lazy_algebraic(
+        sys.modules[__name__],
+        constants,
+        states,
+        voi,
+    )
     return (voi, states, algebraic)
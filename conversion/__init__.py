@@ -11,7 +11,16 @@ Modules:
 - constants: Constants used in the project.
 - plots: Plotting functions.
 - simulation: Functions for running simulations.
+- solver: Functions for solving the cell models.
+- cell_model: Object interface to the cell models.
+- backend: Compilation of the rates kernels with Numba.
+- cache: Functions for caching simulation results on disk.
+- steady_state: Pre-pacing of the cell models to their periodic steady state.
+- checkpoint: Functions for checkpointing long simulations.
 - script_fct: Functions called by the main scripts.
+- codegen: Code generation for the cell models.
+- cellml: Generation of the cell model modules from the CellML files.
+- benchmark: Functions for benchmarking the cell models.
 - Tong2011: Pregnant uterine cell model using Tong 2011 model.
 - Tong2014: Pregnant uterine cell model using Tong 2014 model.
 - Means2023: Pregnant uterine cell model using Means 2023 model.
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+backend.py
+
+Functions for compiling the rates kernels of the cell models
+Author: Mathias Roesler
+Date: 10/26
+
+The backend is selected with BACKEND in constants.py or with the
+CONVERSION_BACKEND environment variable. With the "numba" backend the
+generated compute_rates_buffer function of a model is compiled with Numba,
+the "python" backend or a missing numba package use the Python kernel.
+"""
+
+import sys
+import importlib.util
+
+from conversion.constants import BACKEND
+
+# Backends that can be selected
+BACKENDS = {"python", "numba"}
+
+# Compiled kernels by model module name
+_KERNELS = {}
+
+
+def numba_available():
+    """Checks if numba is installed without importing it
+
+    Args:
+
+    Returns:
+    available -- bool, True if numba can be imported.
+
+    """
+    return importlib.util.find_spec("numba") is not None
+
+
+def select_backend(backend=None):
+    """Selects the backend used to evaluate the rates
+
+    The Python backend is used instead of Numba if numba is not installed.
+
+    Args:
+    backend -- str, backend to use instead of BACKEND, default value None.
+
+    Returns:
+    backend -- str, selected backend {"python", "numba"}.
+
+    Raises:
+    ValueError -- if the backend is not valid.
+
+    """
+    if backend is None:
+        backend = BACKEND
+
+    if backend not in BACKENDS:
+        raise ValueError(f"{backend} is not a valid backend {BACKENDS}")
+
+    if backend == "numba" and not numba_available():
+        sys.stderr.write(
+            "Warning: numba is not installed, using the python backend\n"
+        )
+        return "python"
+
+    return backend
+
+
+def numba_kernels(model):
+    """Compiles the rates kernels of a model with Numba
+
+    The kernels are compiled once per model and follow the numpy error model
+    so that overflows return inf instead of raising an exception. They write
+    the rates into a preallocated buffer so that no array is allocated by
+    the integrator calls. The kernel is the compute_rates_buffer function
+    generated in the model module by conversion.codegen.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+
+    Returns:
+    kernel -- function, compiled kernel with arguments (voi, states,
+    prepared, rates) that writes the rates into rates and returns it.
+    batch_kernel -- function, compiled kernel with arguments (voi, states,
+    prepared, rates) where states, prepared and rates have the shapes
+    (nb_batch, sizeStates), (nb_batch, len(prepared)) and (nb_batch,
+    sizeStates).
+
+    Raises:
+    ImportError -- if numba is not installed.
+    AttributeError -- if the model has no compute_rates_buffer function.
+
+    """
+    if model.__name__ in _KERNELS:
+        return _KERNELS[model.__name__]
+
+    try:
+        import numba
+    except ImportError:
+        raise ImportError("numba is required to compile the kernels")
+
+    kernel = numba.njit(error_model="numpy")(model.compute_rates_buffer)
+
+    @numba.njit(error_model="numpy")
+    def batch_kernel(voi, states, prepared, rates):
+        for j in range(states.shape[0]):
+            kernel(voi, states[j], prepared[j], rates[j])
+        return rates
+
+    _KERNELS[model.__name__] = (kernel, batch_kernel)
+    return kernel, batch_kernel
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark.py
+
+Functions for benchmarking the cell models
+Author: Mathias Roesler
+Date: 10/26
+"""
+
+import os
+import json
+import time
+import tracemalloc
+import timeit
+import importlib
+
+import numpy as np
+
+from conversion import backend, metrics, solver
+from conversion.constants import SOLVER_CONFIG
+
+# Functions of the model modules that evaluate the rates
+RATES_FUNCTIONS = ("compute_rates", "compute_rates_kernel")
+
+# Integrators and tolerances compared by benchmark_solvers
+SOLVER_INTEGRATORS = ("vode", "lsoda", "odeint", "BDF", "Radau", "LSODA")
+SOLVER_TOLERANCES = (1e-5, 1e-6, 1e-7, 1e-8)
+REFERENCE_TOL = 1e-10  # Tolerance of the reference simulation
+ERROR_METRICS = ("l2", "rmse", "mae")
+MAX_DEVIATION = 0.01  # Deviation in mV allowed by recommend_settings
+
+
+def time_call(function, number=1000, repeat=5):
+    """Measures the time of a single call to a function
+
+    The best of the repeats is kept to remove the noise of the system.
+
+    Args:
+    function -- function, function without arguments to time.
+    number -- int, number of calls per repeat, default value 1000.
+    repeat -- int, number of repeats, default value 5.
+
+    Returns:
+    duration -- float, time of a single call in s.
+
+    Raises:
+    ValueError -- if number or repeat is not positive.
+
+    """
+    if number < 1 or repeat < 1:
+        raise ValueError("number and repeat must be positive")
+
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def benchmark_rates(model_name, voi=0.0, number=1000, repeat=5):
+    """Measures the time of a single evaluation of the rates of a model
+
+    Args:
+    model_name -- str, name of the model {"Roesler2024", "Means2023",
+    "Tong2011", "Tong2014"}.
+    voi -- float, time in ms at which the rates are evaluated, default
+    value 0.
+    number -- int, number of calls per repeat, default value 1000.
+    repeat -- int, number of repeats, default value 5.
+
+    Returns:
+    timings -- dict, time of a single call in s for each rates function of
+    the model.
+
+    Raises:
+    ModuleNotFoundError -- if the model is not found.
+    ValueError -- if number or repeat is not positive.
+
+    """
+    model = importlib.import_module(f"conversion.{model_name}")
+    states, constants = model.init_consts()
+    states = np.array(states, dtype=float)
+
+    timings = {}
+    for name in RATES_FUNCTIONS:
+        function = getattr(model, name, None)
+        if function is None:
+            continue
+
+        if name == "compute_rates_kernel":
+            # The kernel reads the constants prepared once per simulation
+            arguments = (voi, states, model.prepare(constants))
+        else:
+            arguments = (voi, states, constants)
+
+        timings[name] = time_call(lambda: function(*arguments), number, repeat)
+
+    return timings
+
+
+def peak_allocation(function):
+    """Measures the memory allocated during a call to a function
+
+    Args:
+    function -- function, function without arguments to call.
+
+    Returns:
+    size -- int, peak memory in bytes allocated by the call.
+
+    """
+    tracemalloc.start()
+    try:
+        function()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return peak - baseline
+
+
+def benchmark_buffers(model_name, voi=0.0, number=1000, repeat=5):
+    """Compares the rates kernels with and without preallocated buffers
+
+    The Python kernel returns a new list that is converted to an array as
+    done by the integrators. The Numba kernel is timed with a new output
+    array at every call and with a preallocated buffer, it is skipped if
+    numba is not installed.
+
+    Args:
+    model_name -- str, name of the model {"Roesler2024", "Means2023",
+    "Tong2011", "Tong2014"}.
+    voi -- float, time in ms at which the rates are evaluated, default
+    value 0.
+    number -- int, number of calls per repeat, default value 1000.
+    repeat -- int, number of repeats, default value 5.
+
+    Returns:
+    results -- dict, time of a single call in s and memory in bytes
+    allocated by a call for each kernel.
+
+    Raises:
+    ModuleNotFoundError -- if the model is not found.
+    ValueError -- if number or repeat is not positive.
+
+    """
+    model = importlib.import_module(f"conversion.{model_name}")
+    states, constants = model.init_consts()
+    states = np.array(states, dtype=float)
+    prepared = model.prepare(constants)
+
+    kernels = {
+        "python_list": lambda: np.asarray(
+            model.compute_rates_kernel(voi, states, prepared)
+        ),
+    }
+
+    if backend.numba_available():
+        kernel, _ = backend.numba_kernels(model)
+        prepared = np.array(prepared)
+        buffer = np.empty(model.sizeStates)
+        kernels["numba_allocated"] = lambda: kernel(
+            voi, states, prepared, np.empty(model.sizeStates)
+        )
+        kernels["numba_buffer"] = lambda: kernel(voi, states, prepared, buffer)
+
+    results = {}
+    for name, function in kernels.items():
+        # Call once so that the compilation is not timed
+        function()
+        results[name] = (
+            time_call(function, number, repeat),
+            peak_allocation(function),
+        )
+
+    return results
+
+
+class CountedModel:
+    """Model module that counts the evaluations of its rates and Jacobian"""
+
+    def __init__(self, model):
+        """Wraps the model module
+
+        The Numba kernels are compiled from the compute_rates_buffer
+        function of the model so their calls are not counted.
+
+        Args:
+        model -- module, model module from {Roesler2024, Means2023,
+        Tong2011, Tong2014}.
+
+        """
+        self.model = model
+        self.rhs_evaluations = 0
+        self.jacobian_evaluations = 0
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def compute_rates(self, voi, states, constants):
+        self.rhs_evaluations += 1
+        return self.model.compute_rates(voi, states, constants)
+
+    def compute_rates_kernel(self, voi, states, prepared):
+        self.rhs_evaluations += 1
+        return self.model.compute_rates_kernel(voi, states, prepared)
+
+    def compute_jacobian(self, voi, states, constants):
+        self.jacobian_evaluations += 1
+        return self.model.compute_jacobian(voi, states, constants)
+
+
+def benchmark_solvers(
+    model_name,
+    integrators=SOLVER_INTEGRATORS,
+    tolerances=SOLVER_TOLERANCES,
+    end=15000,
+    output_dt=1.0,
+    metric="rmse",
+):
+    """Compares the integrators and tolerances on a simulation of a model
+
+    Each integrator is run with the same absolute and relative tolerance and
+    the membrane potential is compared to a reference simulation with vode
+    and REFERENCE_TOL. A failed integration has no counts or deviation. The
+    compiled kernels of the numba backend cannot be counted so the rates
+    evaluations are None with that backend.
+
+    Args:
+    model_name -- str, name of the model {"Roesler2024", "Means2023",
+    "Tong2011", "Tong2014"}.
+    integrators -- list[str], integrators to compare, default value
+    SOLVER_INTEGRATORS.
+    tolerances -- list[float], tolerances to compare, default value
+    SOLVER_TOLERANCES.
+    end -- float, end time in ms for the simulations, default value 15000.
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    metric -- str, name of the error metric from {l2, rmse, mae}, default
+    value "rmse".
+
+    Returns:
+    results -- list[dict], one result per integrator and tolerance with keys
+    {integrator, tol, time, rhs_evaluations, jacobian_evaluations,
+    deviation}, the time is in s.
+
+    Raises:
+    ModuleNotFoundError -- if the model is not found.
+    ValueError -- if the metric is not one of {l2, rmse, mae}.
+    IntegrationError -- if the reference simulation fails.
+
+    """
+    if metric not in ERROR_METRICS:
+        raise ValueError(f"{metric} is not one of {ERROR_METRICS}")
+
+    # The Numba kernels do not go through CountedModel
+    count_rates = backend.select_backend() == "python"
+
+    model = importlib.import_module(f"conversion.{model_name}")
+    states, constants = model.init_consts()
+    options = {"end": end, "output_dt": output_dt, "record": ["v"]}
+
+    _, reference = solver.solve(
+        model,
+        states,
+        constants,
+        integrator="vode",
+        atol=REFERENCE_TOL,
+        rtol=REFERENCE_TOL,
+        **options,
+    )
+
+    results = []
+    for integrator in integrators:
+        for tol in tolerances:
+            counted = CountedModel(model)
+            result = {"integrator": integrator, "tol": tol}
+
+            start = time.perf_counter()
+            try:
+                voi, data = solver.solve(
+                    counted,
+                    states,
+                    constants,
+                    integrator=integrator,
+                    atol=tol,
+                    rtol=tol,
+                    **options,
+                )
+            except solver.IntegrationError:
+                result.update(
+                    time=time.perf_counter() - start,
+                    rhs_evaluations=None,
+                    jacobian_evaluations=None,
+                    deviation=None,
+                )
+            else:
+                result.update(
+                    time=time.perf_counter() - start,
+                    rhs_evaluations=(
+                        counted.rhs_evaluations if count_rates else None
+                    ),
+                    jacobian_evaluations=counted.jacobian_evaluations,
+                    deviation=float(
+                        metrics.compute_comparison(
+                            reference[0], data[0], metric, time=voi
+                        )
+                    ),
+                )
+
+            results.append(result)
+
+    return results
+
+
+def recommend_settings(results, max_deviation=MAX_DEVIATION):
+    """Selects the fastest solver settings within a deviation
+
+    Args:
+    results -- list[dict], results of benchmark_solvers.
+    max_deviation -- float, largest deviation from the reference allowed,
+    default value MAX_DEVIATION.
+
+    Returns:
+    settings -- dict, solver settings with keys {integrator, atol, rtol},
+    None if no result is within max_deviation.
+
+    """
+    valid = [
+        result
+        for result in results
+        if result["deviation"] is not None
+        and result["deviation"] <= max_deviation
+    ]
+
+    if not valid:
+        return None
+
+    best = min(valid, key=lambda result: result["time"])
+    return {
+        "integrator": best["integrator"],
+        "atol": best["tol"],
+        "rtol": best["tol"],
+    }
+
+
+def save_solver_config(model_name, settings, path=None):
+    """Saves the recommended solver settings of a model
+
+    The settings of the other models in the configuration file are kept,
+    they are read by solver.model_settings.
+
+    Args:
+    model_name -- str, name of the model {"Roesler2024", "Means2023",
+    "Tong2011", "Tong2014"}.
+    settings -- dict, solver settings with keys {integrator, atol, rtol}.
+    path -- str, path to the configuration file instead of SOLVER_CONFIG,
+    default value None.
+
+    Returns:
+
+    """
+    if path is None:
+        path = SOLVER_CONFIG
+
+    config = {}
+    if os.path.isfile(path):
+        with open(path, "r") as handle:
+            config = json.load(handle)
+
+    config[model_name] = settings
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as handle:
+        json.dump(config, handle, indent=4, sort_keys=True)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cache.py
+
+Functions for caching simulation results on disk
+Author: Mathias Roesler
+Date: 10/26
+
+The results are stored in CACHE_DIR under a hash of everything that
+determines the simulation output. The least recently used results are
+removed when the cache grows over CACHE_SIZE.
+"""
+
+import os
+import sys
+import pickle
+import inspect
+import hashlib
+
+import numpy as np
+
+from conversion import __version__, utils, backend
+from conversion.constants import (
+    SOLVER,
+    METHOD,
+    ATOL,
+    RTOL,
+    MAX_STEP,
+    RL_STEP,
+    CACHE_DIR,
+    CACHE_SIZE,
+)
+
+
+def simulation_key(model, init_states, constants, start, end, **options):
+    """Computes the cache key of a simulation
+
+    The source of the model module is part of the key so that editing or
+    regenerating a model invalidates its results.
+
+    Args:
+    model -- module, model module of the simulation.
+    init_states -- list[float], list of initial states.
+    constants -- list[int], list of constant values.
+    start -- float, start time in ms for the simulation.
+    end -- float, end time in ms for the simulation.
+    options -- additional settings that change the simulation output.
+
+    Returns:
+    key -- str, hexadecimal hash of the simulation.
+
+    """
+    settings = (
+        model.__name__,
+        float(start),
+        float(end),
+        SOLVER,
+        METHOD,
+        ATOL,
+        RTOL,
+        MAX_STEP,
+        RL_STEP,
+        # The numba kernels round differently from the Python kernels
+        backend.BACKEND if backend.numba_available() else "python",
+        __version__,
+        sorted(options.items()),
+    )
+
+    digest = hashlib.sha256(repr(settings).encode("utf-8"))
+
+    with open(inspect.getsourcefile(model), "rb") as handle:
+        digest.update(hashlib.sha256(handle.read()).digest())
+
+    digest.update(np.asarray(init_states, dtype=float).tobytes())
+    digest.update(np.asarray(constants, dtype=float).tobytes())
+
+    return digest.hexdigest()
+
+
+def cache_path(key):
+    """Gets the path of a cached simulation
+
+    Args:
+    key -- str, cache key of the simulation.
+
+    Returns:
+    path -- str, path to the cached file.
+
+    """
+    return os.path.join(CACHE_DIR, f"{key}.pkl")
+
+
+def load_simulation(key, final=False):
+    """Loads a cached simulation
+
+    Loading a simulation marks it as the most recently used. A corrupt
+    entry is removed and treated as a missing simulation.
+
+    Args:
+    key -- str, cache key of the simulation.
+    final -- bool, flag used to also return the states at the last timestep,
+    default value False.
+
+    Returns:
+    voi -- np.array, timesteps in ms, None if the simulation is not cached.
+    states -- np.array, simulation data, None if the simulation is not
+    cached.
+    final_states -- np.array, states at the last timestep, None if they were
+    not cached, only returned if final is set.
+
+    """
+    path = cache_path(key)
+
+    try:
+        data = utils.load_data(path)
+        os.utime(path)
+    except FileNotFoundError:
+        data = {"time": None, "data": None}
+    except (EOFError, pickle.UnpicklingError, ValueError) as e:
+        sys.stderr.write(f"Warning: removing corrupt cache entry: {e}\n")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        data = {"time": None, "data": None}
+
+    if final:
+        return data["time"], data["data"], data.get("final_states")
+    return data["time"], data["data"]
+
+
+def store_simulation(key, voi, states, final_states=None):
+    """Stores a simulation in the cache and evicts old simulations
+
+    Failing to write to the cache only results in a warning.
+
+    Args:
+    key -- str, cache key of the simulation.
+    voi -- np.array, timesteps in ms.
+    states -- np.array, simulation data.
+    final_states -- np.array, states at the last timestep, default value
+    None.
+
+    Returns:
+
+    """
+    try:
+        utils.save_data_atomic(
+            {"time": voi, "data": states, "final_states": final_states},
+            cache_path(key),
+        )
+
+        evict(CACHE_SIZE)
+    except OSError as e:
+        sys.stderr.write(f"Warning: simulation not cached: {e}\n")
+
+
+def evict(max_size):
+    """Removes the least recently used simulations until the cache size is
+    below max_size
+
+    Args:
+    max_size -- int, maximum size of the cache in bytes.
+
+    Returns:
+
+    """
+    entries = []
+
+    for entry in os.scandir(CACHE_DIR):
+        if not entry.name.endswith(".pkl"):
+            continue
+        try:
+            stats = entry.stat()
+        except FileNotFoundError:
+            continue  # Removed by another process
+        entries.append((stats.st_mtime, stats.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
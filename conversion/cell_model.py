@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cell_model.py
+
+Object interface to the cell models
+Author: Mathias Roesler
+Date: 10/26
+
+A CellModel holds the states and constants of a model as read-only numpy
+arrays with the solver configuration. Changing parameters or options
+returns a new CellModel that shares the unchanged arrays. The model modules
+are registered by name and only imported when they are first requested.
+"""
+
+import importlib
+
+import numpy as np
+
+from collections.abc import Mapping
+
+from conversion import utils
+
+
+class ModelRegistry(Mapping):
+    """Model modules by name, imported when they are first requested"""
+
+    __slots__ = ("_paths", "_modules")
+
+    def __init__(self):
+        """Creates an empty registry"""
+        self._paths = {}
+        self._modules = {}
+
+    def __getitem__(self, name):
+        """Gets a model module and imports it if needed
+
+        Args:
+        name -- str, name of the model.
+
+        Returns:
+        module -- module, model module.
+
+        Raises:
+        KeyError -- if the model is not registered.
+
+        """
+        if name not in self._modules:
+            self._modules[name] = importlib.import_module(self._paths[name])
+
+        return self._modules[name]
+
+    def __contains__(self, name):
+        # Checks the registered names without importing the module
+        return name in self._paths
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def register(self, name, module):
+        """Registers a model module under a name
+
+        Args:
+        name -- str, name of the model.
+        module -- module or str, model module or its import path, the
+        module is imported on first use if a path is given.
+
+        Returns:
+
+        """
+        if isinstance(module, str):
+            self._paths[name] = module
+            self._modules.pop(name, None)
+        else:
+            self._paths[name] = module.__name__
+            self._modules[name] = module
+
+    def is_loaded(self, name):
+        """Checks if a model module has already been imported
+
+        Args:
+        name -- str, name of the model.
+
+        Returns:
+        loaded -- bool, True if the module has been imported.
+
+        """
+        return name in self._modules
+
+
+class CellModel:
+    """Cell model with its initial states, constants and solver options"""
+
+    __slots__ = (
+        "name",
+        "module",
+        "states",
+        "constants",
+        "integrator",
+        "output_dt",
+        "record",
+    )
+
+    # Model modules registered by name
+    registry = ModelRegistry()
+
+    def __init__(
+        self,
+        name,
+        module,
+        states,
+        constants,
+        integrator=None,
+        output_dt=1.0,
+        record=("v",),
+    ):
+        """Creates the cell model
+
+        Args:
+        name -- str, name of the model.
+        module -- module, model module from {Roesler2024, Means2023,
+        Tong2011, Tong2014}.
+        states -- list[float], list of initial states.
+        constants -- list[int], list of constant values.
+        integrator -- str, solver to use instead of SOLVER, default value
+        None.
+        output_dt -- float, interval in ms between two outputs, default
+        value 1.
+        record -- list, names or indices of the states to record, None for
+        all the states, default value ("v",).
+
+        Raises:
+        ValueError -- if the number of states or constants is incorrect.
+        ValueError -- if output_dt is not positive.
+
+        """
+        states = np.array(states, dtype=float)
+        constants = np.array(constants, dtype=float)
+
+        if states.shape != (module.sizeStates,):
+            raise ValueError(f"{name} requires {module.sizeStates} states")
+        if constants.shape != (module.sizeConstants,):
+            raise ValueError(
+                f"{name} requires {module.sizeConstants} constants"
+            )
+        if output_dt <= 0:
+            raise ValueError("output_dt must be greater than 0")
+
+        # The arrays are shared between models so they must not change
+        states.setflags(write=False)
+        constants.setflags(write=False)
+
+        self.name = name
+        self.module = module
+        self.states = states
+        self.constants = constants
+        self.integrator = integrator
+        self.output_dt = output_dt
+        self.record = record
+
+    def __repr__(self):
+        return f"CellModel({self.name!r})"
+
+    def __getitem__(self, name):
+        """Gets the value of a constant from its name
+
+        Args:
+        name -- str, name of the constant.
+
+        Returns:
+        value -- float, value of the constant.
+
+        Raises:
+        IndexError -- if the constant is not found.
+
+        """
+        if name not in self.module.constantIndices:
+            raise IndexError(f"{name} was not found in parameter list")
+
+        return float(self.constants[self.module.constantIndices[name]])
+
+    @classmethod
+    def register(cls, name, module):
+        """Registers a model module under a name
+
+        Args:
+        name -- str, name of the model.
+        module -- module or str, model module or its import path.
+
+        Returns:
+
+        """
+        cls.registry.register(name, module)
+
+    @classmethod
+    def load(cls, name, estrus="", **options):
+        """Creates a registered model with its initial states and constants
+
+        Args:
+        name -- str, name of the model {"Roesler2024", "Means2023",
+        "Tong2011", "Tong2014"}.
+        estrus -- str, estrus stage for the Roesler2024 model, default value
+        "".
+        options -- dict, solver options {integrator, output_dt, record}.
+
+        Returns:
+        model -- CellModel, cell model.
+
+        Raises:
+        ValueError -- if the model name is incorrect.
+        KeyError -- if the estrus stage is incorrect.
+
+        """
+        if name not in cls.registry:
+            raise ValueError(f"{name} incorrect model name")
+
+        module = cls.registry[name]
+        states, constants = module.init_consts()
+
+        if name == "Roesler2024":
+            # Set estrus specific parameters
+            constants = utils.set_estrus_params(
+                constants, None, estrus, module
+            )
+
+        return cls(name, module, states, constants, **options)
+
+    def _copy(self, **changes):
+        """Creates a copy of the model that shares the unchanged attributes
+
+        Args:
+        changes -- dict, attributes to change.
+
+        Returns:
+        model -- CellModel, copy of the model.
+
+        """
+        model = object.__new__(type(self))
+        for attribute in self.__slots__:
+            setattr(
+                model,
+                attribute,
+                changes.get(attribute, getattr(self, attribute)),
+            )
+
+        return model
+
+    def with_params(self, **params):
+        """Creates a copy of the model with new parameter values
+
+        The derived constants that depend on the parameters are updated and
+        the states are shared with the original model.
+
+        Args:
+        params -- dict, new values of the parameters by name.
+
+        Returns:
+        model -- CellModel, copy of the model with the new parameters.
+
+        Raises:
+        IndexError -- if a parameter is not found.
+
+        """
+        constants = self.constants.copy()
+        utils.set_params(
+            constants, None, list(params), list(params.values()), self.module
+        )
+        constants.setflags(write=False)
+
+        return self._copy(constants=constants)
+
+    def with_options(self, **options):
+        """Creates a copy of the model with new solver options
+
+        Args:
+        options -- dict, solver options {integrator, output_dt, record}.
+
+        Returns:
+        model -- CellModel, copy of the model with the new options.
+
+        Raises:
+        KeyError -- if an option is not valid.
+        ValueError -- if output_dt is not positive.
+
+        """
+        for option in options:
+            if option not in ("integrator", "output_dt", "record"):
+                raise KeyError(f"{option} is not a valid solver option")
+        if options.get("output_dt", self.output_dt) <= 0:
+            raise ValueError("output_dt must be greater than 0")
+
+        return self._copy(**options)
+
+    def simulate(self, start=0, end=15000, **options):
+        """Runs a simulation of the model
+
+        The simulation is run by simulation.run_simulation so it is cached
+        on disk like the simulations of the scripts.
+
+        Args:
+        start -- float, start time in ms for the simulation, default value 0.
+        end -- float, end time in ms for the simulation, default value 15000.
+        options -- dict, simulation options {use_cache, prepace, steady_tol,
+        tile, checkpoint, resume, final, continue_from, integrator,
+        max_step, output_dt, record}, see simulation.run_simulation. The
+        options override the settings of the model.
+
+        Returns:
+        voi -- np.array, timesteps in ms.
+        states -- np.array, simulation data of the recorded states in the
+        order of record.
+        final_states -- np.array, states at the last timestep, only returned
+        if final is set.
+
+        Raises:
+        ValueError -- if the start number is less than 0.
+        ValueError -- if the end number is smaller than start value.
+        IndexError -- if a recorded state is not found.
+
+        """
+        # simulation imports this module
+        from conversion import simulation
+
+        defaults = {
+            "output_dt": self.output_dt,
+            "record": self.record,
+            "integrator": self.integrator,
+        }
+
+        return simulation.run_simulation(
+            self, start, end, **{**defaults, **options}
+        )
+
+    def simulate_batch(self, param, values, start=0, end=15000, **options):
+        """Runs a simulation for each value of a parameter as a single batch
+
+        Args:
+        param -- str, name of the parameter to sweep over.
+        values -- np.array, array of values to sweep over.
+        start -- float, start time in ms for the simulation, default value 0.
+        end -- float, end time in ms for the simulation, default value 15000.
+        options -- dict, simulation options {integrator, max_step, atol,
+        rtol, output_dt, record}, see simulation.run_batch. The options
+        override the settings of the model.
+
+        Returns:
+        voi -- np.array, timesteps in ms.
+        states -- np.array, simulation data of shape
+        (len(record), len(values), len(voi)).
+
+        Raises:
+        ValueError -- if the start number is less than 0.
+        ValueError -- if the end number is smaller than start value.
+        IndexError -- if the parameter or a recorded state is not valid.
+
+        """
+        # simulation imports this module
+        from conversion import simulation
+
+        defaults = {
+            "output_dt": self.output_dt,
+            "record": self.record,
+            "integrator": self.integrator,
+        }
+
+        return simulation.run_batch(
+            self, param, values, start, end, **{**defaults, **options}
+        )
+
+
+CellModel.register("Tong2011", "conversion.Tong2011")
+CellModel.register("Tong2014", "conversion.Tong2014")
+CellModel.register("Means2023", "conversion.Means2023")
+CellModel.register("Roesler2024", "conversion.Roesler2024")
@@ -0,0 +1,706 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cellml.py
+
+CellML to Python conversion functions for the cell models
+Author: Mathias Roesler
+Date: 10/26
+
+The CellML 1.0 files in cells/ are parsed into symbolic equations and a
+model module is generated with the same API as the exported model modules.
+Only the MathML elements used by the cell models are supported. sympy is only
+required to generate code, not to run the generated modules.
+"""
+
+import os
+import xml.etree.ElementTree as ET
+
+from conversion import codegen
+from conversion.codegen import ModelPrinter, format_source
+
+try:
+    import sympy as sp
+except ImportError:  # pragma: no cover
+    sp = None
+
+# Directory containing the CellML files of the models
+CELLS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cells")
+
+CELLML_NS = "{http://www.cellml.org/cellml/1.0#}"
+MATHML_NS = "{http://www.w3.org/1998/Math/MathML}"
+
+
+class CellMLModel:
+    """Symbolic equations of a CellML model
+
+    Attributes:
+    name -- str, name of the model.
+    voi -- sp.Symbol, variable of integration.
+    states -- list[sp.Symbol], state variables in document order.
+    constants -- list[sp.Symbol], constants followed by computed constants.
+    algebraic -- list[sp.Symbol], algebraic variables in evaluation order.
+    initial_values -- dict, initial value of the states and constants.
+    equations -- dict, expression of each computed constant and algebraic
+    variable.
+    rates -- dict, expression of the derivative of each state.
+    legends -- dict, legend of each variable.
+
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.voi = None
+        self.states = []
+        self.constants = []
+        self.algebraic = []
+        self.initial_values = {}
+        self.equations = {}
+        self.rates = {}
+        self.legends = {}
+
+
+def _apply(operator, args):
+    """Converts a MathML apply element to a sympy expression
+
+    Args:
+    operator -- str, name of the MathML operator.
+    args -- list[sp.Expr], list of converted arguments.
+
+    Returns:
+    expr -- sp.Expr, sympy expression.
+
+    Raises:
+    ValueError -- if the operator is not supported.
+
+    """
+    match operator:
+        case "plus":
+            return sp.Add(*args)
+        case "minus":
+            return -args[0] if len(args) == 1 else args[0] - args[1]
+        case "times":
+            return sp.Mul(*args)
+        case "divide":
+            return args[0] / args[1]
+        case "power":
+            return sp.Pow(args[0], args[1])
+        case "exp":
+            return sp.exp(args[0])
+        case "ln":
+            return sp.log(args[0])
+        case "abs":
+            return sp.Abs(args[0])
+        case "rem":
+            return sp.Mod(args[0], args[1])
+        case "lt":
+            return sp.StrictLessThan(args[0], args[1])
+        case "gt":
+            return sp.StrictGreaterThan(args[0], args[1])
+        case "leq":
+            return sp.LessThan(args[0], args[1])
+        case "geq":
+            return sp.GreaterThan(args[0], args[1])
+        case "and":
+            return sp.And(*args)
+        case "or":
+            return sp.Or(*args)
+        case _:
+            raise ValueError(f"unsupported MathML operator {operator}")
+
+
+def _mathml(element, symbols):
+    """Converts a MathML element to a sympy expression
+
+    Args:
+    element -- ET.Element, MathML element.
+    symbols -- dict, mapping between the variable names of the component and
+    their symbols.
+
+    Returns:
+    expr -- sp.Expr, sympy expression.
+
+    Raises:
+    ValueError -- if the element is not supported.
+    KeyError -- if a variable is not declared in the component.
+
+    """
+    tag = element.tag.replace(MATHML_NS, "")
+
+    match tag:
+        case "ci":
+            return symbols[element.text.strip()]
+        case "cn":
+            return sp.Float(float(element.text.strip()))
+        case "apply":
+            operator, *args = list(element)
+            return _apply(
+                operator.tag.replace(MATHML_NS, ""),
+                [_mathml(arg, symbols) for arg in args],
+            )
+        case "piecewise":
+            pieces = []
+            for child in element:
+                if child.tag == f"{MATHML_NS}piece":
+                    value, condition = list(child)
+                    pieces.append(
+                        (_mathml(value, symbols), _mathml(condition, symbols))
+                    )
+                else:
+                    pieces.append((_mathml(child[0], symbols), sp.true))
+            return sp.Piecewise(*pieces)
+        case _:
+            raise ValueError(f"unsupported MathML element {tag}")
+
+
+def _find(parent, names):
+    """Finds the representative of a connected variable
+
+    Args:
+    parent -- dict, mapping between variables and their parent variable.
+    names -- tuple, (component, variable) names of the variable.
+
+    Returns:
+    root -- tuple, (component, variable) names of the representative.
+
+    """
+    while parent[names] != names:
+        parent[names] = parent[parent[names]]
+        names = parent[names]
+    return names
+
+
+def parse_cellml(cellml_file):
+    """Parses a CellML 1.0 file into symbolic equations
+
+    Args:
+    cellml_file -- str, path to the CellML file.
+
+    Returns:
+    model -- CellMLModel, symbolic equations of the model.
+
+    Raises:
+    ImportError -- if sympy is not installed.
+    ValueError -- if the file contains unsupported MathML.
+
+    """
+    codegen.require_sympy()
+
+    root = ET.parse(cellml_file).getroot()
+    model = CellMLModel(root.get("name"))
+
+    # Variables of each component
+    parent = {}
+    declarations = {}
+    for component in root.iter(f"{CELLML_NS}component"):
+        for variable in component.iter(f"{CELLML_NS}variable"):
+            names = (component.get("name"), variable.get("name"))
+            parent[names] = names
+            declarations[names] = variable
+
+    # Connected variables share the same representative
+    for connection in root.iter(f"{CELLML_NS}connection"):
+        components = connection.find(f"{CELLML_NS}map_components")
+        for mapping in connection.iter(f"{CELLML_NS}map_variables"):
+            first = _find(
+                parent,
+                (components.get("component_1"), mapping.get("variable_1")),
+            )
+            second = _find(
+                parent,
+                (components.get("component_2"), mapping.get("variable_2")),
+            )
+            parent[second] = first
+
+    # The source of a connected set is the variable without an in interface
+    sources = {}
+    for names, variable in declarations.items():
+        interfaces = (
+            variable.get("public_interface"),
+            variable.get("private_interface"),
+        )
+        if "in" not in interfaces:
+            sources[_find(parent, names)] = names
+
+    symbols = {}
+    for names, variable in declarations.items():
+        source = sources[_find(parent, names)]
+        if source not in symbols:
+            symbols[source] = sp.Symbol(f"{source[0]}__{source[1]}")
+            unit = declarations[source].get("units")
+            model.legends[symbols[source]] = (
+                f"{source[1]} in component {source[0]} ({unit})"
+            )
+        symbols[names] = symbols[source]
+
+        value = variable.get("initial_value")
+        if value is not None:
+            model.initial_values[symbols[source]] = float(value)
+
+    # Equations of each component
+    for component in root.iter(f"{CELLML_NS}component"):
+        local = {
+            name: symbols[(component.get("name"), name)]
+            for component_name, name in declarations
+            if component_name == component.get("name")
+        }
+
+        for math in component.iter(f"{MATHML_NS}math"):
+            for equation in math.findall(f"{MATHML_NS}apply"):
+                _, lhs, rhs = list(equation)
+
+                if lhs.tag == f"{MATHML_NS}apply":
+                    # Derivative of a state
+                    _, bvar, state = list(lhs)
+                    model.voi = local[bvar[0].text.strip()]
+                    state = local[state.text.strip()]
+                    model.states.append(state)
+                    model.rates[state] = _mathml(rhs, local)
+                else:
+                    model.equations[local[lhs.text.strip()]] = _mathml(
+                        rhs,
+                        local,
+                    )
+
+    _classify(model)
+    return model
+
+
+def _classify(model):
+    """Sorts the variables of a model into constants and algebraic variables
+
+    Computed constants only depend on constants and are evaluated once. The
+    algebraic variables are sorted so that each one only depends on the
+    previous ones.
+
+    Args:
+    model -- CellMLModel, symbolic equations of the model.
+
+    Returns:
+
+    Raises:
+    ValueError -- if the equations contain a cycle.
+
+    """
+    model.constants = [
+        symbol
+        for symbol in model.initial_values
+        if symbol not in model.rates
+        and symbol not in model.equations
+        and symbol != model.voi
+    ]
+
+    known = set(model.constants)
+    changed = True
+    while changed:
+        changed = False
+        for symbol, expr in model.equations.items():
+            if symbol not in known and expr.free_symbols <= known:
+                model.constants.append(symbol)
+                known.add(symbol)
+                changed = True
+
+    visiting = set()
+
+    def visit(symbol):
+        if symbol in known or symbol not in model.equations:
+            return
+        if symbol in visiting:
+            raise ValueError(f"cyclic equations for {symbol}")
+
+        visiting.add(symbol)
+        for dependency in model.equations[symbol].free_symbols:
+            visit(dependency)
+        visiting.remove(symbol)
+
+        known.add(symbol)
+        model.algebraic.append(symbol)
+
+    for symbol in model.equations:
+        visit(symbol)
+
+
+def _names(model):
+    """Creates the mapping between the model symbols and the printed names
+
+    Args:
+    model -- CellMLModel, symbolic equations of the model.
+
+    Returns:
+    names -- dict, mapping between symbols and printed names.
+
+    """
+    names = {model.voi: "voi"}
+    names.update({s: f"states[{i}]" for i, s in enumerate(model.states)})
+    names.update({c: f"constants[{i}]" for i, c in enumerate(model.constants)})
+    names.update({a: f"algebraic[{i}]" for i, a in enumerate(model.algebraic)})
+    return names
+
+
+def symbolic_rates(model):
+    """Expresses the rates of a model with the states and constants only
+
+    Args:
+    model -- CellMLModel, symbolic equations of the model.
+
+    Returns:
+    rates -- list[sp.Expr], list of rates in the order of the states.
+
+    """
+    substitutions = {}
+    for symbol in model.algebraic:
+        substitutions[symbol] = model.equations[symbol].xreplace(substitutions)
+
+    return [
+        model.rates[state].xreplace(substitutions) for state in model.states
+    ]
+
+
+def _legends_source(model):
+    """Creates the source of the create_legends function
+
+    Args:
+    model -- CellMLModel, symbolic equations of the model.
+
+    Returns:
+    lines -- list[str], source lines of the function.
+
+    """
+    lines = [
+        "def create_legends():",
+        '    """Creates the lists of legends',
+        "",
+        "    Args:",
+        "",
+        "    Returns:",
+        "    legend_states -- list[str], list of legends for states.",
+        "    legend_algebraic -- list[str], list of legends for algebraic.",
+        "    legend_voi -- list[str], list of legends for voi.",
+        "    legend_constants -- list[str], list of legends for constants.",
+        "",
+        '    """',
+        "    legend_states = [''] * sizeStates",
+        "    legend_algebraic = [''] * sizeAlgebraic",
+        "    legend_constants = [''] * sizeConstants",
+        f"    legend_voi = {model.legends[model.voi]!r}",
+    ]
+    for kind, symbols in (
+        ("states", model.states),
+        ("algebraic", model.algebraic),
+        ("constants", model.constants),
+    ):
+        for i, symbol in enumerate(symbols):
+            lines.append(f"    legend_{kind}[{i}] = {model.legends[symbol]!r}")
+
+    lines.append(
+        "    return (legend_states, legend_algebraic, legend_voi, "
+        "legend_constants)"
+    )
+    return lines
+
+
+def _init_source(model, printer):
+    """Creates the source of the init_consts function
+
+    Args:
+    model -- CellMLModel, symbolic equations of the model.
+    printer -- ModelPrinter, printer of the expressions.
+
+    Returns:
+    lines -- list[str], source lines of the function.
+
+    """
+    lines = [
+        "def init_consts():",
+        '    """Initialises the constants',
+        "",
+        "    Args:",
+        "",
+        "    Returns:",
+        "    states -- list[float], list of states.",
+        "    constants -- list[int], list of constants.",
+        "",
+        '    """',
+        "    constants = [0.0] * sizeConstants",
+        "    states = [0.0] * sizeStates",
+    ]
+    for i, state in enumerate(model.states):
+        lines.append(f"    states[{i}] = {model.initial_values[state]!r}")
+    for i, constant in enumerate(model.constants):
+        if constant in model.equations:
+            value = printer.doprint(model.equations[constant])
+        else:
+            value = repr(model.initial_values[constant])
+        lines.append(f"    constants[{i}] = {value}")
+
+    lines.append("    return (states, constants)")
+    return lines
+
+
+def _rates_source(model, rates, printer):
+    """Creates the source of the compute_rates function
+
+    Args:
+    model -- CellMLModel, symbolic equations of the model.
+    rates -- list[sp.Expr], list of rates in the order of the states.
+    printer -- ModelPrinter, printer of the expressions.
+
+    Returns:
+    lines -- list[str], source lines of the function.
+
+    """
+    replacements, reduced = sp.cse(rates, symbols=sp.numbered_symbols("x"))
+
+    lines = [
+        "def compute_rates(voi, states, constants):",
+        '    """Computes rates of the system',
+        "",
+        "    The states and constants can also be arrays of shape (sizeStates,",
+        "    nb_batch) and (sizeConstants, nb_batch) to compute the rates of a",
+        "    batch of simulations at once.",
+        "",
+        "    Args:",
+        "    voi -- float, time in ms.",
+        "    states -- list[float], list of states.",
+        "    constants -- list[int], list of constant values.",
+        "",
+        "    Returns:",
+        "    rates -- np.array[float], array of computed rates.",
+        "",
+        '    """',
+        "    rates = np.zeros(np.shape(states))",
+    ]
+    for symbol, expr in replacements:
+        lines.append(f"    {symbol} = {printer.doprint(expr)}")
+    for i, expr in enumerate(reduced):
+        lines.append(f"    rates[{i}] = {printer.doprint(expr)}")
+
+    lines.append("    return rates")
+    return lines
+
+
+def _algebraic_source(model, printer):
+    """Creates the source of the compute_algebraic function
+
+    Args:
+    model -- CellMLModel, symbolic equations of the model.
+    printer -- ModelPrinter, printer of the expressions.
+
+    Returns:
+    lines -- list[str], source lines of the function.
+
+    """
+    lines = [
+        "def compute_algebraic(constants, states, voi):",
+        '    """Computes algebraics of the system',
+        "",
+        "    Args:",
+        "    constants -- list[int], list of constant values.",
+        "    states -- list[float], list of states.",
+        "    voi -- list[float], list of voi.",
+        "",
+        "    Returns:",
+        "    algebraic -- np.array[float], list of computed algebraics.",
+        "",
+        '    """',
+        "    voi = np.asarray(voi)",
+        "    algebraic = np.zeros((sizeAlgebraic,) + voi.shape)",
+        "    states = np.asarray(states)",
+    ]
+    for i, symbol in enumerate(model.algebraic):
+        lines.append(
+            f"    algebraic[{i}] = {printer.doprint(model.equations[symbol])}"
+        )
+
+    lines.append("    return algebraic")
+    return lines
+
+
+MODULE_FOOTER = '''
+def custom_piecewise(cases):
+    """Computes the result of a piecewise function
+
+    Args:
+    cases -- list, list of piece cases.
+
+    Returns:
+
+    """
+    return np.select(cases[0::2], cases[1::2])
+
+
+def solve_model(
+    init_states,
+    constants,
+    start=0,
+    end=15000,
+    output_dt=1.0,
+    record=None,
+    **options,
+):
+    """Solve model with ODE solver
+
+    Args:
+    init_states -- list[float], list of initial states.
+    constants -- list[int], list of constant values.
+    start -- int, start time in ms for the simulation, default value 0.
+    end -- int, end time in ms for the simulation, default value 15000.
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    record -- list, names or indices of the states to record, default value
+    None for all the states.
+    options -- dict, solver options {integrator, steady_tol, tile,
+    checkpoint, resume, max_step, atol, rtol}, see solver.solve, the
+    settings recommended for the model are used by default.
+
+    Returns:
+    voi -- np.array, timesteps in ms.
+    states -- np.array, simulation data of the recorded states.
+    algebraic -- function, computes the requested algebraic variables over a
+    time window, see solver.compute_algebraic, None if only some of the states
+    are recorded.
+
+    Raises:
+    KeyError -- if an option is not valid, see solver.check_options.
+    IntegrationError -- if the integrator fails, see solver.solve.
+
+    """
+    solver.check_options(options)
+    voi, states = solver.solve(
+        sys.modules[__name__],
+        init_states,
+        constants,
+        start,
+        end,
+        output_dt=output_dt,
+        record=record,
+        **options,
+    )
+
+    if record is not None:
+        # The algebraic variables depend on all the states
+        return (voi, states, None)
+
+    # Algebraic variables are only computed on request
+    algebraic = solver.lazy_algebraic(
+        sys.modules[__name__],
+        constants,
+        states,
+        voi,
+    )
+    return (voi, states, algebraic)
+'''
+
+
+def generate_module(cellml_file):
+    """Generates the source of a model module from a CellML file
+
+    The rates are expressed with the states and constants only and their
+    common subexpressions are evaluated once. The computed constants are
+    evaluated once in init_consts and numerical subexpressions are folded.
+
+    Args:
+    cellml_file -- str, path to the CellML file.
+
+    Returns:
+    source -- str, source code of the model module.
+
+    Raises:
+    ImportError -- if sympy is not installed.
+    ValueError -- if the file contains unsupported MathML.
+
+    """
+    model = parse_cellml(cellml_file)
+    printer = ModelPrinter(_names(model))
+    rates = symbolic_rates(model)
+
+    header = [
+        "#!/usr/bin/env python3",
+        "# -*- coding: utf-8 -*-",
+        '"""',
+        f"{model.name}.py",
+        "",
+        f"{model.name} cell model Python version",
+        "Generated from the CellML file by conversion.cellml, do not edit.",
+        '"""',
+        "",
+        "import sys",
+        "import math",
+        "",
+        "import numpy as np",
+        "",
+        "from conversion import solver",
+        "",
+        f"sizeAlgebraic = {len(model.algebraic)}",
+        f"sizeStates = {len(model.states)}",
+        f"sizeConstants = {len(model.constants)}",
+        codegen.gate_states_source(model.states, rates),
+    ]
+
+    init = _init_source(model, printer)
+    derived = codegen.derived_constants("\n".join(init))
+    header.append(codegen.derived_constants_source(derived))
+    for name, symbols in (
+        ("stateIndices", model.states),
+        ("algebraicIndices", model.algebraic),
+        ("constantIndices", model.constants),
+    ):
+        legends = [model.legends[symbol] for symbol in symbols]
+        header.append(codegen.indices_source(name, legends))
+
+    sections = [
+        "\n".join(header),
+        "\n".join(_legends_source(model)) + "\n",
+        "\n".join(init) + "\n",
+        codegen.compute_derived_source(derived),
+        "\n".join(_rates_source(model, rates, printer)) + "\n",
+    ]
+    # The kernel prints the time symbol with its own name
+    voi = {model.voi: sp.Symbol("voi")}
+    sections.append(
+        codegen.prepare_source(model.states, model.constants, rates)
+    )
+    sections.append(
+        codegen.rates_kernel_source(
+            model.states,
+            model.constants,
+            [rate.xreplace(voi) for rate in rates],
+        )
+    )
+    sections.append(
+        codegen.rates_kernel_source(
+            model.states,
+            model.constants,
+            [rate.xreplace(voi) for rate in rates],
+            buffer=True,
+        )
+    )
+    sections.append(
+        codegen.jacobian_source(model.states, model.constants, rates)
+    )
+    sections.append(
+        codegen.jacobian_diagonal_source(model.states, model.constants, rates)
+    )
+    sections.append("\n".join(_algebraic_source(model, printer)) + "\n")
+    sections.append(MODULE_FOOTER)
+
+    return format_source("\n\n".join(sections))
+
+
+def write_module(cellml_file, module_file):
+    """Generates a model module from a CellML file and writes it
+
+    Args:
+    cellml_file -- str, path to the CellML file.
+    module_file -- str, path to the model module file to write.
+
+    Returns:
+
+    Raises:
+    ImportError -- if sympy is not installed.
+    ValueError -- if the file contains unsupported MathML.
+
+    """
+    source = generate_module(cellml_file)
+
+    with open(module_file, "w", encoding="utf-8") as handler:
+        handler.write(source)
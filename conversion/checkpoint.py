@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+checkpoint.py
+
+Functions for checkpointing long simulations
+Author: Mathias Roesler
+Date: 10/26
+
+A checkpoint holds the time and full state vector of the integrator with
+the outputs computed so far. It is stored under a key computed from the
+model, initial states, constants and solver settings, without the end time,
+so that a simulation can be resumed or extended to a longer end.
+"""
+
+import sys
+
+import numpy as np
+
+from conversion import utils, cache
+
+
+def checkpoint_key(model, init_states, constants, start, **options):
+    """Computes the key of the checkpoints of a simulation
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    init_states -- list[float], list of initial states.
+    constants -- list[float], list of constant values.
+    start -- float, start time in ms for the simulation.
+    options -- additional settings that change the simulation output.
+
+    Returns:
+    key -- str, hexadecimal hash of the simulation.
+
+    """
+    # The end time is left out so that a checkpoint can be extended
+    return cache.simulation_key(
+        model, init_states, constants, start, np.inf, **options
+    )
+
+
+def save_checkpoint(path, key, time, states, voi, data):
+    """Saves a checkpoint of a simulation
+
+    Failing to write the checkpoint only results in a warning.
+
+    Args:
+    path -- str, path to the checkpoint file.
+    key -- str, key of the simulation.
+    time -- float, time in ms of the checkpoint.
+    states -- np.array, states of the model at time.
+    voi -- np.array, timesteps in ms of the outputs up to time.
+    data -- np.array, simulation data of the recorded states up to time.
+
+    Returns:
+
+    """
+    checkpoint = {
+        "key": key,
+        "time": time,
+        "states": states,
+        "voi": voi,
+        "data": data,
+    }
+
+    try:
+        # A killed run keeps the last checkpoint
+        utils.save_data_atomic(checkpoint, path)
+    except OSError as e:
+        sys.stderr.write(f"Warning: checkpoint not saved: {e}\n")
+
+
+def load_checkpoint(path, key):
+    """Loads the checkpoint of a simulation
+
+    A checkpoint of another simulation is ignored with a warning.
+
+    Args:
+    path -- str, path to the checkpoint file.
+    key -- str, key of the simulation.
+
+    Returns:
+    checkpoint -- dict, checkpoint with keys {time, states, voi, data},
+    None if there is no checkpoint of the simulation.
+
+    """
+    try:
+        checkpoint = utils.load_data(path)
+    except (FileNotFoundError, EOFError):
+        return None
+
+    if checkpoint["key"] != key:
+        sys.stderr.write(
+            f"Warning: {path} is the checkpoint of another simulation\n"
+        )
+        return None
+
+    return checkpoint
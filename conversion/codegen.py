@@ -0,0 +1,1056 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+codegen.py
+
+Code generation functions for the cell models
+Author: Mathias Roesler
+Date: 10/26
+
+The model equations are traced symbolically from the compute_rates function
+of a model module and the derived functions are written back into the module
+source. The derived constants are read from the source of the init_consts
+function. sympy is only required to generate code, not to run the models.
+"""
+
+import re
+import ast
+import types
+
+try:
+    import sympy as sp
+    from sympy.printing.pycode import PythonCodePrinter
+    from sympy.functions.elementary.piecewise import ExprCondPair
+except ImportError:  # pragma: no cover
+    sp = None
+    ExprCondPair = None
+    PythonCodePrinter = object
+
+
+def require_sympy():
+    """Checks that sympy is installed to generate code
+
+    Args:
+
+    Returns:
+
+    Raises:
+    ImportError -- if sympy is not installed.
+
+    """
+    if sp is None:
+        raise ImportError(
+            "sympy is required to generate model code, install it with "
+            "pip3 install -e .[codegen]"
+        )
+
+
+# Value of a generated module variable, a list, a dictionary or a single line
+_VARIABLE_VALUE = r"(\[[^\]]*\]|\{[^}]*\}|[^\n]*)"
+
+
+class _SymbolicNumpy:
+    """Replacement for the numpy functions used in the model equations"""
+
+    @staticmethod
+    def exp(x):
+        return sp.exp(x)
+
+    @staticmethod
+    def log(x):
+        return sp.log(x)
+
+    @staticmethod
+    def power(x, y):
+        return sp.Pow(x, y)
+
+    @staticmethod
+    def less(x, y):
+        return sp.StrictLessThan(x, y)
+
+    @staticmethod
+    def greater(x, y):
+        return sp.StrictGreaterThan(x, y)
+
+
+def _symbolic_piecewise(cases):
+    """Symbolic version of the custom_piecewise function of the models
+
+    Args:
+    cases -- list, list of piece cases.
+
+    Returns:
+    piecewise -- sp.Piecewise, symbolic piecewise function.
+
+    """
+    conditions = [sp.true if c is True else c for c in cases[0::2]]
+    return sp.Piecewise(*zip(cases[1::2], conditions))
+
+
+class ModelPrinter(PythonCodePrinter):
+    """Prints sympy expressions with the conventions of the model modules"""
+
+    def __init__(self, names, settings=None):
+        """Creates the printer
+
+        Args:
+        names -- dict, mapping between the symbols and their printed names.
+        settings -- dict, sympy printer settings, default value None.
+
+        """
+        super().__init__(settings)
+        self._names = names
+
+    def _print_Symbol(self, expr):
+        return self._names.get(expr, expr.name)
+
+    def _print_Float(self, expr):
+        return repr(float(expr))
+
+    def _print_Rational(self, expr):
+        return f"({float(expr.p)} / {float(expr.q)})"
+
+    def _print_Pow(self, expr, rational=False):
+        base = self._print(expr.base)
+
+        if expr.exp == -1:
+            return f"(1.0 / {self.parenthesize(expr.base, 50)})"
+        if expr.exp.is_number and expr.exp < 0:
+            return f"(1.0 / np.power({base}, {self._print(-expr.exp)}))"
+        return f"np.power({base}, {self._print(expr.exp)})"
+
+    def _print_exp(self, expr):
+        return f"np.exp({self._print(expr.args[0])})"
+
+    def _print_log(self, expr):
+        return f"np.log({self._print(expr.args[0])})"
+
+    def _print_StrictLessThan(self, expr):
+        return f"np.less({self._print(expr.lhs)}, {self._print(expr.rhs)})"
+
+    def _print_StrictGreaterThan(self, expr):
+        return f"np.greater({self._print(expr.lhs)}, {self._print(expr.rhs)})"
+
+    def _print_LessThan(self, expr):
+        return (
+            f"np.less_equal({self._print(expr.lhs)}, {self._print(expr.rhs)})"
+        )
+
+    def _print_GreaterThan(self, expr):
+        return (
+            f"np.greater_equal({self._print(expr.lhs)}, "
+            f"{self._print(expr.rhs)})"
+        )
+
+    def _print_Or(self, expr):
+        return self._logical("np.logical_or", expr.args)
+
+    def _print_And(self, expr):
+        return self._logical("np.logical_and", expr.args)
+
+    def _logical(self, function, args):
+        result = self._print(args[-1])
+        for arg in reversed(args[:-1]):
+            result = f"{function}({self._print(arg)}, {result})"
+        return result
+
+    def _print_Piecewise(self, expr):
+        cases = []
+        for value, condition in expr.args:
+            cases.append(
+                "True" if condition == sp.true else self._print(condition)
+            )
+            cases.append(self._print(value))
+        return f"custom_piecewise([{', '.join(cases)}])"
+
+
+class ScalarModelPrinter(ModelPrinter):
+    """Prints sympy expressions for scalar evaluation with the math module"""
+
+    def _print_Pow(self, expr, rational=False):
+        base = self.parenthesize(expr.base, 60)
+
+        if expr.exp == -1:
+            return f"(1.0 / {base})"
+        if expr.exp.is_number and float(expr.exp).is_integer():
+            exponent = int(expr.exp)
+            if exponent < 0:
+                return f"(1.0 / {base} ** {-exponent})"
+            return f"{base} ** {exponent}"
+        return f"math.pow({self._print(expr.base)}, {self._print(expr.exp)})"
+
+    def _print_exp(self, expr):
+        return f"math.exp({self._print(expr.args[0])})"
+
+    def _print_log(self, expr):
+        return f"math.log({self._print(expr.args[0])})"
+
+    def _print_StrictLessThan(self, expr):
+        return f"({self._print(expr.lhs)} < {self._print(expr.rhs)})"
+
+    def _print_StrictGreaterThan(self, expr):
+        return f"({self._print(expr.lhs)} > {self._print(expr.rhs)})"
+
+    def _print_LessThan(self, expr):
+        return f"({self._print(expr.lhs)} <= {self._print(expr.rhs)})"
+
+    def _print_GreaterThan(self, expr):
+        return f"({self._print(expr.lhs)} >= {self._print(expr.rhs)})"
+
+    def _print_Or(self, expr):
+        return f"({' or '.join(self._print(arg) for arg in expr.args)})"
+
+    def _print_And(self, expr):
+        return f"({' and '.join(self._print(arg) for arg in expr.args)})"
+
+    def _print_Piecewise(self, expr):
+        *pieces, (otherwise, condition) = expr.args
+        result = self._print(otherwise)
+        if condition != sp.true:
+            # No otherwise case, same result as np.select
+            result = f"({result} if {self._print(condition)} else 0.0)"
+        for value, condition in reversed(pieces):
+            result = (
+                f"({self._print(value)} if {self._print(condition)} "
+                f"else {result})"
+            )
+        return result
+
+
+def trace_rates(model):
+    """Traces the compute_rates function of a model symbolically
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+
+    Returns:
+    voi -- sp.Symbol, time symbol.
+    states -- list[sp.Symbol], list of state symbols.
+    constants -- list[sp.Symbol], list of constant symbols.
+    rates -- list[sp.Expr], list of symbolic rates.
+
+    Raises:
+    ImportError -- if sympy is not installed.
+
+    """
+    require_sympy()
+
+    voi = sp.Symbol("voi")
+    states = list(sp.symbols(f"states_0:{model.sizeStates}"))
+    constants = list(sp.symbols(f"constants_0:{model.sizeConstants}"))
+
+    namespace = dict(model.compute_rates.__globals__)
+    namespace["np"] = _SymbolicNumpy
+    namespace["custom_piecewise"] = _symbolic_piecewise
+    compute_rates = types.FunctionType(
+        model.compute_rates.__code__,
+        namespace,
+    )
+
+    return voi, states, constants, compute_rates(voi, states, constants)
+
+
+def _symbol_names(states, constants):
+    """Creates the mapping between the symbols and the printed names
+
+    Args:
+    states -- list[sp.Symbol], list of state symbols.
+    constants -- list[sp.Symbol], list of constant symbols.
+
+    Returns:
+    names -- dict, mapping between symbols and printed names.
+
+    """
+    names = {s: f"states[{i}]" for i, s in enumerate(states)}
+    names.update({c: f"constants[{i}]" for i, c in enumerate(constants)})
+    return names
+
+
+def _function_source(header, output, replacements, assignments, printer):
+    """Creates the source of a generated function
+
+    Args:
+    header -- list[str], lines of the function definition and docstring.
+    output -- str, line initialising the returned array.
+    replacements -- list[tuple], common subexpressions as (symbol, expr).
+    assignments -- list[tuple], assignments as (target, expr).
+    printer -- ModelPrinter, printer of the expressions.
+
+    Returns:
+    source -- str, formatted source code of the function.
+
+    """
+    lines = header + [output]
+    for symbol, expr in replacements:
+        lines.append(f"    {symbol} = {printer.doprint(expr)}")
+    for target, expr in assignments:
+        lines.append(f"    {target} = {printer.doprint(expr)}")
+    lines.append(f"    return {output.split('=')[0].strip()}")
+
+    return format_source("\n".join(lines) + "\n")
+
+
+def jacobian_source(states, constants, rates):
+    """Creates the source of the compute_jacobian function of symbolic rates
+
+    The Jacobian is derived symbolically and the common subexpressions are
+    only evaluated once.
+
+    Args:
+    states -- list[sp.Symbol], list of state symbols.
+    constants -- list[sp.Symbol], list of constant symbols.
+    rates -- list[sp.Expr], list of symbolic rates.
+
+    Returns:
+    source -- str, source code of the compute_jacobian function.
+
+    """
+    entries = []
+    for i, rate in enumerate(rates):
+        for j, state in enumerate(states):
+            derivative = sp.diff(rate, state)
+
+            if derivative != 0:
+                entries.append((f"jacobian[{i}, {j}]", derivative))
+
+    replacements, reduced = sp.cse(
+        [derivative for _, derivative in entries],
+        symbols=sp.numbered_symbols("x"),
+    )
+
+    header = [
+        "def compute_jacobian(voi, states, constants):",
+        '    """Computes the Jacobian of the rates with respect to the states',
+        "",
+        "    Generated from compute_rates by conversion.codegen, do not edit.",
+        "",
+        "    Args:",
+        "    voi -- float, time in ms.",
+        "    states -- list[float], list of states.",
+        "    constants -- list[int], list of constant values.",
+        "",
+        "    Returns:",
+        "    jacobian -- np.array[float], derivative of rates[i] with respect",
+        "    to states[j] at index [i, j].",
+        "",
+        '    """',
+    ]
+    return _function_source(
+        header,
+        "    jacobian = np.zeros((sizeStates, sizeStates) + "
+        "np.shape(states[0]))",
+        replacements,
+        [(target, expr) for (target, _), expr in zip(entries, reduced)],
+        ModelPrinter(_symbol_names(states, constants)),
+    )
+
+
+def generate_jacobian(model):
+    """Generates the source of the compute_jacobian function of a model
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+
+    Returns:
+    source -- str, source code of the compute_jacobian function.
+
+    Raises:
+    ImportError -- if sympy is not installed.
+
+    """
+    _, states, constants, rates = trace_rates(model)
+    return jacobian_source(states, constants, rates)
+
+
+def jacobian_diagonal_source(states, constants, rates):
+    """Creates the source of the compute_jacobian_diagonal function of
+    symbolic rates
+
+    Args:
+    states -- list[sp.Symbol], list of state symbols.
+    constants -- list[sp.Symbol], list of constant symbols.
+    rates -- list[sp.Expr], list of symbolic rates.
+
+    Returns:
+    source -- str, source code of the compute_jacobian_diagonal function.
+
+    """
+    entries = []
+    for i, (rate, state) in enumerate(zip(rates, states)):
+        derivative = sp.diff(rate, state)
+
+        if derivative != 0:
+            entries.append((f"diagonal[{i}]", derivative))
+
+    replacements, reduced = sp.cse(
+        [derivative for _, derivative in entries],
+        symbols=sp.numbered_symbols("x"),
+    )
+
+    header = [
+        "def compute_jacobian_diagonal(voi, states, constants):",
+        '    """Computes the derivative of each rate with respect to its state',
+        "",
+        "    Generated from compute_rates by conversion.codegen, do not edit.",
+        "",
+        "    Args:",
+        "    voi -- float, time in ms.",
+        "    states -- list[float], list of states.",
+        "    constants -- list[int], list of constant values.",
+        "",
+        "    Returns:",
+        "    diagonal -- np.array[float], derivative of rates[i] with respect",
+        "    to states[i] at index i.",
+        "",
+        '    """',
+    ]
+    return _function_source(
+        header,
+        "    diagonal = np.zeros((sizeStates,) + np.shape(states[0]))",
+        replacements,
+        [(target, expr) for (target, _), expr in zip(entries, reduced)],
+        ModelPrinter(_symbol_names(states, constants)),
+    )
+
+
+def generate_jacobian_diagonal(model):
+    """Generates the source of the compute_jacobian_diagonal function of a
+    model
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+
+    Returns:
+    source -- str, source code of the compute_jacobian_diagonal function.
+
+    Raises:
+    ImportError -- if sympy is not installed.
+
+    """
+    _, states, constants, rates = trace_rates(model)
+    return jacobian_diagonal_source(states, constants, rates)
+
+
+def gate_states_source(states, rates):
+    """Creates the source of the gateStates list of symbolic rates
+
+    A state is a gate if its rate is linear in the state, the rate is then
+    of the form (inf - state) / tau and can be integrated exactly over a step.
+
+    Args:
+    states -- list[sp.Symbol], list of state symbols.
+    rates -- list[sp.Expr], list of symbolic rates.
+
+    Returns:
+    source -- str, source code of the gateStates list.
+
+    """
+    gates = []
+    for i, (rate, state) in enumerate(zip(rates, states)):
+        derivative = sp.diff(rate, state)
+
+        if derivative != 0 and not derivative.has(state):
+            gates.append(i)
+
+    return format_source(f"gateStates = {gates}\n")
+
+
+def generate_gate_states(model):
+    """Generates the source of the gateStates list of a model
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+
+    Returns:
+    source -- str, source code of the gateStates list.
+
+    Raises:
+    ImportError -- if sympy is not installed.
+
+    """
+    _, states, _, rates = trace_rates(model)
+    return gate_states_source(states, rates)
+
+
+def hoist_constants(constants, rates):
+    """Extracts the subexpressions of the rates that depend on constants only
+
+    The largest subexpressions without states or time, such as reversal
+    potentials or products of constants, are replaced by prepared symbols.
+    The constant factors and terms of products and sums are grouped.
+
+    Args:
+    constants -- list[sp.Symbol], list of constant symbols.
+    rates -- list[sp.Expr], list of symbolic rates.
+
+    Returns:
+    prepared -- list[sp.Expr], constant expressions of the prepared symbols.
+    symbols -- list[sp.Symbol], list of prepared symbols.
+    reduced -- list[sp.Expr], rates expressed with the prepared symbols.
+
+    """
+    constants = set(constants)
+    hoisted = {}
+
+    def is_constant(expr):
+        return expr.free_symbols <= constants
+
+    def hoist(expr):
+        if expr not in hoisted:
+            hoisted[expr] = sp.Symbol(f"prepared_{len(hoisted)}")
+        return hoisted[expr]
+
+    def visit(expr):
+        if expr.is_Atom:
+            return hoist(expr) if expr in constants else expr
+
+        # Conditions and their pairs are not values
+        condition = isinstance(
+            expr, (sp.logic.boolalg.Boolean, ExprCondPair)
+        )
+        if is_constant(expr) and not condition:
+            return hoist(expr)
+
+        if isinstance(expr, (sp.Add, sp.Mul)):
+            constant = [arg for arg in expr.args if is_constant(arg)]
+            if constant and any(arg.free_symbols for arg in constant):
+                others = [
+                    visit(arg) for arg in expr.args if not is_constant(arg)
+                ]
+                return expr.func(hoist(expr.func(*constant)), *others)
+
+        return expr.func(*[visit(arg) for arg in expr.args])
+
+    reduced = [visit(rate) for rate in rates]
+    return list(hoisted), list(hoisted.values()), reduced
+
+
+def prepare_source(states, constants, rates):
+    """Creates the source of the prepare function of symbolic rates
+
+    The prepare function evaluates the constant subexpressions of the rates
+    once per parameter set for compute_rates_kernel.
+
+    Args:
+    states -- list[sp.Symbol], list of state symbols.
+    constants -- list[sp.Symbol], list of constant symbols.
+    rates -- list[sp.Expr], list of symbolic rates.
+
+    Returns:
+    source -- str, source code of the prepare function.
+
+    """
+    prepared, _, _ = hoist_constants(constants, rates)
+    replacements, reduced = sp.cse(prepared, symbols=sp.numbered_symbols("x"))
+    printer = ScalarModelPrinter(_symbol_names(states, constants))
+
+    lines = [
+        "def prepare(constants):",
+        '    """Evaluates the constant subexpressions of the rates',
+        "",
+        "    Generated from compute_rates by conversion.codegen, do not edit.",
+        "    The prepared values need to be computed again when the constants",
+        "    change.",
+        "",
+        "    Args:",
+        "    constants -- list[int], list of constant values.",
+        "",
+        "    Returns:",
+        "    prepared -- list[float], list of prepared values for",
+        "    compute_rates_kernel.",
+        "",
+        "    Raises:",
+        "    OverflowError -- if an exponential overflows.",
+        "    ZeroDivisionError -- if a denominator is zero.",
+        "    ValueError -- if a power or logarithm is not defined.",
+        "",
+        '    """',
+        "    constants = np.asarray(constants, dtype=float).tolist()",
+    ]
+    for symbol, expr in replacements:
+        lines.append(f"    {symbol} = {printer.doprint(expr)}")
+    lines.append("    return [")
+    for expr in reduced:
+        lines.append(f"        {printer.doprint(expr)},")
+    lines.append("    ]")
+
+    return format_source("\n".join(lines) + "\n")
+
+
+def rates_kernel_source(states, constants, rates, buffer=False):
+    """Creates the source of the compute_rates_kernel function of symbolic
+    rates
+
+    The kernel evaluates the rates of a single simulation with scalar math
+    functions and every common subexpression, such as the exponentials of
+    the membrane potential shared by several gates, is only evaluated once.
+    The constant subexpressions are read from the output of prepare. With
+    buffer set the compute_rates_buffer function is created instead, it
+    writes the rates into a preallocated array so that it can be compiled
+    with Numba.
+
+    Args:
+    states -- list[sp.Symbol], list of state symbols.
+    constants -- list[sp.Symbol], list of constant symbols.
+    rates -- list[sp.Expr], list of symbolic rates.
+    buffer -- bool, flag used to write the rates into a buffer, default
+    value False.
+
+    Returns:
+    source -- str, source code of the compute_rates_kernel or
+    compute_rates_buffer function.
+
+    """
+    _, symbols, rates = hoist_constants(constants, rates)
+    replacements, reduced = sp.cse(rates, symbols=sp.numbered_symbols("x"))
+    names = _symbol_names(states, constants)
+    names.update({p: f"prepared[{i}]" for i, p in enumerate(symbols)})
+    printer = ScalarModelPrinter(names)
+
+    if buffer:
+        lines = [
+            "def compute_rates_buffer(voi, states, prepared, rates):",
+            '    """Computes the rates of a single simulation into a buffer',
+            "",
+            "    Generated from compute_rates by conversion.codegen, do not "
+            "edit.",
+            "",
+            "    Args:",
+            "    voi -- float, time in ms.",
+            "    states -- np.array[float], array of states.",
+            "    prepared -- np.array[float], array of prepared values "
+            "computed by",
+            "    prepare from the constants.",
+            "    rates -- np.array[float], array the rates are written into.",
+            "",
+            "    Returns:",
+            "    rates -- np.array[float], array of computed rates.",
+            "",
+            '    """',
+        ]
+    else:
+        lines = [
+            "def compute_rates_kernel(voi, states, prepared):",
+            '    """Computes the rates of a single simulation with scalar '
+            "functions",
+            "",
+            "    Generated from compute_rates by conversion.codegen, do not "
+            "edit.",
+            "",
+            "    Args:",
+            "    voi -- float, time in ms.",
+            "    states -- list[float], list of states.",
+            "    prepared -- list[float], list of prepared values computed by",
+            "    prepare from the constants.",
+            "",
+            "    Returns:",
+            "    rates -- list[float], list of computed rates.",
+            "",
+            "    Raises:",
+            "    OverflowError -- if an exponential overflows.",
+            "    ZeroDivisionError -- if a denominator is zero.",
+            "    ValueError -- if a power or logarithm is not defined.",
+            "",
+            '    """',
+            "    states = np.asarray(states, dtype=float).tolist()",
+        ]
+
+    for symbol, expr in replacements:
+        lines.append(f"    {symbol} = {printer.doprint(expr)}")
+
+    if buffer:
+        for i, expr in enumerate(reduced):
+            lines.append(f"    rates[{i}] = {printer.doprint(expr)}")
+        lines.append("    return rates")
+    else:
+        lines.append("    return [")
+        for expr in reduced:
+            lines.append(f"        {printer.doprint(expr)},")
+        lines.append("    ]")
+
+    return format_source("\n".join(lines) + "\n")
+
+
+def generate_prepare(model):
+    """Generates the source of the prepare function of a model
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+
+    Returns:
+    source -- str, source code of the prepare function.
+
+    Raises:
+    ImportError -- if sympy is not installed.
+
+    """
+    _, states, constants, rates = trace_rates(model)
+    return prepare_source(states, constants, rates)
+
+
+def generate_rates_kernel(model):
+    """Generates the source of the compute_rates_kernel function of a model
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+
+    Returns:
+    source -- str, source code of the compute_rates_kernel function.
+
+    Raises:
+    ImportError -- if sympy is not installed.
+
+    """
+    _, states, constants, rates = trace_rates(model)
+    return rates_kernel_source(states, constants, rates)
+
+
+def generate_rates_buffer(model):
+    """Generates the source of the compute_rates_buffer function of a model
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+
+    Returns:
+    source -- str, source code of the compute_rates_buffer function.
+
+    Raises:
+    ImportError -- if sympy is not installed.
+
+    """
+    _, states, constants, rates = trace_rates(model)
+    return rates_kernel_source(states, constants, rates, buffer=True)
+
+
+def indices_source(name, legends):
+    """Creates the source of a dictionary of the indices of named variables
+
+    The name of a variable is the first word of its legend, the first
+    variable is kept if several variables have the same name.
+
+    Args:
+    name -- str, name of the dictionary.
+    legends -- list[str], list of legends of the variables.
+
+    Returns:
+    source -- str, source code of the dictionary.
+
+    """
+    indices = {}
+    for i, legend in enumerate(legends):
+        indices.setdefault(legend.split(" ")[0], i)
+
+    return format_source(f"{name} = {indices}\n")
+
+
+def generate_indices(model):
+    """Generates the sources of the stateIndices, algebraicIndices and
+    constantIndices dictionaries of a model
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+
+    Returns:
+    sources -- dict, source code of each dictionary.
+
+    """
+    legend_states, legend_algebraic, _, legend_constants = (
+        model.create_legends()
+    )
+    return {
+        "stateIndices": indices_source("stateIndices", legend_states),
+        "algebraicIndices": indices_source(
+            "algebraicIndices", legend_algebraic
+        ),
+        "constantIndices": indices_source("constantIndices", legend_constants),
+    }
+
+
+def read_function(model_file, name):
+    """Reads the source of a function from a model module file
+
+    The file is read again so that the source matches the file after the
+    generated code has been written.
+
+    Args:
+    model_file -- str, path to the model module file.
+    name -- str, name of the function to read.
+
+    Returns:
+    source -- str, source code of the function.
+
+    Raises:
+    ValueError -- if the function is not found in the file.
+
+    """
+    with open(model_file, "r", encoding="utf-8") as handler:
+        content = handler.read()
+
+    for node in ast.parse(content).body:
+        if isinstance(node, ast.FunctionDef) and node.name == name:
+            return ast.get_source_segment(content, node)
+
+    raise ValueError(f"{name} not found in {model_file}")
+
+
+def derived_constants(source):
+    """Finds the constants that are computed from other constants
+
+    Args:
+    source -- str, source code of the init_consts function.
+
+    Returns:
+    derived -- list[tuple], derived constants as (index, dependencies,
+    expression) tuples in the order of computation, dependencies are the
+    indices of the constants used in the expression.
+
+    """
+    function = ast.parse(source).body[0]
+    derived = []
+
+    def constant_index(node):
+        if (
+            isinstance(node, ast.Subscript)
+            and isinstance(node.value, ast.Name)
+            and node.value.id == "constants"
+            and isinstance(node.slice, ast.Constant)
+        ):
+            return node.slice.value
+        return None
+
+    for statement in function.body:
+        if not isinstance(statement, ast.Assign):
+            continue
+
+        index = constant_index(statement.targets[0])
+        dependencies = []
+        for node in ast.walk(statement.value):
+            dependency = constant_index(node)
+            if dependency is not None and dependency not in dependencies:
+                dependencies.append(dependency)
+
+        if index is not None and dependencies:
+            derived.append((index, dependencies, ast.unparse(statement.value)))
+
+    return derived
+
+
+def derived_constants_source(derived):
+    """Creates the source of the derivedConstants dictionary
+
+    Args:
+    derived -- list[tuple], derived constants as (index, dependencies,
+    expression) tuples in the order of computation.
+
+    Returns:
+    source -- str, source code of the derivedConstants dictionary.
+
+    """
+    graph = {index: dependencies for index, dependencies, _ in derived}
+    return format_source(f"derivedConstants = {graph}\n")
+
+
+def compute_derived_source(derived):
+    """Creates the source of the compute_derived_constants function
+
+    Args:
+    derived -- list[tuple], derived constants as (index, dependencies,
+    expression) tuples in the order of computation.
+
+    Returns:
+    source -- str, source code of the compute_derived_constants function.
+
+    """
+    lines = [
+        "def compute_derived_constants(constants, derived=None):",
+        '    """Computes the constants that depend on other constants',
+        "",
+        "    Generated from init_consts by conversion.codegen, do not edit.",
+        "",
+        "    Args:",
+        "    constants -- list[int], list of constant values.",
+        "    derived -- set[int], indices of the derived constants to compute,",
+        "    default value None for all of them.",
+        "",
+        "    Returns:",
+        "    constants -- list[int], list of updated constant values.",
+        "",
+        '    """',
+        "    if derived is None:",
+        "        derived = derivedConstants",
+    ]
+    for index, _, expression in derived:
+        lines.append(f"    if {index} in derived:")
+        lines.append(f"        constants[{index}] = {expression}")
+    lines.append("    return constants")
+
+    return format_source("\n".join(lines) + "\n")
+
+
+def generate_derived_constants(model):
+    """Generates the source of the derivedConstants dictionary of a model
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+
+    Returns:
+    source -- str, source code of the derivedConstants dictionary.
+
+    Raises:
+    ValueError -- if init_consts is not found in the model file.
+
+    """
+    derived = derived_constants(read_function(model.__file__, "init_consts"))
+    return derived_constants_source(derived)
+
+
+def generate_compute_derived(model):
+    """Generates the source of the compute_derived_constants function of a
+    model
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+
+    Returns:
+    source -- str, source code of the compute_derived_constants function.
+
+    Raises:
+    ValueError -- if init_consts is not found in the model file.
+
+    """
+    derived = derived_constants(read_function(model.__file__, "init_consts"))
+    return compute_derived_source(derived)
+
+
+def format_source(source):
+    """Formats generated source code with black if it is available
+
+    Args:
+    source -- str, source code to format.
+
+    Returns:
+    formatted -- str, formatted source code.
+
+    """
+    try:
+        import black
+    except ImportError:
+        return source
+
+    return black.format_str(source, mode=black.Mode())
+
+
+def write_function(model_file, name, source, before="compute_algebraic"):
+    """Writes the source of a function in a model module file
+
+    If the function already exists it is replaced, otherwise it is inserted
+    before the function named before.
+
+    Args:
+    model_file -- str, path to the model module file.
+    name -- str, name of the function to write.
+    source -- str, source code of the function.
+    before -- str, name of the function to insert the new function before,
+    default value "compute_algebraic".
+
+    Returns:
+
+    Raises:
+    ValueError -- if neither function is found in the file.
+
+    """
+    with open(model_file, "r", encoding="utf-8") as handler:
+        content = handler.read()
+
+    definition = re.compile(rf"^def {name}\(.*?(?=^def |\Z)", re.M | re.S)
+    if definition.search(content):
+        content = definition.sub(lambda _: source + "\n\n", content, count=1)
+    else:
+        position = content.find(f"\ndef {before}(")
+        if position < 0:
+            raise ValueError(f"{before} not found in {model_file}")
+        content = (
+            content[: position + 1] + source + "\n\n" + content[position + 1:]
+        )
+
+    with open(model_file, "w", encoding="utf-8") as handler:
+        handler.write(content)
+
+
+def write_variable(model_file, name, source, after="sizeConstants"):
+    """Writes the source of a module variable in a model module file
+
+    If the variable already exists it is replaced, otherwise it is inserted
+    after the variable named after.
+
+    Args:
+    model_file -- str, path to the model module file.
+    name -- str, name of the variable to write.
+    source -- str, source code of the variable.
+    after -- str, name of the variable to insert the new variable after,
+    default value "sizeConstants".
+
+    Returns:
+
+    Raises:
+    ValueError -- if neither variable is found in the file.
+
+    """
+    with open(model_file, "r", encoding="utf-8") as handler:
+        content = handler.read()
+
+    definition = re.compile(rf"^{name} = {_VARIABLE_VALUE}\n", re.M)
+    if definition.search(content):
+        content = definition.sub(lambda _: source, content, count=1)
+    else:
+        match = re.search(rf"^{after} = {_VARIABLE_VALUE}\n", content, re.M)
+        if match is None:
+            raise ValueError(f"{after} not found in {model_file}")
+        content = (
+            content[: match.end()] + source + content[match.end():]
+        )
+
+    with open(model_file, "w", encoding="utf-8") as handler:
+        handler.write(content)
+
+
+def write_import(model_file, statement, before="import numpy as np"):
+    """Adds an import statement to a model module file if it is missing
+
+    Args:
+    model_file -- str, path to the model module file.
+    statement -- str, import statement to add.
+    before -- str, line to insert the statement before, default value
+    "import numpy as np".
+
+    Returns:
+
+    Raises:
+    ValueError -- if the line to insert before is not found in the file.
+
+    """
+    with open(model_file, "r", encoding="utf-8") as handler:
+        content = handler.read()
+
+    if re.search(rf"^{re.escape(statement)}$", content, re.M):
+        return
+
+    match = re.search(rf"^{re.escape(before)}$", content, re.M)
+    if match is None:
+        raise ValueError(f"{before} not found in {model_file}")
+    content = (
+        content[: match.start()] + statement + "\n" + content[match.start():]
+    )
+
+    with open(model_file, "w", encoding="utf-8") as handler:
+        handler.write(content)
@@ -16,11 +16,32 @@ BASE = "Documents/phd"
 RES_DIR = os.path.join(HOME, BASE, "uSMC-conversion/res")
 
 # Model solving constants
+# SOLVER is an ode integrator, "odeint", a solve_ivp method, "rush_larsen"
+# or "grl1"
 SOLVER = "vode"
 METHOD = "bdf"
 ATOL = 1e-07
 RTOL = 1e-07
-MAX_STEP = 0.1
+MAX_STEP = 1.0  # Maximum step in ms, 0 to only restart at the stimulus edges
+RL_STEP = 0.1  # Time step of the Rush-Larsen solvers in ms
+ALGEBRAIC_CHUNK = 10000  # Number of timesteps per algebraic computation
+# Solver settings tried in order for the sweep points whose integration
+# failed, each one overrides SOLVER and/or MAX_STEP, empty to disable
+RETRY_POLICY = [{"max_step": 0.1}, {"integrator": "lsoda"}]
+# BACKEND of the rates kernels, "python" or "numba" if numba is installed
+BACKEND = os.environ.get("CONVERSION_BACKEND", "python")
+
+# Simulation cache constants
+CACHE_DIR = os.path.join(RES_DIR, "cache")
+CACHE_SIZE = 2 * 1024**3  # Maximum size of the cache in bytes
+
+# Solver settings recommended for each model by the benchmark
+SOLVER_CONFIG = os.path.join(RES_DIR, "solver_config.json")
+
+# Pre-pacing constants
+STEADY_STATE_DIR = os.path.join(RES_DIR, "steady_state")
+STEADY_STATE_TOL = 1e-4  # Relative change of the states over a cycle
+STEADY_STATE_CYCLES = 100  # Maximum number of pacing cycles
 
 # Specific values for different estrus stages
 ESTRUS_PARAMS = {
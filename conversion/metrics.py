@@ -11,10 +11,9 @@ Date: 11/24
 import conversion.utils
 
 import numpy as np
-import sklearn.metrics as skm
-import scipy.stats as stat
 
-from elephant.spike_train_dissimilarity import van_rossum_distance
+# sklearn, scipy.stats, elephant and quantities are imported on first use
+# to keep the package import fast
 
 
 def compute_L2_norm(y_true, y_pred):
@@ -50,6 +49,8 @@ def compute_mae(y_true, y_pred):
     mae -- float, mean absolute error.
 
     """
+    import sklearn.metrics as skm
+
     return skm.mean_absolute_error(y_true, y_pred)
 
 
@@ -64,6 +65,8 @@ def compute_rmse(y_true, y_pred):
     rmse -- float, root mean square error
 
     """
+    import sklearn.metrics as skm
+
     return skm.mean_squared_error(y_true, y_pred, squared=False)
 
 
@@ -78,6 +81,8 @@ def compute_correlation(y_true, y_pred):
     correl -- float, Pearson correlation
 
     """
+    import scipy.stats as stat
+
     correl, _ = stat.pearsonr(y_true, y_pred)
     return correl
 
@@ -94,6 +99,10 @@ def compute_van_rossum_distance(y_true, y_pred, time, tau=1.0):
     Returns:
     distance -- float, Van Rossum distance.
     """
+    import quantities as quant
+
+    from elephant.spike_train_dissimilarity import van_rossum_distance
+
     st_true = conversion.utils.create_spike_train(
         conversion.utils.extract_spike_times(y_true, time),
         time[-1],
@@ -104,7 +113,7 @@ def compute_van_rossum_distance(y_true, y_pred, time, tau=1.0):
     )
     return van_rossum_distance(
         [st_true, st_pred],
-        tau * conversion.utils.quant.s,
+        tau * quant.s,
     )[0, 1]
 
 
@@ -10,6 +10,8 @@ Date: 11/24
 
 import numpy as np
 
+from concurrent.futures import ProcessPoolExecutor
+
 from conversion.constants import ESTRUS, PARAM
 from conversion import utils, simulation
 
@@ -35,6 +37,8 @@ def sweep_func(args):
       default value "estrus".
       base_estrus -- str, estrus stage for the base model if Roesler2024,
       default value "estrus".
+      jobs -- int, number of worker processes for the sweep simulations.
+      output_dt -- float, interval in ms between two outputs.
 
     Returns:
     plot_data -- dict(list(tuple)), dictionnary with the parameter name as key
@@ -53,6 +57,7 @@ def sweep_func(args):
     ValueError -- if the number of simulations is negative.
     ValueError -- if the number of simulations is not an integer.
     KeyError -- if the estrus stage is incorrect.
+    RuntimeError -- if a worker process failed.
 
 
     """
@@ -67,7 +72,10 @@ def sweep_func(args):
         # Compute base model if pregnant model
         if args.base_model != "Roesler2024":
             print(f"Computing {args.base_model} simulation with default times")
-            t, base_data = simulation.run_simulation(args.base_model)
+            t, base_data = simulation.run_simulation(
+                args.base_model,
+                output_dt=args.output_dt,
+            )
 
         else:
             print(
@@ -79,13 +87,13 @@ def sweep_func(args):
             t, base_data = simulation.run_simulation(
                 args.base_model,
                 estrus=args.base_estrus,
+                output_dt=args.output_dt,
             )
 
         # Create values to loop through
         values = np.linspace(args.start_val, args.end_val, args.nb_points)
 
-        # Create arrays to store results
-        comp_points = np.zeros(len(values))
+        # Create list to store results
         plot_data = []
 
         if args.estrus == "all":
@@ -93,35 +101,78 @@ def sweep_func(args):
         else:
             estrus = [args.estrus]
 
-        for stage in estrus:
-            # Loop over estrus cycle
-            if stage != "":
-                print(f"{stage.capitalize()} stage")
-
-            save_file = utils.sweep_path(
-                args.base_model,
-                args.sweep_model,
-                args.param,
-                args.metric,
-                stage,
-                base_estrus=args.base_estrus,
-            )
+        futures = {}
+        executor = None
+        if args.jobs > 1:
+            # Spread the sweep values of every stage over a process pool
+            executor = ProcessPoolExecutor(max_workers=args.jobs)
+            for stage in estrus:
+                futures[stage] = simulation.submit_sweep(
+                    executor,
+                    args.sweep_model,
+                    args.param,
+                    values,
+                    args.metric,
+                    base_data[0, :],
+                    stage,
+                    args.output_dt,
+                )
 
-            # Main sweep
-            comp_points = simulation.run_sweep(
-                args.sweep_model,
-                args.param,
-                values,
-                args.metric,
-                base_data[0, :],
-                stage,
-            )
+        try:
+            for stage in estrus:
+                # Loop over estrus cycle
+                if stage != "":
+                    print(f"{stage.capitalize()} stage")
 
-            # Save data and prepare for plotting
-            plot_data.append((comp_points, values, stage))
-            utils.save_data(save_file, (comp_points, values, stage))
+                save_file = utils.sweep_path(
+                    args.base_model,
+                    args.sweep_model,
+                    args.param,
+                    args.metric,
+                    stage,
+                    base_estrus=args.base_estrus,
+                )
 
-    except (ValueError, KeyError):
+                # Main sweep
+                if executor is not None:
+                    comp_points, failed = simulation.collect_sweep(
+                        futures[stage],
+                        args.param,
+                        values,
+                    )
+                    # The failed points are re-run in the same pool
+                    comp_points, _ = simulation.retry_sweep(
+                        comp_points,
+                        failed,
+                        args.sweep_model,
+                        args.param,
+                        values,
+                        args.metric,
+                        base_data[0, :],
+                        stage,
+                        args.output_dt,
+                        executor,
+                    )
+                else:
+                    comp_points, _ = simulation.run_sweep(
+                        args.sweep_model,
+                        args.param,
+                        values,
+                        args.metric,
+                        base_data[0, :],
+                        stage,
+                        output_dt=args.output_dt,
+                    )
+
+                # Save data and prepare for plotting
+                plot_data.append((comp_points, values, stage))
+                utils.save_data(save_file, (comp_points, values, stage))
+
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    except (ValueError, KeyError, RuntimeError):
         raise
 
     return {args.param: plot_data}, [args.param]
@@ -203,7 +254,9 @@ def single_func(args):
     """Function called by the model-simulation script to run
     a single simulation
 
-    The data is saved in RES_DIR.
+    The data is saved in RES_DIR with the final states and the integrator
+    state is checkpointed next to it while the simulation runs. A saved
+    simulation can be extended to a longer end time.
 
     Args:
     args -- argparse.Namespace with following arguments:
@@ -212,6 +265,14 @@ def single_func(args):
       start -- float, start time of the simulation.
       end -- float, end time of the simulation.
       estrus -- str, estrus stage for the Roesler2024 model, default value "".
+      output_dt -- float, interval in ms between two outputs.
+      prepace -- bool, flag used to start from the periodic steady state.
+      steady_tol -- float, relative change of the states over a cycle below
+      which the simulation stops, None to run up to end.
+      tile -- bool, flag used to repeat the converged cycle up to end.
+      resume -- bool, flag used to continue from the last checkpoint.
+      extend -- int, duration in s of the saved simulation to continue,
+      None to start from start.
       plot_only -- bool, flag used to plot an already computed model.
 
     Returns:
@@ -221,6 +282,7 @@ def single_func(args):
     Raises:
     ValueError -- if the model name is incorrect.
     ValueError -- if the start time is smaller than the end time.
+    ValueError -- if the saved simulation cannot be continued.
     FileNotFoundError -- if the data file is not found.
     KeyError -- if the estrus stage is incorrect.
 
@@ -228,14 +290,36 @@ def single_func(args):
     """
     try:
         if not args.plot_only:
-            time, data = simulation.run_simulation(
+            # The simulations stopped early are not checkpointed
+            checkpoint = None
+            if args.steady_tol is None:
+                checkpoint = utils.checkpoint_path(args.model, args.estrus)
+
+            # Continue a saved simulation instead of starting from start
+            continue_from = None
+            if args.extend is not None:
+                continue_from = utils.load_data(
+                    utils.results_path(args.model, args.extend, args.estrus)
+                )
+
+            time, data, final_states = simulation.run_simulation(
                 args.model,
                 args.start,
                 args.end,
                 args.estrus,
+                output_dt=args.output_dt,
+                prepace=args.prepace,
+                steady_tol=args.steady_tol,
+                tile=args.tile,
+                checkpoint=checkpoint,
+                resume=args.resume,
+                final=True,
+                continue_from=continue_from,
             )
             sim_data = data[0, :]
-            simulation.save_simulation(args.model, sim_data, time, args.estrus)
+            simulation.save_simulation(
+                args.model, sim_data, time, args.estrus, final_states
+            )
 
         else:
             res_file = utils.results_path(
@@ -266,6 +350,11 @@ def multi_func(args):
       start -- float, start time of the simulation.
       end -- float, end time of the simulation.
       estrus -- str, estrus stage for the Roesler2024 model, default value "".
+      output_dt -- float, interval in ms between two outputs.
+      prepace -- bool, flag used to start from the periodic steady state.
+      steady_tol -- float, relative change of the states over a cycle below
+      which the simulation stops, None to run up to end.
+      tile -- bool, flag used to repeat the converged cycle up to end.
 
     Returns:
     sim_data -- np.array, simulations output one column per simulation.
@@ -275,14 +364,16 @@ def multi_func(args):
     ValueError -- if the model name is incorrect.
     ValueError -- if the start time is smaller than the end time.
     ValueError -- if the parameter is not valid.
+    ValueError -- if steady_tol is given without tile.
     KeyError -- if the estrus stage is incorrect.
 
 
     """
-    try:
-        # Pre-allocate space
-        sim_data = np.zeros((len(args.values), args.end - args.start))
+    if args.steady_tol is not None and not args.tile:
+        # Each value converges at its own cycle so the outputs differ in size
+        raise ValueError("steady_tol requires tile with multiple simulations")
 
+    try:
         for i, value in enumerate(args.values):
             print(f"Running simulation with {args.param} at {value}")
             time, data = simulation.run_simulation(
@@ -292,7 +383,16 @@ def multi_func(args):
                 args.estrus,
                 args.param,
                 value,
+                args.output_dt,
+                prepace=args.prepace,
+                steady_tol=args.steady_tol,
+                tile=args.tile,
             )
+
+            if i == 0:
+                # Pre-allocate space
+                sim_data = np.zeros((len(args.values), len(time)))
+
             sim_data[i, :] = data[0, :]
 
     except (ValueError, KeyError):
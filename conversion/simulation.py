@@ -9,172 +9,599 @@ Date: 11/24
 """
 
 import os
+import sys
 
 import numpy as np
 
-from conversion import Tong2011, Tong2014, Means2023, Roesler2024
-from conversion import utils, metrics
+from concurrent.futures import ProcessPoolExecutor
 
-from conversion.constants import RES_DIR
+from conversion import utils, metrics, solver, cache, steady_state
+from conversion.cell_model import CellModel
 
+from conversion.constants import RES_DIR, RETRY_POLICY
 
-def run_simulation(model, start=0, end=15000, estrus="", param="", value=None):
+# Model modules registered with CellModel
+MODELS = CellModel.registry
+
+
+def init_model(model, estrus="", param="", value=None):
+    """Initialises the states and constants of the given model
+
+    If a parameter and its value are provided the parameter is updated along
+    with the derived constants that depend on it. A CellModel provides its
+    own states and constants, its estrus stage is set when it is loaded.
+
+    Args:
+    model -- str or CellModel, name of the model to use {"Roesler2024",
+    "Means2023", "Tong2011", "Tong2014"} or cell model.
+    estrus -- str, estrus stage for the Roesler2024 model, default value "".
+    param -- str, name of the parameter to update if running a parameter sweep.
+    value -- int, value of the parameter to update if running a
+    parameter sweep.
+
+    Returns:
+    model_module -- module, module of the model.
+    init_states -- list[float], list of initial states.
+    constants -- list[int], list of constant values.
+
+    Raises:
+    ValueError -- if the model name is incorrect.
+    ValueError -- if an estrus stage is given with a CellModel.
+    IndexError -- if the parameter is not valid.
+    KeyError -- if the estrus stage is incorrect.
+
+    """
+    if isinstance(model, CellModel):
+        if estrus != "":
+            raise ValueError("the estrus stage of a CellModel is set by load")
+
+        model_module = model.module
+        init_states = model.states.tolist()
+        constants = model.constants.tolist()
+    elif model not in MODELS:
+        raise ValueError(f"{model} incorrect model name")
+    else:
+        model_module = MODELS[model]
+        init_states, constants = model_module.init_consts()
+
+    try:
+        if model == "Roesler2024":
+            # Set estrus specific parameters
+            constants = utils.set_estrus_params(
+                constants,
+                None,
+                estrus,
+                model_module,
+            )
+        if param != "":
+            # If running a sweep update the constants
+            constants, _ = utils.set_params(
+                constants,
+                None,
+                param,
+                value,
+                model_module,
+            )
+
+    except (IndexError, KeyError):
+        raise
+
+    return model_module, init_states, constants
+
+
+def _continuation(saved, nb_record, output_dt, end):
+    """Gets the start of a simulation that continues a saved simulation
+
+    Args:
+    saved -- dict, saved simulation with keys {time, data, final_states},
+    see save_simulation.
+    nb_record -- int, number of recorded states.
+    output_dt -- float, interval in ms between two outputs.
+    end -- float, end time in ms for the simulation.
+
+    Returns:
+    start -- float, end time in ms of the saved simulation.
+    init_states -- list[float], states at the end of the saved simulation.
+    voi -- np.array, timesteps in ms of the saved simulation.
+    states -- np.array, simulation data of the saved simulation.
+
+    Raises:
+    ValueError -- if the saved simulation has no final states.
+    ValueError -- if the recorded states or output_dt differ.
+    ValueError -- if the end number is smaller than the saved end.
+
+    """
+    if saved.get("final_states") is None:
+        raise ValueError("the saved simulation has no final states")
+
+    voi = np.asarray(saved["time"], dtype=float)
+    states = np.atleast_2d(saved["data"])
+
+    if states.shape[0] != nb_record:
+        raise ValueError("the saved simulation recorded other states")
+    if len(voi) > 1 and not np.isclose(voi[1] - voi[0], output_dt):
+        raise ValueError("the saved simulation has another output_dt")
+    if end < voi[-1]:
+        raise ValueError("end value must be greater than the saved end")
+
+    return float(voi[-1]), list(saved["final_states"]), voi, states
+
+
+def run_simulation(
+    model,
+    start=0,
+    end=15000,
+    estrus="",
+    param="",
+    value=None,
+    output_dt=1.0,
+    use_cache=True,
+    record=("v",),
+    prepace=False,
+    steady_tol=None,
+    tile=False,
+    checkpoint=None,
+    resume=False,
+    final=False,
+    continue_from=None,
+    integrator=None,
+    max_step=None,
+):
     """Runs a simulation for the given model
 
-    If a parameter and its value are provided the parameter is updated.
+    The model is given by its name or as a CellModel, see
+    CellModel.simulate.
+    If a parameter and its value are provided the parameter is updated. Only
+    the recorded states are stored, by default the membrane potential. If
+    prepace is set the simulation starts from the periodic steady state of
+    the model with its constants, see steady_state.load_steady_state.
+    If steady_tol is given the simulation stops once a pacing cycle has
+    converged, see solver.solve_cycles.
+    If a checkpoint path is given the integrator state is saved periodically
+    and resume continues the simulation from the saved checkpoint, see
+    solver.solve_edges.
+    If a saved simulation is given in continue_from, only the interval from
+    its last timestep to end is integrated, starting from its final states,
+    and appended to the saved data.
+    The solver settings recommended for the model are used unless integrator
+    is given, see solver.model_settings.
+
+    The results are cached on disk and a simulation with the same model,
+    constants, initial states, times and solver settings is only run once.
 
     Args:
-    model -- str, name of the model to use {"Roesler2024", "Means2023",
-    "Tong2011", "Tong2014"}.
-    start -- float, start time in ms for the simulation, default value 0.
+    model -- str or CellModel, name of the model to use {"Roesler2024",
+    "Means2023", "Tong2011", "Tong2014"} or cell model.
+    start -- float, start time in ms for the simulation, default value 0,
+    replaced by the end of the saved simulation with continue_from.
     end -- float, end time in ms for the simulation, default value 15000.
     estrus -- str, estrus stage for the Roesler2024 model, default value "".
     param -- str, name of the parameter to update if running a parameter sweep.
     value -- int, value of the parameter to update if running a
     parameter sweep.
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    use_cache -- bool, flag used to read and write the simulation cache,
+    default value True.
+    record -- list, names or indices of the states to record, None for all
+    the states, default value ("v",).
+    prepace -- bool, flag used to start from the periodic steady state,
+    default value False.
+    steady_tol -- float, relative change of the states over a cycle below
+    which the simulation stops, default value None to run up to end.
+    tile -- bool, flag used to repeat the converged cycle up to end, default
+    value False.
+    checkpoint -- str, path to the checkpoint file, default value None to
+    save no checkpoint.
+    resume -- bool, flag used to continue from the saved checkpoint,
+    default value False.
+    final -- bool, flag used to return the states at the last timestep,
+    default value False.
+    continue_from -- dict, saved simulation to continue with keys {time,
+    data, final_states}, see save_simulation, default value None.
+    integrator -- str, solver to use instead of SOLVER, default value None.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
 
     Returns:
     voi -- np.array, timesteps in ms.
-    states -- np.array, simulation data.
+    states -- np.array, simulation data of the recorded states in the order
+    of record.
+    final_states -- np.array, states at the last timestep, None if the
+    converged cycle is tiled, only returned if final is set.
 
     Raises:
     ValueError -- if the start number is less than 0.
     ValueError -- if the end number is smaller than start value.
+    ValueError -- if output_dt is not positive.
     ValueError -- if the model name is incorrect.
+    ValueError -- if an estrus stage is given with a CellModel.
+    ValueError -- if prepace or steady_tol is set and the model has no
+    stimulus protocol.
+    ValueError -- if both steady_tol and checkpoint are given.
+    ValueError -- if both prepace and continue_from are given.
+    ValueError -- if the saved simulation cannot be continued.
+    IndexError -- if the parameter or a recorded state is not valid.
     KeyError -- if the estrus stage is incorrect.
+    IntegrationError -- if the integrator fails, see solver.solve.
 
     """
     if start < 0:
         raise ValueError("start value must be greater than 0")
     if end < start:
         raise ValueError("end value must be greater than start value")
+    if output_dt <= 0:
+        raise ValueError("output_dt must be greater than 0")
+    if prepace and continue_from is not None:
+        raise ValueError("prepace and continue_from cannot be combined")
 
-    match model:
-        case "Tong2011":
-            init_states, constants = Tong2011.init_consts()
-            if param != "":
-                try:
-                    # If running a sweep update the constants
-                    _, _, _, legend_constants = Tong2011.create_legends()
-                    constants, _ = utils.set_params(
-                        constants,
-                        legend_constants,
-                        param,
-                        value,
-                    )
-                except IndexError:
-                    raise
-            (
-                voi,
-                states,
-                _,
-            ) = Tong2011.solve_model(
-                init_states,
-                constants,
-                start,
-                end,
-            )
-        case "Tong2014":
-            init_states, constants = Tong2014.init_consts()
-            if param != "":
-                try:
-                    # If running a sweep update the constants
-                    _, _, _, legend_constants = Tong2014.create_legends()
-                    constants, _ = utils.set_params(
-                        constants,
-                        legend_constants,
-                        param,
-                        value,
-                    )
-                except IndexError:
-                    raise
-            (
-                voi,
-                states,
-                _,
-            ) = Tong2014.solve_model(
-                init_states,
-                constants,
-                start,
-                end,
-            )
-        case "Means2023":
-            init_states, constants = Means2023.init_consts()
-            if param != "":
-                try:
-                    # If running a sweep update the constants
-                    _, _, _, legend_constants = Means2023.create_legends()
-                    constants, _ = utils.set_params(
-                        constants,
-                        legend_constants,
-                        param,
-                        value,
-                    )
-                except IndexError:
-                    raise
-            (
-                voi,
-                states,
-                _,
-            ) = Means2023.solve_model(
-                init_states,
-                constants,
-                start,
+    try:
+        model_module, init_states, constants = init_model(
+            model,
+            estrus,
+            param,
+            value,
+        )
+        record = solver.record_indices(model_module, record)
+
+        if continue_from is not None:
+            start, init_states, saved_voi, saved_states = _continuation(
+                continue_from,
+                len(record),
+                output_dt,
                 end,
             )
-        case "Roesler2024":
-            init_states, constants = Roesler2024.init_consts()
-            _, _, _, legend_constants = Roesler2024.create_legends()
-            try:
-                # Set estrus specific parameters
-                constants = utils.set_estrus_params(
-                    constants,
-                    legend_constants,
-                    estrus,
-                )
-                if param != "":
-                    # If running a sweep update the constants
-                    _, _, _, legend_constants = Roesler2024.create_legends()
-                    constants, _ = utils.set_params(
-                        constants,
-                        legend_constants,
-                        param,
-                        value,
-                    )
-
-            except (IndexError, KeyError):
-                raise
-            (
-                voi,
-                states,
-                _,
-            ) = Roesler2024.solve_model(
+        elif prepace:
+            init_states = steady_state.load_steady_state(
+                model_module,
                 init_states,
                 constants,
-                start,
-                end,
-            )
-        case _:
-            raise ValueError(f"{model} incorrect model name")
+                use_cache=use_cache,
+            ).tolist()
+    except (ValueError, IndexError, KeyError):
+        raise
+
+    # Solver settings that differ from the defaults in constants
+    solver_options = solver.model_settings(model_module)
+    if integrator is not None:
+        solver_options["integrator"] = integrator
+    if max_step is not None:
+        solver_options["max_step"] = max_step
+
+    voi = None
+    if use_cache:
+        key = cache.simulation_key(
+            model_module,
+            init_states,
+            constants,
+            start,
+            end,
+            output_dt=output_dt,
+            record=record.tolist(),
+            steady_tol=steady_tol,
+            tile=tile,
+            **solver_options,
+        )
+        voi, states, final_states = cache.load_simulation(key, final=True)
+
+        if final and final_states is None and not tile:
+            voi = None  # Cached without the final states
+
+    if voi is None:
+        voi, states, final_states = solver.solve(
+            model_module,
+            init_states,
+            constants,
+            start,
+            end,
+            output_dt=output_dt,
+            record=record,
+            steady_tol=steady_tol,
+            tile=tile,
+            checkpoint=checkpoint,
+            resume=resume,
+            final=True,
+            **solver_options,
+        )
+
+        if use_cache:
+            cache.store_simulation(key, voi, states, final_states)
 
+    if continue_from is not None:
+        # The first timestep is the last one of the saved simulation
+        voi = np.concatenate((saved_voi, voi[1:]))
+        states = np.concatenate((saved_states, states[:, 1:]), axis=1)
+
+    if final:
+        return voi, states, final_states
     return voi, states
 
 
-def run_sweep(sweep_model, param, values, metric, base_sim, estrus=""):
+def run_batch(
+    model,
+    param,
+    values,
+    start=0,
+    end=15000,
+    estrus="",
+    output_dt=1.0,
+    record=("v",),
+    integrator=None,
+    max_step=None,
+    atol=None,
+    rtol=None,
+):
+    """Runs a simulation for each value of a parameter as a single batch
+
+    The simulations are integrated together as one ODE system so that the
+    cost of evaluating the model is shared by the whole batch.
+
+    Args:
+    model -- str or CellModel, name of the model to use {"Roesler2024",
+    "Means2023", "Tong2011", "Tong2014"} or cell model.
+    param -- str, name of the parameter to sweep over.
+    values -- np.array, array of values to sweep over.
+    start -- float, start time in ms for the simulation, default value 0.
+    end -- float, end time in ms for the simulation, default value 15000.
+    estrus -- str, estrus stage for the Roesler2024 model, default value "".
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    record -- list, names or indices of the states to record, None for all
+    the states, default value ("v",).
+    integrator -- str, solver to use instead of SOLVER, default value None.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
+    atol -- float, absolute tolerance instead of ATOL, default value None.
+    rtol -- float, relative tolerance instead of RTOL, default value None.
+
+    Returns:
+    voi -- np.array, timesteps in ms.
+    states -- np.array, simulation data of shape
+    (len(record), len(values), len(voi)).
+
+    Raises:
+    ValueError -- if the start number is less than 0.
+    ValueError -- if the end number is smaller than start value.
+    ValueError -- if output_dt is not positive.
+    ValueError -- if the model name is incorrect.
+    ValueError -- if an estrus stage is given with a CellModel.
+    IndexError -- if the parameter or a recorded state is not valid.
+    KeyError -- if the estrus stage is incorrect.
+
+    """
+    if start < 0:
+        raise ValueError("start value must be greater than 0")
+    if end < start:
+        raise ValueError("end value must be greater than start value")
+
+    init_states = []
+    constants = []
+
+    try:
+        model_module, base_states, base_constants = init_model(model, estrus)
+
+        for value in values:
+            # Only the constants that depend on the parameter are updated
+            value_constants, _ = utils.set_params(
+                list(base_constants),
+                None,
+                param,
+                value,
+                model_module,
+            )
+            init_states.append(base_states)
+            constants.append(value_constants)
+    except (ValueError, IndexError, KeyError):
+        raise
+
+    return solver.solve_batch(
+        model_module,
+        np.array(init_states).T,
+        np.array(constants).T,
+        start,
+        end,
+        integrator=integrator,
+        output_dt=output_dt,
+        record=record,
+        max_step=max_step,
+        atol=atol,
+        rtol=rtol,
+    )
+
+
+def compute_sweep_point(
+    sweep_model,
+    param,
+    value,
+    metric,
+    base_sim,
+    estrus="",
+    output_dt=1.0,
+    integrator=None,
+    max_step=None,
+):
+    """Runs the simulation of a single sweep value and compares the result to
+    a base simulation
+
+    Args:
+    sweep_model -- str, name of the model to use {"Roesler2024", "Means2023",
+    "Tong2011", "Tong2014"}.
+    param -- str, name of the parameter to sweep over.
+    value -- float, value of the parameter.
+    metric -- str, name of the metric to use from {l2, rmse, mae, correl, vrd}.
+    base_sim -- np.array, base simulation to compare to, sampled every
+    output_dt.
+    estrus -- str, estrus stage for the Roesler2024 model, default value "".
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    integrator -- str, solver to use instead of SOLVER, default value None.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
+
+    Returns:
+    comp_point -- float, comparison point between base simulation and sweep
+    simulation using input metric.
+
+    Raises:
+    ValueError -- if the model name is incorrect.
+    IndexError -- if the parameter is not valid.
+    KeyError -- if the estrus stage is incorrect.
+    ValueError -- if the provided metric is not one of
+    {'l2', 'rmse', 'mae', 'correl', 'vrd'}.
+    IntegrationError -- if the integrator fails.
+
+    """
+    t, sweep_data = run_simulation(
+        sweep_model,
+        estrus=estrus,
+        param=param,
+        value=value,
+        output_dt=output_dt,
+        integrator=integrator,
+        max_step=max_step,
+    )
+    return metrics.compute_comparison(
+        base_sim,
+        sweep_data[0, :],
+        metric,
+        time=t,
+    )
+
+
+def submit_sweep(
+    executor,
+    sweep_model,
+    param,
+    values,
+    metric,
+    base_sim,
+    estrus="",
+    output_dt=1.0,
+    integrator=None,
+    max_step=None,
+):
+    """Submits the simulations of a parameter sweep to a process pool
+
+    Args:
+    executor -- concurrent.futures.Executor, pool running the simulations.
+    sweep_model -- str, name of the model to use {"Roesler2024", "Means2023",
+    "Tong2011", "Tong2014"}.
+    param -- str, name of the parameter to sweep over.
+    values -- np.array, array of values to sweep over.
+    metric -- str, name of the metric to use from {l2, rmse, mae, correl, vrd}.
+    base_sim -- np.array, base simulation to compare to, sampled every
+    output_dt.
+    estrus -- str, estrus stage for the Roesler2024 model, default value "".
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    integrator -- str, solver to use instead of SOLVER, default value None.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
+
+    Returns:
+    futures -- list[concurrent.futures.Future], one future per value in the
+    same order as values.
+
+    """
+    return [
+        executor.submit(
+            compute_sweep_point,
+            sweep_model,
+            param,
+            value,
+            metric,
+            base_sim,
+            estrus,
+            output_dt,
+            integrator,
+            max_step,
+        )
+        for value in values
+    ]
+
+
+def collect_sweep(futures, param, values):
+    """Collects the comparison points of a submitted parameter sweep
+
+    The comparison points are returned in the order of the values regardless
+    of the order in which the simulations finish. The points whose
+    integration failed are set to NaN with a warning and marked as failed,
+    see retry_sweep.
+
+    Args:
+    futures -- list[concurrent.futures.Future], futures returned by
+    submit_sweep.
+    param -- str, name of the parameter to sweep over.
+    values -- np.array, array of values to sweep over.
+
+    Returns:
+    comp_points -- np.array, array of comparison points between base simulation
+    and sweep using input metric.
+    failed -- np.array[bool], True for the points whose integration failed.
+
+    Raises:
+    ValueError -- if a simulation raised a ValueError.
+    IndexError -- if a simulation raised an IndexError.
+    KeyError -- if a simulation raised a KeyError.
+    RuntimeError -- if a worker failed for any other reason.
+
+    """
+    comp_points = np.zeros(len(values))
+    failed = np.zeros(len(values), dtype=bool)
+
+    for i, (value, future) in enumerate(zip(values, futures)):
+        try:
+            comp_points[i] = future.result()
+            print(f"  Computed simulation {i+1}")
+        except (ValueError, IndexError, KeyError) as e:
+            raise type(e)(f"{param} = {value}: {e}") from e
+        except solver.IntegrationError as e:
+            comp_points[i] = np.nan
+            failed[i] = True
+            sys.stderr.write(f"Warning: {param} = {value}: {e}\n")
+        except Exception as e:
+            raise RuntimeError(f"{param} = {value}: {e}") from e
+
+    return comp_points, failed
+
+
+def run_sweep(
+    sweep_model,
+    param,
+    values,
+    metric,
+    base_sim,
+    estrus="",
+    workers=1,
+    output_dt=1.0,
+    integrator=None,
+    max_step=None,
+    retry=True,
+):
     """Runs a parameter sweep and compares the results to a base simulation
 
+    If more than one worker is requested the simulations are run in parallel
+    in a process pool. The points whose integration failed are set to NaN
+    with a warning and, if retry is set, re-run with the settings of
+    RETRY_POLICY, see retry_sweep.
+
     Args:
     sweep_model -- str, name of the model to use {"Roesler2024", "Means2023",
     "Tong2011", "Tong2014"}.
     param -- str, name of the parameter to sweep over.
     values -- np.array, array of values to sweep over.
     metric -- str, name of the metric to use from {l2, rmse, mae, correl, vrd}.
-    base_sim -- np.array, base simulation to compare to.
+    base_sim -- np.array, base simulation to compare to, sampled every
+    output_dt.
     estrus -- str, estrus stage for the Roesler2024 model, default value "".
+    workers -- int, number of worker processes, default value 1.
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    integrator -- str, solver to use instead of SOLVER, default value None.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
+    retry -- bool, flag used to re-run the failed points, default value
+    True.
 
     Returns:
     comp_points -- np.array, array of comparison points between base simulation
     and sweep using input metric.
+    failed -- np.array[bool], True for the points whose integration failed.
 
     Raises:
     ValueError -- if the start number is less than 0.
@@ -183,38 +610,188 @@ def run_sweep(sweep_model, param, values, metric, base_sim, estrus=""):
     KeyError -- if the estrus stage is incorrect.
     ValueError -- if the provided metric is not one of
     {'l2', 'rmse', 'mae', 'correl', 'vrd'}.
+    RuntimeError -- if a worker process failed.
 
     """
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = submit_sweep(
+                executor,
+                sweep_model,
+                param,
+                values,
+                metric,
+                base_sim,
+                estrus,
+                output_dt,
+                integrator,
+                max_step,
+            )
+            comp_points, failed = collect_sweep(futures, param, values)
+
+            if retry:
+                comp_points, failed = retry_sweep(
+                    comp_points,
+                    failed,
+                    sweep_model,
+                    param,
+                    values,
+                    metric,
+                    base_sim,
+                    estrus,
+                    output_dt,
+                    executor,
+                )
+
+        return comp_points, failed
+
     comp_points = np.zeros(len(values))
+    failed = np.zeros(len(values), dtype=bool)
 
-    try:
-        for i, value in enumerate(values):
-            print(f"  Computing simulation {i+1}")
-            t, sweep_data = run_simulation(
+    for i, value in enumerate(values):
+        print(f"  Computing simulation {i+1}")
+        try:
+            comp_points[i] = compute_sweep_point(
                 sweep_model,
-                estrus=estrus,
-                param=param,
-                value=value,
+                param,
+                value,
+                metric,
+                base_sim,
+                estrus,
+                output_dt,
+                integrator,
+                max_step,
             )
-            comp_points[i] = metrics.compute_comparison(
+        except (ValueError, IndexError, KeyError) as e:
+            raise type(e)(f"{param} = {value}: {e}") from e
+        except solver.IntegrationError as e:
+            comp_points[i] = np.nan
+            failed[i] = True
+            sys.stderr.write(f"Warning: {param} = {value}: {e}\n")
+
+    if retry:
+        comp_points, failed = retry_sweep(
+            comp_points,
+            failed,
+            sweep_model,
+            param,
+            values,
+            metric,
+            base_sim,
+            estrus,
+            output_dt,
+        )
+
+    return comp_points, failed
+
+
+def retry_sweep(
+    comp_points,
+    failed,
+    sweep_model,
+    param,
+    values,
+    metric,
+    base_sim,
+    estrus="",
+    output_dt=1.0,
+    executor=None,
+    policy=None,
+):
+    """Re-runs the points of a parameter sweep whose integration failed
+
+    The failed points are re-run with each solver settings of the policy in
+    turn until they all succeed, the other points are kept. The simulations
+    are submitted to the executor if one is given, otherwise they are run
+    one after the other.
+
+    Args:
+    comp_points -- np.array, array of comparison points of the sweep.
+    failed -- np.array[bool], True for the points whose integration failed.
+    sweep_model -- str, name of the model to use {"Roesler2024", "Means2023",
+    "Tong2011", "Tong2014"}.
+    param -- str, name of the parameter to sweep over.
+    values -- np.array, array of values to sweep over.
+    metric -- str, name of the metric to use from {l2, rmse, mae, correl, vrd}.
+    base_sim -- np.array, base simulation to compare to, sampled every
+    output_dt.
+    estrus -- str, estrus stage for the Roesler2024 model, default value "".
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    executor -- concurrent.futures.Executor, pool running the simulations,
+    default value None.
+    policy -- list[dict], solver settings with keys {integrator, max_step}
+    to try in order instead of RETRY_POLICY, default value None.
+
+    Returns:
+    comp_points -- np.array, array of comparison points between base simulation
+    and sweep using input metric, NaN for the points that still failed.
+    failed -- np.array[bool], True for the points that still failed.
+
+    Raises:
+    KeyError -- if a setting of the policy is not valid.
+    RuntimeError -- if a worker process failed.
+
+    """
+    if policy is None:
+        policy = RETRY_POLICY
+
+    for settings in policy:
+        for option in settings:
+            if option not in ("integrator", "max_step"):
+                raise KeyError(f"{option} is not a valid retry setting")
+
+    comp_points = np.array(comp_points, dtype=float)
+    failed = np.array(failed, dtype=bool)
+    values = np.asarray(values)
+
+    for settings in policy:
+        indices = np.flatnonzero(failed)
+        if len(indices) == 0:
+            break
+
+        print(f"  Retrying {len(indices)} simulations with {settings}")
+        if executor is not None:
+            futures = submit_sweep(
+                executor,
+                sweep_model,
+                param,
+                values[indices],
+                metric,
                 base_sim,
-                sweep_data[0, :],
+                estrus,
+                output_dt,
+                **settings,
+            )
+            points, still_failed = collect_sweep(
+                futures, param, values[indices]
+            )
+        else:
+            points, still_failed = run_sweep(
+                sweep_model,
+                param,
+                values[indices],
                 metric,
-                time=t,
+                base_sim,
+                estrus,
+                output_dt=output_dt,
+                retry=False,
+                **settings,
             )
-    except (ValueError, KeyError):
-        raise
 
-    return comp_points
+        comp_points[indices] = points
+        failed[indices] = still_failed
+
+    return comp_points, failed
 
 
-def save_simulation(model_name, sim_data, t, estrus=""):
+def save_simulation(model_name, sim_data, t, estrus="", final_states=None):
     """Saves the results of a simulation as {model_name}_{duration}s.pkl with
     duration the last timestep in t. If the model is Roesler2024 then the save
     name includes the estrus stage between model_name and duration.
 
-    The data and time are stored in a dictionnary with respective keys being
-    data and time.
+    The data, time and final states are stored in a dictionnary with
+    respective keys being data, time and final_states. A simulation saved
+    with its final states can be continued with run_simulation.
 
     Args:
     model_name -- str, name of the model to use {"Roesler2024", "Means2023",
@@ -222,6 +799,8 @@ def save_simulation(model_name, sim_data, t, estrus=""):
     sim_data -- np.array, simulation data to save.
     t -- np.array, simulation timestamps in ms.
     estrus -- str, estrus stage for the Roesler2024 model, default value "".
+    final_states -- np.array, states at the last timestep, default value
+    None.
 
     Returns:
 
@@ -238,7 +817,7 @@ def save_simulation(model_name, sim_data, t, estrus=""):
     else:
         res_file = os.path.join(RES_DIR, f"{model_name}_{duration}s.pkl")
 
-    save_dict = {"data": sim_data, "time": t}
+    save_dict = {"data": sim_data, "time": t, "final_states": final_states}
 
     utils.save_data(res_file, save_dict)
 
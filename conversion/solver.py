@@ -0,0 +1,1568 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+solver.py
+
+Functions for solving the cell models
+Author: Mathias Roesler
+Date: 10/26
+"""
+
+import os
+import json
+import functools
+
+import numpy as np
+
+from scipy import sparse
+from scipy.integrate import ode, odeint, solve_ivp
+from conversion import backend
+from conversion.checkpoint import (
+    checkpoint_key,
+    save_checkpoint,
+    load_checkpoint,
+)
+from conversion.constants import SOLVER, METHOD, ATOL, RTOL, MAX_STEP, RL_STEP
+from conversion.constants import ALGEBRAIC_CHUNK, SOLVER_CONFIG
+
+# Solvers that use the Rush-Larsen methods
+RUSH_LARSEN = {"rush_larsen", "grl1"}
+
+# Methods of solve_ivp and those that use the Jacobian
+IVP_METHODS = {"RK45", "RK23", "DOP853", "Radau", "BDF", "LSODA"}
+IMPLICIT_METHODS = {"Radau", "BDF", "LSODA"}
+
+# Names of the stimulus protocol constants in the model legends
+STIMULUS_CONSTANTS = ("stim_start", "stim_interval", "stim_duration")
+
+# Options of solve that keep its (voi, states) output, see check_options
+MODEL_OPTIONS = {
+    "integrator",
+    "steady_tol",
+    "tile",
+    "checkpoint",
+    "resume",
+    "max_step",
+    "atol",
+    "rtol",
+}
+
+# Counters of the ODEPACK integrators in iwork and rwork
+ODEPACK_INTEGRATORS = {"vode", "zvode", "lsoda"}
+
+
+class IntegrationError(RuntimeError):
+    """Failure of an integrator with the time and states it reached"""
+
+    def __init__(self, message, time, states, stats=None):
+        """Creates the error
+
+        Args:
+        message -- str, reason of the failure given by the integrator.
+        time -- float, time in ms reached by the integrator.
+        states -- np.array, states at time.
+        stats -- dict, step statistics of the integrator, default value
+        None.
+
+        """
+        super().__init__(f"integration failed at t = {time:g} ms: {message}")
+        self.message = message
+        self.time = time
+        self.states = states
+        self.stats = {} if stats is None else stats
+
+    def __reduce__(self):
+        # Keeps the attributes when raised in a worker process
+        return (
+            type(self),
+            (self.message, self.time, self.states, self.stats),
+        )
+
+
+def batch_constants(constants):
+    """Reduces the constants of a batch to the values that differ
+
+    Constants that are identical across the batch are returned as scalars so
+    that only the swept constants are evaluated as arrays.
+
+    Args:
+    constants -- np.array[float], constant values of shape
+    (sizeConstants, nb_batch).
+
+    Returns:
+    batch_constants -- list, list of constant values either as float or as
+    np.array of length nb_batch.
+
+    """
+    return [
+        float(row[0]) if np.all(row == row[0]) else row for row in constants
+    ]
+
+
+def scalar_rates(model, constants):
+    """Creates the rates function of a single simulation
+
+    The compute_rates_kernel function of the model is used when it exists,
+    it evaluates the rates with scalar math functions and reads the constant
+    subexpressions computed once by the prepare function of the model. The
+    compute_rates_buffer function is compiled with Numba instead if it is the
+    selected backend. The numpy
+    compute_rates function is used as a fallback for models without a kernel
+    and for the states where a scalar function fails.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    constants -- list[int], list of constant values.
+
+    Returns:
+    rates -- function, rates function of the simulation.
+
+    """
+    kernel = getattr(model, "compute_rates_kernel", None)
+
+    try:
+        prepared = model.prepare(constants)
+    except (AttributeError, OverflowError, ZeroDivisionError, ValueError):
+        kernel = None
+
+    if kernel is None:
+
+        def rates(voi, y):
+            return model.compute_rates(voi, y, constants)
+
+        return rates
+
+    if hasattr(model, "compute_rates_buffer") and (
+        backend.select_backend() == "numba"
+    ):
+        kernel, _ = backend.numba_kernels(model)
+        prepared = np.array(prepared)
+        # The rates are written into the same buffer at every call
+        buffer = np.empty(model.sizeStates)
+
+        def rates(voi, y):
+            return kernel(voi, y, prepared, buffer)
+
+        return rates
+
+    def rates(voi, y):
+        try:
+            return kernel(voi, y, prepared)
+        except (OverflowError, ZeroDivisionError, ValueError):
+            # Let numpy return inf or nan as compute_rates does
+            return model.compute_rates(voi, y, constants)
+
+    return rates
+
+
+def batch_rates(model, constants):
+    """Creates the rates function of a batch of simulations
+
+    The states of the batch are stored in a flat vector with the states of
+    each simulation next to each other. The compiled batch kernel of the
+    model is used if Numba is the selected backend, it then returns the same
+    preallocated array at every call.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    constants -- np.array[float], constant values of shape
+    (sizeConstants, nb_batch).
+
+    Returns:
+    rates -- function, rates function of the batch.
+
+    """
+    nb_batch = constants.shape[1]
+
+    if (
+        hasattr(model, "compute_rates_buffer")
+        and backend.select_backend() == "numba"
+    ):
+        _, kernel = backend.numba_kernels(model)
+        prepared = np.array([model.prepare(column) for column in constants.T])
+        # The rates are written into the same buffer at every call
+        buffer = np.empty((nb_batch, model.sizeStates))
+
+        def rates(voi, y):
+            states = y.reshape(nb_batch, model.sizeStates)
+            return kernel(voi, states, prepared, buffer).ravel()
+
+        return rates
+
+    constants = batch_constants(constants)
+
+    def rates(voi, y):
+        states = y.reshape(nb_batch, model.sizeStates).T
+        return np.array(model.compute_rates(voi, states, constants)).T.ravel()
+
+    return rates
+
+
+def batch_jacobian(model, constants):
+    """Creates the banded Jacobian function of a batch of simulations
+
+    The Jacobian of the batch is block diagonal and is returned in the banded
+    format expected by the integrator with lband = uband = sizeStates - 1.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    constants -- np.array[float], constant values of shape
+    (sizeConstants, nb_batch).
+
+    Returns:
+    jacobian -- function, banded Jacobian function of the batch.
+
+    """
+    nb_batch = constants.shape[1]
+    constants = batch_constants(constants)
+    size = model.sizeStates
+    i, j = np.meshgrid(np.arange(size), np.arange(size), indexing="ij")
+    rows = (size - 1 + i - j)[:, :, np.newaxis]
+    cols = j[:, :, np.newaxis] + size * np.arange(nb_batch)
+
+    def jacobian(voi, y):
+        states = y.reshape(nb_batch, size).T
+        banded = np.zeros((2 * size - 1, size * nb_batch))
+        banded[rows, cols] = model.compute_jacobian(voi, states, constants)
+        return banded
+
+    return jacobian
+
+
+def output_times(start=0, end=15000, output_dt=1.0):
+    """Creates the output timesteps of a simulation
+
+    Args:
+    start -- float, start time in ms for the simulation, default value 0.
+    end -- float, end time in ms for the simulation, default value 15000.
+    output_dt -- float, interval in ms between two outputs, default value 1.
+
+    Returns:
+    voi -- np.array, timesteps in ms from start to the last multiple of
+    output_dt before end.
+
+    Raises:
+    ValueError -- if output_dt is not positive.
+
+    """
+    if output_dt <= 0:
+        raise ValueError("output_dt must be greater than 0")
+
+    nb_steps = int(np.floor((end - start) / output_dt + 1e-9))
+    return start + output_dt * np.arange(nb_steps + 1)
+
+
+def name_indices(name_index, size, names, kind="state"):
+    """Finds the indices of variables from their names or indices
+
+    Args:
+    name_index -- dict, mapping between the names (first word of the legend)
+    and the indices of the variables.
+    size -- int, number of variables.
+    names -- list, names or indices of the variables.
+    kind -- str, kind of variable used in the error messages, default value
+    "state".
+
+    Returns:
+    indices -- np.array[int], indices of the variables.
+
+    Raises:
+    IndexError -- if a variable is not found.
+
+    """
+    indices = []
+
+    for name in names:
+        if isinstance(name, str):
+            if name not in name_index:
+                raise IndexError(f"{name} was not found in {kind} list")
+            indices.append(name_index[name])
+
+        elif 0 <= name < size:
+            indices.append(int(name))
+
+        else:
+            raise IndexError(f"{kind} index {name} is out of range")
+
+    return np.array(indices, dtype=int)
+
+
+def record_indices(model, record=None):
+    """Finds the indices of the states to record
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    record -- list, names or indices of the states to record, default value
+    None for all the states.
+
+    Returns:
+    indices -- np.array[int], indices of the states to record.
+
+    Raises:
+    IndexError -- if a state is not found.
+
+    """
+    if record is None:
+        return np.arange(model.sizeStates)
+
+    return name_indices(model.stateIndices, model.sizeStates, record)
+
+
+def compute_algebraic(
+    model,
+    constants,
+    states,
+    voi,
+    names=None,
+    window=None,
+    chunk_size=ALGEBRAIC_CHUNK,
+):
+    """Computes the requested algebraic variables of a simulation
+
+    The algebraic variables are computed over the time window in chunks of
+    chunk_size timesteps, so that the algebraic variables that are not
+    requested are never stored for the whole simulation.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    constants -- list[float], list of constant values.
+    states -- np.array, simulation data of all the states.
+    voi -- np.array, timesteps in ms.
+    names -- list, names (first word of the legend) or indices of the
+    algebraic variables, default value None for all the algebraic variables.
+    window -- tuple[float], start and end times in ms of the window, default
+    value None for the whole simulation.
+    chunk_size -- int, number of timesteps computed at once, default value
+    ALGEBRAIC_CHUNK.
+
+    Returns:
+    voi -- np.array, timesteps in ms of the window.
+    algebraic -- np.array, algebraic variables of shape (len(names),
+    len(voi)).
+
+    Raises:
+    ValueError -- if the states are not all the states of the model.
+    IndexError -- if an algebraic variable is not found.
+
+    """
+    if len(states) != model.sizeStates:
+        raise ValueError("all the states are required to compute algebraics")
+
+    if names is None:
+        indices = np.arange(model.sizeAlgebraic)
+    else:
+        indices = name_indices(
+            model.algebraicIndices, model.sizeAlgebraic, names, "algebraic"
+        )
+
+    first, last = 0, len(voi)
+    if window is not None:
+        first = np.searchsorted(voi, window[0])
+        last = np.searchsorted(voi, window[1], side="right")
+
+    algebraic = np.zeros((len(indices), last - first))
+    for i in range(first, last, chunk_size):
+        chunk = slice(i, min(i + chunk_size, last))
+        values = model.compute_algebraic(
+            constants,
+            states[:, chunk],
+            voi[chunk],
+        )
+        algebraic[:, i - first : chunk.stop - first] = values[indices]
+
+    return voi[first:last], algebraic
+
+
+def lazy_algebraic(model, constants, states, voi):
+    """Creates a function computing the algebraic variables on request
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    constants -- list[float], list of constant values.
+    states -- np.array, simulation data of all the states.
+    voi -- np.array, timesteps in ms.
+
+    Returns:
+    algebraic -- function, algebraic(names=None, window=None) returns the
+    timesteps of the window and the requested algebraic variables, see
+    compute_algebraic.
+
+    """
+
+    def algebraic(names=None, window=None):
+        return compute_algebraic(model, constants, states, voi, names, window)
+
+    return algebraic
+
+
+def stimulus_edges(model, constants, start=0, end=15000):
+    """Computes the times at which the stimulus of a model switches on or off
+
+    The stimulus is off before stim_start, on until stim_start +
+    stim_duration and then on for stim_duration at the start of every period
+    of stim_interval + stim_duration.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    constants -- list[float], list of constant values, either as float or as
+    np.array for a batch of simulations.
+    start -- int, start time in ms for the simulation, default value 0.
+    end -- int, end time in ms for the simulation, default value 15000.
+
+    Returns:
+    edges -- np.array, sorted times in ms strictly between start and end.
+
+    """
+    try:
+        indices = [model.constantIndices[name] for name in STIMULUS_CONSTANTS]
+    except KeyError:
+        # No stimulus protocol in the model
+        return np.array([])
+
+    edges = set()
+    values = np.broadcast_arrays(
+        *[np.atleast_1d(constants[i]) for i in indices]
+    )
+    for stim_start, interval, duration in zip(*values):
+        stim_end = stim_start + duration
+        edges.update([stim_start, stim_end])
+
+        period = interval + duration
+        if period <= 0:
+            continue
+
+        for k in range(
+            max(int(stim_end // period), 0), int(np.ceil(end / period)) + 1
+        ):
+            edges.update(
+                e for e in (k * period, k * period + duration) if e > stim_end
+            )
+
+    return np.array(sorted(e for e in edges if start < e < end), dtype=float)
+
+
+def ode_error(r):
+    """Creates the error of a failed scipy ode integrator
+
+    Args:
+    r -- scipy.integrate.ode, failed integrator.
+
+    Returns:
+    error -- IntegrationError, error with the time and states reached, the
+    return code, and for the ODEPACK integrators the number of steps, rates
+    and Jacobian evaluations and the last step size.
+
+    """
+    code = r.get_return_code()
+    integrator = r._integrator
+    stats = {"return_code": code}
+
+    if type(integrator).__name__ in ODEPACK_INTEGRATORS:
+        stats["steps"] = int(integrator.iwork[10])
+        stats["rhs_evaluations"] = int(integrator.iwork[11])
+        stats["jacobian_evaluations"] = int(integrator.iwork[12])
+        stats["step_size"] = float(integrator.rwork[10])
+
+    message = getattr(integrator, "messages", {}).get(
+        code, f"return code {code}"
+    )
+    return IntegrationError(message, float(r.t), r.y.copy(), stats)
+
+
+def solve_ode(
+    rates,
+    jacobian,
+    init_states,
+    voi,
+    scale=1.0,
+    band=None,
+    integrator=None,
+    edges=(),
+    record=None,
+    max_step=None,
+    atol=None,
+    rtol=None,
+):
+    """Solves an ODE system with a scipy integrator
+
+    The system is integrated piecewise between the edges and the integrator
+    is reinitialised at each edge, so that it never steps over a
+    discontinuity of the rates.
+
+    Args:
+    rates -- function, rates function of the system f(voi, y).
+    jacobian -- function, Jacobian function of the system jac(voi, y).
+    init_states -- np.array[float], initial states.
+    voi -- np.array, timesteps in ms.
+    scale -- float, factor dividing the tolerances, default value 1.0.
+    band -- int, lower and upper bandwidth of the Jacobian if banded, default
+    value None.
+    integrator -- str, scipy integrator to use instead of SOLVER, default
+    value None.
+    edges -- list[float], sorted times in ms at which the rates are
+    discontinuous, default value ().
+    record -- np.array[int], indices of the states to return, default value
+    None for all the states.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
+    atol -- float, absolute tolerance instead of ATOL, default value None.
+    rtol -- float, relative tolerance instead of RTOL, default value None.
+
+    Returns:
+    states -- np.array, simulation data of shape (len(record), len(voi)).
+
+    Raises:
+    IntegrationError -- if the integrator fails.
+
+    """
+    if integrator is None:
+        integrator = SOLVER
+    if max_step is None:
+        max_step = MAX_STEP
+    if atol is None:
+        atol = ATOL
+    if rtol is None:
+        rtol = RTOL
+
+    options = {}
+    if band is not None:
+        options = {"lband": band, "uband": band}
+
+        if integrator == "lsoda":
+            # lsoda expects band more rows of zeros below the bands
+            bands = jacobian
+
+            def jacobian(voi, y):
+                banded = bands(voi, y)
+                return np.vstack((banded, np.zeros((band, banded.shape[1]))))
+
+    # Construct ODE object to solve
+    r = ode(rates, jacobian)
+    r.set_integrator(
+        integrator,
+        method=METHOD,
+        atol=atol / scale,
+        rtol=rtol / scale,
+        max_step=max_step,
+        nsteps=100000,
+        **options,
+    )
+    r.set_initial_value(init_states, voi[0])
+
+    # Solve model
+    edges = list(edges)
+    if record is None:
+        record = np.arange(len(init_states))
+
+    states = np.zeros((len(record), len(voi)))
+    states[:, 0] = init_states[record]
+    for i, t in enumerate(voi[1:]):
+        # Restart the integrator at the edges before t
+        while edges and edges[0] <= t:
+            edge = edges.pop(0)
+            if edge > r.t:
+                r.integrate(edge)
+                if not r.successful():
+                    raise ode_error(r)
+            r.set_initial_value(r.y.copy(), edge)
+
+        if t > r.t:
+            r.integrate(t)
+            if not r.successful():
+                raise ode_error(r)
+        states[:, i + 1] = r.y[record]
+
+    return states
+
+
+def segments(voi, edges=()):
+    """Splits the timesteps into the segments between the edges
+
+    Args:
+    voi -- np.array, timesteps in ms.
+    edges -- list[float], sorted times in ms at which the rates are
+    discontinuous, default value ().
+
+    Returns:
+    segments -- list[tuple], list of (t, indices) where t are the times to
+    integrate over, from the start to the end of the segment, and indices are
+    the indices in voi of the times t[1:len(indices) + 1].
+
+    """
+    bounds = [voi[0]] + [e for e in edges if voi[0] < e < voi[-1]]
+    bounds.append(voi[-1])
+
+    result = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        indices = np.nonzero((voi > start) & (voi <= end))[0]
+        t = np.concatenate(([start], voi[indices]))
+        if t[-1] < end:
+            t = np.append(t, end)
+        result.append((t, indices))
+
+    return result
+
+
+def solve_odeint(
+    rates,
+    jacobian,
+    init_states,
+    voi,
+    scale=1.0,
+    band=None,
+    edges=(),
+    record=None,
+    max_step=None,
+    atol=None,
+    rtol=None,
+):
+    """Solves an ODE system with odeint (LSODA)
+
+    The system is integrated with one call per segment between the edges and
+    the solution is returned directly at the timesteps.
+
+    Args:
+    rates -- function, rates function of the system f(voi, y).
+    jacobian -- function, Jacobian function of the system jac(voi, y).
+    init_states -- np.array[float], initial states.
+    voi -- np.array, timesteps in ms.
+    scale -- float, factor dividing the tolerances, default value 1.0.
+    band -- int, lower and upper bandwidth of the Jacobian if banded, default
+    value None.
+    edges -- list[float], sorted times in ms at which the rates are
+    discontinuous, default value ().
+    record -- np.array[int], indices of the states to return, default value
+    None for all the states.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
+    atol -- float, absolute tolerance instead of ATOL, default value None.
+    rtol -- float, relative tolerance instead of RTOL, default value None.
+
+    Returns:
+    states -- np.array, simulation data of shape (len(record), len(voi)).
+
+    Raises:
+    IntegrationError -- if the integrator fails.
+
+    """
+    if max_step is None:
+        max_step = MAX_STEP
+    if atol is None:
+        atol = ATOL
+    if rtol is None:
+        rtol = RTOL
+
+    if record is None:
+        record = np.arange(len(init_states))
+
+    states = np.zeros((len(record), len(voi)))
+    states[:, 0] = init_states[record]
+    y = init_states
+
+    for t, indices in segments(voi, edges):
+        solution, info = odeint(
+            rates,
+            y,
+            t,
+            Dfun=jacobian,
+            ml=band,
+            mu=band,
+            rtol=rtol / scale,
+            atol=atol / scale,
+            hmax=max_step,
+            mxstep=100000,
+            full_output=True,
+            tfirst=True,
+        )
+        if info["message"] != "Integration successful.":
+            # First time that was not reached
+            failed = np.nonzero(info["tcur"] < t[1:])[0][0]
+            raise IntegrationError(
+                info["message"],
+                float(info["tcur"][failed]),
+                solution[failed + 1].copy(),
+                {
+                    "steps": int(info["nst"][failed]),
+                    "rhs_evaluations": int(info["nfe"][failed]),
+                    "jacobian_evaluations": int(info["nje"][failed]),
+                    "step_size": float(info["hu"][failed]),
+                },
+            )
+
+        states[:, indices] = solution[1 : len(indices) + 1, record].T
+        y = solution[-1]
+
+    return states
+
+
+def solve_ivp_method(
+    rates,
+    jacobian,
+    init_states,
+    voi,
+    method,
+    scale=1.0,
+    sparsity=None,
+    edges=(),
+    record=None,
+    max_step=None,
+    atol=None,
+    rtol=None,
+):
+    """Solves an ODE system with one of the solve_ivp methods
+
+    The system is integrated with one call per segment between the edges and
+    the solution is returned directly at the timesteps.
+    The rates are copied as solve_ivp keeps the rates of previous steps and
+    the rates function may reuse its output array.
+
+    Args:
+    rates -- function, rates function of the system f(voi, y).
+    jacobian -- function, Jacobian function of the system jac(voi, y), only
+    used by the implicit methods.
+    init_states -- np.array[float], initial states.
+    voi -- np.array, timesteps in ms.
+    method -- str, solve_ivp method, {RK45, RK23, DOP853, Radau, BDF, LSODA}.
+    scale -- float, factor dividing the tolerances, default value 1.0.
+    sparsity -- sparse matrix, sparsity structure of the Jacobian used when
+    jacobian is None, default value None.
+    edges -- list[float], sorted times in ms at which the rates are
+    discontinuous, default value ().
+    record -- np.array[int], indices of the states to return, default value
+    None for all the states.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
+    atol -- float, absolute tolerance instead of ATOL, default value None.
+    rtol -- float, relative tolerance instead of RTOL, default value None.
+
+    Returns:
+    states -- np.array, simulation data of shape (len(record), len(voi)).
+
+    Raises:
+    IntegrationError -- if the integrator fails.
+
+    """
+    if max_step is None:
+        max_step = MAX_STEP
+    if atol is None:
+        atol = ATOL
+    if rtol is None:
+        rtol = RTOL
+
+    def fun(t, y):
+        return np.array(rates(t, y))
+
+    options = {}
+    if method in IMPLICIT_METHODS:
+        if jacobian is not None:
+            options["jac"] = jacobian
+        elif sparsity is not None:
+            options["jac_sparsity"] = sparsity
+
+    if record is None:
+        record = np.arange(len(init_states))
+
+    states = np.zeros((len(record), len(voi)))
+    states[:, 0] = init_states[record]
+    y = init_states
+
+    for t, indices in segments(voi, edges):
+        solution = solve_ivp(
+            fun,
+            (t[0], t[-1]),
+            y,
+            method=method,
+            t_eval=t[1:],
+            rtol=rtol / scale,
+            atol=atol / scale,
+            max_step=max_step if max_step > 0 else np.inf,
+            **options,
+        )
+
+        if not solution.success:
+            # Last timestep reached before the failure
+            if len(solution.t):
+                t_failed, y_failed = solution.t[-1], solution.y[:, -1]
+            else:
+                t_failed, y_failed = t[0], y
+
+            raise IntegrationError(
+                solution.message,
+                float(t_failed),
+                np.array(y_failed),
+                {
+                    "return_code": int(solution.status),
+                    "rhs_evaluations": int(solution.nfev),
+                    "jacobian_evaluations": int(solution.njev),
+                    "lu_decompositions": int(solution.nlu),
+                },
+            )
+
+        states[:, indices] = solution.y[record, : len(indices)]
+        y = solution.y[:, -1]
+
+    return states
+
+
+def solve_rush_larsen(
+    model,
+    init_states,
+    constants,
+    voi,
+    generalised=False,
+    record=None,
+):
+    """Solves a model with the Rush-Larsen method
+
+    The gates are updated exactly over each step assuming the other states
+    are constant. The other states are updated with the forward Euler method,
+    or with the same exponential update using the diagonal of the Jacobian
+    for the generalised Rush-Larsen (GRL1) method. The steps are at most
+    RL_STEP long and end on every timestep of voi.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    init_states -- np.array[float], initial states of shape (sizeStates,) or
+    (sizeStates, nb_batch).
+    constants -- list[float], list of constant values, either as float or as
+    np.array of length nb_batch.
+    voi -- np.array, timesteps in ms.
+    generalised -- bool, flag used to apply the exponential update to all
+    the states, default value False.
+    record -- np.array[int], indices of the states to return, default value
+    None for all the states.
+
+    Returns:
+    states -- np.array, simulation data of shape (len(record),) +
+    init_states.shape[1:] + (len(voi),).
+
+    Raises:
+    IntegrationError -- if the states are not finite.
+
+    """
+    if generalised:
+        exponential = np.arange(model.sizeStates)
+    else:
+        exponential = np.array(model.gateStates, dtype=int)
+
+    y = np.array(init_states, dtype=float)
+    if record is None:
+        record = np.arange(model.sizeStates)
+
+    states = np.zeros((len(record),) + y.shape[1:] + (len(voi),))
+    states[..., 0] = y[record]
+
+    for i in range(1, len(voi)):
+        nb_substeps = int(np.ceil((voi[i] - voi[i - 1]) / RL_STEP - 1e-9))
+        dt = (voi[i] - voi[i - 1]) / nb_substeps
+        t = voi[i - 1]
+
+        for _ in range(nb_substeps):
+            rates = np.array(model.compute_rates(t, y, constants))
+            diagonal = model.compute_jacobian_diagonal(t, y, constants)
+            update = dt * rates
+
+            # Exponential update rates / a * (exp(a * dt) - 1)
+            a = diagonal[exponential]
+            linear = np.abs(a) < 1e-12
+            a = np.where(linear, 1.0, a)
+            update[exponential] = np.where(
+                linear,
+                update[exponential],
+                rates[exponential] / a * np.expm1(a * dt),
+            )
+
+            y = y + update
+            t += dt
+
+        if not np.all(np.isfinite(y)):
+            raise IntegrationError(
+                "the states are not finite",
+                float(t),
+                y,
+                {"step_size": dt},
+            )
+
+        states[..., i] = y[record]
+
+    return states
+
+
+def integrate(
+    model,
+    init_states,
+    constants,
+    voi,
+    integrator,
+    record=None,
+    max_step=None,
+    atol=None,
+    rtol=None,
+):
+    """Integrates a model over the timesteps with the given solver
+
+    The Rush-Larsen methods are used if integrator is "rush_larsen" or
+    "grl1", odeint if it is "odeint", solve_ivp if it is one of its methods,
+    otherwise integrator and METHOD select the scipy ode integrator. The
+    integrators are restarted at every edge of the stimulus.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    init_states -- list[float], list of initial states.
+    constants -- list[int], list of constant values.
+    voi -- np.array, timesteps in ms.
+    integrator -- str, solver to use.
+    record -- np.array[int], indices of the states to return, default value
+    None for all the states.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
+    atol -- float, absolute tolerance instead of ATOL, default value None.
+    rtol -- float, relative tolerance instead of RTOL, default value None.
+
+    Returns:
+    states -- np.array, simulation data of shape (len(record), len(voi)).
+
+    Raises:
+    IntegrationError -- if the integrator fails.
+
+    """
+    if integrator in RUSH_LARSEN:
+        return solve_rush_larsen(
+            model,
+            init_states,
+            constants,
+            voi,
+            integrator == "grl1",
+            record,
+        )
+
+    edges = stimulus_edges(model, constants, voi[0], voi[-1])
+    init_states = np.array(init_states, dtype=float)
+
+    rates = scalar_rates(model, constants)
+
+    def jacobian(t, y):
+        return model.compute_jacobian(t, y, constants)
+
+    if integrator == "odeint":
+        return solve_odeint(
+            rates,
+            jacobian,
+            init_states,
+            voi,
+            edges=edges,
+            record=record,
+            max_step=max_step,
+            atol=atol,
+            rtol=rtol,
+        )
+    elif integrator in IVP_METHODS:
+        return solve_ivp_method(
+            rates,
+            jacobian,
+            init_states,
+            voi,
+            integrator,
+            edges=edges,
+            record=record,
+            max_step=max_step,
+            atol=atol,
+            rtol=rtol,
+        )
+
+    return solve_ode(
+        rates,
+        jacobian,
+        init_states,
+        voi,
+        integrator=integrator,
+        edges=edges,
+        record=record,
+        max_step=max_step,
+        atol=atol,
+        rtol=rtol,
+    )
+
+
+def solve_cycles(
+    model,
+    init_states,
+    constants,
+    voi,
+    integrator,
+    record,
+    steady_tol,
+    tile=False,
+    max_step=None,
+    atol=None,
+    rtol=None,
+):
+    """Solves a model one pacing cycle at a time until the cycle converges
+
+    A cycle starts at the onset of a periodic stimulus and lasts
+    stim_interval + stim_duration. The integration stops at the end of the
+    first cycle over which the relative change of the states is below
+    steady_tol, see steady_state.cycle_difference. The converged cycle can
+    then be repeated up to the last timestep.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    init_states -- list[float], list of initial states.
+    constants -- list[int], list of constant values.
+    voi -- np.array, timesteps in ms.
+    integrator -- str, solver to use.
+    record -- np.array[int], indices of the states to return.
+    steady_tol -- float, relative change of the states over a cycle below
+    which the cycle has converged.
+    tile -- bool, flag used to repeat the converged cycle up to the last
+    timestep, default value False.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
+    atol -- float, absolute tolerance instead of ATOL, default value None.
+    rtol -- float, relative tolerance instead of RTOL, default value None.
+
+    Returns:
+    voi -- np.array, timesteps in ms, up to the end of the converged cycle
+    unless tile is set.
+    states -- np.array, simulation data of the recorded states.
+    cycle -- tuple, start and end times in ms of the converged cycle, None
+    if no cycle converged.
+    final_states -- np.array, states at the last timestep, None if the
+    converged cycle is tiled.
+
+    Raises:
+    ValueError -- if the model has no stimulus protocol.
+    IntegrationError -- if the integrator fails.
+
+    """
+    # steady_state imports the solver
+    from conversion import steady_state
+
+    period = steady_state.pacing_period(model, constants)
+    boundaries = period * np.arange(1, np.floor(voi[-1] / period) + 1)
+
+    states = np.zeros((len(record), len(voi)))
+    y = np.array(init_states, dtype=float)
+    states[:, 0] = y[record]
+
+    # Start time of the current cycle, None until the first boundary
+    cycle_start = voi[0] if np.isclose(boundaries, voi[0]).any() else None
+    cycle = None
+
+    for t, indices in segments(voi, boundaries):
+        cycle_states = integrate(
+            model,
+            y,
+            constants,
+            t,
+            integrator,
+            max_step=max_step,
+            atol=atol,
+            rtol=rtol,
+        )
+        states[:, indices] = cycle_states[record, 1 : len(indices) + 1]
+        previous, y = y, cycle_states[:, -1]
+
+        if not np.isclose(boundaries, t[-1]).any():
+            # The last segment ends before the next cycle
+            break
+
+        if (
+            cycle_start is not None
+            and steady_state.cycle_difference(previous, y) < steady_tol
+        ):
+            cycle = (float(cycle_start), float(t[-1]))
+            break
+
+        cycle_start = t[-1]
+
+    if cycle is None:
+        return voi, states, None, y
+
+    nb_outputs = np.searchsorted(voi, t[-1], side="right")
+
+    if not tile:
+        return voi[:nb_outputs], states[:, :nb_outputs], cycle, y
+
+    # Times of the remaining outputs within the converged cycle, the end of
+    # the cycle is used for the boundaries so that the states are continuous
+    phase = t[-1] - (t[-1] - voi[nb_outputs:]) % period
+    for i, row in enumerate(cycle_states[record]):
+        states[i, nb_outputs:] = np.interp(phase, t, row)
+
+    return voi, states, cycle, None
+
+
+def solve_edges(
+    model,
+    init_states,
+    constants,
+    voi,
+    integrator,
+    record,
+    path=None,
+    key=None,
+    resume=False,
+    max_step=None,
+    atol=None,
+    rtol=None,
+):
+    """Solves a model one segment between the edges of the stimulus at a time
+
+    The full states are kept between the segments and a checkpoint is saved
+    at every edge if a path is given. The integrators are restarted at the
+    edges of the stimulus, so a simulation resumed from a checkpoint gives
+    the same results as an uninterrupted one. For the same reason no
+    checkpoint is saved at the last timestep, a longer simulation resumes
+    from the last edge. A checkpoint that goes past the last timestep
+    provides all the outputs.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    init_states -- list[float], list of initial states.
+    constants -- list[int], list of constant values.
+    voi -- np.array, timesteps in ms.
+    integrator -- str, solver to use.
+    record -- np.array[int], indices of the states to return.
+    path -- str, path to the checkpoint file, default value None to save no
+    checkpoint.
+    key -- str, key of the simulation, see checkpoint_key, default value
+    None.
+    resume -- bool, flag used to continue from the saved checkpoint,
+    default value False.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
+    atol -- float, absolute tolerance instead of ATOL, default value None.
+    rtol -- float, relative tolerance instead of RTOL, default value None.
+
+    Returns:
+    states -- np.array, simulation data of shape (len(record), len(voi)).
+    final_states -- np.array, states at the last timestep, None if the
+    outputs come from a checkpoint that goes past the last timestep.
+
+    """
+    states = np.zeros((len(record), len(voi)))
+    y = np.array(init_states, dtype=float)
+    states[:, 0] = y[record]
+    t_start = voi[0]
+    nb_outputs = 1
+
+    saved = None
+    if path is not None and resume:
+        saved = load_checkpoint(path, key)
+
+    if saved is not None:
+        nb_outputs = min(len(saved["voi"]), len(voi))
+        states[:, :nb_outputs] = saved["data"][:, :nb_outputs]
+
+        if saved["time"] >= voi[-1]:
+            return states, None
+
+        y = saved["states"]
+        t_start = saved["time"]
+
+    # Remaining timesteps after the start time
+    remaining = np.concatenate(([t_start], voi[nb_outputs:]))
+    edges = stimulus_edges(model, constants, t_start, voi[-1])
+
+    for t, indices in segments(remaining, edges):
+        segment_states = integrate(
+            model,
+            y,
+            constants,
+            t,
+            integrator,
+            max_step=max_step,
+            atol=atol,
+            rtol=rtol,
+        )
+        states[:, nb_outputs + indices - 1] = segment_states[
+            record, 1 : len(indices) + 1
+        ]
+        y = segment_states[:, -1]
+
+        if path is None or not np.isclose(edges, t[-1]).any():
+            # Resuming from the last timestep would add a restart
+            continue
+
+        done = np.searchsorted(voi, t[-1], side="right")
+        save_checkpoint(path, key, t[-1], y, voi[:done], states[:, :done])
+
+    return states, y
+
+
+@functools.lru_cache(maxsize=8)
+def read_solver_config(path, mtime):
+    """Reads a solver configuration file
+
+    The file is parsed once per process for each modification time.
+
+    Args:
+    path -- str, path to the configuration file.
+    mtime -- float, modification time of the file, only used as cache key.
+
+    Returns:
+    config -- dict, solver settings by model name.
+
+    """
+    with open(path, "r") as handle:
+        return json.load(handle)
+
+
+def check_options(options):
+    """Checks the solver options given to the solve_model function of a model
+
+    Args:
+    options -- dict, solver options, see solve.
+
+    Returns:
+
+    Raises:
+    KeyError -- if an option is not one of MODEL_OPTIONS, such as final
+    which changes the output of solve.
+
+    """
+    for option in options:
+        if option not in MODEL_OPTIONS:
+            raise KeyError(
+                f"{option} is not a valid solve_model option, "
+                f"use solver.solve instead"
+            )
+
+
+def model_settings(model, path=None):
+    """Reads the solver settings recommended for a model
+
+    The settings are written by benchmark.save_solver_config with the name
+    of the model as key, the file is only parsed again when it changes.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    path -- str, path to the configuration file instead of SOLVER_CONFIG,
+    default value None.
+
+    Returns:
+    settings -- dict, solver settings with keys among {integrator, atol,
+    rtol}, empty if the model has no recommended settings.
+
+    """
+    if path is None:
+        path = SOLVER_CONFIG
+
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+
+    config = read_solver_config(path, mtime)
+    return dict(config.get(model.__name__.split(".")[-1], {}))
+
+
+def solve(
+    model,
+    init_states,
+    constants,
+    start=0,
+    end=15000,
+    integrator=None,
+    output_dt=1.0,
+    record=None,
+    steady_tol=None,
+    tile=False,
+    checkpoint=None,
+    resume=False,
+    final=False,
+    max_step=None,
+    atol=None,
+    rtol=None,
+):
+    """Solves a model with the solver selected in SOLVER
+
+    The Rush-Larsen methods are used if SOLVER is "rush_larsen" or "grl1",
+    odeint if SOLVER is "odeint", solve_ivp if SOLVER is one of its methods,
+    otherwise SOLVER and METHOD select the scipy ode integrator. The
+    integrators are restarted at every edge of the stimulus. The settings
+    recommended for the model in SOLVER_CONFIG replace SOLVER, ATOL and RTOL
+    when they are not given, see model_settings.
+
+    If steady_tol is given the simulation stops once a pacing cycle has
+    converged, see solve_cycles, and the converged cycle is printed.
+    If a checkpoint path is given the time and states are saved at every edge
+    of the stimulus, see solve_edges, and resume continues the simulation
+    from the saved checkpoint. If final is set the full states at the last
+    timestep are also returned so that the simulation can be continued.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    init_states -- list[float], list of initial states.
+    constants -- list[int], list of constant values.
+    start -- int, start time in ms for the simulation, default value 0.
+    end -- int, end time in ms for the simulation, default value 15000.
+    integrator -- str, solver to use instead of SOLVER, default value None.
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    record -- list, names or indices of the states to record, default value
+    None for all the states.
+    steady_tol -- float, relative change of the states over a cycle below
+    which the simulation stops, default value None to run up to end.
+    tile -- bool, flag used to repeat the converged cycle up to end, default
+    value False.
+    checkpoint -- str, path to the checkpoint file, default value None to
+    save no checkpoint.
+    resume -- bool, flag used to continue from the saved checkpoint,
+    default value False.
+    final -- bool, flag used to return the states at the last timestep,
+    default value False.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
+    atol -- float, absolute tolerance instead of ATOL, default value None.
+    rtol -- float, relative tolerance instead of RTOL, default value None.
+
+    Returns:
+    voi -- np.array, timesteps in ms.
+    states -- np.array, simulation data of the recorded states.
+    final_states -- np.array, states at the last timestep, only returned if
+    final is set, see solve_edges and solve_cycles.
+
+    Raises:
+    ValueError -- if output_dt is not positive.
+    ValueError -- if steady_tol is given and the model has no stimulus
+    protocol.
+    ValueError -- if both steady_tol and checkpoint are given.
+    IndexError -- if a recorded state is not found.
+    IntegrationError -- if the integrator fails.
+
+    """
+    settings = model_settings(model)
+    if integrator is None:
+        integrator = settings.get("integrator", SOLVER)
+    if atol is None:
+        atol = settings.get("atol", ATOL)
+    if rtol is None:
+        rtol = settings.get("rtol", RTOL)
+
+    # Set timespan to solve over
+    voi = output_times(start, end, output_dt)
+    record = record_indices(model, record)
+
+    if steady_tol is not None and checkpoint is not None:
+        raise ValueError("steady_tol and checkpoint cannot be combined")
+
+    if steady_tol is None and (checkpoint is not None or final):
+        key = checkpoint_key(
+            model,
+            init_states,
+            constants,
+            start,
+            integrator=integrator,
+            output_dt=output_dt,
+            record=record.tolist(),
+            max_step=max_step,
+            atol=atol,
+            rtol=rtol,
+        )
+        states, final_states = solve_edges(
+            model,
+            init_states,
+            constants,
+            voi,
+            integrator,
+            record,
+            checkpoint,
+            key,
+            resume,
+            max_step,
+            atol,
+            rtol,
+        )
+
+        if final:
+            return voi, states, final_states
+        return voi, states
+
+    if steady_tol is None:
+        states = integrate(
+            model,
+            init_states,
+            constants,
+            voi,
+            integrator,
+            record,
+            max_step,
+            atol,
+            rtol,
+        )
+        return voi, states
+
+    voi, states, cycle, final_states = solve_cycles(
+        model,
+        init_states,
+        constants,
+        voi,
+        integrator,
+        record,
+        steady_tol,
+        tile,
+        max_step,
+        atol,
+        rtol,
+    )
+
+    if cycle is not None:
+        print(f"Converged cycle from {cycle[0]:g} to {cycle[1]:g} ms")
+
+    if final:
+        return voi, states, final_states
+    return voi, states
+
+
+def solve_batch(
+    model,
+    init_states,
+    constants,
+    start=0,
+    end=15000,
+    integrator=None,
+    output_dt=1.0,
+    record=None,
+    max_step=None,
+    atol=None,
+    rtol=None,
+):
+    """Solves a batch of simulations of a model as a single ODE system
+
+    All the simulations share the same time steps. The tolerances are scaled
+    by the square root of the batch size so that the error of each simulation
+    is controlled as if it was solved on its own. The settings recommended
+    for the model in SOLVER_CONFIG are used as in solve.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    init_states -- np.array[float], initial states of shape
+    (sizeStates, nb_batch).
+    constants -- np.array[float], constant values of shape
+    (sizeConstants, nb_batch).
+    start -- int, start time in ms for the simulation, default value 0.
+    end -- int, end time in ms for the simulation, default value 15000.
+    integrator -- str, solver to use instead of SOLVER, default value None.
+    output_dt -- float, interval in ms between two outputs, default value 1.
+    record -- list, names or indices of the states to record, default value
+    None for all the states.
+    max_step -- float, maximum step in ms instead of MAX_STEP, default
+    value None.
+    atol -- float, absolute tolerance instead of ATOL, default value None.
+    rtol -- float, relative tolerance instead of RTOL, default value None.
+
+    Returns:
+    voi -- np.array, timesteps in ms.
+    states -- np.array, simulation data of shape
+    (len(record), nb_batch, len(voi)).
+
+    Raises:
+    ValueError -- if the states and constants batch sizes differ.
+    ValueError -- if output_dt is not positive.
+    IndexError -- if a recorded state is not found.
+
+    """
+    settings = model_settings(model)
+    if integrator is None:
+        integrator = settings.get("integrator", SOLVER)
+    if atol is None:
+        atol = settings.get("atol", ATOL)
+    if rtol is None:
+        rtol = settings.get("rtol", RTOL)
+
+    init_states = np.asarray(init_states, dtype=float)
+    constants = np.asarray(constants, dtype=float)
+    nb_batch = init_states.shape[1]
+
+    if constants.shape[1] != nb_batch:
+        raise ValueError("states and constants batch sizes differ")
+
+    # Set timespan to solve over
+    voi = output_times(start, end, output_dt)
+    record = record_indices(model, record)
+
+    if integrator in RUSH_LARSEN:
+        states = solve_rush_larsen(
+            model,
+            init_states,
+            batch_constants(constants),
+            voi,
+            integrator == "grl1",
+            record,
+        )
+        return voi, states
+
+    edges = stimulus_edges(model, constants, start, end)
+    rates = batch_rates(model, constants)
+    y = init_states.T.ravel()
+    scale = np.sqrt(nb_batch)
+    band = model.sizeStates - 1
+
+    # Indices of the recorded states in the flat vector of the batch
+    flat_record = (
+        model.sizeStates * np.arange(nb_batch)[:, np.newaxis] + record
+    ).ravel()
+
+    if integrator == "odeint":
+        states = solve_odeint(
+            rates,
+            batch_jacobian(model, constants),
+            y,
+            voi,
+            scale=scale,
+            band=band,
+            edges=edges,
+            record=flat_record,
+            max_step=max_step,
+            atol=atol,
+            rtol=rtol,
+        )
+    elif integrator in IVP_METHODS:
+        # The block diagonal Jacobian is estimated from its sparsity
+        block = np.ones((model.sizeStates, model.sizeStates))
+        states = solve_ivp_method(
+            rates,
+            None,
+            y,
+            voi,
+            integrator,
+            scale=scale,
+            sparsity=sparse.block_diag([block] * nb_batch),
+            edges=edges,
+            record=flat_record,
+            max_step=max_step,
+            atol=atol,
+            rtol=rtol,
+        )
+    else:
+        states = solve_ode(
+            rates,
+            batch_jacobian(model, constants),
+            y,
+            voi,
+            scale=scale,
+            band=band,
+            integrator=integrator,
+            edges=edges,
+            record=flat_record,
+            max_step=max_step,
+            atol=atol,
+            rtol=rtol,
+        )
+
+    return voi, states.reshape(nb_batch, len(record), len(voi)).swapaxes(0, 1)
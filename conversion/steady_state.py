@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+steady_state.py
+
+Functions for pre-pacing the cell models to their periodic steady state
+Author: Mathias Roesler
+Date: 10/26
+
+A pacing cycle goes from 0 to stim_interval + stim_duration and contains
+the first stimulus of the protocol. The cycle is repeated from its final
+states until the states at the end of two consecutive cycles are within
+STEADY_STATE_TOL of each other. The converged states are stored in
+STEADY_STATE_DIR under the cache key of the model and its constants.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+from conversion import utils, solver, cache
+from conversion.constants import (
+    ATOL,
+    STEADY_STATE_DIR,
+    STEADY_STATE_TOL,
+    STEADY_STATE_CYCLES,
+)
+
+
+def pacing_period(model, constants):
+    """Gets the duration of a pacing cycle of a model
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    constants -- list[float], list of constant values.
+
+    Returns:
+    period -- float, duration of a pacing cycle in ms.
+
+    Raises:
+    ValueError -- if the model has no stimulus protocol.
+    ValueError -- if the first stimulus does not end within the cycle.
+
+    """
+    try:
+        stim_start, interval, duration = [
+            constants[model.constantIndices[name]]
+            for name in solver.STIMULUS_CONSTANTS
+        ]
+    except KeyError:
+        raise ValueError(f"{model.__name__} has no stimulus protocol")
+
+    period = float(interval + duration)
+    if stim_start + duration > period:
+        raise ValueError("the first stimulus does not end within the cycle")
+
+    return period
+
+
+def cycle_difference(previous, current):
+    """Computes the relative change of the states over a cycle
+
+    The change is relative to the previous states with ATOL as a lower
+    bound, so that states close to zero do not dominate.
+
+    Args:
+    previous -- np.array, states at the start of the cycle.
+    current -- np.array, states at the end of the cycle.
+
+    Returns:
+    difference -- float, largest relative change of a state.
+
+    """
+    previous = np.asarray(previous, dtype=float)
+    current = np.asarray(current, dtype=float)
+
+    return float(
+        np.max(np.abs(current - previous) / (np.abs(previous) + ATOL))
+    )
+
+
+def prepace(
+    model,
+    init_states,
+    constants,
+    tol=STEADY_STATE_TOL,
+    max_cycles=STEADY_STATE_CYCLES,
+    integrator=None,
+):
+    """Paces a model until it reaches its periodic steady state
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    init_states -- list[float], list of initial states.
+    constants -- list[float], list of constant values.
+    tol -- float, relative change of the states over a cycle below which
+    the model is at steady state, default value STEADY_STATE_TOL.
+    max_cycles -- int, maximum number of cycles, default value
+    STEADY_STATE_CYCLES.
+    integrator -- str, solver to use instead of SOLVER, default value None.
+
+    Returns:
+    states -- np.array, states at the end of the last cycle.
+    nb_cycles -- int, number of cycles run.
+    converged -- bool, True if the steady state was reached.
+
+    Raises:
+    ValueError -- if the model has no stimulus protocol.
+    ValueError -- if max_cycles is not positive.
+
+    """
+    if max_cycles < 1:
+        raise ValueError("max_cycles must be greater than 0")
+
+    period = pacing_period(model, constants)
+    states = np.array(init_states, dtype=float)
+
+    for nb_cycles in range(1, max_cycles + 1):
+        _, cycle_states = solver.solve(
+            model,
+            states,
+            constants,
+            0,
+            period,
+            integrator=integrator,
+            output_dt=period,
+        )
+        previous, states = states, cycle_states[:, -1]
+
+        if cycle_difference(previous, states) < tol:
+            return states, nb_cycles, True
+
+    return states, max_cycles, False
+
+
+def steady_state_path(key):
+    """Gets the path of stored steady states
+
+    Args:
+    key -- str, cache key of the steady states.
+
+    Returns:
+    path -- str, path to the steady state file.
+
+    """
+    return os.path.join(STEADY_STATE_DIR, f"{key}.pkl")
+
+
+def load_steady_state(
+    model,
+    init_states,
+    constants,
+    tol=STEADY_STATE_TOL,
+    max_cycles=STEADY_STATE_CYCLES,
+    use_cache=True,
+):
+    """Gets the periodic steady states of a model and its constants
+
+    The steady states are read from STEADY_STATE_DIR if they were already
+    computed, otherwise the model is pre-paced and the result is stored.
+    Failing to reach the steady state or to store it only results in a
+    warning.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    init_states -- list[float], list of initial states.
+    constants -- list[float], list of constant values.
+    tol -- float, relative change of the states over a cycle below which
+    the model is at steady state, default value STEADY_STATE_TOL.
+    max_cycles -- int, maximum number of cycles, default value
+    STEADY_STATE_CYCLES.
+    use_cache -- bool, flag used to read and write the stored steady states,
+    default value True.
+
+    Returns:
+    states -- np.array, steady states of the model.
+
+    Raises:
+    ValueError -- if the model has no stimulus protocol.
+    ValueError -- if max_cycles is not positive.
+
+    """
+    key = cache.simulation_key(
+        model,
+        init_states,
+        constants,
+        0,
+        pacing_period(model, constants),
+        steady_state_tol=tol,
+        max_cycles=max_cycles,
+    )
+    path = steady_state_path(key)
+
+    if use_cache:
+        try:
+            return utils.load_data(path)["states"]
+        except (FileNotFoundError, EOFError):
+            pass
+
+    states, nb_cycles, converged = prepace(
+        model, init_states, constants, tol, max_cycles
+    )
+
+    if not converged:
+        sys.stderr.write(
+            f"Warning: {model.__name__} did not reach its steady state "
+            f"after {nb_cycles} cycles\n"
+        )
+
+    if use_cache:
+        try:
+            utils.save_data_atomic(
+                {
+                    "states": states,
+                    "cycles": nb_cycles,
+                    "converged": converged,
+                },
+                path,
+            )
+        except OSError as e:
+            sys.stderr.write(f"Warning: steady state not stored: {e}\n")
+
+    return states
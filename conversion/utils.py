@@ -11,32 +11,85 @@ Date: 11/24
 import os
 import sys
 import pickle
-import quantities as quant
+import tempfile
 
 from conversion.constants import ESTRUS_PARAMS, E2_MAP, P4_MAP, RES_DIR
 
-from scipy.signal import find_peaks
-from neo.core import SpikeTrain
 
+def derived_dependents(model, indices):
+    """Finds the derived constants that depend on the given constants
 
-def set_params(constants, legend_constants, param, value):
-    """Sets the new value for the specified parameter
+    The derivedConstants dictionary of the model is ordered as the
+    computation in init_consts, the dependents are found in a single pass.
+
+    Args:
+    model -- module, model module from {Roesler2024, Means2023, Tong2011,
+    Tong2014}.
+    indices -- list[int], indices of the changed constants.
+
+    Returns:
+    dependents -- set[int], indices of the derived constants to compute
+    again.
+
+    """
+    changed = set(indices)
+    dependents = set()
+
+    for index, dependencies in model.derivedConstants.items():
+        if changed.intersection(dependencies):
+            dependents.add(index)
+            changed.add(index)
+
+    return dependents
+
+
+def set_params(constants, legend_constants, param, value, model=None):
+    """Sets the new value for the specified parameters
+
+    If the model is provided the parameters are found with its
+    constantIndices and the derived constants that depend on them are
+    computed again, otherwise the parameters are found in the legends and
+    only the E2 and P4 modulators of E2_MAP and P4_MAP are updated.
 
     Args:
     constants -- list[int], list of constant values.
-    legend_constants -- list[str], list of legends for constants.
-    param -- str, name of the parameter to change.
-    value -- float, new value for the parameter, if None the value
-            is not updated.
+    legend_constants -- list[str], list of legends for constants, only used
+    if model is None.
+    param -- str, name of the parameter to change, or list[str] of names to
+    change several parameters at once.
+    value -- float, new value for the parameter, or list[float] of values
+    in the order of param, if None the value is not updated.
+    model -- module, model module of the constants, default value None.
 
     Returns:
     updated_constants -- list[int], list of updated constant values.
-    idx -- int, index of the parameter.
+    idx -- int, index of the parameter, or list[int] of indices if param
+    is a list.
 
     Raises:
-    IndexError -- if the parameter is not in the list.
+    IndexError -- if a parameter is not in the list.
+    ValueError -- if param and value do not have the same length.
 
     """
+    if not isinstance(param, str):
+        if value is None:
+            value = [None] * len(param)
+        if len(param) != len(value):
+            raise ValueError("param and value must have the same length")
+
+    if model is not None:
+        return _set_model_params(constants, param, value, model)
+
+    if not isinstance(param, str):
+        indices = []
+        for name, name_value in zip(param, value):
+            constants, idx = set_params(
+                constants, legend_constants, name, name_value
+            )
+            indices.append(idx)
+
+        return constants, indices
+
     found = False
     idx = 0
 
@@ -74,14 +127,60 @@ def set_params(constants, legend_constants, param, value):
     return constants, idx
 
 
-def set_estrus_params(constants, legend_constants, estrus):
+def _set_model_params(constants, param, value, model):
+    """Sets the parameters of a model and updates the derived constants
+
+    Args:
+    constants -- list[int], list of constant values.
+    param -- str, name of the parameter to change, or list[str] of names.
+    value -- float, new value for the parameter, or list[float] of values,
+    None values are not updated.
+    model -- module, model module of the constants.
+
+    Returns:
+    updated_constants -- list[int], list of updated constant values.
+    idx -- int, index of the parameter, or list[int] of indices if param
+    is a list.
+
+    Raises:
+    IndexError -- if a parameter is not in the list.
+
+    """
+    names = [param] if isinstance(param, str) else param
+    values = [value] if isinstance(param, str) else value
+
+    indices = []
+    for name in names:
+        if name not in model.constantIndices:
+            raise IndexError(f"{name} was not found in parameter list")
+        indices.append(model.constantIndices[name])
+
+    changed = []
+    for idx, new_value in zip(indices, values):
+        if new_value is not None:
+            constants[idx] = new_value
+            changed.append(idx)
+
+    if changed:
+        # Only the constants that depend on the parameters are computed
+        model.compute_derived_constants(
+            constants, derived_dependents(model, changed)
+        )
+
+    return constants, indices[0] if isinstance(param, str) else indices
+
+
+def set_estrus_params(constants, legend_constants, estrus, model=None):
     """Sets the specific values of the constants for the estrus stage
 
     Args:
     constants -- list[int], list of constant values.
-    legend_constants -- list[str], list of legends for constants.
+    legend_constants -- list[str], list of legends for constants, only used
+    if model is None.
     estrus -- str, estrus stage,
             {all, proestrus, estrus, metestrus, diestrus}.
+    model -- module, model module of the constants used to find the
+    parameters and compute the derived constants again, default value None.
 
     Returns:
     updated_constants -- list[int], list of updated constant values.
@@ -93,6 +192,25 @@ def set_estrus_params(constants, legend_constants, estrus):
     if estrus not in ESTRUS_PARAMS.keys():
         raise KeyError(f"the key {estrus} is not a valid estrus stage")
 
+    if model is not None:
+        params = {}
+        for key, value in ESTRUS_PARAMS[estrus].items():
+            if key in model.constantIndices:
+                params[key] = value
+            else:
+                sys.stderr.write(
+                    "Warning: {} estrus parameter not set".format(key),
+                )
+
+        constants, _ = set_params(
+            constants,
+            legend_constants,
+            list(params),
+            list(params.values()),
+            model,
+        )
+        return constants
+
     for key in ESTRUS_PARAMS[estrus].keys():
         try:
             constants, _ = set_params(
@@ -128,6 +246,36 @@ def save_data(save_file, data):
         raise
 
 
+def save_data_atomic(data, path):
+    """Saves data to a file that is replaced in a single step
+
+    The data is written to a temporary file in the same directory first so
+    that readers and killed runs never see a partially written file.
+
+    Args:
+    data -- dict, dictionnary of data to save.
+    path -- str, path to the save file, its directory is created if needed.
+
+    Returns:
+
+    Raises:
+    OSError -- if the file cannot be written.
+
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    handle, tmp_file = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(handle)
+
+    try:
+        save_data(tmp_file, data)
+        os.replace(tmp_file, path)
+    except Exception:
+        os.remove(tmp_file)
+        raise
+
+
 def load_data(load_file):
     """Loads data to the load file
 
@@ -170,6 +318,26 @@ def results_path(model_name, duration, estrus=""):
         return os.path.join(RES_DIR, f"{model_name}_{duration}s.pkl")
 
 
+def checkpoint_path(model_name, estrus=""):
+    """Gets the checkpoint path of a simulation based on the model name
+
+    Args:
+    model_name -- str, name of the model to use {"Roesler2024", "Means2023",
+    "Tong2011", "Tong2014"}.
+    estrus -- str, estrus stage for the Roesler2024 model, default value "".
+
+    Returns:
+    checkpoint_path -- str, path to the checkpoint file.
+
+    Raises:
+
+    """
+    if model_name == "Roesler2024":
+        return os.path.join(RES_DIR, f"{model_name}_{estrus}_checkpoint.pkl")
+    else:
+        return os.path.join(RES_DIR, f"{model_name}_checkpoint.pkl")
+
+
 def sweep_path(
     base_model,
     sweep_model,
@@ -228,6 +396,9 @@ def extract_spike_times(signal, time, height=-40):
     Raises:
 
     """
+    # Imported on first use to keep the package import fast
+    from scipy.signal import find_peaks
+
     peaks, _ = find_peaks(signal, height=height)
     return time[peaks]
 
@@ -245,4 +416,8 @@ def create_spike_train(spike_times, t_stop):
     Raises:
 
     """
+    # Imported on first use to keep the package import fast
+    import quantities as quant
+    from neo.core import SpikeTrain
+
     return SpikeTrain(spike_times * quant.ms, t_stop=t_stop * quant.ms)
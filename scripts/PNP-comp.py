@@ -55,6 +55,12 @@ if __name__ == "__main__":
         default=15000,
         help="end time for the simulation",
     )
+    parser.add_argument(
+        "--output-dt",
+        type=float,
+        default=1.0,
+        help="interval in ms between two simulation outputs",
+    )
     args = parser.parse_args()
 
     np_model = "Roesler2024"
@@ -74,6 +80,7 @@ if __name__ == "__main__":
                 args.p_model,
                 args.start,
                 args.end,
+                output_dt=args.output_dt,
             )
             simulation.save_simulation(args.p_model, p_data[0, :], t)
             sim_data[args.p_model] = p_data[0, :]
@@ -87,6 +94,7 @@ if __name__ == "__main__":
                     args.start,
                     args.end,
                     estrus_stage,
+                    output_dt=args.output_dt,
                 )
 
                 # Save model output
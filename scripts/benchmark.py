@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark.py
+
+Benchmarks the functions of the cell models
+Author: Mathias Roesler
+Last modified: 10/26
+"""
+
+import sys
+import argparse
+
+from conversion import benchmark
+
+
+def rates_func(args):
+    for model_name in args.models:
+        timings = benchmark.benchmark_rates(
+            model_name, number=args.number, repeat=args.repeat
+        )
+        reference = timings["compute_rates"]
+
+        for name, duration in timings.items():
+            print(
+                f"{model_name:<12} {name:<22} {duration * 1e6:10.2f} us "
+                f"x{reference / duration:.1f}"
+            )
+
+
+def buffers_func(args):
+    for model_name in args.models:
+        results = benchmark.benchmark_buffers(
+            model_name, number=args.number, repeat=args.repeat
+        )
+
+        for name, (duration, size) in results.items():
+            print(
+                f"{model_name:<12} {name:<16} {duration * 1e6:10.2f} us "
+                f"{size:8d} bytes"
+            )
+
+
+def solvers_func(args):
+    for model_name in args.models:
+        results = benchmark.benchmark_solvers(
+            model_name,
+            args.integrators,
+            args.tolerances,
+            end=args.end,
+            output_dt=args.output_dt,
+            metric=args.metric,
+        )
+
+        for result in results:
+            if result["deviation"] is None:
+                print(
+                    f"{model_name:<12} {result['integrator']:<8} "
+                    f"{result['tol']:8.0e} failed"
+                )
+                continue
+
+            rhs = result["rhs_evaluations"]
+            print(
+                f"{model_name:<12} {result['integrator']:<8} "
+                f"{result['tol']:8.0e} {result['time']:8.3f} s "
+                f"{'n/a' if rhs is None else rhs:>8} rhs "
+                f"{result['jacobian_evaluations']:6d} jac "
+                f"{args.metric} {result['deviation']:.2e}"
+            )
+
+        settings = benchmark.recommend_settings(results, args.max_deviation)
+        if settings is None:
+            print(f"{model_name}: no settings within {args.max_deviation}")
+            continue
+
+        print(f"{model_name}: recommended {settings}")
+        if args.save:
+            benchmark.save_solver_config(model_name, settings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the functions of the cell models"
+    )
+    subparsers = parser.add_subparsers(
+        title="subcommands",
+        description="Available subcommands",
+        dest="command",
+        required=True,
+    )
+
+    # Rates subparser
+    rates_parser = subparsers.add_parser(
+        "rates", help="Times a single evaluation of the model rates"
+    )
+    rates_parser.add_argument(
+        "models",
+        type=str,
+        nargs="+",
+        choices={"Tong2011", "Tong2014", "Means2023", "Roesler2024"},
+        help="models to benchmark",
+    )
+    rates_parser.add_argument(
+        "-n",
+        "--number",
+        type=int,
+        default=1000,
+        help="number of calls per repeat",
+    )
+    rates_parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=5,
+        help="number of repeats",
+    )
+    rates_parser.set_defaults(func=rates_func)
+
+    # Buffers subparser
+    buffers_parser = subparsers.add_parser(
+        "buffers",
+        help="Compares the rates kernels with and without output buffers",
+    )
+    buffers_parser.add_argument(
+        "models",
+        type=str,
+        nargs="+",
+        choices={"Tong2011", "Tong2014", "Means2023", "Roesler2024"},
+        help="models to benchmark",
+    )
+    buffers_parser.add_argument(
+        "-n",
+        "--number",
+        type=int,
+        default=10000,
+        help="number of calls per repeat",
+    )
+    buffers_parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=5,
+        help="number of repeats",
+    )
+    buffers_parser.set_defaults(func=buffers_func)
+
+    # Solvers subparser
+    solvers_parser = subparsers.add_parser(
+        "solvers",
+        help="Compares the integrators and tolerances on a simulation",
+    )
+    solvers_parser.add_argument(
+        "models",
+        type=str,
+        nargs="+",
+        choices={"Tong2011", "Tong2014", "Means2023", "Roesler2024"},
+        help="models to benchmark",
+    )
+    solvers_parser.add_argument(
+        "-i",
+        "--integrators",
+        type=str,
+        nargs="+",
+        default=benchmark.SOLVER_INTEGRATORS,
+        help="integrators to compare",
+    )
+    solvers_parser.add_argument(
+        "-t",
+        "--tolerances",
+        type=float,
+        nargs="+",
+        default=benchmark.SOLVER_TOLERANCES,
+        help="absolute and relative tolerances to compare",
+    )
+    solvers_parser.add_argument(
+        "--end",
+        type=float,
+        default=15000,
+        help="end time in ms of the simulations",
+    )
+    solvers_parser.add_argument(
+        "--output-dt",
+        type=float,
+        default=1.0,
+        help="interval in ms between two outputs",
+    )
+    solvers_parser.add_argument(
+        "--metric",
+        type=str,
+        default="rmse",
+        choices=set(benchmark.ERROR_METRICS),
+        help="metric used to compare the simulations to the reference",
+    )
+    solvers_parser.add_argument(
+        "--max-deviation",
+        type=float,
+        default=benchmark.MAX_DEVIATION,
+        help="largest deviation from the reference of the recommendation",
+    )
+    solvers_parser.add_argument(
+        "--save",
+        action="store_true",
+        help="flag used to save the recommended settings for solve_model",
+    )
+    solvers_parser.set_defaults(func=solvers_func)
+
+    args = parser.parse_args()
+
+    try:
+        args.func(args)
+
+    except Exception as e:
+        sys.stderr.write(f"Error: {e}")
+        exit()
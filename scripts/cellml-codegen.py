@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cellml-codegen.py
+
+Generates the model modules from the CellML files
+Author: Mathias Roesler
+Last modified: 10/26
+"""
+
+import os
+import sys
+import argparse
+
+from conversion import cellml, codegen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generates the model modules from the CellML files"
+    )
+    parser.add_argument(
+        "models",
+        type=str,
+        nargs="+",
+        choices={"Tong2011", "Tong2014", "Means2023", "Roesler2024"},
+        help="models to generate the modules for",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        type=str,
+        default=".",
+        help="directory to write the generated modules in",
+    )
+    args = parser.parse_args()
+
+    try:
+        codegen.require_sympy()
+    except ImportError as e:
+        sys.stderr.write(f"Error: {e}\n")
+        exit(1)
+
+    try:
+        for model_name in args.models:
+            print(f"Generating {model_name} module")
+            cellml.write_module(
+                os.path.join(cellml.CELLS_DIR, f"{model_name}.cellml"),
+                os.path.join(args.output_dir, f"{model_name}.py"),
+            )
+
+    except Exception as e:
+        sys.stderr.write(f"Error: {e}")
+        exit()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+model-codegen.py
+
+Generates the derived functions of the cell models
+Author: Mathias Roesler
+Last modified: 10/26
+"""
+
+import sys
+import argparse
+import importlib
+
+from conversion import codegen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generates the derived functions of the cell models"
+    )
+    parser.add_argument(
+        "models",
+        type=str,
+        nargs="+",
+        choices={"Tong2011", "Tong2014", "Means2023", "Roesler2024"},
+        help="models to generate the functions for",
+    )
+    args = parser.parse_args()
+
+    try:
+        codegen.require_sympy()
+    except ImportError as e:
+        sys.stderr.write(f"Error: {e}\n")
+        exit(1)
+
+    try:
+        for model_name in args.models:
+            print(f"Generating {model_name} functions")
+            model = importlib.import_module(f"conversion.{model_name}")
+            codegen.write_variable(
+                model.__file__,
+                "gateStates",
+                codegen.generate_gate_states(model),
+            )
+            codegen.write_variable(
+                model.__file__,
+                "derivedConstants",
+                codegen.generate_derived_constants(model),
+                after="gateStates",
+            )
+            after = "derivedConstants"
+            for name, source in codegen.generate_indices(model).items():
+                codegen.write_variable(model.__file__, name, source, after)
+                after = name
+            codegen.write_function(
+                model.__file__,
+                "compute_derived_constants",
+                codegen.generate_compute_derived(model),
+                before="compute_rates",
+            )
+            codegen.write_import(model.__file__, "import math")
+            codegen.write_function(
+                model.__file__,
+                "prepare",
+                codegen.generate_prepare(model),
+            )
+            codegen.write_function(
+                model.__file__,
+                "compute_rates_kernel",
+                codegen.generate_rates_kernel(model),
+            )
+            codegen.write_function(
+                model.__file__,
+                "compute_rates_buffer",
+                codegen.generate_rates_buffer(model),
+                before="prepare",
+            )
+            codegen.write_function(
+                model.__file__,
+                "compute_jacobian",
+                codegen.generate_jacobian(model),
+            )
+            codegen.write_function(
+                model.__file__,
+                "compute_jacobian_diagonal",
+                codegen.generate_jacobian_diagonal(model),
+            )
+
+    except Exception as e:
+        sys.stderr.write(f"Error: {e}")
+        exit()
@@ -5,7 +5,7 @@ model-simulation.py
 
 Runs a simulation for a given model
 Author: Mathias Roesler
-Last modified: 11/24
+Last modified: 10/26
 """
 
 import sys
@@ -45,6 +45,29 @@ def add_shared_arguments(parser):
         default="estrus",
         help="estrus stage for the Roesler2024 model",
     )
+    parser.add_argument(
+        "--output-dt",
+        type=float,
+        default=1.0,
+        help="interval in ms between two simulation outputs",
+    )
+    parser.add_argument(
+        "--prepace",
+        action="store_true",
+        help="start from the periodic steady state of the model",
+    )
+    parser.add_argument(
+        "--steady-tol",
+        type=float,
+        default=None,
+        help="stop once the states change less than this over a cycle, "
+        "multi requires --tile",
+    )
+    parser.add_argument(
+        "--tile",
+        action="store_true",
+        help="repeat the converged cycle up to the end time",
+    )
 
 
 if __name__ == "__main__":
@@ -71,6 +94,18 @@ if __name__ == "__main__":
         action="store_true",
         help="flag used just to plot data",
     )
+    single_parser.add_argument(
+        "-r",
+        "--resume",
+        action="store_true",
+        help="continue the simulation from its last checkpoint",
+    )
+    single_parser.add_argument(
+        "--extend",
+        type=int,
+        default=None,
+        help="duration in s of the saved simulation to continue up to end",
+    )
 
     single_parser.set_defaults(func=script_fct.single_func)
 
@@ -101,17 +136,23 @@ if __name__ == "__main__":
             plots.plot_single_simulation(sim_data, time / 1e3)
 
             # Hardcoded comparison between first and last event
-            if args.end == 210000 and args.start == 0:
+            # Only when the simulation was not stopped early
+            if args.end == 210000 and args.start == 0 and \
+                    time[-1] + args.output_dt > args.end:
                 stim_duration = 10000  # Hardcoded value of stim duration
                 duration = ESTRUS_PARAMS[args.estrus]["stim_interval"] + \
                     stim_duration
                 nb_events = int(args.end // duration)
 
-                first_event = sim_data[0:12000]
-                last_event = sim_data[
-                    duration * nb_events - 1000: duration * nb_events
-                    + (stim_duration + 1000)
-                ]
+                # Convert times in ms to output indices
+                last_start = int((duration * nb_events - 1000) / args.output_dt)
+                last_end = int(
+                    (duration * nb_events + stim_duration + 1000)
+                    / args.output_dt
+                )
+
+                first_event = sim_data[0: int(12000 / args.output_dt)]
+                last_event = sim_data[last_start:last_end]
                 vrd = metrics.compute_comparison(
                     first_event, last_event, "vrd", time=time
                 )
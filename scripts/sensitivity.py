@@ -6,7 +6,7 @@ sensitivity.py
 Computes or plots sweeps and sensitivity to
 parameters for a cellML export model
 Author: Mathias Roesler
-Last modified: 11/24
+Last modified: 10/26
 """
 
 import sys
@@ -89,6 +89,19 @@ if __name__ == "__main__":
         type=int,
         help="number of points for the parameter sweep",
     )
+    sweep_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of simulations to run in parallel",
+    )
+    sweep_parser.add_argument(
+        "--output-dt",
+        type=float,
+        default=1.0,
+        help="interval in ms between two simulation outputs",
+    )
     sweep_parser.set_defaults(func=script_fct.sweep_func)
 
     # Plot subparser
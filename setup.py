@@ -24,5 +24,7 @@ setup(
     packages=find_packages(),
     python_requires=">=3.8",  # Minimum Python version required
     install_requires=read_requirements(),
+    # Only needed by the code generation scripts
+    extras_require={"codegen": ["sympy==1.14.0"]},
     zip_safe=True,
 )
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_backend.py
+
+Unit tests for the backend functions in backend.py.
+Author: Mathias Roesler
+Date: 10/26
+
+This file contains test cases for the functions:
+- select_backend
+- numba_kernels
+
+The tests comparing the Numba and Python backends are skipped if numba is
+not installed.
+"""
+
+import sys
+import subprocess
+
+import pytest
+import numpy as np
+
+import conversion.backend as backend
+import conversion.solver as solver
+import conversion.Tong2011 as Tong2011
+import conversion.Means2023 as Means2023
+
+MODELS = [Tong2011, Means2023]
+
+
+def test_select_backend():
+    assert backend.select_backend("python") == "python"
+
+
+def test_select_backend_fallback(monkeypatch):
+    monkeypatch.setattr(backend, "numba_available", lambda: False)
+
+    assert backend.select_backend("numba") == "python"
+
+
+def test_select_backend_invalid():
+    with pytest.raises(ValueError):
+        backend.select_backend("wrong")
+
+
+def test_numba_kernels_without_sympy():
+    pytest.importorskip("numba")
+    code = (
+        "import sys\n"
+        "import conversion.backend as backend\n"
+        "import conversion.Tong2011 as Tong2011\n"
+        "backend.numba_kernels(Tong2011)\n"
+        "assert 'sympy' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_numba_kernels(model):
+    pytest.importorskip("numba")
+    kernel, batch_kernel = backend.numba_kernels(model)
+    states, constants = model.init_consts()
+    states = np.array(states) * 1.01
+    prepared = np.array(model.prepare(constants))
+
+    buffer = np.empty(model.sizeStates)
+    rates = kernel(1500.0, states, prepared, buffer)
+    assert rates is buffer
+    assert np.allclose(rates, model.compute_rates(1500.0, states, constants))
+
+    batch_buffer = np.empty((2, model.sizeStates))
+    batch = batch_kernel(
+        1500.0,
+        np.vstack([states, states]),
+        np.vstack([prepared, prepared]),
+        batch_buffer,
+    )
+    assert batch is batch_buffer
+    assert np.array_equal(batch, [rates, rates])
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_numba_solve_parity(model, monkeypatch):
+    pytest.importorskip("numba")
+    states, constants = model.init_consts()
+
+    voi, expected = solver.solve(model, states, constants, 0, 2000)
+    monkeypatch.setattr(backend, "BACKEND", "numba")
+
+    for integrator in ["vode", "odeint", "BDF"]:
+        _, trajectories = solver.solve(
+            model, states, constants, 0, 2000, integrator
+        )
+
+        assert trajectories.shape == expected.shape
+        rmse = np.sqrt(np.mean((trajectories[0] - expected[0]) ** 2))
+        assert rmse < 0.01
+
+
+def test_numba_solve_batch_parity(monkeypatch):
+    pytest.importorskip("numba")
+    states, constants = Tong2011.init_consts()
+    batch_states = np.repeat(np.array(states)[:, np.newaxis], 2, axis=1)
+    batch_constants = np.array(constants)[:, np.newaxis] * np.ones(2)
+    batch_constants[0, 1] *= 1.1
+
+    _, expected = solver.solve_batch(
+        Tong2011, batch_states, batch_constants, 0, 1000, record=["v"]
+    )
+    monkeypatch.setattr(backend, "BACKEND", "numba")
+    _, trajectories = solver.solve_batch(
+        Tong2011, batch_states, batch_constants, 0, 1000, record=["v"]
+    )
+
+    assert np.allclose(trajectories, expected, atol=0.05)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_benchmark.py
+
+Unit tests for the benchmark module.
+Author: Mathias Roesler
+Date: 10/26
+
+This file contains test cases for the functions:
+- time_call
+- benchmark_rates
+- peak_allocation
+- benchmark_buffers
+- benchmark_solvers
+- recommend_settings
+- save_solver_config
+"""
+
+import pytest
+
+import numpy as np
+
+import conversion.solver as solver
+import conversion.Tong2011 as Tong2011
+import conversion.Tong2014 as Tong2014
+import conversion.Means2023 as Means2023
+
+from conversion import benchmark, backend
+
+
+def test_time_call():
+    calls = []
+
+    duration = benchmark.time_call(lambda: calls.append(1), 10, 2)
+
+    assert duration > 0
+    assert len(calls) == 20
+
+
+@pytest.mark.parametrize("number, repeat", [(0, 1), (1, 0)])
+def test_time_call_invalid(number, repeat):
+    with pytest.raises(ValueError):
+        benchmark.time_call(lambda: None, number, repeat)
+
+
+def test_benchmark_rates():
+    timings = benchmark.benchmark_rates("Tong2011", number=5, repeat=1)
+
+    assert set(timings) == set(benchmark.RATES_FUNCTIONS)
+    assert all(duration > 0 for duration in timings.values())
+
+
+def test_benchmark_rates_invalid():
+    with pytest.raises(ModuleNotFoundError):
+        benchmark.benchmark_rates("Tong2000", number=5, repeat=1)
+
+
+def test_peak_allocation():
+    assert benchmark.peak_allocation(lambda: None) == 0
+    assert benchmark.peak_allocation(lambda: np.empty(1000)) >= 8000
+
+
+def test_benchmark_buffers():
+    results = benchmark.benchmark_buffers("Tong2011", number=5, repeat=1)
+
+    assert "python_list" in results
+    assert all(duration > 0 for duration, _ in results.values())
+
+
+def test_benchmark_solvers():
+    results = benchmark.benchmark_solvers(
+        "Means2023", ["vode", "BDF"], [1e-5, 1e-8], end=100
+    )
+
+    assert [(r["integrator"], r["tol"]) for r in results] == [
+        ("vode", 1e-5),
+        ("vode", 1e-8),
+        ("BDF", 1e-5),
+        ("BDF", 1e-8),
+    ]
+    for result in results:
+        assert result["rhs_evaluations"] > 0
+        assert result["jacobian_evaluations"] > 0
+        assert result["deviation"] >= 0
+
+    # A tighter tolerance is closer to the reference
+    assert results[1]["deviation"] < results[0]["deviation"]
+
+
+def test_benchmark_solvers_numba(monkeypatch):
+    pytest.importorskip("numba")
+    monkeypatch.setattr(backend, "BACKEND", "numba")
+
+    (result,) = benchmark.benchmark_solvers("Means2023", ["vode"], [1e-6], 10)
+
+    assert result["rhs_evaluations"] is None
+    assert result["jacobian_evaluations"] > 0
+
+
+def test_benchmark_solvers_invalid_metric():
+    with pytest.raises(ValueError):
+        benchmark.benchmark_solvers("Means2023", metric="correl")
+
+
+def test_recommend_settings():
+    results = [
+        {"integrator": "vode", "tol": 1e-5, "time": 1.0, "deviation": 0.1},
+        {"integrator": "BDF", "tol": 1e-7, "time": 3.0, "deviation": 0.001},
+        {"integrator": "lsoda", "tol": 1e-6, "time": 2.0, "deviation": 0.01},
+        {"integrator": "Radau", "tol": 1e-6, "time": 0.5, "deviation": None},
+    ]
+
+    assert benchmark.recommend_settings(results, 0.01) == {
+        "integrator": "lsoda",
+        "atol": 1e-6,
+        "rtol": 1e-6,
+    }
+    assert benchmark.recommend_settings(results, 1e-4) is None
+
+
+def test_save_solver_config(tmp_path):
+    path = str(tmp_path / "solver_config.json")
+    settings = {"integrator": "lsoda", "atol": 1e-6, "rtol": 1e-6}
+
+    benchmark.save_solver_config("Means2023", settings, path)
+    benchmark.save_solver_config("Tong2011", {"integrator": "BDF"}, path)
+
+    assert solver.model_settings(Means2023, path) == settings
+    assert solver.model_settings(Tong2011, path) == {"integrator": "BDF"}
+    assert solver.model_settings(Tong2014, path) == {}
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_cache.py
+
+Unit tests for the cache functions in cache.py.
+Author: Mathias Roesler
+Date: 10/26
+
+This file contains test cases for the functions:
+- simulation_key
+- load_simulation
+- store_simulation
+- evict
+
+The tests cover various scenarios including cache hits, cache misses and
+eviction.
+"""
+
+import os
+import importlib.util
+
+import pytest
+import numpy as np
+
+import conversion.cache as cache
+import conversion.Means2023 as Means2023
+import conversion.Roesler2024 as Roesler2024
+
+# Data for testing
+init_states_R, constants_R = Roesler2024.init_consts()
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+# Tests for simulation_key
+
+
+def test_simulation_key_deterministic():
+    key = cache.simulation_key(Roesler2024, init_states_R, constants_R, 0, 10)
+    assert key == cache.simulation_key(
+        Roesler2024, init_states_R, constants_R, 0.0, 10.0
+    )
+
+
+def test_simulation_key_changes():
+    key = cache.simulation_key(Roesler2024, init_states_R, constants_R, 0, 10)
+    constants = constants_R.copy()
+    constants[11] += 1e-12
+
+    assert key != cache.simulation_key(
+        Roesler2024, init_states_R, constants, 0, 10
+    )
+    assert key != cache.simulation_key(
+        Roesler2024, init_states_R, constants_R, 0, 20
+    )
+    assert key != cache.simulation_key(
+        Means2023, init_states_R, constants_R, 0, 10
+    )
+
+
+def test_simulation_key_settings(monkeypatch):
+    key = cache.simulation_key(Roesler2024, init_states_R, constants_R, 0, 10)
+
+    monkeypatch.setattr(cache, "RL_STEP", 0.05)
+    assert key != cache.simulation_key(
+        Roesler2024, init_states_R, constants_R, 0, 10
+    )
+
+    monkeypatch.undo()
+    monkeypatch.setattr(cache.backend, "BACKEND", "numba")
+    monkeypatch.setattr(cache.backend, "numba_available", lambda: True)
+    assert key != cache.simulation_key(
+        Roesler2024, init_states_R, constants_R, 0, 10
+    )
+
+
+def test_simulation_key_source(tmp_path):
+    path = tmp_path / "model.py"
+    path.write_text("sizeStates = 1\n")
+    spec = importlib.util.spec_from_file_location("model", path)
+    model = importlib.util.module_from_spec(spec)
+    key = cache.simulation_key(model, [0.0], [1.0], 0, 10)
+
+    # Regenerating the model invalidates its results
+    path.write_text("sizeStates = 2\n")
+    assert key != cache.simulation_key(model, [0.0], [1.0], 0, 10)
+
+
+# Tests for load_simulation and store_simulation
+
+
+def test_load_missing(cache_dir):
+    assert cache.load_simulation("missing") == (None, None)
+
+
+@pytest.mark.parametrize("content", [b"", b"corrupt data", b"\x80\x04"])
+def test_load_corrupt(cache_dir, content):
+    path = cache.cache_path("corrupt")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as handler:
+        handler.write(content)
+
+    assert cache.load_simulation("corrupt") == (None, None)
+    assert not os.path.exists(path)
+
+
+def test_store_load(cache_dir):
+    voi = np.arange(5.0)
+    states = np.ones((2, 5))
+    cache.store_simulation("key", voi, states)
+
+    loaded_voi, loaded_states = cache.load_simulation("key")
+    assert np.array_equal(loaded_voi, voi)
+    assert np.array_equal(loaded_states, states)
+
+
+def test_store_load_final(cache_dir):
+    final_states = np.arange(3.0)
+    cache.store_simulation("key", np.arange(5.0), np.ones((2, 5)))
+    cache.store_simulation(
+        "final", np.arange(5.0), np.ones((2, 5)), final_states
+    )
+
+    assert cache.load_simulation("key", final=True)[2] is None
+    assert np.array_equal(
+        cache.load_simulation("final", final=True)[2], final_states
+    )
+    assert cache.load_simulation("missing", final=True) == (None, None, None)
+
+
+# Tests for evict
+
+
+def test_evict_least_recently_used(cache_dir):
+    for i, key in enumerate(["old", "used", "new"]):
+        cache.store_simulation(key, np.arange(100.0), np.ones((2, 100)))
+        os.utime(cache.cache_path(key), (i, i))
+
+    cache.load_simulation("old")  # Marks old as most recently used
+    size = os.path.getsize(cache.cache_path("old"))
+    cache.evict(2 * size)
+
+    assert os.path.exists(cache.cache_path("old"))
+    assert not os.path.exists(cache.cache_path("used"))
+    assert os.path.exists(cache.cache_path("new"))
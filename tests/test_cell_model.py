@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_cell_model.py
+
+Unit tests for the CellModel class in cell_model.py.
+Author: Mathias Roesler
+Date: 10/26
+
+This file contains test cases for the methods:
+- load
+- with_params
+- with_options
+- simulate
+- simulate_batch
+
+The tests cover various scenarios including valid inputs and invalid inputs.
+"""
+
+import pytest
+import numpy as np
+
+import conversion.cache as cache
+import conversion.solver as solver
+import conversion.Roesler2024 as Roesler2024
+
+from conversion.cell_model import CellModel
+from conversion.simulation import init_model, run_simulation
+
+
+def test_registry():
+    assert set(CellModel.registry) == {
+        "Tong2011",
+        "Tong2014",
+        "Means2023",
+        "Roesler2024",
+    }
+
+
+def test_load():
+    model = CellModel.load("Roesler2024", "estrus")
+    _, init_states, constants = init_model("Roesler2024", "estrus")
+
+    assert model.module is Roesler2024
+    assert np.array_equal(model.states, init_states)
+    assert np.array_equal(model.constants, constants)
+    assert not model.constants.flags.writeable
+    assert not hasattr(model, "__dict__")
+
+
+def test_load_invalid():
+    with pytest.raises(ValueError):
+        CellModel.load("Tong2000")
+
+    with pytest.raises(KeyError):
+        CellModel.load("Roesler2024", "wrong")
+
+
+def test_with_params():
+    model = CellModel.load("Roesler2024", "estrus")
+    updated = model.with_params(E2=50, gcal=1.0)
+
+    assert updated["E2"] == 50
+    assert updated["gcal"] == 1.0
+    assert updated["mod_E2"] == 50 / model["E2_max"]
+    assert model["E2"] == 40
+
+    # The states are shared and the constants are copied
+    assert updated.states is model.states
+    assert updated.constants is not model.constants
+
+
+def test_with_params_invalid():
+    model = CellModel.load("Tong2011")
+
+    with pytest.raises(IndexError):
+        model.with_params(wrong=1.0)
+
+    with pytest.raises(IndexError):
+        model["wrong"]
+
+
+def test_with_options():
+    model = CellModel.load("Tong2011")
+    updated = model.with_options(output_dt=2.0, record=None)
+
+    assert updated.output_dt == 2.0
+    assert updated.record is None
+    assert model.output_dt == 1.0
+    assert updated.constants is model.constants
+
+    with pytest.raises(KeyError):
+        model.with_options(wrong=1)
+
+    with pytest.raises(ValueError):
+        model.with_options(output_dt=0)
+
+
+def test_simulate():
+    model = CellModel.load("Tong2011").with_params(stim_interval=500)
+    voi, states = model.simulate(0, 200, use_cache=False)
+
+    expected_voi, expected = run_simulation(
+        "Tong2011",
+        0,
+        200,
+        param="stim_interval",
+        value=500,
+        use_cache=False,
+    )
+
+    assert np.array_equal(voi, expected_voi)
+    assert np.allclose(states, expected)
+
+
+def test_simulate_options():
+    model = CellModel.load("Tong2011")
+    voi, states = model.simulate(
+        0, 100, integrator="lsoda", output_dt=0.5, use_cache=False
+    )
+
+    # The options override the settings of the model
+    expected_voi, expected = run_simulation(
+        "Tong2011", 0, 100, output_dt=0.5, integrator="lsoda", use_cache=False
+    )
+
+    assert np.array_equal(voi, expected_voi)
+    assert np.allclose(states, expected)
+
+
+def test_simulate_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+    model = CellModel.load("Tong2011")
+    voi, states = model.simulate(0, 100)
+
+    # The second simulation is read from the cache
+    monkeypatch.setattr(solver, "solve", None)
+    cached_voi, cached = model.simulate(0, 100)
+
+    assert np.array_equal(cached_voi, voi)
+    assert np.array_equal(cached, states)
+
+
+def test_simulate_invalid():
+    model = CellModel.load("Tong2011")
+
+    with pytest.raises(ValueError):
+        model.simulate(-1, 100)
+
+    with pytest.raises(ValueError):
+        model.simulate(100, 0)
+
+
+def test_simulate_batch():
+    model = CellModel.load("Tong2011", record=("v", 1))
+    values = [model["gcal"], 1.2 * model["gcal"]]
+
+    voi, states = model.simulate_batch("gcal", values, 0, 100)
+
+    assert states.shape == (2, 2, len(voi))
+    for i, value in enumerate(values):
+        _, single = model.with_params(gcal=value).simulate(
+            0, 100, use_cache=False
+        )
+        assert np.allclose(states[:, i], single, atol=1e-3)
+
+
+def test_simulate_batch_options():
+    model = CellModel.load("Tong2011", record=("v",))
+    values = [model["gcal"], 1.2 * model["gcal"]]
+
+    voi, states = model.simulate_batch(
+        "gcal", values, 0, 100, integrator="lsoda", output_dt=0.5
+    )
+
+    assert voi[1] == 0.5
+    assert states.shape == (1, 2, len(voi))
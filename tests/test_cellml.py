@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_cellml.py
+
+Unit tests for the CellML conversion functions in cellml.py.
+Author: Mathias Roesler
+Date: 10/26
+
+This file contains test cases for the functions:
+- parse_cellml
+- write_module
+
+The generated modules are compared with the model modules, the variables are
+matched by their legends.
+"""
+
+import os
+import sys
+import importlib.util
+
+import pytest
+import numpy as np
+
+from conversion import (
+    cellml,
+    codegen,
+    Tong2011,
+    Tong2014,
+    Means2023,
+    Roesler2024,
+)
+
+pytest.importorskip("sympy")
+
+MODELS = [Tong2011, Tong2014, Means2023, Roesler2024]
+
+# Constants that were edited in the model modules after the export
+EDITED_CONSTANTS = {
+    "Tong2011": ["stim_current in component interface (pA_per_pF)"],
+    "Tong2014": ["stim_current in component interface (pA_per_pF)"],
+}
+
+
+def model_name(model):
+    return model.__name__.split(".")[-1]
+
+
+@pytest.fixture(scope="module", params=MODELS, ids=model_name)
+def modules(request, tmp_path_factory):
+    # Generate and import the module of the model
+    name = model_name(request.param)
+    module_file = tmp_path_factory.mktemp("generated") / f"{name}.py"
+    cellml.write_module(
+        os.path.join(cellml.CELLS_DIR, f"{name}.cellml"),
+        str(module_file),
+    )
+
+    spec = importlib.util.spec_from_file_location(f"gen_{name}", module_file)
+    generated = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = generated
+    spec.loader.exec_module(generated)
+
+    yield request.param, generated
+
+    del sys.modules[spec.name]
+
+
+def mapping(legends, generated_legends):
+    # Index in the generated module of each legend of the model module
+    indices = {legend: i for i, legend in enumerate(generated_legends)}
+    return [indices.get(legend) for legend in legends]
+
+
+def matched_inputs(model, generated):
+    # Initial values of the model module in the generated module order
+    legends = model.create_legends()
+    generated_legends = generated.create_legends()
+    states, constants = model.init_consts()
+    _, generated_constants = generated.init_consts()
+
+    state_map = mapping(legends[0], generated_legends[0])
+    generated_states = np.zeros(generated.sizeStates)
+    generated_states[state_map] = states
+
+    for i, j in enumerate(mapping(legends[3], generated_legends[3])):
+        if j is not None:
+            generated_constants[j] = constants[i]
+
+    return states, constants, generated_states, generated_constants, state_map
+
+
+def test_parse_cellml():
+    model = cellml.parse_cellml(
+        os.path.join(cellml.CELLS_DIR, "Roesler2024.cellml")
+    )
+
+    assert str(model.voi) == "environment__time"
+    assert len(model.states) == Roesler2024.sizeStates
+    assert len(model.algebraic) == Roesler2024.sizeAlgebraic
+    assert model.legends[model.states[0]] == "v in component membrane (mV)"
+
+
+def test_parse_cellml_without_sympy(monkeypatch):
+    monkeypatch.setattr(codegen, "sp", None)
+
+    with pytest.raises(ImportError, match="codegen"):
+        cellml.parse_cellml(
+            os.path.join(cellml.CELLS_DIR, "Roesler2024.cellml")
+        )
+
+
+def test_generated_legends(modules):
+    model, generated = modules
+    legends = model.create_legends()
+    generated_legends = generated.create_legends()
+
+    assert generated.sizeStates == model.sizeStates
+    assert set(generated_legends[0]) == set(legends[0])
+    assert set(generated_legends[1]) == set(legends[1])
+    assert generated_legends[2] == legends[2]
+    assert set(generated_legends[3]) <= set(legends[3])
+
+
+def test_generated_init_consts(modules):
+    model, generated = modules
+    legends = model.create_legends()
+    generated_legends = generated.create_legends()
+    states, constants = model.init_consts()
+    generated_states, generated_constants = generated.init_consts()
+
+    state_map = mapping(legends[0], generated_legends[0])
+    assert np.allclose(np.array(generated_states)[state_map], states)
+
+    edited = EDITED_CONSTANTS.get(model_name(model), [])
+    for i, j in enumerate(mapping(legends[3], generated_legends[3])):
+        if j is not None and legends[3][i] not in edited:
+            assert generated_constants[j] == pytest.approx(constants[i])
+
+    assert len(generated.derivedConstants) > 0
+    assert generated.compute_derived_constants(
+        list(generated_constants)
+    ) == pytest.approx(generated_constants)
+
+
+@pytest.mark.parametrize("voi", [0.0, 1500.0, 20000.0])
+def test_generated_rates(modules, voi):
+    model, generated = modules
+    states, constants, generated_states, generated_constants, state_map = (
+        matched_inputs(model, generated)
+    )
+    states = np.array(states) * 1.01
+    generated_states = generated_states * 1.01
+
+    rates = model.compute_rates(voi, states, constants)
+    generated_rates = generated.compute_rates(
+        voi,
+        generated_states,
+        generated_constants,
+    )
+
+    assert np.allclose(generated_rates[state_map], rates, rtol=1e-10)
+    assert np.allclose(
+        generated.compute_rates_kernel(
+            voi, generated_states, generated.prepare(generated_constants)
+        ),
+        generated_rates,
+        rtol=1e-10,
+    )
+    assert np.allclose(
+        generated.compute_rates_buffer(
+            voi,
+            generated_states,
+            np.array(generated.prepare(generated_constants)),
+            np.empty(generated.sizeStates),
+        ),
+        generated_rates,
+        rtol=1e-10,
+    )
+    assert np.allclose(
+        generated.compute_jacobian(voi, generated_states, generated_constants)[
+            np.ix_(state_map, state_map)
+        ],
+        model.compute_jacobian(voi, states, constants),
+        rtol=1e-10,
+    )
+
+
+def test_generated_algebraic(modules):
+    model, generated = modules
+    states, constants, generated_states, generated_constants, state_map = (
+        matched_inputs(model, generated)
+    )
+    voi = np.array([0.0, 1500.0, 20000.0])
+    states = np.repeat(np.array(states)[:, np.newaxis], len(voi), axis=1)
+    generated_states = np.repeat(generated_states[:, np.newaxis], 3, axis=1)
+
+    algebraic = model.compute_algebraic(constants, states, voi)
+    generated_algebraic = generated.compute_algebraic(
+        generated_constants,
+        generated_states,
+        voi,
+    )
+
+    algebraic_map = mapping(
+        model.create_legends()[1],
+        generated.create_legends()[1],
+    )
+    assert np.allclose(generated_algebraic[algebraic_map], algebraic)
+
+
+def test_generated_solve(modules):
+    model, generated = modules
+    states, constants, generated_states, generated_constants, state_map = (
+        matched_inputs(model, generated)
+    )
+
+    _, expected, _ = model.solve_model(states, constants, 0, 200)
+    _, result, _ = generated.solve_model(
+        generated_states,
+        generated_constants,
+        0,
+        200,
+    )
+
+    assert np.allclose(result[state_map], expected, rtol=1e-4, atol=1e-6)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_checkpoint.py
+
+Unit tests for the checkpoint functions in checkpoint.py.
+Author: Mathias Roesler
+Date: 10/26
+
+This file contains test cases for the functions:
+- checkpoint_key
+- save_checkpoint
+- load_checkpoint
+
+The tests cover various scenarios including missing checkpoints and
+checkpoints of another simulation.
+"""
+
+import numpy as np
+
+import conversion.checkpoint as checkpoint
+import conversion.Means2023 as Means2023
+
+# Data for testing
+init_states_M, constants_M = Means2023.init_consts()
+
+
+def test_checkpoint_key():
+    key = checkpoint.checkpoint_key(Means2023, init_states_M, constants_M, 0)
+    constants = constants_M.copy()
+    constants[0] += 1
+
+    assert key == checkpoint.checkpoint_key(
+        Means2023, init_states_M, constants_M, 0.0
+    )
+    assert key != checkpoint.checkpoint_key(
+        Means2023, init_states_M, constants, 0
+    )
+    assert key != checkpoint.checkpoint_key(
+        Means2023, init_states_M, constants_M, 0, output_dt=10.0
+    )
+
+
+def test_save_load_checkpoint(tmp_path):
+    path = str(tmp_path / "checkpoint.pkl")
+    voi = np.arange(5.0)
+    data = np.ones((1, 5))
+    checkpoint.save_checkpoint(path, "key", 4.0, np.zeros(3), voi, data)
+
+    saved = checkpoint.load_checkpoint(path, "key")
+    assert saved["time"] == 4.0
+    assert np.array_equal(saved["states"], np.zeros(3))
+    assert np.array_equal(saved["voi"], voi)
+    assert np.array_equal(saved["data"], data)
+    assert [p.name for p in tmp_path.iterdir()] == ["checkpoint.pkl"]
+
+
+def test_load_checkpoint_missing(tmp_path):
+    assert checkpoint.load_checkpoint(str(tmp_path / "missing"), "key") is None
+
+
+def test_load_checkpoint_other_key(tmp_path, capsys):
+    path = str(tmp_path / "checkpoint.pkl")
+    checkpoint.save_checkpoint(path, "key", 4.0, [], [], [])
+
+    assert checkpoint.load_checkpoint(path, "other") is None
+    assert "another simulation" in capsys.readouterr().err
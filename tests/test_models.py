@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_models.py
+
+Unit tests for the cell model modules.
+Author: Mathias Roesler
+Date: 10/26
+
+This file contains test cases for the functions:
+- stateIndices, algebraicIndices and constantIndices
+- compute_derived_constants
+- compute_rates
+- prepare
+- compute_rates_kernel
+- compute_rates_buffer
+- compute_jacobian
+- compute_jacobian_diagonal
+
+The tests cover the four cell models.
+"""
+
+import pytest
+import numpy as np
+
+from conversion import Tong2011, Tong2014, Means2023, Roesler2024
+
+MODELS = [Tong2011, Tong2014, Means2023, Roesler2024]
+
+
+def finite_difference_jacobian(model, voi, states, constants, eps=1e-6):
+    # Central differences approximation of the Jacobian
+    states = np.array(states, dtype=float)
+    jacobian = np.zeros((len(states), len(states)))
+
+    for j in range(len(states)):
+        step = eps * max(abs(states[j]), 1e-3)
+        upper = states.copy()
+        lower = states.copy()
+        upper[j] += step
+        lower[j] -= step
+        jacobian[:, j] = (
+            np.array(model.compute_rates(voi, upper, constants))
+            - np.array(model.compute_rates(voi, lower, constants))
+        ) / (upper[j] - lower[j])
+
+    return jacobian
+
+
+@pytest.mark.parametrize("model", MODELS)
+@pytest.mark.parametrize("voi", [0.0, 1500.0])
+def test_jacobian_finite_differences(model, voi):
+    states, constants = model.init_consts()
+    # Move away from the initial conditions
+    states = np.array(states) * 1.01
+
+    jacobian = model.compute_jacobian(voi, states, constants)
+    expected = finite_difference_jacobian(model, voi, states, constants)
+
+    assert jacobian.shape == (model.sizeStates, model.sizeStates)
+    scale = np.abs(expected).max(axis=1, keepdims=True)
+    assert np.allclose(jacobian, expected, rtol=1e-4, atol=1e-6 * scale)
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_jacobian_batch(model):
+    states, constants = model.init_consts()
+    batch = np.array(states)[:, np.newaxis] * np.array([1.0, 1.01])
+
+    jacobian = model.compute_jacobian(0.0, batch, constants)
+
+    assert jacobian.shape == (model.sizeStates, model.sizeStates, 2)
+    assert np.allclose(
+        jacobian[:, :, 1],
+        model.compute_jacobian(0.0, batch[:, 1], constants),
+    )
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_rates_batch(model):
+    states, constants = model.init_consts()
+    batch_states = np.array(states)[:, np.newaxis] * np.array([1.0, 1.01])
+    batch_constants = np.array(constants)[:, np.newaxis] * np.array([1.0, 1.1])
+
+    rates = np.array(model.compute_rates(1500.0, batch_states, batch_constants))
+
+    assert rates.shape == (model.sizeStates, 2)
+    for i in range(2):
+        assert np.allclose(
+            rates[:, i],
+            model.compute_rates(
+                1500.0,
+                batch_states[:, i],
+                batch_constants[:, i],
+            ),
+        )
+
+
+@pytest.mark.parametrize("model", MODELS)
+@pytest.mark.parametrize("voi", [0.0, 50.0, 1500.0])
+def test_rates_kernel(model, voi):
+    states, constants = model.init_consts()
+    states = np.array(states) * 1.01
+
+    prepared = model.prepare(constants)
+    rates = model.compute_rates_kernel(voi, states, prepared)
+
+    assert isinstance(rates, list)
+    assert np.allclose(
+        rates,
+        model.compute_rates(voi, states, constants),
+        rtol=1e-10,
+        atol=1e-12,
+    )
+
+
+@pytest.mark.parametrize("model", MODELS)
+@pytest.mark.parametrize("voi", [0.0, 1500.0])
+def test_rates_buffer(model, voi):
+    states, constants = model.init_consts()
+    states = np.array(states) * 1.01
+    prepared = np.array(model.prepare(constants))
+
+    buffer = np.empty(model.sizeStates)
+    rates = model.compute_rates_buffer(voi, states, prepared, buffer)
+
+    assert rates is buffer
+    assert np.array_equal(
+        rates, model.compute_rates_kernel(voi, states, prepared)
+    )
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_indices(model):
+    legend_states, legend_algebraic, _, legend_constants = (
+        model.create_legends()
+    )
+
+    for indices, legends in (
+        (model.stateIndices, legend_states),
+        (model.algebraicIndices, legend_algebraic),
+        (model.constantIndices, legend_constants),
+    ):
+        names = [legend.split(" ")[0] for legend in legends]
+        assert set(indices) == set(names)
+        for name, i in indices.items():
+            assert i == names.index(name)
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_derived_constants(model):
+    _, constants = model.init_consts()
+    derived = list(model.derivedConstants)
+
+    assert len(derived) > 0
+    assert model.compute_derived_constants(list(constants)) == constants
+
+    # Only the derived constants are computed
+    changed = list(constants)
+    for index in derived:
+        changed[index] = 0.0
+    assert model.compute_derived_constants(changed, derived[:1]) == [
+        constants[i] if i == derived[0] else changed[i]
+        for i in range(model.sizeConstants)
+    ]
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_prepare(model):
+    states, constants = model.init_consts()
+    constants = list(constants)
+    prepared = model.prepare(constants)
+
+    assert all(isinstance(value, float) for value in prepared)
+    assert len(prepared) < model.sizeConstants + model.sizeStates
+
+    # Changing a constant needs a new prepared list
+    constants[-1] *= 1.1
+    assert model.compute_rates_kernel(
+        0.0, states, model.prepare(constants)
+    ) == pytest.approx(model.compute_rates(0.0, states, constants))
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_jacobian_diagonal(model):
+    states, constants = model.init_consts()
+    states = np.array(states) * 1.01
+
+    diagonal = model.compute_jacobian_diagonal(1500.0, states, constants)
+    jacobian = model.compute_jacobian(1500.0, states, constants)
+
+    assert np.allclose(diagonal, np.diag(jacobian))
+    assert len(model.gateStates) > 0
+    assert np.all(diagonal[model.gateStates] < 0)
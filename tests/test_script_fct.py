@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_script_fct.py
+
+Unit tests for the script functions in script_fct.py.
+Author: Mathias Roesler
+Date: 10/26
+
+This file contains test cases for the functions:
+- multi_func
+
+The tests cover various scenarios including valid inputs and invalid inputs.
+"""
+
+import argparse
+
+import pytest
+import numpy as np
+
+import conversion.cache as cache
+
+from conversion.script_fct import multi_func
+
+
+def multi_args(**changes):
+    # Arguments of the multi subcommand of model-simulation.py
+    args = argparse.Namespace(
+        model="Means2023",
+        param="gcal",
+        values=[0.6, 1.2],
+        start=0,
+        end=2e6,
+        estrus="",
+        output_dt=10.0,
+        prepace=False,
+        steady_tol=1e-3,
+        tile=True,
+    )
+    for name, value in changes.items():
+        setattr(args, name, value)
+
+    return args
+
+
+# Tests for multi_func
+
+
+def test_multi_func_steady_tol(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+
+    sim_data, time = multi_func(multi_args())
+
+    # The two values converge at different cycles
+    cycles = [
+        line
+        for line in capsys.readouterr().out.splitlines()
+        if line.startswith("Converged cycle")
+    ]
+    assert len(set(cycles)) == 2
+
+    assert sim_data.shape == (2, len(time))
+    assert time[-1] == 2e6
+    assert np.all(np.isfinite(sim_data))
+
+
+def test_multi_func_steady_tol_without_tile():
+    with pytest.raises(ValueError):
+        multi_func(multi_args(tile=False))
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_simulation.py
+
+Unit tests for the simulation functions in simulation.py.
+Author: Mathias Roesler
+Date: 10/26
+
+This file contains test cases for:
+- the deferred imports of the module
+- collect_sweep
+- run_sweep
+- retry_sweep
+- run_simulation
+- save_simulation
+
+The tests cover various scenarios including valid inputs, invalid inputs.
+"""
+
+import sys
+import subprocess
+
+import pytest
+import numpy as np
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from conversion import utils, simulation
+
+from conversion.solver import IntegrationError
+from conversion.simulation import (
+    collect_sweep,
+    retry_sweep,
+    run_sweep,
+    run_simulation,
+    save_simulation,
+)
+
+# Tests for the import of the module
+
+
+# Modules that should only be imported when they are needed
+DEFERRED_MODULES = [
+    "conversion.Tong2011",
+    "conversion.Tong2014",
+    "conversion.Means2023",
+    "conversion.Roesler2024",
+    "neo",
+    "quantities",
+    "elephant",
+    "sklearn",
+]
+
+
+def test_deferred_imports():
+    code = (
+        "import sys\n"
+        "import conversion.simulation\n"
+        f"print([m for m in {DEFERRED_MODULES} if m in sys.modules])\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+
+    # Cumulative import time in us, generous bound for slow CI machines
+    cumulative = [
+        int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.split("|")[-1].strip() == "conversion.simulation"
+    ]
+    assert len(cumulative) == 1
+    assert cumulative[0] < 5e6
+
+
+def test_model_registry_lazy():
+    code = (
+        "import sys\n"
+        "from conversion.simulation import MODELS\n"
+        "assert 'Tong2011' in MODELS\n"
+        "assert not MODELS.is_loaded('Tong2011')\n"
+        "assert MODELS['Tong2011'].sizeStates > 0\n"
+        "assert 'conversion.Tong2011' in sys.modules\n"
+        "assert 'conversion.Tong2014' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+# Tests for collect_sweep
+
+
+def test_collect_sweep_order():
+    values = [1.0, 2.0, 3.0]
+    futures = [Future() for _ in values]
+
+    # Complete the futures in reverse order
+    for future, result in reversed(list(zip(futures, [10.0, 20.0, 30.0]))):
+        future.set_result(result)
+
+    comp_points, failed = collect_sweep(futures, "gcal", values)
+    assert np.array_equal(comp_points, [10.0, 20.0, 30.0])
+    assert not failed.any()
+
+
+def test_collect_sweep_failure():
+    values = [1.0, 2.0]
+    futures = [Future() for _ in values]
+    futures[0].set_result(10.0)
+    futures[1].set_exception(ArithmeticError("overflow"))
+
+    with pytest.raises(RuntimeError, match="gcal = 2.0"):
+        collect_sweep(futures, "gcal", values)
+
+
+def test_collect_sweep_integration_error():
+    values = [1.0, 2.0]
+    futures = [Future() for _ in values]
+    futures[0].set_result(10.0)
+    futures[1].set_exception(IntegrationError("failed", 5.0, np.zeros(3)))
+
+    comp_points, failed = collect_sweep(futures, "gcal", values)
+    assert comp_points[0] == 10.0
+    assert np.isnan(comp_points[1])
+    assert np.array_equal(failed, [False, True])
+
+
+# Tests for run_sweep
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_sweep_invalid_param(workers):
+    with pytest.raises(IndexError, match="wrong = 1.5"):
+        run_sweep(
+            "Roesler2024",
+            "wrong",
+            [1.5],
+            "l2",
+            np.zeros(10),
+            "estrus",
+            workers=workers,
+        )
+
+
+def test_run_sweep_retry(monkeypatch):
+    calls = []
+
+    def compute_sweep_point(model, param, value, *args):
+        # The second value only succeeds with a smaller maximum step
+        calls.append((value, args[-1]))
+        if value == 2.0 and args[-1] is None:
+            raise IntegrationError("failed", 5.0, np.zeros(3))
+        return value
+
+    monkeypatch.setattr(simulation, "compute_sweep_point", compute_sweep_point)
+    monkeypatch.setattr(simulation, "RETRY_POLICY", [{"max_step": 0.1}])
+    comp_points, failed = run_sweep("Tong2011", "gna", [1.0, 2.0], "l2", None)
+
+    assert np.array_equal(comp_points, [1.0, 2.0])
+    assert not failed.any()
+    assert calls == [(1.0, None), (2.0, None), (2.0, 0.1)]
+
+
+def test_run_sweep_nan_metric(monkeypatch):
+    calls = []
+
+    def compute_sweep_point(model, param, value, *args):
+        # A metric can be NaN without a failed integration
+        calls.append(value)
+        return np.nan
+
+    monkeypatch.setattr(simulation, "compute_sweep_point", compute_sweep_point)
+    comp_points, failed = run_sweep("Tong2011", "gna", [1.0, 2.0], "l2", None)
+
+    assert np.isnan(comp_points).all()
+    assert not failed.any()
+    assert calls == [1.0, 2.0]
+
+
+def test_retry_sweep_failed():
+    comp_points, failed = retry_sweep(
+        [1.0, np.nan],
+        [False, True],
+        "Tong2011",
+        "gna",
+        [1.0, 2.0],
+        "l2",
+        None,
+        policy=[],
+    )
+
+    assert comp_points[0] == 1.0
+    assert np.isnan(comp_points[1])
+    assert np.array_equal(failed, [False, True])
+
+
+def test_retry_sweep_executor(monkeypatch):
+    def compute_sweep_point(model, param, value, *args):
+        return value * 10
+
+    monkeypatch.setattr(simulation, "compute_sweep_point", compute_sweep_point)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        comp_points, failed = retry_sweep(
+            [1.0, np.nan],
+            [False, True],
+            "Tong2011",
+            "gna",
+            [1.0, 2.0],
+            "l2",
+            None,
+            executor=executor,
+            policy=[{"max_step": 0.1}],
+        )
+
+    assert np.array_equal(comp_points, [1.0, 20.0])
+    assert not failed.any()
+
+
+def test_retry_sweep_invalid_setting():
+    with pytest.raises(KeyError):
+        retry_sweep(
+            [np.nan],
+            [True],
+            "Tong2011",
+            "gna",
+            [1.0],
+            "l2",
+            None,
+            policy=[{"method": "bdf"}],
+        )
+
+
+# Tests for run_simulation
+
+
+def test_run_simulation_output_dt():
+    t, data = run_simulation("Tong2011", 0, 100, use_cache=False)
+    t_coarse, data_coarse = run_simulation(
+        "Tong2011",
+        0,
+        100,
+        output_dt=10.0,
+        use_cache=False,
+    )
+
+    assert np.array_equal(t, np.arange(101.0))
+    assert np.array_equal(t_coarse, np.arange(0.0, 101.0, 10.0))
+    assert data_coarse.shape[1] == len(t_coarse)
+    assert np.allclose(data_coarse, data[:, ::10], rtol=1e-4, atol=1e-6)
+
+
+def test_run_simulation_record():
+    t, data = run_simulation("Tong2011", 0, 50, use_cache=False)
+    _, all_data = run_simulation(
+        "Tong2011",
+        0,
+        50,
+        use_cache=False,
+        record=None,
+    )
+
+    assert data.shape == (1, len(t))
+    assert all_data.shape == (22, len(t))
+    assert np.array_equal(data[0], all_data[0])
+
+
+def test_run_simulation_invalid_output_dt():
+    with pytest.raises(ValueError):
+        run_simulation("Tong2011", 0, 100, output_dt=0, use_cache=False)
+
+
+def test_run_simulation_prepace(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "conversion.steady_state.STEADY_STATE_DIR", str(tmp_path)
+    )
+    t, data = run_simulation("Means2023", 0, 10, use_cache=False)
+    _, paced_data = run_simulation(
+        "Means2023",
+        0,
+        10,
+        use_cache=False,
+        prepace=True,
+    )
+
+    assert paced_data.shape == (1, len(t))
+    assert not np.array_equal(data, paced_data)
+
+
+def test_run_simulation_continue_from(monkeypatch, tmp_path):
+    monkeypatch.setattr("conversion.simulation.RES_DIR", str(tmp_path))
+    t, data = run_simulation("Means2023", 0, 4000, use_cache=False)
+
+    first_t, first_data, final_states = run_simulation(
+        "Means2023", 0, 2000, use_cache=False, final=True
+    )
+    save_simulation("Means2023", first_data[0], first_t, "", final_states)
+    saved = utils.load_data(str(tmp_path / "Means2023_2s.pkl"))
+
+    continued_t, continued_data = run_simulation(
+        "Means2023", end=4000, use_cache=False, continue_from=saved
+    )
+
+    assert np.array_equal(continued_t, t)
+    assert np.array_equal(continued_data[:, :2001], first_data)
+    assert np.max(np.abs(continued_data - data)) < 0.01
+
+
+def test_run_simulation_continue_invalid():
+    saved = {"time": np.arange(11.0), "data": np.zeros(11)}
+
+    with pytest.raises(ValueError, match="final states"):
+        run_simulation("Means2023", end=20, continue_from=saved)
+
+    saved["final_states"] = np.zeros(9)
+    with pytest.raises(ValueError, match="saved end"):
+        run_simulation("Means2023", end=5, continue_from=saved)
+    with pytest.raises(ValueError, match="output_dt"):
+        run_simulation("Means2023", end=20, output_dt=2.0, continue_from=saved)
+    with pytest.raises(ValueError):
+        run_simulation("Means2023", end=20, prepace=True, continue_from=saved)
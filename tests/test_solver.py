@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_solver.py
+
+Unit tests for the solver functions in solver.py.
+Author: Mathias Roesler
+Date: 10/26
+
+This file contains test cases for the functions:
+- batch_constants
+- output_times
+- record_indices
+- compute_algebraic
+- stimulus_edges
+- segments
+- solve
+- solve_cycles
+- solve_edges
+- solve_batch
+- IntegrationError
+- model_settings
+
+The tests cover various scenarios including valid inputs and invalid inputs.
+"""
+
+import os
+import pickle
+
+import pytest
+import numpy as np
+
+import conversion.solver as solver
+import conversion.Tong2011 as Tong2011
+import conversion.Means2023 as Means2023
+import conversion.Roesler2024 as Roesler2024
+
+from conversion.metrics import compute_comparison
+from conversion.solver import (
+    IntegrationError,
+    batch_constants,
+    compute_algebraic,
+    output_times,
+    record_indices,
+    stimulus_edges,
+    segments,
+    solve,
+    solve_batch,
+    solve_cycles,
+)
+
+# Data for testing
+init_states_R, constants_R = Roesler2024.init_consts()
+init_states_M, constants_M = Means2023.init_consts()
+init_states_T, constants_T = Tong2011.init_consts()
+period_M = 56500.0  # Pacing cycle of the Means2023 model
+
+
+def test_batch_constants():
+    constants = np.array([[1.0, 1.0], [2.0, 3.0]])
+    reduced = batch_constants(constants)
+
+    assert reduced[0] == 1.0
+    assert np.array_equal(reduced[1], [2.0, 3.0])
+
+
+def test_output_times():
+    assert np.array_equal(output_times(0, 5), [0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+    assert np.array_equal(output_times(100, 125, 10), [100.0, 110.0, 120.0])
+    assert np.array_equal(output_times(0, 1, 0.1), np.arange(11) * 0.1)
+
+
+def test_output_times_invalid():
+    with pytest.raises(ValueError):
+        output_times(0, 10, 0)
+
+
+def test_record_indices():
+    assert np.array_equal(record_indices(Roesler2024, ["cai", 0]), [1, 0])
+    assert len(record_indices(Roesler2024)) == Roesler2024.sizeStates
+
+
+@pytest.mark.parametrize("record", [["wrong"], [Roesler2024.sizeStates]])
+def test_record_indices_invalid(record):
+    with pytest.raises(IndexError):
+        record_indices(Roesler2024, record)
+
+
+@pytest.mark.parametrize("integrator", ["vode", "odeint", "rush_larsen"])
+def test_solve_record(integrator):
+    _, expected = solve(
+        Roesler2024, init_states_R, constants_R, 0, 50, integrator
+    )
+    _, states = solve(
+        Roesler2024,
+        init_states_R,
+        constants_R,
+        0,
+        50,
+        integrator,
+        record=["cai", "v"],
+    )
+
+    assert states.shape == (2, expected.shape[1])
+    assert np.array_equal(states, expected[[1, 0]])
+
+
+def test_compute_algebraic():
+    voi, states, algebraic = Roesler2024.solve_model(
+        init_states_R,
+        constants_R,
+        0,
+        100,
+    )
+    expected = Roesler2024.compute_algebraic(constants_R, states, voi)
+
+    t, values = compute_algebraic(
+        Roesler2024,
+        constants_R,
+        states,
+        voi,
+        ["I_stim", 3],
+        window=(20, 70),
+        chunk_size=7,
+    )
+
+    assert np.array_equal(t, np.arange(20.0, 71.0))
+    assert np.allclose(values, expected[[0, 3], 20:71])
+
+    # Lazy algebraic variables returned by solve_model
+    t, values = algebraic()
+    assert np.array_equal(t, voi)
+    assert np.allclose(values, expected)
+
+
+def test_compute_algebraic_invalid():
+    voi, states, _ = Roesler2024.solve_model(init_states_R, constants_R, 0, 10)
+
+    with pytest.raises(IndexError):
+        compute_algebraic(Roesler2024, constants_R, states, voi, ["wrong"])
+    with pytest.raises(ValueError):
+        compute_algebraic(Roesler2024, constants_R, states[:2], voi)
+
+
+@pytest.mark.parametrize("option", ["final", "wrong"])
+def test_solve_model_invalid_option(option):
+    with pytest.raises(KeyError, match=option):
+        Roesler2024.solve_model(
+            init_states_R, constants_R, 0, 10, **{option: True}
+        )
+
+
+def test_stimulus_edges():
+    edges = stimulus_edges(Roesler2024, constants_R, 0, 120000)
+
+    assert np.array_equal(edges, [1000, 11000, 56500, 66500, 113000])
+    assert len(stimulus_edges(Roesler2024, constants_R, 2000, 10000)) == 0
+
+
+def test_stimulus_edges_means():
+    # The stimulus constants are at different indices in Means2023
+    _, constants = Means2023.init_consts()
+    constants[3] = 20000
+
+    edges = stimulus_edges(Means2023, constants, 0, 70000)
+
+    assert np.array_equal(edges, [1000, 11000, 30000, 40000, 60000])
+
+
+def test_stimulus_edges_batch():
+    constants = np.array([constants_R, constants_R]).T
+    constants[0, 1] = 2000  # Change stim_start in the second simulation
+
+    edges = stimulus_edges(Roesler2024, batch_constants(constants), 0, 15000)
+
+    assert np.array_equal(edges, [1000, 2000, 11000, 12000])
+
+
+def test_segments():
+    voi = np.arange(0.0, 6.0)
+    result = segments(voi, [2.0, 3.5])
+
+    assert len(result) == 3
+    assert np.array_equal(result[0][0], [0.0, 1.0, 2.0])
+    assert np.array_equal(result[0][1], [1, 2])
+    assert np.array_equal(result[1][0], [2.0, 3.0, 3.5])
+    assert np.array_equal(result[1][1], [3])
+    assert np.array_equal(result[2][0], [3.5, 4.0, 5.0])
+    assert np.array_equal(result[2][1], [4, 5])
+
+
+@pytest.mark.parametrize("integrator", ["odeint", "LSODA", "BDF"])
+def test_solve_dense_output(integrator):
+    _, expected = solve(
+        Roesler2024, init_states_R, constants_R, 0, 1200, "vode"
+    )
+    _, states = solve(
+        Roesler2024,
+        init_states_R,
+        constants_R,
+        0,
+        1200,
+        integrator,
+    )
+
+    assert states.shape == expected.shape
+    assert compute_comparison(expected[0], states[0], "rmse") < 0.01
+
+
+def test_solve_stimulus_edges(monkeypatch):
+    voi, states = solve(Roesler2024, init_states_R, constants_R, 0, 1200)
+
+    # Reference solution with a small maximum step and no restart
+    monkeypatch.setattr(solver, "MAX_STEP", 0.1)
+    monkeypatch.setattr(solver, "stimulus_edges", lambda *args: [])
+    _, expected = solve(Roesler2024, init_states_R, constants_R, 0, 1200)
+
+    assert compute_comparison(expected[0], states[0], "rmse") < 0.01
+
+
+def test_solve_max_step_tong2011():
+    _, states = solve(
+        Tong2011, init_states_T, constants_T, 0, 15000, record=["v"]
+    )
+
+    # Reference solution with a small maximum step
+    _, expected = solve(
+        Tong2011,
+        init_states_T,
+        constants_T,
+        0,
+        15000,
+        record=["v"],
+        integrator="vode",
+        max_step=0.05,
+    )
+
+    assert np.max(np.abs(expected[0] - states[0])) < 0.01
+
+
+def test_solve_cycles_converged():
+    voi = output_times(0, 4 * period_M, 10)
+    record = record_indices(Means2023)
+    expected = solve(
+        Means2023, init_states_M, constants_M, 0, voi[-1], None, 10
+    )
+
+    cycle_voi, states, cycle, _ = solve_cycles(
+        Means2023, init_states_M, constants_M, voi, "vode", record, np.inf
+    )
+
+    # The first full cycle starts at the second stimulus
+    assert cycle == (period_M, 2 * period_M)
+    assert cycle_voi[-1] == 2 * period_M
+    assert np.array_equal(states, expected[1][:, : len(cycle_voi)])
+
+
+def test_solve_cycles_tile():
+    voi = output_times(0, 4 * period_M, 10)
+    record = record_indices(Means2023)
+    nb_cycle = int(period_M / 10)
+
+    tiled_voi, states, cycle, final_states = solve_cycles(
+        Means2023,
+        init_states_M,
+        constants_M,
+        voi,
+        "vode",
+        record,
+        np.inf,
+        tile=True,
+    )
+
+    assert np.array_equal(tiled_voi, voi)
+    assert final_states is None
+    assert np.array_equal(
+        states[:, -nb_cycle:], states[:, -2 * nb_cycle : -nb_cycle]
+    )
+
+
+def test_solve_cycles_not_converged():
+    voi = output_times(0, 2.5 * period_M, 10)
+    record = record_indices(Means2023)
+    expected = solve(
+        Means2023, init_states_M, constants_M, 0, voi[-1], None, 10
+    )
+
+    cycle_voi, states, cycle, _ = solve_cycles(
+        Means2023, init_states_M, constants_M, voi, "vode", record, 0
+    )
+
+    assert cycle is None
+    assert np.array_equal(cycle_voi, voi)
+    assert np.array_equal(states, expected[1])
+
+
+def test_solve_steady_tol(capsys):
+    voi, states = solve(
+        Means2023,
+        init_states_M,
+        constants_M,
+        0,
+        4 * period_M,
+        output_dt=10,
+        record=["v"],
+        steady_tol=np.inf,
+    )
+
+    assert voi[-1] == 2 * period_M
+    assert states.shape == (1, len(voi))
+    assert "Converged cycle from 56500 to 113000 ms" in capsys.readouterr().out
+
+
+def test_solve_checkpoint_resume(tmp_path):
+    path = str(tmp_path / "checkpoint.pkl")
+    voi, expected = solve(
+        Means2023, init_states_M, constants_M, 0, 150000, record=["v"]
+    )
+
+    # Interrupted simulation resumed up to a longer end
+    _, first = solve(
+        Means2023,
+        init_states_M,
+        constants_M,
+        0,
+        70000,
+        record=["v"],
+        checkpoint=path,
+    )
+    _, resumed = solve(
+        Means2023,
+        init_states_M,
+        constants_M,
+        0,
+        150000,
+        record=["v"],
+        checkpoint=path,
+        resume=True,
+    )
+
+    assert np.array_equal(first, expected[:, : first.shape[1]])
+    assert np.array_equal(resumed, expected)
+
+
+def test_solve_checkpoint_steady_tol(tmp_path):
+    with pytest.raises(ValueError):
+        solve(
+            Means2023,
+            init_states_M,
+            constants_M,
+            0,
+            100,
+            steady_tol=1e-3,
+            checkpoint=str(tmp_path / "checkpoint.pkl"),
+        )
+
+
+@pytest.mark.parametrize("integrator", ["vode", "odeint"])
+def test_solve_integration_error(integrator):
+    # The step limit is reached before the first output
+    with pytest.raises(IntegrationError) as error:
+        solve(
+            Means2023,
+            init_states_M,
+            constants_M,
+            0,
+            20,
+            integrator=integrator,
+            output_dt=20.0,
+            max_step=1e-4,
+        )
+
+    assert 0 < error.value.time < 20
+    assert error.value.states.shape == (Means2023.sizeStates,)
+    assert error.value.stats["steps"] == 100000
+    assert "integration failed" in str(error.value)
+
+
+def test_integration_error_pickle():
+    error = IntegrationError("failed", 10.0, np.ones(3), {"steps": 5})
+    copy = pickle.loads(pickle.dumps(error))
+
+    assert str(copy) == str(error)
+    assert copy.time == 10.0
+    assert np.array_equal(copy.states, np.ones(3))
+    assert copy.stats == {"steps": 5}
+
+
+def test_solve_model_settings(monkeypatch, tmp_path):
+    path = tmp_path / "solver_config.json"
+    path.write_text('{"Means2023": {"integrator": "BDF", "rtol": 1e-5}}')
+    monkeypatch.setattr(solver, "SOLVER_CONFIG", str(path))
+
+    assert solver.model_settings(Roesler2024) == {}
+
+    _, states = solve(Means2023, init_states_M, constants_M, 0, 100)
+    _, expected = solve(
+        Means2023,
+        init_states_M,
+        constants_M,
+        0,
+        100,
+        integrator="BDF",
+        atol=solver.ATOL,
+        rtol=1e-5,
+    )
+    assert np.array_equal(states, expected)
+
+    # The given settings replace the recommended ones
+    _, states = solve(
+        Means2023, init_states_M, constants_M, 0, 100, integrator="vode"
+    )
+    assert not np.array_equal(states, expected)
+
+
+def test_model_settings_cached(tmp_path):
+    path = tmp_path / "solver_config.json"
+    path.write_text('{"Means2023": {"integrator": "BDF"}}')
+    solver.read_solver_config.cache_clear()
+
+    assert solver.model_settings(Means2023, str(path)) == {"integrator": "BDF"}
+    solver.model_settings(Means2023, str(path))
+    assert solver.read_solver_config.cache_info().misses == 1
+
+    # A modified file is read again
+    path.write_text('{"Means2023": {"integrator": "lsoda"}}')
+    os.utime(path, ns=(0, 10**9))
+    assert solver.model_settings(Means2023, str(path)) == {
+        "integrator": "lsoda"
+    }
+
+
+def test_solve_batch_matches_single():
+    constants = np.array([constants_R, constants_R]).T
+    constants[11, 1] = 0.8  # Change gcal in the second simulation
+    init_states = np.array([init_states_R, init_states_R]).T
+
+    voi, states = solve_batch(Roesler2024, init_states, constants, 0, 200)
+
+    assert states.shape == (Roesler2024.sizeStates, 2, len(voi))
+    for i in range(2):
+        _, expected, _ = Roesler2024.solve_model(
+            init_states_R,
+            list(constants[:, i]),
+            0,
+            200,
+        )
+        assert np.allclose(states[:, i, :], expected, rtol=1e-4, atol=1e-6)
+
+
+@pytest.mark.parametrize("integrator", ["odeint", "BDF", "lsoda"])
+def test_solve_batch_dense_output(integrator):
+    constants = np.array([constants_R, constants_R]).T
+    constants[11, 1] = 0.8  # Change gcal in the second simulation
+    init_states = np.array([init_states_R, init_states_R]).T
+
+    voi, states = solve_batch(
+        Roesler2024,
+        init_states,
+        constants,
+        0,
+        200,
+        integrator,
+    )
+
+    assert states.shape == (Roesler2024.sizeStates, 2, len(voi))
+    for i in range(2):
+        _, expected = solve(
+            Roesler2024,
+            init_states_R,
+            list(constants[:, i]),
+            0,
+            200,
+            integrator,
+        )
+        assert np.allclose(states[:, i, :], expected, rtol=1e-4, atol=1e-6)
+
+
+def test_solve_batch_model_settings(monkeypatch, tmp_path):
+    path = tmp_path / "solver_config.json"
+    path.write_text('{"Roesler2024": {"integrator": "BDF", "rtol": 1e-5}}')
+    monkeypatch.setattr(solver, "SOLVER_CONFIG", str(path))
+    init_states = np.array([init_states_R, init_states_R]).T
+    constants = np.array([constants_R, constants_R]).T
+
+    # The recommended settings are used when none are given
+    _, states = solve_batch(Roesler2024, init_states, constants, 0, 100)
+    _, expected = solve_batch(
+        Roesler2024,
+        init_states,
+        constants,
+        0,
+        100,
+        integrator="BDF",
+        atol=solver.ATOL,
+        rtol=1e-5,
+    )
+    assert np.array_equal(states, expected)
+
+    # The given settings replace the recommended ones
+    _, states = solve_batch(
+        Roesler2024, init_states, constants, 0, 100, max_step=0.5, rtol=1e-6
+    )
+    assert not np.array_equal(states, expected)
+
+
+@pytest.mark.parametrize("integrator", ["vode", "rush_larsen"])
+def test_solve_batch_record(integrator):
+    constants = np.array([constants_R, constants_R]).T
+    constants[11, 1] = 0.8  # Change gcal in the second simulation
+    init_states = np.array([init_states_R, init_states_R]).T
+
+    _, expected = solve_batch(
+        Roesler2024, init_states, constants, 0, 50, integrator
+    )
+    _, states = solve_batch(
+        Roesler2024,
+        init_states,
+        constants,
+        0,
+        50,
+        integrator,
+        record=["v", "cai"],
+    )
+
+    assert states.shape == (2, 2, expected.shape[2])
+    assert np.array_equal(states, expected[:2])
+
+
+def test_solve_batch_size_mismatch():
+    constants = np.array([constants_R, constants_R]).T
+    init_states = np.array([init_states_R]).T
+
+    with pytest.raises(ValueError):
+        solve_batch(Roesler2024, init_states, constants, 0, 10)
+
+
+@pytest.mark.parametrize("integrator", ["rush_larsen", "grl1"])
+def test_solve_rush_larsen_matches_ode(integrator):
+    _, expected = solve(
+        Roesler2024, init_states_R, constants_R, 0, 500, "vode"
+    )
+    voi, states = solve(
+        Roesler2024,
+        init_states_R,
+        constants_R,
+        0,
+        500,
+        integrator,
+    )
+
+    assert states.shape == expected.shape
+    assert compute_comparison(expected[0], states[0], "rmse") < 0.1
+    assert compute_comparison(expected[0], states[0], "correl") > 0.9999
+
+
+def test_solve_batch_rush_larsen():
+    constants = np.array([constants_R, constants_R]).T
+    constants[11, 1] = 0.8  # Change gcal in the second simulation
+    init_states = np.array([init_states_R, init_states_R]).T
+
+    voi, states = solve_batch(
+        Roesler2024,
+        init_states,
+        constants,
+        0,
+        50,
+        "rush_larsen",
+    )
+
+    assert states.shape == (Roesler2024.sizeStates, 2, len(voi))
+    for i in range(2):
+        _, expected = solve(
+            Roesler2024,
+            init_states_R,
+            list(constants[:, i]),
+            0,
+            50,
+            "rush_larsen",
+        )
+        assert np.allclose(states[:, i, :], expected)
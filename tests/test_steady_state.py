@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_steady_state.py
+
+Unit tests for the pre-pacing functions in steady_state.py.
+Author: Mathias Roesler
+Date: 10/26
+
+This file contains test cases for the functions:
+- pacing_period
+- cycle_difference
+- prepace
+- load_steady_state
+
+The tests cover various scenarios including valid inputs, invalid inputs and
+stored steady states.
+"""
+
+import types
+
+import pytest
+import numpy as np
+
+import conversion.steady_state as steady_state
+import conversion.Tong2011 as Tong2011
+
+from conversion import solver
+
+# Data for testing
+init_states_T, constants_T = Tong2011.init_consts()
+
+
+@pytest.fixture
+def steady_state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(steady_state, "STEADY_STATE_DIR", str(tmp_path))
+    return tmp_path
+
+
+# Tests for pacing_period
+
+
+def test_pacing_period():
+    assert steady_state.pacing_period(Tong2011, constants_T) == 56500.0
+
+
+def test_pacing_period_no_stimulus():
+    model = types.SimpleNamespace(__name__="model", constantIndices={})
+
+    with pytest.raises(ValueError):
+        steady_state.pacing_period(model, [])
+
+
+def test_pacing_period_long_stimulus():
+    constants = constants_T.copy()
+    constants[Tong2011.constantIndices["stim_start"]] = 50000
+
+    with pytest.raises(ValueError):
+        steady_state.pacing_period(Tong2011, constants)
+
+
+# Tests for cycle_difference
+
+
+def test_cycle_difference():
+    assert steady_state.cycle_difference([1.0, -2.0], [1.0, -2.0]) == 0.0
+    assert steady_state.cycle_difference([1.0, -2.0], [1.1, -2.0]) == (
+        pytest.approx(0.1, rel=1e-5)
+    )
+
+
+# Tests for prepace
+
+
+def test_prepace_single_cycle():
+    states, nb_cycles, converged = steady_state.prepace(
+        Tong2011, init_states_T, constants_T, tol=np.inf
+    )
+    _, cycle_states = solver.solve(
+        Tong2011, init_states_T, constants_T, 0, 56500, output_dt=56500
+    )
+
+    assert (nb_cycles, converged) == (1, True)
+    assert np.array_equal(states, cycle_states[:, -1])
+
+
+def test_prepace_not_converged():
+    states, nb_cycles, converged = steady_state.prepace(
+        Tong2011, init_states_T, constants_T, tol=0, max_cycles=2
+    )
+
+    assert states.shape == (Tong2011.sizeStates,)
+    assert (nb_cycles, converged) == (2, False)
+
+
+def test_prepace_invalid_cycles():
+    with pytest.raises(ValueError):
+        steady_state.prepace(
+            Tong2011, init_states_T, constants_T, max_cycles=0
+        )
+
+
+# Tests for load_steady_state
+
+
+def test_load_steady_state_stored(steady_state_dir, monkeypatch):
+    calls = []
+    prepace = steady_state.prepace
+
+    def counted_prepace(*args):
+        calls.append(args)
+        return prepace(*args)
+
+    monkeypatch.setattr(steady_state, "prepace", counted_prepace)
+
+    states = steady_state.load_steady_state(
+        Tong2011, init_states_T, constants_T, tol=np.inf
+    )
+    stored = steady_state.load_steady_state(
+        Tong2011, init_states_T, constants_T, tol=np.inf
+    )
+
+    assert len(calls) == 1
+    assert len(list(steady_state_dir.iterdir())) == 1
+    assert np.array_equal(states, stored)
+
+    # A different parameter set is pre-paced again
+    constants = constants_T.copy()
+    constants[Tong2011.constantIndices["stim_current"]] = -0.3
+    steady_state.load_steady_state(
+        Tong2011, init_states_T, constants, tol=np.inf
+    )
+
+    assert len(calls) == 2
+
+
+def test_load_steady_state_warning(steady_state_dir, capsys):
+    steady_state.load_steady_state(
+        Tong2011, init_states_T, constants_T, tol=0, max_cycles=1
+    )
+
+    assert "did not reach its steady state" in capsys.readouterr().err
@@ -8,23 +8,54 @@ Author: Mathias Roesler
 Date: 11/24
 
 This file contains test cases for the functions:
+- derived_dependents
 - set_params
 - set_estrus_params
+- save_data_atomic
 
 The tests cover various scenarios including valid inputs, invalid inputs.
 """
 
+import os
+import types
+import pickle
+
 import pytest
+import numpy as np
 
 import conversion.Roesler2024 as Roesler2024
 
-from conversion.utils import set_params, set_estrus_params
+from conversion.utils import (
+    set_params,
+    set_estrus_params,
+    derived_dependents,
+    save_data_atomic,
+    load_data,
+)
 from conversion.constants import E2_MAP, P4_MAP, ESTRUS_PARAMS
 
 # Data for testing
 init_states_R, constants_R = Roesler2024.init_consts()
 _, _, _, legend_constants_R = Roesler2024.create_legends()
 
+# Tests for derived_dependents
+
+
+def test_derived_dependents():
+    model = types.SimpleNamespace(
+        derivedConstants={3: [0, 1], 4: [3], 5: [2]},
+    )
+
+    assert derived_dependents(model, [0]) == {3, 4}
+    assert derived_dependents(model, [2]) == {5}
+    assert derived_dependents(model, [4]) == set()
+
+
+def test_derived_dependents_model():
+    assert derived_dependents(Roesler2024, [6]) == {25}
+    assert derived_dependents(Roesler2024, [71]) == {74, 75, 76}
+
+
 # Tests for set_params
 
 
@@ -61,6 +92,66 @@ def test_set_params_modulators():
     assert updated_constants[P4_MAP["mod_P4"]] == compare_value
 
 
+def test_set_params_model():
+    updated_constants, idx = set_params(
+        constants_R.copy(), legend_constants_R, "E2", 50, Roesler2024
+    )
+    assert updated_constants[idx] == 50
+    assert updated_constants[E2_MAP["mod_E2"]] == (
+        50 / constants_R[E2_MAP["E2_max"]]
+    )
+
+    # The Nernst potentials depend on the temperature
+    updated_constants, idx = set_params(
+        constants_R.copy(), legend_constants_R, "temp", 300, Roesler2024
+    )
+    expected = Roesler2024.compute_derived_constants(updated_constants.copy())
+    assert updated_constants == expected
+    assert updated_constants[74] == pytest.approx(
+        constants_R[74] * 300 / constants_R[idx]
+    )
+
+    # Other constants are left unchanged
+    changed = np.flatnonzero(np.array(updated_constants) != constants_R)
+    assert set(changed) == {idx, 74, 75, 76}
+
+
+def test_set_params_many():
+    names = ["gcal", "E2", "temp"]
+    values = [100, 50, 300]
+
+    updated_constants, indices = set_params(
+        constants_R.copy(), None, names, values, Roesler2024
+    )
+
+    assert indices == [Roesler2024.constantIndices[name] for name in names]
+    assert [updated_constants[i] for i in indices] == values
+    assert updated_constants == Roesler2024.compute_derived_constants(
+        updated_constants.copy()
+    )
+
+    # Same result as setting the parameters one by one
+    expected = constants_R.copy()
+    for name, value in zip(names, values):
+        expected, _ = set_params(expected, None, name, value, Roesler2024)
+    assert updated_constants == expected
+
+    # Same result without the model
+    legend_updated, _ = set_params(
+        constants_R.copy(), legend_constants_R, names[:2], values[:2]
+    )
+    assert legend_updated[indices[0]] == 100
+    assert legend_updated[E2_MAP["mod_E2"]] == expected[E2_MAP["mod_E2"]]
+
+
+def test_set_params_many_invalid():
+    with pytest.raises(ValueError):
+        set_params(constants_R.copy(), None, ["gcal", "E2"], [1], Roesler2024)
+
+    with pytest.raises(IndexError):
+        set_params(constants_R.copy(), None, ["wrong"], [1], Roesler2024)
+
+
 def test_set_params_not_found():
     with pytest.raises(IndexError):
         set_params(constants_R.copy(), legend_constants_R, "wrong", 100)
@@ -91,6 +182,41 @@ def test_set_estrus_params_normal_case():
             assert updated_constants[idx] == value
 
 
+@pytest.mark.parametrize("estrus", ESTRUS_PARAMS.keys())
+def test_set_estrus_params_model(estrus):
+    updated_constants = set_estrus_params(
+        constants_R.copy(), None, estrus, Roesler2024
+    )
+    expected = set_estrus_params(
+        constants_R.copy(), legend_constants_R, estrus
+    )
+
+    assert updated_constants == pytest.approx(expected)
+
+
 def test_set_estrus_params_invalid_stage():
     with pytest.raises(KeyError):
-        set_estrus_params(constants_R.copy(), legend_constants_R, "invalid_stage")
+        set_estrus_params(
+            constants_R.copy(), legend_constants_R, "invalid_stage"
+        )
+
+
+def test_save_data_atomic(tmp_path):
+    path = tmp_path / "results" / "data.pkl"
+    save_data_atomic({"states": [1.0]}, str(path))
+    save_data_atomic({"states": [2.0]}, str(path))
+
+    assert load_data(str(path)) == {"states": [2.0]}
+    assert os.listdir(path.parent) == ["data.pkl"]
+
+
+def test_save_data_atomic_failure(tmp_path):
+    path = tmp_path / "data.pkl"
+    save_data_atomic({"states": [1.0]}, str(path))
+
+    # The previous file is kept and the temporary file is removed
+    with pytest.raises((AttributeError, pickle.PicklingError)):
+        save_data_atomic({"states": lambda: None}, str(path))
+
+    assert load_data(str(path)) == {"states": [1.0]}
+    assert os.listdir(tmp_path) == ["data.pkl"]